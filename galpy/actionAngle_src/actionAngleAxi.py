@@ -19,8 +19,7 @@ from scipy import optimize, integrate
 from galpy.actionAngle_src.actionAngle import *
 from galpy.actionAngle_src.actionAngleVertical import actionAngleVertical
 from galpy.potential_src.planarPotential import _evaluateplanarPotentials
-from galpy.potential_src.Potential import epifreq
-from galpy.potential import vcirc
+from galpy.potential_src.Potential import _epifreq, _vcirc
 _EPS= 10.**-15.
 class actionAngleAxi(actionAngleVertical):
     """Action-angle formalism for axisymmetric potentials"""
@@ -122,7 +121,7 @@ class actionAngleAxi(actionAngleVertical):
             return self._TR
         (rperi,rap)= self.calcRapRperi(**kwargs)
         if nu.fabs(rap-rperi)/rap < 10.**-4.: #Rough limit
-            self._TR= 2.*m.pi/epifreq(self._pot,self._R,use_physical=False)
+            self._TR= 2.*m.pi/_epifreq(self._pot,self._R)
             return self._TR
         Rmean= m.exp((m.log(rperi)+m.log(rap))/2.)
         EL= self.calcEL(**kwargs)
@@ -277,10 +276,10 @@ class actionAngleAxi(actionAngleVertical):
             return self._rperirap
         EL= self.calcEL(**kwargs)
         E, L= EL
-        if self._vR == 0. and m.fabs(self._vT - vcirc(self._pot,self._R,use_physical=False)) < _EPS: #We are on a circular orbit
+        if self._vR == 0. and m.fabs(self._vT - _vcirc(self._pot,self._R)) < _EPS: #We are on a circular orbit
             rperi= self._R
             rap = self._R
-        elif self._vR == 0. and self._vT > vcirc(self._pot,self._R,use_physical=False): #We are exactly at pericenter
+        elif self._vR == 0. and self._vT > _vcirc(self._pot,self._R): #We are exactly at pericenter
             rperi= self._R
             if self._gamma != 0.:
                 startsign= _rapRperiAxiEq(self._R+10.**-8.,E,L,self._pot)
@@ -291,7 +290,7 @@ class actionAngleAxi(actionAngleVertical):
             rap= optimize.brentq(_rapRperiAxiEq,rperi+0.00001,rend,
                                  args=(E,L,self._pot))
 #                                   fprime=_rapRperiAxiDeriv)
-        elif self._vR == 0. and self._vT < vcirc(self._pot,self._R,use_physical=False): #We are exactly at apocenter
+        elif self._vR == 0. and self._vT < _vcirc(self._pot,self._R): #We are exactly at apocenter
             rap= self._R
             if self._gamma != 0.:
                 startsign= _rapRperiAxiEq(self._R-10.**-8.,E,L,self._pot)
@@ -17,11 +17,12 @@ import warnings
 import numpy as nu
 import numpy.linalg as linalg
 from scipy import optimize
-from galpy.potential import dvcircdR, vcirc, _isNonAxi
+from galpy.potential import dvcircdR, _isNonAxi
+from galpy.potential_src.Potential import _vcirc
 from galpy.actionAngle_src.actionAngleIsochrone import actionAngleIsochrone
 from galpy.actionAngle_src.actionAngle import actionAngle
 from galpy.potential import IsochronePotential, MWPotential
-from galpy.util import bovy_plot, galpyWarning
+from galpy.util import galpyWarning
 from galpy.util.bovy_conversion import physical_conversion, \
     potential_physical_input, time_in_Gyr
 _TWOPI= 2.*nu.pi
@@ -390,6 +391,7 @@ class actionAngleIsochroneApprox(actionAngle):
         HISTORY:
            2013-09-10 - Written - Bovy (IAS)
         """
+        from galpy.util import bovy_plot
         #Kwargs
         type= kwargs.pop('type','araz')
         deperiod= kwargs.pop('deperiod',False)
@@ -750,7 +752,7 @@ def estimateBIsochrone(pot,R,z,phi=None):
     else:
         r2= R**2.+z**2
         r= math.sqrt(r2)
-        dlvcdlr= dvcircdR(pot,r,phi=phi,use_physical=False)/vcirc(pot,r,phi=phi,use_physical=False)*r
+        dlvcdlr= dvcircdR(pot,r,phi=phi,use_physical=False)/_vcirc(pot,r,phi=phi)*r
         try:
             b= optimize.brentq(lambda x: dlvcdlr-(x/math.sqrt(r2+x**2.)-0.5*r2/(r2+x**2.)),
                                0.01,100.)
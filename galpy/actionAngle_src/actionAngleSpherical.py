@@ -13,8 +13,8 @@ import copy
 import math as m
 import numpy as nu
 from scipy import integrate
-from galpy.potential import epifreq, omegac
-from galpy.potential_src.Potential import _evaluatePotentials
+from galpy.potential_src.Potential import _evaluatePotentials, _epifreq, \
+    _omegac
 from galpy.actionAngle_src.actionAngle import *
 from galpy.actionAngle_src.actionAngleAxi import actionAngleAxi, potentialAxi
 class actionAngleSpherical(actionAngle):
@@ -197,8 +197,8 @@ class actionAngleSpherical(actionAngle):
                 Jr.append(self._calc_jr(rperi,rap,E,L,fixed_quad,**kwargs))
                 #Radial period
                 if Jr[-1] < 10.**-9.: #Circular orbit
-                    Or.append(epifreq(self._pot,axiR[ii],use_physical=False))
-                    Op.append(omegac(self._pot,axiR[ii],use_physical=False))
+                    Or.append(_epifreq(self._pot,axiR[ii]))
+                    Op.append(_omegac(self._pot,axiR[ii]))
                     continue
                 Rmean= m.exp((m.log(rperi)+m.log(rap))/2.)
                 Or.append(self._calc_or(Rmean,rperi,rap,E,L,fixed_quad,**kwargs))
@@ -282,8 +282,8 @@ class actionAngleSpherical(actionAngle):
                 #Radial period
                 Rmean= m.exp((m.log(rperi)+m.log(rap))/2.)
                 if Jr[-1] < 10.**-9.: #Circular orbit
-                    Or.append(epifreq(self._pot,axiR[ii],use_physical=False))
-                    Op.append(omegac(self._pot,axiR[ii],use_physical=False))
+                    Or.append(_epifreq(self._pot,axiR[ii]))
+                    Op.append(_omegac(self._pot,axiR[ii]))
                 else:
                     Or.append(self._calc_or(Rmean,rperi,rap,E,L,fixed_quad,**kwargs))
                     Op.append(self._calc_op(Or[-1],Rmean,rperi,rap,E,L,fixed_quad,**kwargs))
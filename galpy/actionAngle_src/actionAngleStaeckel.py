@@ -14,10 +14,10 @@ import copy
 import warnings
 import numpy as nu
 from scipy import optimize, integrate
-from galpy.potential import evaluateR2derivs, evaluatez2derivs, \
-    evaluateRzderivs, epifreq, omegac, verticalfreq, MWPotential
+from galpy.potential import MWPotential
 from galpy.potential_src.Potential import _evaluatePotentials, \
-    _evaluateRforces, _evaluatezforces
+    _evaluateRforces, _evaluatezforces, _evaluateR2derivs, \
+    _evaluatez2derivs, _evaluateRzderivs, _epifreq, _omegac, _verticalfreq
 from galpy.util import bovy_coords #for prolate confocal transforms
 from galpy.util import galpyWarning
 from galpy.util.bovy_conversion import physical_conversion, \
@@ -229,9 +229,9 @@ class actionAngleStaeckel(actionAngle):
             # Adjustements for close-to-circular orbits
             indx= nu.isnan(Omegar)*(jr < 10.**-3.)+nu.isnan(Omegaz)*(jz < 10.**-3.) #Close-to-circular and close-to-the-plane orbits
             if nu.sum(indx) > 0:
-                Omegar[indx]= [epifreq(self._pot,r,use_physical=False) for r in R[indx]]
-                Omegaphi[indx]= [omegac(self._pot,r,use_physical=False) for r in R[indx]]
-                Omegaz[indx]= [verticalfreq(self._pot,r,use_physical=False) for r in R[indx]]
+                Omegar[indx]= [_epifreq(self._pot,r) for r in R[indx]]
+                Omegaphi[indx]= [_omegac(self._pot,r) for r in R[indx]]
+                Omegaz[indx]= [_verticalfreq(self._pot,r) for r in R[indx]]
             if err == 0:
                 return (jr,Lz,jz,Omegar,Omegaphi,Omegaz)
             else: #pragma: no cover
@@ -300,9 +300,9 @@ class actionAngleStaeckel(actionAngle):
             # Adjustements for close-to-circular orbits
             indx= nu.isnan(Omegar)*(jr < 10.**-3.)+nu.isnan(Omegaz)*(jz < 10.**-3.) #Close-to-circular and close-to-the-plane orbits
             if nu.sum(indx) > 0:
-                Omegar[indx]= [epifreq(self._pot,r,use_physical=False) for r in R[indx]]
-                Omegaphi[indx]= [omegac(self._pot,r,use_physical=False) for r in R[indx]]
-                Omegaz[indx]= [verticalfreq(self._pot,r,use_physical=False) for r in R[indx]]
+                Omegar[indx]= [_epifreq(self._pot,r) for r in R[indx]]
+                Omegaphi[indx]= [_omegac(self._pot,r) for r in R[indx]]
+                Omegaz[indx]= [_verticalfreq(self._pot,r) for r in R[indx]]
             if err == 0:
                 return (jr,Lz,jz,Omegar,Omegaphi,Omegaz,angler,anglephi,anglez)
             else:
@@ -909,10 +909,8 @@ def estimateDeltaStaeckel(pot,R,z):
         delta2= nu.array([(z[ii]**2.-R[ii]**2. #eqn. (9) has a sign error
                            +(3.*R[ii]*_evaluatezforces(pot,R[ii],z[ii])
                              -3.*z[ii]*_evaluateRforces(pot,R[ii],z[ii])
-                             +R[ii]*z[ii]*(evaluateR2derivs(pot,R[ii],z[ii],
-                                                            use_physical=False)
-                                           -evaluatez2derivs(pot,R[ii],z[ii],
-                                                             use_physical=False)))/evaluateRzderivs(pot,R[ii],z[ii],use_physical=False)) for ii in range(len(R))])
+                             +R[ii]*z[ii]*(_evaluateR2derivs(pot,R[ii],z[ii])
+                                           -_evaluatez2derivs(pot,R[ii],z[ii])))/_evaluateRzderivs(pot,R[ii],z[ii])) for ii in range(len(R))])
         indx= (delta2 < 0.)*(delta2 > -10.**-10.)
         delta2[indx]= 0.
         delta2= nu.median(delta2[True^nu.isnan(delta2)])
@@ -920,7 +918,7 @@ def estimateDeltaStaeckel(pot,R,z):
         delta2= (z**2.-R**2. #eqn. (9) has a sign error
                  +(3.*R*_evaluatezforces(pot,R,z)
                    -3.*z*_evaluateRforces(pot,R,z)
-                   +R*z*(evaluateR2derivs(pot,R,z,use_physical=False)
-                         -evaluatez2derivs(pot,R,z,use_physical=False)))/evaluateRzderivs(pot,R,z,use_physical=False))
+                   +R*z*(_evaluateR2derivs(pot,R,z)
+                         -_evaluatez2derivs(pot,R,z)))/_evaluateRzderivs(pot,R,z))
         if delta2 < 0. and delta2 > -10.**-10.: delta2= 0.
     return nu.sqrt(delta2)
@@ -187,6 +187,18 @@ void parse_actionAngleArgs(int npot,
       potentialArgs->zforce= &DiskSCFPotentialzforce;
       potentialArgs->nargs= (int) *(pot_args) + 3;
       break;      
+    case 29: //FerrersPotential, 22 arguments + 2 x glorder
+      potentialArgs->potentialEval= &FerrersPotentialEval;
+      potentialArgs->Rforce= &FerrersPotentialRforce;
+      potentialArgs->zforce= &FerrersPotentialzforce;
+      potentialArgs->nargs= (int) (22 + 2 * *(pot_args+7));
+      break;
+    case 33: //CallbackPotential, 8 arguments
+      potentialArgs->potentialEval= &CallbackPotentialEval;
+      potentialArgs->Rforce= &CallbackPotentialRforce;
+      potentialArgs->zforce= &CallbackPotentialzforce;
+      potentialArgs->nargs= 8;
+      break;
 //////////////////////////////// WRAPPERS /////////////////////////////////////
     case -1: //DehnenSmoothWrapperPotential
       potentialArgs->potentialEval= &DehnenSmoothWrapperPotentialEval;
@@ -23,7 +23,6 @@ from galpy.potential import calcRotcurve
 from galpy.df_src.df import df, _APY_LOADED
 from galpy.potential_src.Potential import _check_c
 from galpy.util.bovy_quadpack import dblquad
-from galpy.util import bovy_plot
 from galpy.util.bovy_conversion import physical_conversion, \
     potential_physical_input, time_in_Gyr
 if _APY_LOADED:
@@ -2019,6 +2018,7 @@ class evolveddiskdfGrid(object):
         HISTORY:
            2011-06-27 - Written - Bovy (NYU)
         """
+        from galpy.util import bovy_plot
         xrange= [self.vRgrid[0],self.vRgrid[len(self.vRgrid)-1]]
         yrange= [self.vTgrid[0],self.vTgrid[len(self.vTgrid)-1]]
         if len(self.df.shape) == 3:
@@ -2210,6 +2210,7 @@ class evolveddiskdfHierarchicalGrid(object):
         HISTORY:
            2011-06-27 - Written - Bovy (NYU)
         """
+        from galpy.util import bovy_plot
         if vmax is None:
             vmax= self.max(tt=tt)*2.
         #Figure out how big of a grid we need
@@ -7,6 +7,7 @@ from galpy import potential
 from galpy import actionAngle
 from galpy.actionAngle import actionAngleIsochrone
 from galpy.potential import IsochronePotential
+from galpy.potential_src.Potential import _vcirc, _epifreq, _verticalfreq
 from galpy.orbit import Orbit
 from galpy.df_src.df import df, _APY_LOADED
 from galpy.util import galpyWarning
@@ -122,7 +123,7 @@ class quasiisothermaldf(df):
             self._precomputergnLz= _precomputergnLz
             self._precomputergLzmin= 0.01
             self._precomputergLzmax= self._precomputergrmax\
-                *potential.vcirc(self._pot,self._precomputergrmax)
+                *_vcirc(self._pot,self._precomputergrmax)
             self._precomputergLzgrid= numpy.linspace(self._precomputergLzmin,self._precomputergLzmax,self._precomputergnLz)
             self._rls= numpy.array([potential.rl(self._pot,l) for l in self._precomputergLzgrid])
             #Spline interpolate
@@ -596,7 +597,7 @@ class quasiisothermaldf(df):
             sigmaz1= self._sz*numpy.exp((self._refr-R)/self._hsz)
         else:
             sigmaz1= _sigmaz1
-        thisvc= potential.vcirc(self._pot,R,use_physical=False)
+        thisvc= _vcirc(self._pot,R)
         #Use the asymmetric drift equation to estimate va
         gamma= numpy.sqrt(0.5)
         va= sigmaR1**2./2./thisvc\
@@ -808,7 +809,7 @@ class quasiisothermaldf(df):
             nsigma= _NSIGMA
         sigmaR1= self._sr*numpy.exp((self._refr-R)/self._hsr)
         sigmaz1= self._sz*numpy.exp((self._refr-R)/self._hsz)
-        thisvc= potential.vcirc(self._pot,R,use_physical=False)
+        thisvc= _vcirc(self._pot,R)
         #Use the asymmetric drift equation to estimate va
         gamma= numpy.sqrt(0.5)
         va= sigmaR1**2./2./thisvc\
@@ -2236,7 +2237,7 @@ class quasiisothermaldf(df):
         NOTE:
            takes about 0.1 ms for a Miyamoto-Nagai potential
         """
-        return potential.epifreq(self._pot,r)
+        return _epifreq(self._pot,r)
 
     def _calc_verticalfreq(self,r):
         """
@@ -2253,7 +2254,7 @@ class quasiisothermaldf(df):
         NOTE:
            takes about 0.05 ms for a Miyamoto-Nagai potential
         """
-        return potential.verticalfreq(self._pot,r)
+        return _verticalfreq(self._pot,r)
 
     def _rg(self,lz):
         """
@@ -11,7 +11,7 @@ else:
 from galpy.orbit import Orbit
 from galpy.df_src.df import df, _APY_LOADED
 from galpy.util import bovy_coords, fast_cholesky_invert, \
-    bovy_conversion, multi, bovy_plot, stable_cho_factor, bovy_ars
+    bovy_conversion, multi, stable_cho_factor, bovy_ars
 from galpy.util.bovy_conversion import physical_conversion, _APY_UNITS
 from galpy.actionAngle_src.actionAngleIsochroneApprox import dePeriod
 import warnings
@@ -551,6 +551,7 @@ class streamdf(df):
            2013-12-09 - Written - Bovy (IAS)
 
         """
+        from galpy.util import bovy_plot
         if not hasattr(self,'_ObsTrackLB') and \
                 (d1.lower() == 'll' or d1.lower() == 'bb' 
                  or d1.lower() == 'dist' or d1.lower() == 'pmll' 
@@ -619,6 +620,7 @@ class streamdf(df):
            2013-12-09 - Written - Bovy (IAS)
 
         """
+        from galpy.util import bovy_plot
         tts= self._progenitor._orb.t[self._progenitor._orb.t \
                                           < self._trackts[self._nTrackChunks-1]]
         obs= [self._R0,0.,self._Zsun]
@@ -865,6 +867,7 @@ class streamdf(df):
            2014-08-27 - Written - Bovy (IAS)
 
         """
+        from galpy.util import bovy_plot
         #First calculate the model
         model_adiff= (self._ObsTrackAA[:,3:]-self._progenitor_angle)[:,0]\
             *self._sigMeanSign
@@ -9,19 +9,23 @@ else:
     from scipy.misc import logsumexp
 from galpy.potential_src.Potential import _evaluateRforces, _evaluatezforces,\
     evaluatePotentials, _evaluatephiforces, evaluateDensities, _check_c
-from galpy.util import galpyWarning
-import galpy.util.bovy_plot as plot
+from galpy.util import galpyWarning, multi
 import galpy.util.bovy_symplecticode as symplecticode
 import galpy.util.bovy_coords as coords
 #try:
-from galpy.orbit_src.integrateFullOrbit import integrateFullOrbit_c, _ext_loaded
+from galpy.orbit_src.integrateFullOrbit import integrateFullOrbit_c, \
+    integrateFullOrbit_dxdv_c, integrateFullOrbit_lyapunov_c, _ext_loaded
 ext_loaded= _ext_loaded
 from galpy.util.bovy_conversion import physical_conversion
 from galpy.orbit_src.OrbitTop import OrbitTop
+from galpy.orbit_src.IntegrationStats import IntegrationStats
 _ORBFITNORMRADEC= 360.
 _ORBFITNORMDIST= 10.
 _ORBFITNORMPMRADEC= 4.
 _ORBFITNORMVLOS= 200.
+_TANGENT_FD_STEP= 1.e-5 # relative step of the finite difference for the change in the force
+_FIT_FD_STEP= 1.e-6 # step of the finite difference for the Jacobian of the transformation to observed coordinates
+_DXDV_C_METHODS= ['rk4_c','rk6_c','dopr54_c','dop853_c','bulirschstoer_c']
 class FullOrbit(OrbitTop):
     """Class that holds and integrates orbits in full 3D potentials"""
     def __init__(self,vxvv=[1.,0.,0.9,0.,0.1],vo=220.,ro=8.0,zo=0.025,
@@ -62,7 +66,8 @@ class FullOrbit(OrbitTop):
                           ro=ro,zo=zo,vo=vo,solarmotion=solarmotion)
         return None
 
-    def integrate(self,t,pot,method='symplec4_c',dt=None):
+    def integrate(self,t,pot,method='symplec4_c',dt=None,events=None,
+                  walltime=None,dense=False):
         """
         NAME:
            integrate
@@ -77,7 +82,12 @@ class FullOrbit(OrbitTop):
                    'rk4_c' for a 4th-order Runge-Kutta integrator in C
                    'rk6_c' for a 6-th order Runge-Kutta integrator in C
                    'dopr54_c' for a Dormand-Prince integrator in C (generally the fastest)
+                   'dop853_c' for an 8th-order Dormand-Prince integrator in C (fastest at tight tolerances)
+                   'bulirschstoer_c' for a Bulirsch-Stoer integrator with adaptive order in C (also efficient at tight tolerances)
            dt= (None) if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize
+           events= (None) list of events to detect during the integration (only for method='dopr54_c'): 'pericenter', 'apocenter', 'zcrossing', 'zmax', or ('escape',r) to stop the integration at radius r
+           dense= (False) if True, keep the dense output of the integrator (only for method='dopr54_c') to evaluate the orbit at any time within the integration range
+           walltime= (None) wall-clock budget for the integration in s (only for the C integrators); when exceeded, the orbit is only integrated up to the last output time reached and the state to continue from is stored
         OUTPUT:
            (none) (get the actual orbit using getOrbit()
         HISTORY:
@@ -88,7 +98,107 @@ class FullOrbit(OrbitTop):
         if hasattr(self,'rs'): delattr(self,'rs')
         self.t= nu.array(t)
         self._pot= pot
-        self.orbit= _integrateFullOrbit(self.vxvv,pot,t,method,dt)
+        out= _integrateFullOrbit(self.vxvv,pot,t,method,dt,dense=dense,
+                                 events=events,stats=True,
+                                 walltime=walltime,checkpoint=True)
+        self.orbit= out[0]
+        self._dense= out[1] if dense else None
+        self._events= out[1+dense] if not events is None else {}
+        self._stats= out[-2]
+        self._set_checkpoint(out[-1],pot,method,events,dense=dense)
+
+    def integrate_dxdv(self,dxdv,t,pot,method='dopr54_c',
+                       rectIn=False,rectOut=False):
+        """
+        NAME:
+           integrate_dxdv
+        PURPOSE:
+           integrate the orbit and a small area of phase space
+        INPUT:
+           dxdv - [dR,dvR,dvT,dz,dvz,dphi]
+           t - list of times at which to output (0 has to be in this!)
+           pot - potential instance or list of instances
+           method= 'odeint' for scipy's odeint
+                   'rk4_c' for a 4th-order Runge-Kutta integrator in C
+                   'rk6_c' for a 6-th order Runge-Kutta integrator in C
+                   'dopr54_c' for a Dormand-Prince integrator in C (generally the fastest)
+                   'dop853_c' for an 8th-order Dormand-Prince integrator in C (fastest at tight tolerances)
+                   'bulirschstoer_c' for a Bulirsch-Stoer integrator with adaptive order in C (also efficient at tight tolerances)
+           rectIn= (False) if True, input dxdv is in rectangular coordinates
+           rectOut= (False) if True, output dxdv (that in orbit_dxdv) is in rectangular coordinates
+        OUTPUT:
+           (none) (get the actual orbit using getOrbit_dxdv()
+        """
+        if hasattr(self,'_orbInterp'): delattr(self,'_orbInterp')
+        if hasattr(self,'rs'): delattr(self,'rs')
+        self.t= nu.array(t)
+        self._pot_dxdv= pot
+        self._pot= pot
+        self.orbit_dxdv, msg= _integrateFullOrbit_dxdv(self.vxvv,dxdv,pot,t,
+                                                       method,rectIn,rectOut)
+        self.orbit= self.orbit_dxdv[:,:6]
+        self._dense= None
+        self._events= {}
+        self._checkpoint= None
+        return msg
+
+    def integrate_lyapunov(self,t,pot,method='dopr54_c',dt=None,dxdv=None):
+        """
+        NAME:
+           integrate_lyapunov
+        PURPOSE:
+           integrate the orbit together with a deviation vector that is renormalized at each output time, to compute the maximal Lyapunov exponent and the mean MEGNO of the orbit
+        INPUT:
+           t - list of times at which to output and renormalize the deviation vector (0 has to be in this!)
+           pot - potential instance or list of instances
+           method= 'odeint', 'rk4_c', 'rk6_c', 'dopr54_c', 'dop853_c', or 'bulirschstoer_c' (see integrate_dxdv)
+           dt= (None) if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize
+           dxdv= (None) initial deviation vector in rectangular coordinates [dx,dy,dz,dvx,dvy,dvz] (default: all components equal)
+        OUTPUT:
+           (none) (get the Lyapunov exponent and MEGNO using lyapunov() and megno())
+        """
+        if hasattr(self,'_orbInterp'): delattr(self,'_orbInterp')
+        if hasattr(self,'rs'): delattr(self,'rs')
+        self.t= nu.array(t)
+        self._pot= pot
+        self.orbit, self._lyap, self._megno, self._stats= \
+            _integrateFullOrbit_lyapunov(self.vxvv,pot,t,method,dt,dxdv)
+        self._dense= None
+        self._events= {}
+        self._checkpoint= None
+
+    @physical_conversion('frequency')
+    def lyapunov(self,*args,**kwargs):
+        """
+        NAME:
+           lyapunov
+        PURPOSE:
+           return the maximal Lyapunov exponent calculated by integrate_lyapunov
+        INPUT:
+           ro= (Object-wide default) physical scale for distances to use to convert
+           vo= (Object-wide default) physical scale for velocities to use to convert
+           use_physical= use to override Object-wide default for using a physical scale for output
+        OUTPUT:
+           maximal Lyapunov exponent (1/Gyr in physical units)
+        """
+        if not hasattr(self,'_lyap'):
+            raise AttributeError("Integrate the orbit with integrate_lyapunov first")
+        return self._lyap
+
+    def megno(self):
+        """
+        NAME:
+           megno
+        PURPOSE:
+           return the mean MEGNO calculated by integrate_lyapunov
+        INPUT:
+           (none)
+        OUTPUT:
+           mean MEGNO <Y> at the final time
+        """
+        if not hasattr(self,'_megno'):
+            raise AttributeError("Integrate the orbit with integrate_lyapunov first")
+        return self._megno
 
     @physical_conversion('energy')
     def Jacobi(self,*args,**kwargs):
@@ -297,8 +407,7 @@ class FullOrbit(OrbitTop):
             return (rap-rperi)/(rap+rperi)
         if not hasattr(self,'orbit'):
             raise AttributeError("Integrate the orbit first")
-        if not hasattr(self,'rs'):
-            self.rs= nu.sqrt(self.orbit[:,0]**2.+self.orbit[:,3]**2.)
+        self._setup_rs()
         return (nu.amax(self.rs)-nu.amin(self.rs))/(nu.amax(self.rs)+nu.amin(self.rs))
 
     @physical_conversion('position')
@@ -322,8 +431,7 @@ class FullOrbit(OrbitTop):
             return rap
         if not hasattr(self,'orbit'):
             raise AttributeError("Integrate the orbit first")
-        if not hasattr(self,'rs'):
-            self.rs= nu.sqrt(self.orbit[:,0]**2.+self.orbit[:,3]**2.)
+        self._setup_rs()
         return nu.amax(self.rs)
 
     @physical_conversion('position')
@@ -347,8 +455,7 @@ class FullOrbit(OrbitTop):
             return rperi
         if not hasattr(self,'orbit'):
             raise AttributeError("Integrate the orbit first")
-        if not hasattr(self,'rs'):
-            self.rs= nu.sqrt(self.orbit[:,0]**2.+self.orbit[:,3]**2.)
+        self._setup_rs()
         return nu.amin(self.rs)
 
     @physical_conversion('position')
@@ -373,12 +480,24 @@ class FullOrbit(OrbitTop):
             return zmax
         if not hasattr(self,'orbit'):
             raise AttributeError("Integrate the orbit first")
-        return nu.amax(nu.fabs(self.orbit[:,3]))
+        zs= nu.fabs(self.orbit[:,3])
+        for et, ey in getattr(self,'_events',{}).values():
+            zs= nu.hstack((zs,nu.fabs(ey[:,3])))
+        return nu.nanmax(zs)
+
+    def _setup_rs(self):
+        """Set up the radii along the orbit, including those at the events (e.g., peri- and apocenters) found during the integration"""
+        if hasattr(self,'rs'): return None
+        rs= nu.sqrt(self.orbit[:,0]**2.+self.orbit[:,3]**2.)
+        for et, ey in getattr(self,'_events',{}).values():
+            rs= nu.hstack((rs,nu.sqrt(ey[:,0]**2.+ey[:,3]**2.)))
+        self.rs= rs[True^nu.isnan(rs)]
+        return None
 
     def fit(self,vxvv,vxvv_err=None,pot=None,radec=False,lb=False,
             customsky=False,lb_to_customsky=None,pmllpmbb_to_customsky=None,
             tintJ=10,ntintJ=1000,integrate_method='dopr54_c',
-            disp=False,
+            disp=False,gradient=True,init=None,numcores=1,
             **kwargs):
         """
         NAME:
@@ -411,6 +530,11 @@ class FullOrbit(OrbitTop):
                integrate_method= (default: 'dopr54_c') integration method to use
            disp= (False) display the optimizer's convergence message
 
+           Keywords related to the optimization:
+               gradient= (True) if True, maximize the likelihood with a gradient-based optimizer (L-BFGS-B), computing the gradient from the variational equations; requires a Runge-Kutta-type C integrator and potentials with C implementations, otherwise the derivative-free Powell method is used
+               init= (None) [nstart,6] array of initial conditions to start the optimization from (default: the current orbit); the best fit is returned
+               numcores= (1) number of cores to use to run the optimizations for the different initial conditions in parallel
+
         OUTPUT:
            max of log likelihood
         HISTORY:
@@ -438,7 +562,9 @@ class FullOrbit(OrbitTop):
                                       pmllpmbb_to_customsky=pmllpmbb_to_customsky,
                                       tintJ=tintJ,ntintJ=ntintJ,
                                       integrate_method=integrate_method,
-                                      ro=ro,vo=vo,obs=obs,disp=disp)
+                                      ro=ro,vo=vo,obs=obs,disp=disp,
+                                      gradient=gradient,init=init,
+                                      numcores=numcores)
         #Setup with these new initial conditions
         self.vxvv= new_vxvv
         return maxLogL
@@ -497,6 +623,7 @@ class FullOrbit(OrbitTop):
         HISTORY:
            2010-08-08 - Written - Bovy (NYU)
         """
+        from galpy.util import bovy_plot as plot
         labeldict= {'t':r'$t$','R':r'$R$','vR':r'$v_R$','vT':r'$v_T$',
                     'z':r'$z$','vz':r'$v_z$','phi':r'$\phi$',
                     'x':r'$x$','y':r'$y$','vx':r'$v_x$','vy':r'$v_y$'}
@@ -548,7 +675,8 @@ class FullOrbit(OrbitTop):
                                   nu.array(self.EzJz)/self.EzJz[0],
                                   *args,**kwargs)
 
-def _integrateFullOrbit(vxvv,pot,t,method,dt):
+def _integrateFullOrbit(vxvv,pot,t,method,dt,dense=False,events=None,
+                        stats=False,walltime=None,checkpoint=False):
     """
     NAME:
        _integrateFullOrbit
@@ -561,11 +689,19 @@ def _integrateFullOrbit(vxvv,pot,t,method,dt):
        t - list of times at which to output (0 has to be in this!)
        method - 'odeint' or 'leapfrog'
        dt - if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize
+       dense= (False) if True, also return the dense output of the integrator (None if the method does not have dense output)
+       events= (None) list of events to detect (see integrateFullOrbit_c), only for method='dopr54_c'
+       stats= (False) if True, also return an IntegrationStats instance with statistics of the integration (only the method for the Python integrators)
+       walltime= (None) wall-clock budget for the integration in s (only for the C integrators)
+       checkpoint= (False) if True, also return (reason,ntdone,dtnext) describing where an interrupted integration stopped (see integrateFullOrbit_c; (None,len(t),None) for the Python integrators)
     OUTPUT:
-       [:,5] array of [R,vR,vT,z,vz,phi] at each t
+       [:,5] array of [R,vR,vT,z,vz,phi] at each t (, dense output)(, dictionary with for each event the times and [R,vR,vT,z,vz,phi] at the events)(, statistics)(, checkpoint)
     HISTORY:
        2010-08-01 - Written - Bovy (NYU)
     """
+    dense_out= None
+    stats_out= None
+    checkpoint_out= (None,len(t),None)
     #First check that the potential has C
     if '_c' in method:
         if not _check_c(pot):
@@ -574,6 +710,9 @@ def _integrateFullOrbit(vxvv,pot,t,method,dt):
             else:
                 method= 'odeint'
             warnings.warn("Cannot use C integration because some of the potentials are not implemented in C (using %s instead)" % (method), galpyWarning)
+    if not events is None and \
+            (not ext_loaded or not method.lower() == 'dopr54_c'):
+        raise NotImplementedError("Event detection is only implemented for method='dopr54_c' and potentials that are implemented in C")
     if method.lower() == 'leapfrog':
         #go to the rectangular frame
         this_vxvv= nu.array([vxvv[0]*nu.cos(vxvv[5]),
@@ -600,7 +739,9 @@ def _integrateFullOrbit(vxvv,pot,t,method,dt):
     elif ext_loaded and \
             (method.lower() == 'leapfrog_c' or method.lower() == 'rk4_c' \
             or method.lower() == 'rk6_c' or method.lower() == 'symplec4_c' \
-            or method.lower() == 'symplec6_c' or method.lower() == 'dopr54_c'):
+            or method.lower() == 'symplec6_c' or method.lower() == 'dopr54_c' \
+            or method.lower() == 'dop853_c' \
+            or method.lower() == 'bulirschstoer_c'):
         warnings.warn("Using C implementation to integrate orbits",
                       galpyWarning)
         #go to the rectangular frame
@@ -611,8 +752,28 @@ def _integrateFullOrbit(vxvv,pot,t,method,dt):
                              vxvv[2]*nu.cos(vxvv[5])+vxvv[1]*nu.sin(vxvv[5]),
                              vxvv[4]])
         #integrate
-        tmp_out, msg= integrateFullOrbit_c(pot,this_vxvv,
-                                           t,method,dt=dt)
+        tmp_out= integrateFullOrbit_c(pot,this_vxvv,
+                                      t,method,dt=dt,dense=dense,
+                                      events=events,stats=stats,
+                                      walltime=walltime,checkpoint=checkpoint)
+        if checkpoint:
+            checkpoint_out= tmp_out[-1]
+            tmp_out= tmp_out[:-1]
+        if stats:
+            stats_out= tmp_out[-1]
+            tmp_out= tmp_out[:-1]
+        if not events is None:
+            events_out= tmp_out[-1]
+            tmp_out= tmp_out[:-1]
+            for name in events_out:
+                ey= events_out[name][1]
+                R,phi,z= coords.rect_to_cyl(ey[:,0],ey[:,1],ey[:,2])
+                vR,vT,vz= coords.rect_to_cyl_vec(ey[:,3],ey[:,4],ey[:,5],
+                                                 ey[:,0],ey[:,1],ey[:,2])
+                events_out[name]= (events_out[name][0],
+                                   nu.array([R,vR,vT,z,vz,phi % (2.*nu.pi)]).T)
+        if len(tmp_out) == 3: tmp_out, msg, dense_out= tmp_out
+        else: tmp_out, msg= tmp_out
         #go back to the cylindrical frame
         R= nu.sqrt(tmp_out[:,0]**2.+tmp_out[:,1]**2.)
         phi= nu.arccos(tmp_out[:,0]/R)
@@ -642,6 +803,183 @@ def _integrateFullOrbit(vxvv,pot,t,method,dt):
     neg_radii= (out[:,0] < 0.)
     out[neg_radii,0]= -out[neg_radii,0]
     out[neg_radii,5]+= m.pi
+    if not dense and events is None and not stats and not checkpoint:
+        return out
+    out= (out,)
+    if dense: out+= (dense_out,)
+    if not events is None: out+= (events_out,)
+    if stats:
+        if stats_out is None: stats_out= IntegrationStats(method)
+        out+= (stats_out,)
+    if checkpoint: out+= (checkpoint_out,)
+    return out
+
+def _integrateFullOrbit_dxdv(vxvv,dxdv,pot,t,method,rectIn,rectOut):
+    """
+    NAME:
+       _integrateFullOrbit_dxdv
+    PURPOSE:
+       integrate an orbit and area of phase space in a Phi(R,z,phi) potential
+    INPUT:
+       vxvv - array with the initial conditions stacked like
+              [R,vR,vT,z,vz,phi]; vR outward!
+       dxdv - difference to integrate [dR,dvR,dvT,dz,dvz,dphi]
+       pot - Potential instance
+       t - list of times at which to output (0 has to be in this!)
+       method - 'odeint' or one of the Runge-Kutta-type C integrators
+       rectIn= (False) if True, input dxdv is in rectangular coordinates
+       rectOut= (False) if True, output dxdv (that in orbit_dxdv) is in rectangular coordinates
+    OUTPUT:
+       [:,12] array of [R,vR,vT,z,vz,phi,dR,dvR,dvT,dz,dvz,dphi] at each t
+       error message from integrator
+    """
+    #First check that the potential has C
+    if '_c' in method:
+        if not ext_loaded or not _check_c(pot):
+            if not 'leapfrog' in method and not 'symplec' in method:
+                method= 'odeint'
+                warnings.warn("Using odeint because not all used potential have adequate C implementations to integrate phase-space volumes",galpyWarning)
+    #go to the rectangular frame
+    this_vxvv= _cyl_to_rect_vxvv(vxvv)
+    if not rectIn:
+        this_dxdv= _cyl_to_rect_dxdv(vxvv,dxdv)
+    else:
+        this_dxdv= nu.array(dxdv)
+    if 'leapfrog' in method.lower() or 'symplec' in method.lower():
+        raise TypeError('Symplectic integration for phase-space volume is not possible')
+    elif method.lower() == 'rk4_c' or method.lower() == 'rk6_c' \
+            or method.lower() == 'dopr54_c' or method.lower() == 'dop853_c' \
+            or method.lower() == 'bulirschstoer_c':
+        warnings.warn("Using C implementation to integrate orbits",galpyWarning)
+        #integrate
+        tmp_out, msg= integrateFullOrbit_dxdv_c(pot,this_vxvv,this_dxdv,
+                                                t,method)
+    elif method.lower() == 'odeint':
+        init= nu.hstack((this_vxvv,this_dxdv))
+        #integrate
+        tmp_out= integrate.odeint(_FullEOM_dxdv,init,t,args=(pot,),
+                                  rtol=10.**-8.)#,mxstep=100000000)
+        msg= 0
+    else:
+        raise NotImplementedError("requested integration method does not exist")
+    #go back to the cylindrical frame
+    R= nu.sqrt(tmp_out[:,0]**2.+tmp_out[:,1]**2.)
+    phi= nu.arctan2(tmp_out[:,1],tmp_out[:,0]) % (2.*nu.pi)
+    cp= nu.cos(phi)
+    sp= nu.sin(phi)
+    vR= tmp_out[:,3]*cp+tmp_out[:,4]*sp
+    vT= tmp_out[:,4]*cp-tmp_out[:,3]*sp
+    out= nu.zeros((len(t),12))
+    out[:,0]= R
+    out[:,1]= vR
+    out[:,2]= vT
+    out[:,3]= tmp_out[:,2]
+    out[:,4]= tmp_out[:,5]
+    out[:,5]= phi
+    if rectOut:
+        out[:,6:]= tmp_out[:,6:]
+    else:
+        out[:,6:]= _rect_to_cyl_dxdv(out[:,:6],tmp_out[:,6:])
+    return (out,msg)
+
+def _integrateFullOrbit_lyapunov(vxvv,pot,t,method,dt,dxdv):
+    """
+    NAME:
+       _integrateFullOrbit_lyapunov
+    PURPOSE:
+       integrate an orbit in a Phi(R,z,phi) potential together with a deviation vector that is renormalized at each output time
+    INPUT:
+       vxvv - array with the initial conditions stacked like
+              [R,vR,vT,z,vz,phi]; vR outward!
+       pot - Potential instance
+       t - list of times at which to output (0 has to be in this!)
+       method - 'odeint' or one of the Runge-Kutta-type C integrators
+       dt - if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize
+       dxdv - initial deviation vector in rectangular coordinates (None: all components equal)
+    OUTPUT:
+       ([:,6] array of [R,vR,vT,z,vz,phi] at each t,maximal Lyapunov exponent,mean MEGNO,statistics)
+    """
+    if dxdv is None: dxdv= nu.ones(6)
+    dxdv= nu.asarray(dxdv,dtype='float')
+    if '_c' in method:
+        if not ext_loaded or not _check_c(pot):
+            if not 'leapfrog' in method and not 'symplec' in method:
+                method= 'odeint'
+                warnings.warn("Using odeint because not all used potential have adequate C implementations to integrate phase-space volumes",galpyWarning)
+    this_vxvv= _cyl_to_rect_vxvv(vxvv)
+    if 'leapfrog' in method.lower() or 'symplec' in method.lower():
+        raise TypeError('Symplectic integration for phase-space volume is not possible')
+    elif method.lower() == 'rk4_c' or method.lower() == 'rk6_c' \
+            or method.lower() == 'dopr54_c' or method.lower() == 'dop853_c' \
+            or method.lower() == 'bulirschstoer_c':
+        warnings.warn("Using C implementation to integrate orbits",galpyWarning)
+        tmp_out, lyap, megno, msg, stats_out= \
+            integrateFullOrbit_lyapunov_c(pot,this_vxvv,dxdv,t,method,dt=dt,
+                                          stats=True)
+    elif method.lower() == 'odeint':
+        tmp_out, lyap, megno= _lyapunov_odeint(this_vxvv,dxdv,pot,t)
+        stats_out= IntegrationStats(method)
+    else:
+        raise NotImplementedError("requested integration method does not exist")
+    out= nu.zeros((len(t),6))
+    out[:,0]= nu.sqrt(tmp_out[:,0]**2.+tmp_out[:,1]**2.)
+    out[:,5]= nu.arctan2(tmp_out[:,1],tmp_out[:,0]) % (2.*nu.pi)
+    cp= nu.cos(out[:,5])
+    sp= nu.sin(out[:,5])
+    out[:,1]= tmp_out[:,3]*cp+tmp_out[:,4]*sp
+    out[:,2]= tmp_out[:,4]*cp-tmp_out[:,3]*sp
+    out[:,3]= tmp_out[:,2]
+    out[:,4]= tmp_out[:,5]
+    return (out,lyap,megno,stats_out)
+
+def _lyapunov_odeint(vxvv,dxdv,pot,t):
+    """Python version of integrateFullOrbit_lyapunov_c for a single orbit in rectangular coordinates, integrating between output times with odeint"""
+    y= nu.zeros(15)
+    y[:6]= vxvv
+    y[6:12]= dxdv/nu.sqrt(nu.sum(dxdv**2.))
+    out= nu.empty((len(t),6))
+    out[0]= vxvv
+    lnsum= 0.
+    for ii in range(len(t)-1):
+        y= integrate.odeint(_FullEOM_megno,y,t[ii:ii+2],args=(pot,),
+                            rtol=10.**-8.)[-1]
+        dnorm= nu.sqrt(nu.sum(y[6:12]**2.))
+        lnsum+= nu.log(dnorm)
+        y[6:12]/= dnorm
+        out[ii+1]= y[:6]
+    return (out,lnsum/(t[-1]-t[0]),y[13]/y[14])
+
+def _cyl_to_rect_vxvv(vxvv):
+    """Convert [R,vR,vT,z,vz,phi] to [x,y,z,vx,vy,vz]"""
+    return nu.array([vxvv[0]*nu.cos(vxvv[5]),
+                     vxvv[0]*nu.sin(vxvv[5]),
+                     vxvv[3],
+                     vxvv[1]*nu.cos(vxvv[5])-vxvv[2]*nu.sin(vxvv[5]),
+                     vxvv[2]*nu.cos(vxvv[5])+vxvv[1]*nu.sin(vxvv[5]),
+                     vxvv[4]])
+
+def _cyl_to_rect_dxdv(vxvv,dxdv):
+    """Convert a deviation [dR,dvR,dvT,dz,dvz,dphi] at [R,vR,vT,z,vz,phi] to [dx,dy,dz,dvx,dvy,dvz]"""
+    cp= nu.cos(vxvv[5])
+    sp= nu.sin(vxvv[5])
+    return nu.array([cp*dxdv[0]-vxvv[0]*sp*dxdv[5],
+                     sp*dxdv[0]+vxvv[0]*cp*dxdv[5],
+                     dxdv[3],
+                     -(vxvv[1]*sp+vxvv[2]*cp)*dxdv[5]+cp*dxdv[1]-sp*dxdv[2],
+                     (vxvv[1]*cp-vxvv[2]*sp)*dxdv[5]+sp*dxdv[1]+cp*dxdv[2],
+                     dxdv[4]])
+
+def _rect_to_cyl_dxdv(vxvv,dxdv):
+    """Convert deviations [:,dx,dy,dz,dvx,dvy,dvz] at [:,R,vR,vT,z,vz,phi] to [:,dR,dvR,dvT,dz,dvz,dphi]"""
+    cp= nu.cos(vxvv[:,5])
+    sp= nu.sin(vxvv[:,5])
+    out= nu.empty_like(dxdv)
+    out[:,5]= (cp*dxdv[:,1]-sp*dxdv[:,0])/vxvv[:,0]
+    out[:,0]= cp*dxdv[:,0]+sp*dxdv[:,1]
+    out[:,1]= cp*dxdv[:,3]+sp*dxdv[:,4]+vxvv[:,2]*out[:,5]
+    out[:,2]= cp*dxdv[:,4]-sp*dxdv[:,3]-vxvv[:,1]*out[:,5]
+    out[:,3]= dxdv[:,2]
+    out[:,4]= dxdv[:,5]
     return out
 
 def _FullEOM(y,t,pot):
@@ -669,6 +1007,54 @@ def _FullEOM(y,t,pot):
             y[5],
             _evaluatezforces(pot,y[0],y[4],phi=y[2],t=t)]
 
+def _FullEOM_dxdv(x,t,pot):
+    """
+    NAME:
+       _FullEOM_dxdv
+    PURPOSE:
+       implements the EOM, i.e., the right-hand side of the differential 
+       equation, for integrating phase space differences, rectangular; the 
+       change in the force along the position difference is computed as a 
+       central finite difference of the force
+    INPUT:
+       x - current phase-space position and difference [x,v,dx,dv]
+       t - current time
+       pot - (list of) Potential instance(s)
+    OUTPUT:
+       dy/dt
+    """
+    dqnorm= nu.sqrt(nu.sum(x[6:9]**2.))
+    if dqnorm == 0.:
+        dF= nu.zeros(3)
+    else:
+        h= _TANGENT_FD_STEP*max(nu.sqrt(nu.sum(x[:3]**2.)),1.)/dqnorm
+        dF= (_rectForce(x[:3]+h*x[6:9],pot,t=t)
+             -_rectForce(x[:3]-h*x[6:9],pot,t=t))/2./h
+    return nu.hstack((x[3:6],_rectForce(x[:3],pot,t=t),x[9:12],dF))
+
+def _FullEOM_megno(x,t,pot):
+    """
+    NAME:
+       _FullEOM_megno
+    PURPOSE:
+       implements the EOM for integrating phase space differences together 
+       with the MEGNO integrals, rectangular
+    INPUT:
+       x - [x,v,dx,dv,I1,I2,s], with s the time since the start, 
+           I1= int ds s (d delta/ds . delta) / |delta|^2, and I2= int ds 2 I1 / s
+       t - current time
+       pot - (list of) Potential instance(s)
+    OUTPUT:
+       dy/dt
+    """
+    out= nu.empty(15)
+    out[:12]= _FullEOM_dxdv(x[:12],t,pot)
+    dnorm2= nu.sum(x[6:12]**2.)
+    out[12]= nu.sum(out[6:12]*x[6:12])/dnorm2*x[14] if dnorm2 > 0. else 0.
+    out[13]= 2.*x[12]/x[14] if x[14] != 0. else 0.
+    out[14]= 1.
+    return out
+
 def _rectForce(x,pot,t=0.):
     """
     NAME:
@@ -701,38 +1087,53 @@ def _fit_orbit(orb,vxvv,vxvv_err,pot,radec=False,lb=False,
                customsky=False,lb_to_customsky=None,
                pmllpmbb_to_customsky=None,
                tintJ=100,ntintJ=1000,integrate_method='dopr54_c',
-               ro=None,vo=None,obs=None,disp=False):
-    """Fit an orbit to data in a given potential"""
+               ro=None,vo=None,obs=None,disp=False,
+               gradient=True,init=None,numcores=1):
+    """Fit an orbit to data in a given potential, starting from each of the initial conditions in init (default: the current orbit) and returning the best fit"""
+    if init is None: init= orb.vxvv
+    init= nu.atleast_2d(init)
+    if gradient and (not ext_loaded or not _check_c(pot) \
+                         or not integrate_method.lower() in _DXDV_C_METHODS):
+        warnings.warn("Fitting the orbit without gradients, because these require a Runge-Kutta-type C integrator and potentials with C implementations",galpyWarning)
+        gradient= False
     # Need to turn this off for speed
     coords._APY_COORDS= False
-    #Import here, because otherwise there is an infinite loop of imports
-    from galpy.actionAngle import actionAngleIsochroneApprox, actionAngle
-    #Mock this up, bc we want to use its orbit-integration routines
-    class mockActionAngleIsochroneApprox(actionAngleIsochroneApprox):
-        def __init__(self,tintJ,ntintJ,pot,integrate_method='dopr54_c'):
-            actionAngle.__init__(self)
-            self._tintJ= tintJ
-            self._ntintJ=ntintJ
-            self._tsJ= nu.linspace(0.,self._tintJ,self._ntintJ)
-            self._integrate_dt= None
-            self._pot= pot
-            self._integrate_method= integrate_method
-            return None
-    tmockAA= mockActionAngleIsochroneApprox(tintJ,ntintJ,pot,
-                                            integrate_method=integrate_method)
-    opt_vxvv= optimize.fmin_powell(_fit_orbit_mlogl,orb.vxvv,
-                                   args=(vxvv,vxvv_err,pot,radec,lb,
-                                         customsky,lb_to_customsky,
-                                         pmllpmbb_to_customsky,
-                                         tmockAA,
-                                         ro,vo,obs),
-                                   disp=disp)
-    maxLogL= -_fit_orbit_mlogl(opt_vxvv,vxvv,vxvv_err,pot,radec,lb,
-                               customsky,lb_to_customsky,pmllpmbb_to_customsky,
-                               tmockAA,
-                               ro,vo,obs)
+    if gradient:
+        tsJ= nu.linspace(0.,tintJ,ntintJ)
+        args= (vxvv,vxvv_err,pot,radec,lb,customsky,lb_to_customsky,
+               pmllpmbb_to_customsky,tsJ,integrate_method,ro,vo,obs)
+        def _fit_one(ii):
+            res= optimize.minimize(_fit_orbit_mlogl_grad,init[ii],args=args,
+                                   jac=True,method='L-BFGS-B',
+                                   options={'disp':disp})
+            return nu.append(res.x,-res.fun)
+    else:
+        #Import here, because otherwise there is an infinite loop of imports
+        from galpy.actionAngle import actionAngleIsochroneApprox, actionAngle
+        #Mock this up, bc we want to use its orbit-integration routines
+        class mockActionAngleIsochroneApprox(actionAngleIsochroneApprox):
+            def __init__(self,tintJ,ntintJ,pot,integrate_method='dopr54_c'):
+                actionAngle.__init__(self)
+                self._tintJ= tintJ
+                self._ntintJ=ntintJ
+                self._tsJ= nu.linspace(0.,self._tintJ,self._ntintJ)
+                self._integrate_dt= None
+                self._pot= pot
+                self._integrate_method= integrate_method
+                return None
+        tmockAA= mockActionAngleIsochroneApprox(tintJ,ntintJ,pot,
+                                                integrate_method=integrate_method)
+        args= (vxvv,vxvv_err,pot,radec,lb,customsky,lb_to_customsky,
+               pmllpmbb_to_customsky,tmockAA,ro,vo,obs)
+        def _fit_one(ii):
+            opt_vxvv= optimize.fmin_powell(_fit_orbit_mlogl,init[ii],
+                                           args=args,disp=disp)
+            return nu.append(opt_vxvv,-_fit_orbit_mlogl(opt_vxvv,*args))
+    out= nu.array(list(multi.parallel_map(_fit_one,range(init.shape[0]),
+                                          numcores=numcores)))
     coords._APY_COORDS= True
-    return (opt_vxvv,maxLogL)
+    best= nu.argmax(out[:,6])
+    return (out[best,:6],out[best,6])
 
 def _fit_orbit_mlogl(new_vxvv,vxvv,vxvv_err,pot,radec,lb,
                      customsky,lb_to_customsky,pmllpmbb_to_customsky,
@@ -748,58 +1149,70 @@ def _fit_orbit_mlogl(new_vxvv,vxvv,vxvv_err,pot,radec,lb,
                                                 new_vxvv[4],
                                                 new_vxvv[5])
     if radec or lb or customsky:
-        #Need to transform to (l,b), (ra,dec), or a custom set
-        #First transform to X,Y,Z,vX,vY,vZ (Galactic)
-        X,Y,Z = coords.galcencyl_to_XYZ(iR.flatten(),iphi.flatten(),
-                                        iz.flatten(),
-                                        Xsun=obs[0]/ro,
-                                        Zsun=obs[2]/ro).T
-        vX,vY,vZ = coords.galcencyl_to_vxvyvz(ivR.flatten(),ivT.flatten(),
-                                              ivz.flatten(),iphi.flatten(),
-                                              vsun=nu.array(\
-                obs[3:6])/vo,Xsun=obs[0]/ro,Zsun=obs[2]/ro).T
-        bad_indx= (X == 0.)*(Y == 0.)*(Z == 0.)
-        if True in bad_indx: X[bad_indx]+= ro/10000.
-        lbdvrpmllpmbb= coords.rectgal_to_sphergal(X*ro,Y*ro,Z*ro,
-                                                  vX*vo,vY*vo,vZ*vo,
-                                                  degree=True)
-        if lb:
-            orb_vxvv= nu.array([lbdvrpmllpmbb[:,0],
-                                lbdvrpmllpmbb[:,1],
-                                lbdvrpmllpmbb[:,2],
-                                lbdvrpmllpmbb[:,4],
-                                lbdvrpmllpmbb[:,5],
-                                lbdvrpmllpmbb[:,3]]).T
-        elif radec:
-            #Further transform to ra,dec,pmra,pmdec
-            radec= coords.lb_to_radec(lbdvrpmllpmbb[:,0],
-                                      lbdvrpmllpmbb[:,1],degree=True)
-            pmrapmdec= coords.pmllpmbb_to_pmrapmdec(lbdvrpmllpmbb[:,4],
-                                                    lbdvrpmllpmbb[:,5],
-                                                    lbdvrpmllpmbb[:,0],
-                                                    lbdvrpmllpmbb[:,1],
-                                                    degree=True)
-            orb_vxvv= nu.array([radec[:,0],radec[:,1],
-                                lbdvrpmllpmbb[:,2],
-                                pmrapmdec[:,0],pmrapmdec[:,1],
-                                lbdvrpmllpmbb[:,3]]).T
-        elif customsky:
-            #Further transform to ra,dec,pmra,pmdec
-            customradec= lb_to_customsky(lbdvrpmllpmbb[:,0],
-                                              lbdvrpmllpmbb[:,1],degree=True)
-            custompmrapmdec= pmllpmbb_to_customsky(lbdvrpmllpmbb[:,4],
-                                                   lbdvrpmllpmbb[:,5],
-                                                   lbdvrpmllpmbb[:,0],
-                                                   lbdvrpmllpmbb[:,1],
-                                                   degree=True)
-            orb_vxvv= nu.array([customradec[:,0],customradec[:,1],
-                                lbdvrpmllpmbb[:,2],
-                                custompmrapmdec[:,0],custompmrapmdec[:,1],
-                                lbdvrpmllpmbb[:,3]]).T
+        orb_vxvv= _fit_orbit_obs(iR,ivR,ivT,iz,ivz,iphi,radec,lb,customsky,
+                                 lb_to_customsky,pmllpmbb_to_customsky,
+                                 ro,vo,obs)
     else:
         #shape=(2tintJ-1,6)
         orb_vxvv= nu.array([iR.flatten(),ivR.flatten(),ivT.flatten(),
                             iz.flatten(),ivz.flatten(),iphi.flatten()]).T 
+    return -_fit_orbit_logl(orb_vxvv,vxvv,vxvv_err)
+
+def _fit_orbit_obs(iR,ivR,ivT,iz,ivz,iphi,radec,lb,customsky,
+                   lb_to_customsky,pmllpmbb_to_customsky,ro,vo,obs):
+    """Transform orbit points in Galactocentric cylindrical coordinates to the observed coordinates used in the fit"""
+    #Need to transform to (l,b), (ra,dec), or a custom set
+    #First transform to X,Y,Z,vX,vY,vZ (Galactic)
+    X,Y,Z = coords.galcencyl_to_XYZ(iR.flatten(),iphi.flatten(),
+                                    iz.flatten(),
+                                    Xsun=obs[0]/ro,
+                                    Zsun=obs[2]/ro).T
+    vX,vY,vZ = coords.galcencyl_to_vxvyvz(ivR.flatten(),ivT.flatten(),
+                                          ivz.flatten(),iphi.flatten(),
+                                          vsun=nu.array(\
+            obs[3:6])/vo,Xsun=obs[0]/ro,Zsun=obs[2]/ro).T
+    bad_indx= (X == 0.)*(Y == 0.)*(Z == 0.)
+    if True in bad_indx: X[bad_indx]+= ro/10000.
+    lbdvrpmllpmbb= coords.rectgal_to_sphergal(X*ro,Y*ro,Z*ro,
+                                              vX*vo,vY*vo,vZ*vo,
+                                              degree=True)
+    if lb:
+        orb_vxvv= nu.array([lbdvrpmllpmbb[:,0],
+                            lbdvrpmllpmbb[:,1],
+                            lbdvrpmllpmbb[:,2],
+                            lbdvrpmllpmbb[:,4],
+                            lbdvrpmllpmbb[:,5],
+                            lbdvrpmllpmbb[:,3]]).T
+    elif radec:
+        #Further transform to ra,dec,pmra,pmdec
+        radec= coords.lb_to_radec(lbdvrpmllpmbb[:,0],
+                                  lbdvrpmllpmbb[:,1],degree=True)
+        pmrapmdec= coords.pmllpmbb_to_pmrapmdec(lbdvrpmllpmbb[:,4],
+                                                lbdvrpmllpmbb[:,5],
+                                                lbdvrpmllpmbb[:,0],
+                                                lbdvrpmllpmbb[:,1],
+                                                degree=True)
+        orb_vxvv= nu.array([radec[:,0],radec[:,1],
+                            lbdvrpmllpmbb[:,2],
+                            pmrapmdec[:,0],pmrapmdec[:,1],
+                            lbdvrpmllpmbb[:,3]]).T
+    elif customsky:
+        #Further transform to ra,dec,pmra,pmdec
+        customradec= lb_to_customsky(lbdvrpmllpmbb[:,0],
+                                          lbdvrpmllpmbb[:,1],degree=True)
+        custompmrapmdec= pmllpmbb_to_customsky(lbdvrpmllpmbb[:,4],
+                                               lbdvrpmllpmbb[:,5],
+                                               lbdvrpmllpmbb[:,0],
+                                               lbdvrpmllpmbb[:,1],
+                                               degree=True)
+        orb_vxvv= nu.array([customradec[:,0],customradec[:,1],
+                            lbdvrpmllpmbb[:,2],
+                            custompmrapmdec[:,0],custompmrapmdec[:,1],
+                            lbdvrpmllpmbb[:,3]]).T
+    return orb_vxvv
+
+def _fit_orbit_logl(orb_vxvv,vxvv,vxvv_err):
+    """The log likelihood of the data given the points along the orbit"""
     out= 0.
     for ii in range(vxvv.shape[0]):
         sub_vxvv= (orb_vxvv-vxvv[ii,:].flatten())**2.
@@ -809,5 +1222,61 @@ def _fit_orbit_mlogl(new_vxvv,vxvv,vxvv_err,pot,radec,lb,
         else:
             sub_vxvv/= 0.01**2.
         out+= logsumexp(-0.5*nu.sum(sub_vxvv,axis=1))
-    return -out
+    return out
+
+def _fit_orbit_mlogl_grad(new_vxvv,vxvv,vxvv_err,pot,radec,lb,
+                          customsky,lb_to_customsky,pmllpmbb_to_customsky,
+                          tsJ,integrate_method,ro,vo,obs):
+    """Minus the log likelihood for fitting an orbit and its gradient with respect to the initial condition, obtained from the state-transition matrix of the variational equations"""
+    w, dw= _fit_orbit_stm(new_vxvv,pot,tsJ,integrate_method)
+    if radec or lb or customsky:
+        obsargs= (radec,lb,customsky,lb_to_customsky,pmllpmbb_to_customsky,
+                  ro,vo,obs)
+        orb_vxvv= _fit_orbit_obs(*(tuple(w.T)+obsargs))
+        # Jacobian of the transformation to the observed coordinates by
+        # central finite differences along each column of the STM
+        dorb= nu.empty_like(dw)
+        for kk in range(6):
+            dnorm= nu.sqrt(nu.sum(dw[:,:,kk]**2.,axis=1))
+            dnorm[dnorm == 0.]= 1.
+            h= (_FIT_FD_STEP/dnorm)[:,None]
+            dobs= _fit_orbit_obs(*(tuple((w+h*dw[:,:,kk]).T)+obsargs))\
+                -_fit_orbit_obs(*(tuple((w-h*dw[:,:,kk]).T)+obsargs))
+            dobs[:,0]= (dobs[:,0]+180.) % 360.-180.
+            dorb[:,:,kk]= dobs/2./h
+    else:
+        orb_vxvv= w
+        dorb= dw
+    if vxvv_err is None: vxvv_err= 0.01*nu.ones_like(vxvv)
+    resid= (orb_vxvv[None,:,:]-vxvv[:,None,:])/vxvv_err[:,None,:]
+    lnp= -0.5*nu.sum(resid**2.,axis=2)
+    out= nu.array([logsumexp(lnp[ii]) for ii in range(vxvv.shape[0])])
+    # d logsumexp = softmax-weighted d lnp
+    weights= nu.exp(lnp-out[:,None])
+    grad= -nu.einsum('ip,ipm,pmk->k',weights,resid/vxvv_err[:,None,:],dorb)
+    return (-nu.sum(out),-grad)
+
+def _fit_orbit_stm(vxvv,pot,tsJ,integrate_method):
+    """Integrate an orbit forward and backward for tsJ together with its state-transition matrix; returns the [2len(tsJ)-1,6] orbit in cylindrical coordinates and the [2len(tsJ)-1,6,6] derivatives of this orbit with respect to the initial condition"""
+    this_vxvv= _cyl_to_rect_vxvv(vxvv)
+    this_dxdv= nu.array([_cyl_to_rect_dxdv(vxvv,e) for e in nu.eye(6)])
+    fwd= integrateFullOrbit_dxdv_c(pot,this_vxvv,this_dxdv,tsJ,
+                                   integrate_method)[0]
+    bwd= integrateFullOrbit_dxdv_c(pot,this_vxvv,this_dxdv,-tsJ,
+                                   integrate_method)[0]
+    tmp_out= nu.vstack((bwd[:0:-1],fwd))
+    npts= tmp_out.shape[0]
+    w= nu.empty((npts,6))
+    w[:,0]= nu.sqrt(tmp_out[:,0]**2.+tmp_out[:,1]**2.)
+    w[:,5]= nu.arctan2(tmp_out[:,1],tmp_out[:,0]) % (2.*nu.pi)
+    cp= nu.cos(w[:,5])
+    sp= nu.sin(w[:,5])
+    w[:,1]= tmp_out[:,3]*cp+tmp_out[:,4]*sp
+    w[:,2]= tmp_out[:,4]*cp-tmp_out[:,3]*sp
+    w[:,3]= tmp_out[:,2]
+    w[:,4]= tmp_out[:,5]
+    dw= nu.empty((npts,6,6))
+    for kk in range(6):
+        dw[:,:,kk]= _rect_to_cyl_dxdv(w,tmp_out[:,6*(kk+1):6*(kk+2)])
+    return (w,dw)
 
@@ -0,0 +1,83 @@
+###############################################################################
+#   IntegrationStats: statistics about what an orbit integrator did
+###############################################################################
+import numpy as nu
+class IntegrationStats(object):
+    """Class holding statistics about an orbit integration"""
+    def __init__(self,method,nfev=None,naccept=None,nreject=None,dt=None,
+                 nsubsteps=None,time=None,drift=None):
+        """
+        NAME:
+           __init__
+        PURPOSE:
+           initialize the statistics of an orbit integration
+        INPUT:
+           method - integration method
+           nfev= number of force evaluations (None if unknown, e.g., for the Python integrators)
+           naccept= number of accepted steps
+           nreject= number of rejected steps (only non-zero for the adaptive integrators)
+           dt= basic step size, either given or set by the integrator's step-size estimate (for the adaptive integrators, the initial step size)
+           nsubsteps= number of basic steps per output time step
+           time= wall-clock time of the integration (s)
+           drift= maximum relative drift in the energy or, for potentials with a pattern speed, the Jacobi integral
+        OUTPUT:
+           IntegrationStats instance
+        """
+        self.method= method
+        self.nfev= nfev
+        self.naccept= naccept
+        self.nreject= nreject
+        self.dt= dt
+        self.nsubsteps= nsubsteps
+        self.time= time
+        self.drift= drift
+        return None
+
+    def __repr__(self):
+        out= 'IntegrationStats for method=%s:' % self.method
+        for key in ['nfev','naccept','nreject','dt','nsubsteps','time',
+                    'drift']:
+            val= getattr(self,key)
+            if val is None: continue
+            if not isinstance(val,nu.ndarray) or val.ndim == 0:
+                out+= '\n   %s= %s' % (key,val)
+            else:
+                out+= '\n   %s= %s (mean), %s (max)' \
+                    % (key,nu.mean(val),nu.amax(val))
+        return out
+
+def _c_stats(method,stats,t,scalarOrbit,time):
+    """Turn the statistics array returned by the C integrators, shape (N,6) with [nfev,naccept,nreject,dt,ntdone,dtnext], into an IntegrationStats instance"""
+    nfev= stats[:,0].astype('int64')
+    naccept= stats[:,1].astype('int64')
+    nreject= stats[:,2].astype('int64')
+    dt= stats[:,3]
+    nsubsteps= nu.rint(nu.fabs((t[1]-t[0])/dt)).astype('int64')
+    if scalarOrbit:
+        return IntegrationStats(method,nfev=nfev[0],naccept=naccept[0],
+                                nreject=nreject[0],dt=dt[0],
+                                nsubsteps=nsubsteps[0],time=time)
+    else:
+        return IntegrationStats(method,nfev=nfev,naccept=naccept,
+                                nreject=nreject,dt=dt,nsubsteps=nsubsteps,
+                                time=time)
+
+def _sum_stats(stats):
+    """Combine the statistics of consecutive integrations (e.g., of chunks of the times) into a single IntegrationStats instance"""
+    out= IntegrationStats(stats[0].method,dt=stats[0].dt,
+                          nsubsteps=stats[0].nsubsteps)
+    for key in ['nfev','naccept','nreject','time']:
+        vals= [getattr(s,key) for s in stats]
+        if any([val is None for val in vals]): continue
+        setattr(out,key,sum(vals))
+    return out
+
+def _pattern_speed(pot):
+    """Return the pattern speed of the first potential in pot that has one (None if none do)"""
+    if not isinstance(pot,list): pot= [pot]
+    for p in pot:
+        try:
+            return p.OmegaP()
+        except AttributeError:
+            continue
+    return None
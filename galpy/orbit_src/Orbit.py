@@ -1,4 +1,5 @@
 import warnings
+import time
 import numpy as nu
 _APY_LOADED= True
 try:
@@ -16,6 +17,7 @@ from galpy.orbit_src.RZOrbit import RZOrbit
 from galpy.orbit_src.planarOrbit import planarOrbit, planarROrbit, \
     planarOrbitTop
 from galpy.orbit_src.linearOrbit import linearOrbit
+from galpy.orbit_src.IntegrationStats import _sum_stats, _pattern_speed
 _K=4.74047
 if _APY_LOADED:
     vxvv_units= [units.kpc,units.km/units.s,units.km/units.s,
@@ -365,7 +367,9 @@ class Orbit(object):
             self._vo= vo
         self._orb.turn_physical_on(ro=ro,vo=vo)
 
-    def integrate(self,t,pot,method='symplec4_c',dt=None):
+    def integrate(self,t,pot,method='symplec4_c',dt=None,out=None,
+                  chunksize=10000,events=None,stats=False,walltime=None,
+                  dense=False):
         """
         NAME:
 
@@ -389,12 +393,26 @@ class Orbit(object):
                    'rk4_c' for a 4th-order Runge-Kutta integrator in C
                    'rk6_c' for a 6-th order Runge-Kutta integrator in C
                    'dopr54_c' for a Dormand-Prince integrator in C (generally the fastest)
+                   'dop853_c' for an 8th-order Dormand-Prince integrator in C (fastest at tight tolerances)
+                   'bulirschstoer_c' for a Bulirsch-Stoer integrator with adaptive order in C (also efficient at tight tolerances)
 
            dt= (None) if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize (only works for the C integrators that use a fixed stepsize) (can be Quantity)
 
+           out= (None) if set, array with shape [len(t),phasedim] (e.g., a numpy.memmap) that the orbit is written into; the orbit is then integrated in chunks of chunksize times, such that the memory used by the integration does not grow with len(t)
+
+           chunksize= (10000) number of times to integrate at once when out= is set
+
+           events= (None) list of events to detect during the integration, with their exact times and phase-space positions found by root-finding on the dense output of the integrator (only for method='dopr54_c' and orbits that track the azimuth): 'pericenter', 'apocenter', 'zcrossing' (crossing z=0), 'zmax' (extrema of z), or ('escape',r) to stop the integration when the orbit reaches radius r (later times in the orbit are NaN); get the events using getEvents(); the peri- and apocenters and extrema of z are used by rperi, rap, e, and zmax with analytic=False
+
+           stats= (False) if True, return an IntegrationStats instance with statistics of the integration: the number of force evaluations (nfev), of accepted (naccept) and rejected (nreject) steps, the basic step size (dt) and number of basic steps per output step (nsubsteps) chosen by the integrator, the wall-clock time of the integration (time), and the maximum relative drift in the energy or, for potentials with a pattern speed, the Jacobi integral (drift); the step statistics are only available for the C integrators
+
+           walltime= (None) wall-clock budget for the integration in s (only for the C integrators); when it is exceeded, the orbit is only integrated up to the last output time that was reached and the integration can be continued with integrate_resume (the same happens when a C integration is interrupted with CTRL-C, after which KeyboardInterrupt is raised)
+
+           dense= (False) if True, keep the dense output of the integrator (only for method='dopr54_c' and orbits that track the azimuth), such that the orbit can be accurately evaluated at any time within the integration range rather than by interpolating between the output times; the dense output stores the coefficients of each step taken by the integrator and can therefore take more memory than the orbit itself
+
         OUTPUT:
 
-           (none) (get the actual orbit using getOrbit()
+           (none) (get the actual orbit using getOrbit(); IntegrationStats instance if stats=True)
 
         HISTORY:
 
@@ -419,7 +437,206 @@ class Orbit(object):
                           galpyWarning)
         if not _check_integrate_dt(t,dt):
             raise ValueError('dt input (integrator stepsize) for Orbit.integrate must be an integer divisor of the output stepsize')
-        self._orb.integrate(t,pot,method=method,dt=dt)
+        if not events is None and not len(self._orb.vxvv) in [4,6]:
+            raise NotImplementedError('Event detection is only implemented for orbits that track the azimuth')
+        if dense and not len(self._orb.vxvv) in [4,6]:
+            raise NotImplementedError('Dense output is only implemented for orbits that track the azimuth')
+        if not out is None and not events is None:
+            raise NotImplementedError('Event detection is not implemented for integrating into a given array with out=')
+        if not out is None and not walltime is None:
+            raise NotImplementedError('A wall-clock budget is not implemented for integrating into a given array with out=')
+        if not out is None and dense:
+            raise NotImplementedError('Dense output is not implemented for integrating into a given array with out=')
+        start= time.time()
+        if out is None and events is None and not dense:
+            self._orb.integrate(t,pot,method=method,dt=dt,walltime=walltime)
+        elif out is None:
+            self._orb.integrate(t,pot,method=method,dt=dt,events=events,
+                                walltime=walltime,dense=dense)
+        else:
+            if out.shape != (len(t),len(self._orb.vxvv)):
+                raise ValueError('out= array for Orbit.integrate needs to have shape (len(t),phasedim)')
+            ii= 0
+            chunk_stats= []
+            for tchunk, ochunk, thispot, cstats in \
+                    self._integrate_chunks(t,pot,method,dt,chunksize):
+                out[ii:ii+len(tchunk)]= ochunk
+                ii+= len(tchunk)
+                chunk_stats.append(cstats)
+            #Reset things that may have been defined by a previous integration
+            if hasattr(self._orb,'_orbInterp'):
+                delattr(self._orb,'_orbInterp')
+            if hasattr(self._orb,'rs'): delattr(self._orb,'rs')
+            self._orb.t= nu.array(t)
+            self._orb._pot= thispot
+            self._orb.orbit= out
+            self._orb._dense= None
+            self._orb._events= {}
+            self._orb._stats= _sum_stats(chunk_stats)
+            self._orb._checkpoint= None
+        if not self._orb._checkpoint is None:
+            warnings.warn("Orbit integration stopped at t=%g because the wall-clock budget was exceeded; continue it with integrate_resume" % self._orb.t[-1],galpyWarning)
+        if not stats: return None
+        out_stats= self._orb._stats
+        out_stats.time= time.time()-start
+        out_stats.drift= _integration_drift(self._orb)
+        return out_stats
+
+    def integrate_chunks(self,t,pot,method='symplec4_c',dt=None,
+                         chunksize=10000):
+        """
+        NAME:
+
+           integrate_chunks
+
+        PURPOSE:
+
+           integrate the orbit in chunks of times, returning a generator over the chunks of the orbit; the full orbit is never stored, such that the memory used does not grow with len(t)
+
+        INPUT:
+
+           t - list of times at which to output (0 has to be in this!) (can be Quantity)
+
+           pot - potential instance or list of instances
+
+           method= integration method (see integrate)
+
+           dt= (None) if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize (only works for the C integrators that use a fixed stepsize) (can be Quantity)
+
+           chunksize= (10000) number of times to integrate at once
+
+        OUTPUT:
+
+           generator yielding (t,orbit) for consecutive chunks of the times, with orbit an array with shape [len(t),phasedim] (in natural units) like getOrbit
+
+        """
+        _check_potential_dim(self,pot)
+        _check_consistent_units(self,pot)
+        # Parse t
+        if _APY_LOADED and isinstance(t,units.Quantity):
+            t= t.to(units.Gyr).value\
+                /bovy_conversion.time_in_Gyr(self._vo,self._ro)
+        if _APY_LOADED and not dt is None and isinstance(dt,units.Quantity):
+            dt= dt.to(units.Gyr).value\
+                /bovy_conversion.time_in_Gyr(self._vo,self._ro)
+        if not _check_integrate_dt(t,dt):
+            raise ValueError('dt input (integrator stepsize) for Orbit.integrate_chunks must be an integer divisor of the output stepsize')
+        for tchunk, ochunk, thispot, cstats in \
+                self._integrate_chunks(t,pot,method,dt,chunksize):
+            yield (tchunk,ochunk)
+
+    def _integrate_chunks(self,t,pot,method,dt,chunksize):
+        """Generator that integrates the orbit in chunks of times, each 
+        chunk starting from the end of the previous one"""
+        if chunksize < 2:
+            raise ValueError('chunksize needs to be at least 2')
+        t= nu.array(t)
+        vxvv= self._orb.vxvv
+        ii= 0
+        while True:
+            jj= min(ii+chunksize,len(t))
+            chunk_orb= self._orb.__class__(vxvv=vxvv)
+            chunk_orb.integrate(t[ii:jj],pot,method=method,dt=dt)
+            # Don't return the first time of a chunk twice
+            start= 0 if ii == 0 else 1
+            yield (chunk_orb.t[start:],chunk_orb.orbit[start:],chunk_orb._pot,
+                   chunk_orb._stats)
+            if jj == len(t): break
+            vxvv= chunk_orb.orbit[-1]
+            ii= jj-1
+
+    def integrate_resume(self,walltime=None,stats=False):
+        """
+        NAME:
+
+           integrate_resume
+
+        PURPOSE:
+
+           continue an orbit integration that stopped because its wall-clock budget was exceeded or because it was interrupted with CTRL-C, without recomputing the part of the orbit that was already integrated
+
+        INPUT:
+
+           walltime= (None) wall-clock budget for the continued integration in s; when it is exceeded again, the integration can be resumed again
+
+           stats= (False) if True, return an IntegrationStats instance with statistics of the continued integration (the drift is that over the full orbit)
+
+        OUTPUT:
+
+           (none) (get the actual orbit using getOrbit(); IntegrationStats instance if stats=True)
+
+        """
+        cp= getattr(self._orb,'_checkpoint',None)
+        if cp is None:
+            raise RuntimeError('No interrupted orbit integration to resume; integrate the orbit using Orbit.integrate first')
+        start= time.time()
+        orb= self._orb.__class__(vxvv=cp['vxvv'])
+        kwargs= {} if cp['events'] is None else {'events':cp['events']}
+        if cp['dense']: kwargs['dense']= True
+        try:
+            orb.integrate(cp['t'],cp['pot'],method=cp['method'],dt=cp['dt'],
+                          walltime=walltime,**kwargs)
+        except KeyboardInterrupt:
+            # Keep whatever was integrated before the interrupt
+            if hasattr(orb,'_checkpoint'): self._merge_resumed(orb)
+            raise
+        self._merge_resumed(orb)
+        if not self._orb._checkpoint is None:
+            warnings.warn("Orbit integration stopped at t=%g because the wall-clock budget was exceeded; continue it with integrate_resume" % self._orb.t[-1],galpyWarning)
+        if not stats: return None
+        out_stats= orb._stats
+        out_stats.time= time.time()-start
+        out_stats.drift= _integration_drift(self._orb)
+        return out_stats
+
+    def _merge_resumed(self,orb):
+        """Append the orbit of the internal orbit orb, which continues the
+        integration of this orbit from its checkpoint, to this orbit"""
+        if hasattr(self._orb,'_orbInterp'): delattr(self._orb,'_orbInterp')
+        if hasattr(self._orb,'rs'): delattr(self._orb,'rs')
+        # The first time of orb is the last one of the current orbit
+        self._orb.t= nu.concatenate((self._orb.t,orb.t[1:]))
+        self._orb.orbit= nu.concatenate((self._orb.orbit,orb.orbit[1:]))
+        dense= getattr(self._orb,'_dense',None)
+        if not dense is None and not getattr(orb,'_dense',None) is None:
+            self._orb._dense= nu.concatenate((dense,orb._dense))
+        elif hasattr(self._orb,'_dense'):
+            self._orb._dense= None
+        events= getattr(self._orb,'_events',{})
+        for name in getattr(orb,'_events',{}):
+            if name in events:
+                events[name]= \
+                    (nu.concatenate((events[name][0],orb._events[name][0])),
+                     nu.concatenate((events[name][1],orb._events[name][1])))
+            else:
+                events[name]= orb._events[name]
+        if hasattr(self._orb,'_events'): self._orb._events= events
+        self._orb._stats= _sum_stats([self._orb._stats,orb._stats])
+        self._orb._checkpoint= orb._checkpoint
+        return None
+
+    def getCheckpoint(self):
+        """
+        NAME:
+
+           getCheckpoint
+
+        PURPOSE:
+
+           return the state from which an orbit integration that stopped early (because its wall-clock budget was exceeded or because it was interrupted with CTRL-C) can be continued
+
+        INPUT:
+
+           (none)
+
+        OUTPUT:
+
+           dictionary with the time (t), the phase-space position (vxvv), and the step size to continue with (dt), all in natural units, or None if the integration completed
+
+        """
+        cp= getattr(self._orb,'_checkpoint',None)
+        if cp is None: return None
+        return {'t':cp['t'][0],'vxvv':cp['vxvv'],'dt':cp['dt']}
 
     def integrate_dxdv(self,dxdv,t,pot,method='dopr54_c',
                        rectIn=False,rectOut=False):
@@ -434,7 +651,7 @@ class Orbit(object):
 
         INPUT:
 
-           dxdv - [dR,dvR,dvT,dphi]
+           dxdv - [dR,dvR,dvT,dphi] or, for 3D orbits, [dR,dvR,dvT,dz,dvz,dphi]
 
            t - list of times at which to output (0 has to be in this!) (can be Quantity)
 
@@ -448,6 +665,10 @@ class Orbit(object):
 
                    'dopr54_c' for a Dormand-Prince integrator in C (generally the fastest)
 
+                   'dop853_c' for an 8th-order Dormand-Prince integrator in C (fastest at tight tolerances)
+
+                   'bulirschstoer_c' for a Bulirsch-Stoer integrator with adaptive order in C (also efficient at tight tolerances)
+
                    'dopr54_c' is recommended, odeint is *not* recommended
 
 
@@ -468,6 +689,8 @@ class Orbit(object):
         """
         _check_potential_dim(self,pot)
         _check_consistent_units(self,pot)
+        if not len(self._orb.vxvv) in [4,6]:
+            raise NotImplementedError('Integration of phase-space volumes is only implemented for orbits that track the azimuth')
         # Parse t
         if _APY_LOADED and isinstance(t,units.Quantity):
             self._orb._integrate_t_asQuantity= True
@@ -476,6 +699,105 @@ class Orbit(object):
         self._orb.integrate_dxdv(dxdv,t,pot,method=method,
                                  rectIn=rectIn,rectOut=rectOut)
 
+    def integrate_lyapunov(self,t,pot,method='dopr54_c',dt=None,dxdv=None):
+        """
+        NAME:
+
+           integrate_lyapunov
+
+        PURPOSE:
+
+           integrate a 3D orbit together with a deviation vector that is renormalized at each output time, to compute the maximal Lyapunov exponent and the mean MEGNO (Cincotta & Simo 2000) of the orbit; only the orbit itself is stored, not the deviation vector
+
+        INPUT:
+
+           t - list of times at which to output and renormalize the deviation vector (0 has to be in this!) (can be Quantity)
+
+           pot - potential instance or list of instances
+
+           method= 'odeint' for scipy's odeint
+
+                   'rk4_c' for a 4th-order Runge-Kutta integrator in C
+
+                   'rk6_c' for a 6-th order Runge-Kutta integrator in C
+
+                   'dopr54_c' for a Dormand-Prince integrator in C (generally the fastest)
+
+                   'dop853_c' for an 8th-order Dormand-Prince integrator in C (fastest at tight tolerances)
+
+                   'bulirschstoer_c' for a Bulirsch-Stoer integrator with adaptive order in C (also efficient at tight tolerances)
+
+           dt= (None) if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize (only works for the C integrators that use a fixed stepsize) (can be Quantity)
+
+           dxdv= (None) initial deviation vector in rectangular coordinates [dx,dy,dz,dvx,dvy,dvz] (default: all components equal)
+
+        OUTPUT:
+
+           (none) (get the Lyapunov exponent using lyapunov() and the MEGNO using megno(); the orbit is available as usual)
+
+        """
+        _check_potential_dim(self,pot)
+        _check_consistent_units(self,pot)
+        if not len(self._orb.vxvv) == 6:
+            raise NotImplementedError('Lyapunov exponents and MEGNO are only implemented for 3D orbits that track the azimuth')
+        # Parse t
+        if _APY_LOADED and isinstance(t,units.Quantity):
+            self._orb._integrate_t_asQuantity= True
+            t= t.to(units.Gyr).value\
+                /bovy_conversion.time_in_Gyr(self._vo,self._ro)
+        if _APY_LOADED and not dt is None and isinstance(dt,units.Quantity):
+            dt= dt.to(units.Gyr).value\
+                /bovy_conversion.time_in_Gyr(self._vo,self._ro)
+        if not _check_integrate_dt(t,dt):
+            raise ValueError('dt input (integrator stepsize) for Orbit.integrate_lyapunov must be an integer divisor of the output stepsize')
+        self._orb.integrate_lyapunov(t,pot,method=method,dt=dt,dxdv=dxdv)
+
+    def lyapunov(self,*args,**kwargs):
+        """
+        NAME:
+
+           lyapunov
+
+        PURPOSE:
+
+           return the maximal Lyapunov exponent computed by integrate_lyapunov, the average logarithmic growth rate of the deviation vector; it tends to zero for regular orbits
+
+        INPUT:
+
+           ro= (Object-wide default) physical scale for distances to use to convert (can be Quantity)
+
+           vo= (Object-wide default) physical scale for velocities to use to convert (can be Quantity)
+
+           use_physical= use to override Object-wide default for using a physical scale for output
+
+        OUTPUT:
+
+           maximal Lyapunov exponent (1/Gyr in physical units)
+
+        """
+        return self._orb.lyapunov(*args,**kwargs)
+
+    def megno(self):
+        """
+        NAME:
+
+           megno
+
+        PURPOSE:
+
+           return the mean MEGNO <Y> (Mean Exponential Growth factor of Nearby Orbits; Cincotta & Simo 2000) computed by integrate_lyapunov; <Y> tends to 2 for quasi-periodic orbits, to 0 for stable periodic orbits, and grows linearly with time for chaotic orbits
+
+        INPUT:
+
+           (none)
+
+        OUTPUT:
+
+           mean MEGNO at the final time
+
+        """
+        return self._orb.megno()
+
     def reverse(self):
         """
         NAME:
@@ -497,8 +819,9 @@ class Orbit(object):
         HISTORY:
            2011-04-13 - Written - Bovy (NYU)
         """
-        if hasattr(self,'_orbInterp'): delattr(self,'_orbInterp')
-        if hasattr(self,'rs'): delattr(self,'rs')
+        if hasattr(self._orb,'_orbInterp'): delattr(self._orb,'_orbInterp')
+        if hasattr(self._orb,'rs'): delattr(self._orb,'rs')
+        self._orb._dense= None
         sortindx = list(range(len(self._orb.t)))
         sortindx.sort(key=lambda x: self._orb.t[x],reverse=True)
         for ii in range(self._orb.orbit.shape[1]):
@@ -597,6 +920,33 @@ class Orbit(object):
         """
         return self._orb.getOrbit()
 
+    def getEvents(self,event=None):
+        """
+
+        NAME:
+
+           getEvents
+
+        PURPOSE:
+
+           return the events found during a previous integration with events=
+
+        INPUT:
+
+           event= (None) name of the event (e.g., 'pericenter'); if None, return all events
+
+        OUTPUT:
+
+           (times,array[nevent,nd] of the phase-space positions at the events) or a dictionary with these for each event
+
+        """
+        events= getattr(self._orb,'_events',{})
+        if event is None:
+            return events
+        elif not event.lower() in events:
+            raise ValueError("Event '%s' was not searched for during the orbit integration; integrate with events=" % event)
+        return events[event.lower()]
+
     def getOrbit_dxdv(self):
         """
 
@@ -626,6 +976,7 @@ class Orbit(object):
     def fit(self,vxvv,vxvv_err=None,pot=None,radec=False,lb=False,
             customsky=False,lb_to_customsky=None,pmllpmbb_to_customsky=None,
             tintJ=10,ntintJ=1000,integrate_method='dopr54_c',
+            gradient=True,init=None,numcores=1,
             **kwargs):
         """
         NAME:
@@ -675,6 +1026,14 @@ class Orbit(object):
 
            disp= (False) display the optimizer's convergence message
 
+           Keywords related to the optimization:
+
+               gradient= (True) if True, maximize the likelihood with a gradient-based optimizer (L-BFGS-B), computing the gradient from the variational equations; requires a Runge-Kutta-type C integrator and potentials with C implementations, otherwise the derivative-free Powell method is used
+
+               init= (None) [nstart,6] array of Galactocentric [R,vR,vT,z,vz,phi] initial conditions in natural units to start the optimization from (default: the current orbit); the best fit is returned [cannot be Quantities]
+
+               numcores= (1) number of cores to use to run the optimizations for the different initial conditions in parallel
+
         OUTPUT:
 
            max of log likelihood
@@ -693,6 +1052,7 @@ class Orbit(object):
                              pmllpmbb_to_customsky=pmllpmbb_to_customsky,
                              tintJ=tintJ,ntintJ=ntintJ,
                              integrate_method=integrate_method,
+                             gradient=gradient,init=init,numcores=numcores,
                              **kwargs)
 
     def E(self,*args,**kwargs):
@@ -3609,6 +3969,15 @@ v           obs=[X,Y,Z,vx,vy,vz] - (optional) position and velocity of observer
         """
         return self._orb.animate(*args,**kwargs)
 
+def _integration_drift(orb):
+    """Maximum relative drift of the Jacobi integral (for potentials with a pattern speed) or the energy along an integrated orbit"""
+    OmegaP= _pattern_speed(orb._pot)
+    if len(orb.vxvv) in [4,6] and not OmegaP is None:
+        integral= orb.Jacobi(orb.t,OmegaP=OmegaP,use_physical=False)
+    else:
+        integral= orb.E(orb.t,use_physical=False)
+    return nu.nanmax(nu.fabs(integral/integral[0]-1.))
+
 def _check_integrate_dt(t,dt):
     """Check that the stepszie in t is an integer x dt"""
     if dt is None:
@@ -8,11 +8,12 @@ import scipy
 from scipy import interpolate
 _APY_LOADED= True
 try:
-    from astropy import units, coordinates
+    # astropy.coordinates is slow to import, so it is only imported when
+    # creating a SkyCoord
+    from astropy import units
 except ImportError:
     _APY_LOADED= False
 from galpy import actionAngle
-import galpy.util.bovy_plot as plot
 import galpy.util.bovy_coords as coords
 from galpy.util.bovy_conversion import physical_conversion
 from galpy.util import bovy_conversion, galpyWarning
@@ -160,7 +161,41 @@ class OrbitTop(object):
         HISTORY:
            2010-07-10 - Written - Bovy (NYU)
         """
-        return self.orbit_dxdv[:,4:]
+        return self.orbit_dxdv[:,self.orbit_dxdv.shape[1]//2:]
+
+    def _set_checkpoint(self,checkpoint,pot,method,events,dense=False):
+        """
+        NAME:
+           _set_checkpoint
+        PURPOSE:
+           store the state from which an interrupted integration can be continued and truncate the orbit to the output times that were reached
+        INPUT:
+           checkpoint - (reason,ntdone,dtnext) returned by the integrator
+           pot - potential that the orbit was integrated in
+           method - integration method
+           events - events that were detected
+           dense= (False) whether the dense output of the integrator is kept
+        OUTPUT:
+           (none); raises KeyboardInterrupt if the integration was interrupted by CTRL-C
+        """
+        reason, ntdone, dtnext= checkpoint
+        if ntdone >= len(self.t):
+            self._checkpoint= None
+        else:
+            # Continue from the last output time that was reached
+            ntdone= max(ntdone,1)
+            self._checkpoint= {'t':self.t[ntdone-1:],
+                               'vxvv':self.orbit[ntdone-1],
+                               'dt':dtnext,
+                               'method':method,
+                               'pot':pot,
+                               'events':events,
+                               'dense':dense}
+            self.t= self.t[:ntdone]
+            self.orbit= self.orbit[:ntdone]
+        if reason == 'sigint':
+            raise KeyboardInterrupt("Orbit integration interrupted by CTRL-C (SIGINT); continue it with integrate_resume")
+        return None
 
     @physical_conversion('time')
     def time(self,*args,**kwargs):
@@ -202,10 +237,7 @@ class OrbitTop(object):
         HISTORY:
            2010-09-21 - Written - Bovy (NYU)
         """
-        thiso= self(*args,**kwargs)
-        onet= (len(thiso.shape) == 1)
-        if onet: return thiso[0]
-        else: return thiso[0,:]
+        return self._callComponents([0],*args)[0]
 
     @physical_conversion('position')
     def r(self,*args,**kwargs):
@@ -223,10 +255,8 @@ class OrbitTop(object):
         HISTORY:
            2016-04-19 - Written - Bovy (UofT)
         """
-        thiso= self(*args,**kwargs)
-        onet= (len(thiso.shape) == 1)
-        if onet: return nu.sqrt(thiso[0]**2.+thiso[3]**2.)
-        else: return nu.sqrt(thiso[0,:]**2.+thiso[3,:]**2.)
+        thiso= self._callComponents([0,3],*args)
+        return nu.sqrt(thiso[0]**2.+thiso[1]**2.)
 
     @physical_conversion('velocity')
     def vR(self,*args,**kwargs):
@@ -244,10 +274,7 @@ class OrbitTop(object):
         HISTORY:
            2010-09-21 - Written - Bovy (NYU)
         """
-        thiso= self(*args,**kwargs)
-        onet= (len(thiso.shape) == 1)
-        if onet: return thiso[1]
-        else: return thiso[1,:]
+        return self._callComponents([1],*args)[0]
 
     @physical_conversion('velocity')
     def vT(self,*args,**kwargs):
@@ -265,10 +292,7 @@ class OrbitTop(object):
         HISTORY:
            2010-09-21 - Written - Bovy (NYU)
         """
-        thiso= self(*args,**kwargs)
-        onet= (len(thiso.shape) == 1)
-        if onet: return thiso[2]
-        else: return thiso[2,:]
+        return self._callComponents([2],*args)[0]
 
     @physical_conversion('position')
     def z(self,*args,**kwargs):
@@ -288,10 +312,7 @@ class OrbitTop(object):
         """
         if len(self.vxvv) < 5:
             raise AttributeError("linear and planar orbits do not have z()")
-        thiso= self(*args,**kwargs)
-        onet= (len(thiso.shape) == 1)
-        if onet: return thiso[3]
-        else: return thiso[3,:]
+        return self._callComponents([3],*args)[0]
 
     @physical_conversion('velocity')
     def vz(self,*args,**kwargs):
@@ -311,10 +332,7 @@ class OrbitTop(object):
         """
         if len(self.vxvv) < 5:
             raise AttributeError("linear and planar orbits do not have vz()")
-        thiso= self(*args,**kwargs)
-        onet= (len(thiso.shape) == 1)
-        if onet: return thiso[4]
-        else: return thiso[4,:]
+        return self._callComponents([4],*args)[0]
         
     @physical_conversion('angle')
     def phi(self,*args,**kwargs):
@@ -332,10 +350,7 @@ class OrbitTop(object):
         """
         if len(self.vxvv) != 4 and len(self.vxvv) != 6:
             raise AttributeError("orbit must track azimuth to use phi()")
-        thiso= self(*args,**kwargs)
-        onet= (len(thiso.shape) == 1)
-        if onet: return thiso[-1]
-        else: return thiso[-1,:]
+        return self._callComponents([len(self.vxvv)-1],*args)[0]
 
     @physical_conversion('position')
     def x(self,*args,**kwargs):
@@ -885,6 +900,7 @@ class OrbitTop(object):
         _check_roSet(self,kwargs,'SkyCoord')
         radec= self._radec(*args,**kwargs)
         tdist= self.dist(*args,**kwargs)
+        from astropy import coordinates
         return coordinates.SkyCoord(radec[:,0]*units.degree,
                                     radec[:,1]*units.degree,
                                     distance=tdist*units.kpc,
@@ -1256,6 +1272,7 @@ class OrbitTop(object):
         HISTORY:
            2010-09-21 - Written - Bovy (NYU)
         """
+        from galpy.util import bovy_plot as plot
         xw= self.xw()
         #BOVY: CHECK THAT THIS IS CORRECT
         plot.bovy_plot(2.*m.pi*nu.fft.fftfreq(len(self.t),
@@ -1279,7 +1296,19 @@ class OrbitTop(object):
         if len(args) == 0:
             return nu.array(self.vxvv)
         else:
-            t= args[0]
+            return self._evaluate(args[0])
+
+    def _callComponents(self,indx,*args):
+        """Return the phase-space components indx at time args[0] (or the initial condition), only interpolating what is necessary; shape [len(indx)] or [len(indx),nt]"""
+        if len(args) == 0:
+            return nu.array(self.vxvv)[indx]
+        else:
+            return self._evaluate(args[0],indx=indx)
+
+    def _evaluate(self,t,indx=None):
+        """Evaluate the phase-space components indx (default: all) at time(s) t"""
+        dim= len(self.vxvv)
+        if indx is None: indx= list(range(dim))
         # Parse t
         if _APY_LOADED and isinstance(t,units.Quantity):
             t= t.to(units.Gyr).value\
@@ -1288,53 +1317,59 @@ class OrbitTop(object):
                     and self._integrate_t_asQuantity \
                     and not nu.all(t == self.t):
             warnings.warn("You specified integration times as a Quantity, but are evaluating at times not specified as a Quantity; assuming that time given is in natural (internal) units (multiply time by unit to get output at physical time)",galpyWarning)
-        if isinstance(t,(int,float)) and hasattr(self,'t') \
-                and t in list(self.t):
-            return self.orbit[list(self.t).index(t),:]
-        else:
-            if isinstance(t,(int,float)): 
-                nt= 1
-                t= [t]
-            else: 
-                nt= len(t)
-            dim= len(self.vxvv)
-            try:
-                self._setupOrbitInterp()
-            except:
-                out= nu.zeros((dim,nt))
-                for jj in range(nt):
-                    try:
-                        indx= list(self.t).index(t[jj])
-                    except ValueError:
-                        raise LookupError("Orbit interpolaton failed; integrate on finer grid")
-                    for ii in range(dim):
-                        out[ii,jj]= self.orbit[indx,ii]
-                return out #should always have nt > 1, bc otherwise covered by above
-            out= []
-            if _OLD_SCIPY and not isinstance(self._orbInterp[0],_fakeInterp) \
-                    and nu.any((nu.array(t) < self._orbInterp[0]._data[3])\
-                               +(nu.array(t) > self._orbInterp[0]._data[4])): #pragma: no cover
-                raise ValueError("One or more requested time is not within the integrated range")
-            if dim == 4 or dim == 6:
-                #Unpack interpolated x and y to R and phi
-                x= self._orbInterp[0](t)
-                y= self._orbInterp[-1](t)
-                R= nu.sqrt(x*x+y*y)
-                phi= nu.arctan2(y,x) % (2.*nu.pi)
-                for ii in range(dim):
-                    if ii == 0:
-                        out.append(R) 
-                    elif ii == dim-1:
-                        out.append(phi) 
-                    else:
-                        out.append(self._orbInterp[ii](t))
-            else:
-                for ii in range(dim):
-                    out.append(self._orbInterp[ii](t))
-            if nt == 1:
-                return nu.array(out).reshape(dim)
+        onet= isinstance(t,(int,float))
+        t= nu.atleast_1d(nu.array(t,dtype='float64'))
+        if hasattr(self,'t'):
+            # Times that are output times are simply looked up
+            tindx, ongrid= self._timeIndex(t)
+            if nu.all(ongrid):
+                out= self.orbit[tindx][:,indx].T
+                if (dim == 4 or dim == 6) and dim-1 in indx:
+                    out[indx.index(dim-1)]%= 2.*nu.pi
+                if onet: return out[:,0]
+                else: return out
+            if getattr(self,'_dense',None) is not None:
+                # Use the dense output of the integrator
+                out= _dense_eval(self._dense,t,dim)[indx]
+                if onet: return out[:,0]
+                else: return out
+        out= nu.empty((len(indx),len(t)))
+        for ii, jj in enumerate(indx):
+            if (dim == 4 or dim == 6) and (jj == 0 or jj == dim-1):
+                #Interpolate x and y rather than R and phi to avoid issues w/ phase wrapping
+                x= self._interpolate('x',t)
+                y= self._interpolate('y',t)
+                if jj == 0: out[ii]= nu.sqrt(x*x+y*y)
+                else: out[ii]= nu.arctan2(y,x) % (2.*nu.pi)
             else:
-                return nu.array(out).reshape((dim,nt))
+                out[ii]= self._interpolate(jj,t)
+        if onet: return out[:,0]
+        else: return out
+
+    def _setupTimeIndex(self):
+        """Return (and cache) the indices that sort self.t and the sorted times"""
+        if getattr(self,'_tIndex',None) is None or self._tIndex[0] is not self.t:
+            sindx= nu.argsort(self.t)
+            self._tIndex= (self.t,sindx,nu.asarray(self.t)[sindx])
+        return self._tIndex[1:]
+
+    def _timeIndex(self,t):
+        """Return the indices in self.t closest to t and whether t equals the output time at that index"""
+        sindx, ts= self._setupTimeIndex()
+        indx= nu.searchsorted(ts,t)
+        indx[indx == len(ts)]= len(ts)-1
+        return (sindx[indx],ts[indx] == t)
+
+    def _interpolate(self,key,t):
+        """Interpolate phase-space component key (index or 'x'/'y') at times t"""
+        try:
+            interp= self._setupOrbitInterp(key)
+        except:
+            raise LookupError("Orbit interpolaton failed; integrate on finer grid")
+        if _OLD_SCIPY and not isinstance(interp,_fakeInterp) \
+                and nu.any((t < interp._data[3])+(t > interp._data[4])): #pragma: no cover
+            raise ValueError("One or more requested time is not within the integrated range")
+        return interp(t)
 
     def plot(self,*args,**kwargs):
         """
@@ -1357,6 +1392,7 @@ class OrbitTop(object):
            2013-11-29 - added ra,dec kwargs and other derived quantities - Bovy (IAS)
            2014-06-11 - Support for plotting in physical coordinates - Bovy (IAS)
         """
+        from galpy.util import bovy_plot as plot
         if (kwargs.get('use_physical',False) \
                 and kwargs.get('ro',self._roSet)) or \
                 (not 'use_physical' in kwargs \
@@ -1611,6 +1647,7 @@ class OrbitTop(object):
            2013-11-29 - added ra,dec kwargs and other derived quantities - Bovy (IAS)
            2014-06-11 - Support for plotting in physical coordinates - Bovy (IAS)
         """
+        from galpy.util import bovy_plot as plot
         if (kwargs.get('use_physical',False) \
                 and kwargs.get('ro',self._roSet)) or \
                 (not 'use_physical' in kwargs \
@@ -2057,45 +2094,31 @@ class OrbitTop(object):
             kwargs['d2']= 'Jacobi'
         return self.plot(*args,**kwargs)
         
-    def _setupOrbitInterp(self):
-        if not hasattr(self,"_orbInterp"):
-            # First check that times increase
-            if hasattr(self,"t"): #Orbit has been integrated
-                if self.t[1] < self.t[0]: #must be backward
-                    sindx= nu.argsort(self.t)
-                    # sort
-                    self.t= self.t[sindx]
-                    self.orbit= self.orbit[sindx]
-                    usindx= nu.argsort(sindx) # to later unsort
-            orbInterp= []
-            for ii in range(len(self.vxvv)):
-                if (len(self.vxvv) == 4 or len(self.vxvv) == 6) and ii == 0:
-                   #Interpolate x and y rather than R and phi to avoid issues w/ phase wrapping
-                    if not hasattr(self,"t"): #Orbit has not been integrated
-                        orbInterp.append(_fakeInterp(self.vxvv[0]*nu.cos(self.vxvv[-1])))
-                    else:
-                        orbInterp.append(interpolate.InterpolatedUnivariateSpline(\
-                                self.t,self.orbit[:,0]*nu.cos(self.orbit[:,-1]),
-                                **_KWINTERP))
-                elif (len(self.vxvv) == 4 or len(self.vxvv) == 6) and \
-                        ii == len(self.vxvv)-1:
-                    if not hasattr(self,"t"): #Orbit has not been integrated
-                        orbInterp.append(_fakeInterp(self.vxvv[0]*nu.sin(self.vxvv[-1])))
-                    else:
-                        orbInterp.append(interpolate.InterpolatedUnivariateSpline(\
-                                self.t,self.orbit[:,0]*nu.sin(self.orbit[:,-1]),**_KWINTERP))
-                else:
-                    if not hasattr(self,"t"): #Orbit has not been integrated
-                        orbInterp.append(_fakeInterp(self.vxvv[ii]))
-                    else:
-                        orbInterp.append(interpolate.InterpolatedUnivariateSpline(\
-                                self.t,self.orbit[:,ii],**_KWINTERP))
-            self._orbInterp= orbInterp
-            try: #unsort
-                self.t= self.t[usindx]
-                self.orbit= self.orbit[usindx]
-            except: pass
-        return None
+    def _setupOrbitInterp(self,key):
+        """Set up the interpolator for phase-space component key (index or 'x'/'y' for the rectangular coordinates in the plane), built lazily and cached per component"""
+        if not hasattr(self,'_orbInterp'):
+            self._orbInterp= {}
+        if key in self._orbInterp:
+            return self._orbInterp[key]
+        if hasattr(self,"t"): #Orbit has been integrated
+            vals= self.orbit
+        else:
+            vals= nu.array(self.vxvv)[nu.newaxis,:]
+        if key == 'x':
+            vals= vals[:,0]*nu.cos(vals[:,-1])
+        elif key == 'y':
+            vals= vals[:,0]*nu.sin(vals[:,-1])
+        else:
+            vals= vals[:,key]
+        if not hasattr(self,"t"): #Orbit has not been integrated
+            interp= _fakeInterp(vals[0])
+        else:
+            # Need increasing times, also for backward integrations
+            sindx, ts= self._setupTimeIndex()
+            interp= interpolate.InterpolatedUnivariateSpline(ts,vals[sindx],
+                                                             **_KWINTERP)
+        self._orbInterp[key]= interp
+        return interp
 
     def animate(self,*args,**kwargs): #pragma: no cover
         """
@@ -2702,6 +2725,41 @@ require(['Plotly'], function (Plotly) {{
                     update_trace34=update_trace34,
                     update_trace56=update_trace56))
 
+def _dense_eval(dense,t,dim):
+    """Evaluate the dense output of the dopr54_c integrator ([t_start,h,
+    rcont1..5] for each step in rectangular coordinates) at times t and 
+    return [R,vR,vT,z,vz,phi] or [R,vR,vT,phi] with shape (dim,len(t))"""
+    t= nu.array(t,dtype='float64')
+    tstart= dense[:,0]
+    h= dense[:,1]
+    if h[0] >= 0.: # forward integration
+        indx= nu.searchsorted(tstart,t,side='right')-1
+    else:
+        indx= nu.searchsorted(-tstart,-t,side='right')-1
+    indx[indx < 0]= 0
+    theta= (t-tstart[indx])/h[indx]
+    if nu.any(theta < -10.**-10.) or nu.any(theta > 1.+10.**-10.):
+        raise ValueError("One or more requested time is not within the integrated range")
+    ndim= (dense.shape[1]-2)//5
+    c= dense[indx,2:].reshape((len(t),5,ndim))
+    theta= theta[:,nu.newaxis]
+    theta1= 1.-theta
+    y= c[:,0]+theta*(c[:,1]+theta1*(c[:,2]+theta*(c[:,3]+theta1*c[:,4])))
+    #go back to the cylindrical frame
+    out= nu.empty((dim,len(t)))
+    x, yy= y[:,0], y[:,1]
+    if dim == 6: vx, vy= y[:,3], y[:,4]
+    else: vx, vy= y[:,2], y[:,3]
+    phi= nu.arctan2(yy,x) % (2.*nu.pi)
+    out[0]= nu.sqrt(x**2.+yy**2.)
+    out[1]= vx*nu.cos(phi)+vy*nu.sin(phi)
+    out[2]= vy*nu.cos(phi)-vx*nu.sin(phi)
+    out[-1]= phi
+    if dim == 6:
+        out[3]= y[:,2]
+        out[4]= y[:,5]
+    return out
+
 class _fakeInterp(object): 
     """Fake class to simulate interpolation when orbit was not integrated"""
     def __init__(self,x):
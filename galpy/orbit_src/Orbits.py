@@ -0,0 +1,1899 @@
+import warnings
+import time
+import numpy as nu
+from scipy import interpolate
+_APY_LOADED= True
+try:
+    # astropy.coordinates is slow to import, so it is only imported when
+    # creating a SkyCoord
+    from astropy import units
+except ImportError:
+    _APY_LOADED= False
+from galpy import actionAngle
+import galpy.util.bovy_coords as coords
+from galpy.util.bovy_conversion import physical_conversion
+from galpy.util import galpyWarning
+from galpy.util import bovy_conversion
+from galpy.util import config
+from galpy.potential_src.Potential import evaluatePotentials, _check_c
+from galpy.potential_src.planarPotential import evaluateplanarPotentials, \
+    toPlanarPotential
+from galpy.orbit_src.OrbitTop import _check_roSet, _check_voSet
+from galpy.orbit_src.Orbit import Orbit, _check_integrate_dt, \
+    _check_potential_dim, _check_consistent_units
+from galpy.orbit_src.FullOrbit import _integrateFullOrbit, \
+    _integrateFullOrbit_lyapunov
+from galpy.orbit_src.planarOrbit import _integrateOrbit
+from galpy.orbit_src.IntegrationStats import IntegrationStats, _sum_stats, \
+    _pattern_speed
+from galpy.orbit_src.integrateFullOrbit import integrateFullOrbit_c, \
+    integrateFullOrbit_lyapunov_c, _ext_loaded
+from galpy.orbit_src.integratePlanarOrbit import integratePlanarOrbit_c
+from galpy.orbit_src.integrateEnsemble import integrateFullOrbits_py, \
+    integratePlanarOrbits_py
+ext_loaded= _ext_loaded
+_C_METHODS= ['leapfrog_c','rk4_c','rk6_c','symplec4_c','symplec6_c',
+             'dopr54_c','dop853_c','bulirschstoer_c']
+class Orbits(object):
+    """Class representing a collection of orbits, stored as arrays"""
+    def __init__(self,vxvv=None,radec=False,lb=False,uvw=False,
+                 vo=None,ro=None,zo=0.025,solarmotion='hogg'):
+        """
+        NAME:
+
+           __init__
+
+        PURPOSE:
+
+           Initialize an Orbits instance, which holds the initial conditions and integrated trajectories of many orbits as contiguous arrays
+
+        INPUT:
+
+           vxvv - initial conditions; can be either
+
+              1) list of Orbit instances (must all be of the same dimension)
+
+              2) array with shape [N,6] or [N,4] of Galactocentric cylindrical coordinates [R,vR,vT(,z,vz),phi] in natural units
+
+              3) array with shape [N,6] of [ra,dec,d,mu_ra, mu_dec,vlos] in [deg,deg,kpc,mas/yr,mas/yr,km/s] (all J2000.0; mu_ra = mu_ra * cos dec) (radec=True) or of [l,b,d,mu_l,mu_b,vlos] (lb=True); use uvw=True to give velocities as [U,V,W] in km/s instead
+
+        OPTIONAL INPUTS:
+
+           radec= if True, input is 3) above in equatorial coordinates
+
+           lb= if True, input is 3) above in Galactic coordinates
+
+           uvw= if True, velocities are UVW
+
+           ro= distance from vantage point to GC (kpc; can be Quantity)
+
+           vo= circular velocity at ro (km/s; can be Quantity)
+
+           zo= offset toward the NGP of the Sun wrt the plane (kpc; can be Quantity)
+
+           solarmotion= 'hogg' or 'dehnen', or 'schoenrich', or value in [-U,V,W]; can be Quantity
+
+        OUTPUT:
+
+           instance
+
+        """
+        if _APY_LOADED and isinstance(ro,units.Quantity):
+            ro= ro.to(units.kpc).value
+        if _APY_LOADED and isinstance(zo,units.Quantity):
+            zo= zo.to(units.kpc).value
+        if _APY_LOADED and isinstance(vo,units.Quantity):
+            vo= vo.to(units.km/units.s).value
+        if isinstance(vxvv,list) and len(vxvv) > 0 \
+                and isinstance(vxvv[0],Orbit):
+            # Take the physical scales from the Orbits if not given
+            if ro is None and vxvv[0]._roSet: ro= vxvv[0]._ro
+            if vo is None and vxvv[0]._voSet: vo= vxvv[0]._vo
+            zo= vxvv[0]._orb._zo
+            solarmotion= vxvv[0]._orb._solarmotion
+            if len(set([len(o._orb.vxvv) for o in vxvv])) != 1:
+                raise ValueError("All Orbit instances given to Orbits need to have the same phase-space dimension")
+            vxvv= nu.array([o._orb.vxvv for o in vxvv])
+        if radec or lb:
+            if ro is None:
+                ro= config.__config__.getfloat('normalization','ro')
+            if vo is None:
+                vo= config.__config__.getfloat('normalization','vo')
+        if isinstance(solarmotion,str) and solarmotion.lower() == 'hogg':
+            vsolar= nu.array([-10.1,4.0,6.7])
+        elif isinstance(solarmotion,str) and solarmotion.lower() == 'dehnen':
+            vsolar= nu.array([-10.,5.25,7.17])
+        elif isinstance(solarmotion,str) \
+                and solarmotion.lower() == 'schoenrich':
+            vsolar= nu.array([-11.1,12.24,7.25])
+        elif _APY_LOADED and isinstance(solarmotion,units.Quantity):
+            vsolar= solarmotion.to(units.km/units.s).value
+        else:
+            vsolar= nu.array(solarmotion)
+        vxvv= nu.array(vxvv,dtype='float64',ndmin=2)
+        if radec or lb:
+            if radec:
+                l,b= coords.radec_to_lb(vxvv[:,0],vxvv[:,1],degree=True).T
+            else:
+                l,b= vxvv[:,0], vxvv[:,1]
+            if uvw:
+                X,Y,Z= coords.lbd_to_XYZ(l,b,vxvv[:,2],degree=True).T
+                vx, vy, vz= vxvv[:,3], vxvv[:,4], vxvv[:,5]
+            else:
+                if radec:
+                    pmll, pmbb= coords.pmrapmdec_to_pmllpmbb(vxvv[:,3],
+                                                             vxvv[:,4],
+                                                             vxvv[:,0],
+                                                             vxvv[:,1],
+                                                             degree=True).T
+                else:
+                    pmll, pmbb= vxvv[:,3], vxvv[:,4]
+                X,Y,Z,vx,vy,vz= coords.sphergal_to_rectgal(l,b,vxvv[:,2],
+                                                           vxvv[:,5],
+                                                           pmll,pmbb,
+                                                           degree=True).T
+            X/= ro
+            Y/= ro
+            Z/= ro
+            vx/= vo
+            vy/= vo
+            vz/= vo
+            vsun= nu.array([0.,1.,0.,])+vsolar/vo
+            R, phi, z= coords.XYZ_to_galcencyl(X,Y,Z,Zsun=zo/ro).T
+            vR, vT,vz= coords.vxvyvz_to_galcencyl(vx,vy,vz,
+                                                  R,phi,z,
+                                                  vsun=vsun,
+                                                  Xsun=1.,Zsun=zo/ro,
+                                                  galcen=True).T
+            vxvv= nu.array([R,vR,vT,z,vz,phi]).T
+        if vxvv.shape[1] != 4 and vxvv.shape[1] != 6:
+            raise ValueError("Orbits only supports orbits that track the azimuth, that is, initial conditions of shape [N,4] or [N,6]")
+        self.vxvv= nu.ascontiguousarray(vxvv)
+        self._zo= zo
+        self._solarmotion= vsolar
+        if vo is None:
+            self._vo= config.__config__.getfloat('normalization','vo')
+            self._voSet= False
+        else:
+            self._vo= vo
+            self._voSet= True
+        if ro is None:
+            self._ro= config.__config__.getfloat('normalization','ro')
+            self._roSet= False
+        else:
+            self._ro= ro
+            self._roSet= True
+        return None
+
+    def __len__(self):
+        return self.vxvv.shape[0]
+
+    def __getitem__(self,key):
+        """
+        NAME:
+
+           __getitem__
+
+        PURPOSE:
+
+           return a subset of the orbits as a new Orbits instance; for integer and slice indices the arrays of the new instance are views into those of this instance (fancy indexing makes a copy, as for numpy arrays)
+
+        INPUT:
+
+           key - integer, slice, or index array
+
+        OUTPUT:
+
+           Orbits instance
+
+        """
+        if isinstance(key,(int,nu.integer)):
+            # Keep the orbit axis, such that this remains a view
+            if key < -len(self) or key >= len(self):
+                raise IndexError("Orbits index out of range")
+            key= slice(key,key+1 if key != -1 else None)
+        out= Orbits.__new__(Orbits)
+        out.vxvv= self.vxvv[key]
+        for attr in ['_zo','_solarmotion','_ro','_roSet','_vo','_voSet',
+                     '_pot','t','_integrate_t_asQuantity']:
+            if hasattr(self,attr):
+                setattr(out,attr,getattr(self,attr))
+        if hasattr(self,'orbit'):
+            out.orbit= self.orbit[key]
+        return out
+
+    def dim(self):
+        """
+        NAME:
+
+           dim
+
+        PURPOSE:
+
+           return the dimension of the problem
+
+        INPUT:
+
+           (none)
+
+        OUTPUT:
+
+           dimension
+
+        """
+        if self.vxvv.shape[1] == 4: return 2
+        else: return 3
+
+    def phasedim(self):
+        """
+        NAME:
+
+           phasedim
+
+        PURPOSE:
+
+           return the phase-space dimension of the problem
+
+        INPUT:
+
+           (none)
+
+        OUTPUT:
+
+           phase-space dimension
+
+        """
+        return self.vxvv.shape[1]
+
+    def turn_physical_off(self):
+        """
+        NAME:
+
+           turn_physical_off
+
+        PURPOSE:
+
+           turn off automatic returning of outputs in physical units
+
+        INPUT:
+
+           (none)
+
+        OUTPUT:
+
+           (none)
+
+        """
+        self._roSet= False
+        self._voSet= False
+        return None
+
+    def turn_physical_on(self,ro=None,vo=None):
+        """
+        NAME:
+
+           turn_physical_on
+
+        PURPOSE:
+
+           turn on automatic returning of outputs in physical units
+
+        INPUT:
+
+           ro= reference distance (kpc; can be Quantity)
+
+           vo= reference velocity (km/s; can be Quantity)
+
+        OUTPUT:
+
+           (none)
+
+        """
+        self._roSet= True
+        self._voSet= True
+        if not ro is None:
+            if _APY_LOADED and isinstance(ro,units.Quantity):
+                ro= ro.to(units.kpc).value
+            self._ro= ro
+        if not vo is None:
+            if _APY_LOADED and isinstance(vo,units.Quantity):
+                vo= vo.to(units.km/units.s).value
+            self._vo= vo
+        return None
+
+    def integrate(self,t,pot,method='symplec4_c',dt=None,out=None,
+                  chunksize=None,stats=False):
+        """
+        NAME:
+
+           integrate
+
+        PURPOSE:
+
+           integrate all orbits; when the potential and the method are implemented in C, all orbits are integrated in a single call to the C integrators (in parallel when OpenMP is available); otherwise, all orbits are integrated in lockstep in Python, evaluating the forces for all orbits at once (with an adaptive Dormand-Prince integrator for the adaptive C methods, a leapfrog integrator for 'leapfrog(_c)', a fourth-order symplectic integrator for 'symplec4/6_c', and a fourth-order Runge-Kutta integrator for 'rk4/6_c'), or one by one for method='odeint' or if the potential cannot be evaluated for all orbits at once
+
+        INPUT:
+
+           t - list of times at which to output (0 has to be in this!) (can be Quantity)
+
+           pot - potential instance or list of instances
+
+           method= 'odeint' for scipy's odeint
+                   'leapfrog' for a simple leapfrog implementation
+                   'leapfrog_c' for a simple leapfrog implementation in C
+                   'symplec4_c' for a 4th order symplectic integrator in C
+                   'symplec6_c' for a 6th order symplectic integrator in C
+                   'rk4_c' for a 4th-order Runge-Kutta integrator in C
+                   'rk6_c' for a 6-th order Runge-Kutta integrator in C
+                   'dopr54_c' for a Dormand-Prince integrator in C (generally the fastest)
+                   'dop853_c' for an 8th-order Dormand-Prince integrator in C (fastest at tight tolerances)
+                   'bulirschstoer_c' for a Bulirsch-Stoer integrator with adaptive order in C (also efficient at tight tolerances)
+
+           dt= (None) if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize (only works for the C integrators that use a fixed stepsize) (can be Quantity)
+
+           out= (None) if set, array with shape [N,len(t),phasedim] (e.g., a numpy.memmap) that the orbits are written into
+
+           chunksize= (None) if set, integrate the orbits in chunks of this many times, such that the temporary memory used by the C integrators does not grow with len(t) (useful in combination with out=)
+
+           stats= (False) if True, return an IntegrationStats instance with statistics of the integration (see Orbit.integrate); the per-orbit statistics are arrays with shape [N]
+
+        OUTPUT:
+
+           (none) (get the actual orbits using getOrbit(); IntegrationStats instance if stats=True)
+
+        """
+        _check_potential_dim(self,pot)
+        _check_consistent_units(self,pot)
+        # Parse t
+        if _APY_LOADED and isinstance(t,units.Quantity):
+            self._integrate_t_asQuantity= True
+            t= t.to(units.Gyr).value\
+                /bovy_conversion.time_in_Gyr(self._vo,self._ro)
+        else:
+            self._integrate_t_asQuantity= False
+        if _APY_LOADED and not dt is None and isinstance(dt,units.Quantity):
+            dt= dt.to(units.Gyr).value\
+                /bovy_conversion.time_in_Gyr(self._vo,self._ro)
+        if not _check_integrate_dt(t,dt):
+            raise ValueError('dt input (integrator stepsize) for Orbits.integrate must be an integer divisor of the output stepsize')
+        if self.phasedim() == 4:
+            pot= toPlanarPotential(pot)
+        if hasattr(self,'_orbInterp'): delattr(self,'_orbInterp')
+        self.t= nu.array(t)
+        self._pot= pot
+        if out is None:
+            out= nu.empty((len(self),len(self.t),self.phasedim()))
+        elif out.shape != (len(self),len(self.t),self.phasedim()):
+            raise ValueError('out= array for Orbits.integrate needs to have shape (N,len(t),phasedim)')
+        if chunksize is None:
+            chunksize= len(self.t)
+        elif chunksize < 2:
+            raise ValueError('chunksize needs to be at least 2')
+        start= time.time()
+        if ext_loaded and method.lower() in _C_METHODS and _check_c(pot):
+            # Integrate in chunks, each starting from the end of the previous
+            ii= 0
+            vxvv= self.vxvv
+            chunk_stats= []
+            while True:
+                jj= min(ii+chunksize,len(self.t))
+                chunk_stats.append(\
+                    self._integrate_c(pot,vxvv,self.t[ii:jj],method,dt,
+                                      out[:,ii:jj]))
+                if jj == len(self.t): break
+                vxvv= out[:,jj-1]
+                ii= jj-1
+            out_stats= _sum_stats(chunk_stats)
+        else:
+            # Integrate all orbits in lockstep in Python, unless scipy's
+            # odeint is explicitly requested
+            if method.lower() == 'odeint':
+                out_stats= None
+            else:
+                out_stats= self._integrate_py(pot,self.vxvv,self.t,method,dt,
+                                              out)
+            if out_stats is None:
+                # Potential cannot be evaluated for all orbits at once,
+                # so integrate the orbits one by one
+                for ii in range(len(self)):
+                    if self.phasedim() == 4:
+                        out[ii]= _integrateOrbit(self.vxvv[ii],pot,
+                                                 self.t,method,dt)[0]
+                    else:
+                        out[ii]= _integrateFullOrbit(self.vxvv[ii],pot,
+                                                     self.t,method,dt)
+                out_stats= IntegrationStats(method)
+        self.orbit= out
+        if not stats: return None
+        out_stats.time= time.time()-start
+        # Maximum relative drift in the energy or Jacobi integral of each orbit
+        integral= self.E(self.t,use_physical=False)
+        OmegaP= _pattern_speed(pot)
+        if not OmegaP is None:
+            integral-= nu.atleast_1d(OmegaP)[-1]\
+                *self.orbit[...,0]*self.orbit[...,2]
+        out_stats.drift= nu.nanmax(nu.fabs(integral/integral[:,:1]-1.),
+                                   axis=1)
+        return out_stats
+
+    def _integrate_c(self,pot,vxvv,t,method,dt,out):
+        """Integrate all orbits in C at once, writing the result into out and returning the integration statistics"""
+        if self.phasedim() == 4:
+            tmp_out, msg, stats= integratePlanarOrbit_c(pot,_to_rect(vxvv),t,
+                                                        method,dt=dt,
+                                                        stats=True)
+        else:
+            tmp_out, msg, stats= integrateFullOrbit_c(pot,_to_rect(vxvv),t,
+                                                      method,dt=dt,stats=True)
+        _from_rect(tmp_out,out)
+        return stats
+
+    def _integrate_py(self,pot,vxvv,t,method,dt,out):
+        """Integrate all orbits in lockstep in Python, evaluating the forces for all orbits at once, writing the result into out and returning the integration statistics (None if the potential cannot be evaluated for all orbits at once)"""
+        if self.phasedim() == 4:
+            tmp_out, stats= integratePlanarOrbits_py(pot,_to_rect(vxvv),t,
+                                                     method,dt=dt)
+        else:
+            tmp_out, stats= integrateFullOrbits_py(pot,_to_rect(vxvv),t,
+                                                   method,dt=dt)
+        if tmp_out is None: return None
+        _from_rect(tmp_out,out)
+        return stats
+
+    def integrate_lyapunov(self,t,pot,method='dopr54_c',dt=None,dxdv=None):
+        """
+        NAME:
+
+           integrate_lyapunov
+
+        PURPOSE:
+
+           integrate all 3D orbits together with a deviation vector that is renormalized at each output time, to compute the maximal Lyapunov exponent and the mean MEGNO of each orbit (see Orbit.integrate_lyapunov); when the potential is implemented in C, all orbits are integrated in a single call to the C integrators (in parallel when OpenMP is available)
+
+        INPUT:
+
+           t - list of times at which to output and renormalize the deviation vectors (0 has to be in this!) (can be Quantity)
+
+           pot - potential instance or list of instances
+
+           method= 'odeint', 'rk4_c', 'rk6_c', 'dopr54_c', 'dop853_c', or 'bulirschstoer_c' (see Orbit.integrate_lyapunov)
+
+           dt= (None) if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize (only works for the C integrators that use a fixed stepsize) (can be Quantity)
+
+           dxdv= (None) initial deviation vector in rectangular coordinates [dx,dy,dz,dvx,dvy,dvz], the same for all orbits or with shape [N,6] (default: all components equal)
+
+        OUTPUT:
+
+           (none) (get the Lyapunov exponents using lyapunov() and the MEGNOs using megno(); the orbits are available as usual)
+
+        """
+        _check_potential_dim(self,pot)
+        _check_consistent_units(self,pot)
+        if not self.phasedim() == 6:
+            raise NotImplementedError('Lyapunov exponents and MEGNO are only implemented for 3D orbits that track the azimuth')
+        # Parse t
+        if _APY_LOADED and isinstance(t,units.Quantity):
+            self._integrate_t_asQuantity= True
+            t= t.to(units.Gyr).value\
+                /bovy_conversion.time_in_Gyr(self._vo,self._ro)
+        else:
+            self._integrate_t_asQuantity= False
+        if _APY_LOADED and not dt is None and isinstance(dt,units.Quantity):
+            dt= dt.to(units.Gyr).value\
+                /bovy_conversion.time_in_Gyr(self._vo,self._ro)
+        if not _check_integrate_dt(t,dt):
+            raise ValueError('dt input (integrator stepsize) for Orbits.integrate_lyapunov must be an integer divisor of the output stepsize')
+        if hasattr(self,'_orbInterp'): delattr(self,'_orbInterp')
+        self.t= nu.array(t)
+        self._pot= pot
+        if dxdv is None: dxdv= nu.ones(6)
+        dxdv= nu.broadcast_to(nu.asarray(dxdv,dtype='float'),(len(self),6))
+        out= nu.empty((len(self),len(self.t),6))
+        if ext_loaded and method.lower() in _C_METHODS \
+                and not 'leapfrog' in method.lower() \
+                and not 'symplec' in method.lower() and _check_c(pot):
+            R= self.vxvv[:,0]
+            vR= self.vxvv[:,1]
+            vT= self.vxvv[:,2]
+            cp, sp= nu.cos(self.vxvv[:,5]), nu.sin(self.vxvv[:,5])
+            this_vxvv= nu.array([R*cp,R*sp,self.vxvv[:,3],
+                                 vR*cp-vT*sp,vT*cp+vR*sp,
+                                 self.vxvv[:,4]]).T
+            tmp_out, self._lyap, self._megno, msg= \
+                integrateFullOrbit_lyapunov_c(pot,this_vxvv,dxdv,self.t,
+                                              method,dt=dt)
+            #go back to the cylindrical frame
+            x, y= tmp_out[...,0], tmp_out[...,1]
+            vx, vy= tmp_out[...,3], tmp_out[...,4]
+            out[...,0]= nu.sqrt(x**2.+y**2.)
+            phi= nu.arctan2(y,x) % (2.*nu.pi)
+            cp, sp= nu.cos(phi), nu.sin(phi)
+            out[...,1]= vx*cp+vy*sp
+            out[...,2]= vy*cp-vx*sp
+            out[...,3]= tmp_out[...,2]
+            out[...,4]= tmp_out[...,5]
+            out[...,5]= phi
+        else:
+            # Integrate the orbits one by one
+            self._lyap= nu.empty(len(self))
+            self._megno= nu.empty(len(self))
+            for ii in range(len(self)):
+                out[ii], self._lyap[ii], self._megno[ii], _= \
+                    _integrateFullOrbit_lyapunov(self.vxvv[ii],pot,self.t,
+                                                 method,dt,dxdv[ii])
+        self.orbit= out
+        return None
+
+    @physical_conversion('frequency')
+    def lyapunov(self,*args,**kwargs):
+        """
+        NAME:
+
+           lyapunov
+
+        PURPOSE:
+
+           return the maximal Lyapunov exponents computed by integrate_lyapunov
+
+        INPUT:
+
+           ro= (Object-wide default) physical scale for distances to use to convert (can be Quantity)
+
+           vo= (Object-wide default) physical scale for velocities to use to convert (can be Quantity)
+
+           use_physical= use to override Object-wide default for using a physical scale for output
+
+        OUTPUT:
+
+           maximal Lyapunov exponents with shape [N] (1/Gyr in physical units)
+
+        """
+        if not hasattr(self,'_lyap'):
+            raise AttributeError("Integrate the orbits with integrate_lyapunov first")
+        return self._lyap
+
+    def megno(self):
+        """
+        NAME:
+
+           megno
+
+        PURPOSE:
+
+           return the mean MEGNOs computed by integrate_lyapunov
+
+        INPUT:
+
+           (none)
+
+        OUTPUT:
+
+           mean MEGNO at the final time with shape [N]
+
+        """
+        if not hasattr(self,'_megno'):
+            raise AttributeError("Integrate the orbits with integrate_lyapunov first")
+        return self._megno
+
+    def getOrbit(self):
+        """
+        NAME:
+
+           getOrbit
+
+        PURPOSE:
+
+           return the integrated orbits
+
+        INPUT:
+
+           (none)
+
+        OUTPUT:
+
+           array with shape [N,nt,phasedim] of [R,vR,vT,z,vz,phi] or [R,vR,vT,phi]
+
+        """
+        return self.orbit
+
+    def __call__(self,*args,**kwargs):
+        """
+        NAME:
+
+           __call__
+
+        PURPOSE:
+
+           return the phase-space coordinates of all orbits at time t
+
+        INPUT:
+
+           t - (optional) time or array of times (can be Quantity)
+
+        OUTPUT:
+
+           array with shape [phasedim,N] or [phasedim,N,nt] (for an array of times)
+
+        """
+        if len(args) == 0 or args[0] is None:
+            return self.vxvv.T
+        t= args[0]
+        # Parse t
+        if _APY_LOADED and isinstance(t,units.Quantity):
+            t= t.to(units.Gyr).value\
+                /bovy_conversion.time_in_Gyr(self._vo,self._ro)
+        elif hasattr(self,'_integrate_t_asQuantity') \
+                and self._integrate_t_asQuantity \
+                and not nu.all(t == self.t):
+            warnings.warn("You specified integration times as a Quantity, but are evaluating at times not specified as a Quantity; assuming that time given is in natural (internal) units (multiply time by unit to get output at physical time)",galpyWarning)
+        onet= nu.ndim(t) == 0
+        t= nu.atleast_1d(t).astype('float64')
+        if not hasattr(self,'t'):
+            if nu.any(t != 0.):
+                raise ValueError("Integrate instance before evaluating it at non-zero time")
+            out= nu.tile(self.vxvv.T[:,:,nu.newaxis],(1,1,len(t)))
+        else:
+            sindx= nu.argsort(self.t)
+            indx= nu.searchsorted(self.t,t,sorter=sindx)
+            indx[indx == len(self.t)]= len(self.t)-1
+            indx= sindx[indx]
+            if nu.all(self.t[indx] == t):
+                out= nu.transpose(self.orbit[:,indx,:],axes=(2,0,1))
+            else:
+                out= self._interpolate(t)
+        if onet: return out[:,:,0]
+        else: return out
+
+    def _interpolate(self,t):
+        """Interpolate all orbits at times t, returns [phasedim,N,nt]"""
+        if not hasattr(self,'_orbInterp'):
+            sindx= nu.argsort(self.t)
+            # Interpolate x and y rather than R and phi to avoid phase wrapping
+            tointerp= nu.copy(self.orbit[:,sindx,:])
+            tointerp[...,0]= self.orbit[:,sindx,0]*nu.cos(self.orbit[:,sindx,-1])
+            tointerp[...,-1]= self.orbit[:,sindx,0]*nu.sin(self.orbit[:,sindx,-1])
+            self._orbInterp= interpolate.CubicSpline(self.t[sindx],tointerp,
+                                                     axis=1,extrapolate=False)
+        if nu.any(t < nu.amin(self.t)) or nu.any(t > nu.amax(self.t)):
+            raise ValueError("One or more requested time is not within the integrated range")
+        out= nu.transpose(self._orbInterp(t),axes=(2,0,1))
+        x, y= nu.copy(out[0]), nu.copy(out[-1])
+        out[0]= nu.sqrt(x**2.+y**2.)
+        out[-1]= nu.arctan2(y,x) % (2.*nu.pi)
+        return out
+
+    @physical_conversion('time')
+    def time(self,*args,**kwargs):
+        """
+        NAME:
+
+           time
+
+        PURPOSE:
+
+           return the times at which the orbits are sampled
+
+        INPUT:
+
+           t - (default: integration times) time at which to get the time (for consistency reasons); default is integration times
+
+           ro= (Object-wide default) physical scale for distances to use to convert
+
+           vo= (Object-wide default) physical scale for velocities to use to convert
+
+           use_physical= use to override Object-wide default for using a physical scale for output
+
+        OUTPUT:
+
+           t(t)
+
+        """
+        if len(args) == 0:
+            try:
+                return self.t
+            except AttributeError:
+                return 0.
+        else: return args[0]
+
+    @physical_conversion('position')
+    def R(self,*args,**kwargs):
+        """
+        NAME:
+
+           R
+
+        PURPOSE:
+
+           return the cylindrical radius
+
+        INPUT:
+
+           t - (optional) time or array of times at which to get the radius (can be Quantity)
+
+           ro= (Object-wide default) physical scale for distances to use to convert (can be Quantity)
+
+           use_physical= use to override Object-wide default for using a physical scale for output
+
+        OUTPUT:
+
+           R(t) with shape [N] or [N,nt]
+
+        """
+        return self(*args)[0]
+
+    @physical_conversion('position')
+    def r(self,*args,**kwargs):
+        """
+        NAME:
+
+           r
+
+        PURPOSE:
+
+           return the spherical radius
+
+        INPUT:
+
+           t - (optional) time or array of times at which to get the radius (can be Quantity)
+
+           ro= (Object-wide default) physical scale for distances to use to convert (can be Quantity)
+
+           use_physical= use to override Object-wide default for using a physical scale for output
+
+        OUTPUT:
+
+           r(t) with shape [N] or [N,nt]
+
+        """
+        thiso= self(*args)
+        if self.phasedim() == 4: return thiso[0]
+        else: return nu.sqrt(thiso[0]**2.+thiso[3]**2.)
+
+    @physical_conversion('velocity')
+    def vR(self,*args,**kwargs):
+        """
+        NAME:
+
+           vR
+
+        PURPOSE:
+
+           return the radial velocity
+
+        INPUT:
+
+           t - (optional) time or array of times at which to get the radial velocity (can be Quantity)
+
+           vo= (Object-wide default) physical scale for velocities to use to convert (can be Quantity)
+
+           use_physical= use to override Object-wide default for using a physical scale for output
+
+        OUTPUT:
+
+           vR(t) with shape [N] or [N,nt]
+
+        """
+        return self(*args)[1]
+
+    @physical_conversion('velocity')
+    def vT(self,*args,**kwargs):
+        """
+        NAME:
+
+           vT
+
+        PURPOSE:
+
+           return the tangential velocity
+
+        INPUT:
+
+           t - (optional) time or array of times at which to get the tangential velocity (can be Quantity)
+
+           vo= (Object-wide default) physical scale for velocities to use to convert (can be Quantity)
+
+           use_physical= use to override Object-wide default for using a physical scale for output
+
+        OUTPUT:
+
+           vT(t) with shape [N] or [N,nt]
+
+        """
+        return self(*args)[2]
+
+    @physical_conversion('position')
+    def z(self,*args,**kwargs):
+        """
+        NAME:
+
+           z
+
+        PURPOSE:
+
+           return the vertical height
+
+        INPUT:
+
+           t - (optional) time or array of times at which to get the vertical height (can be Quantity)
+
+           ro= (Object-wide default) physical scale for distances to use to convert (can be Quantity)
+
+           use_physical= use to override Object-wide default for using a physical scale for output
+
+        OUTPUT:
+
+           z(t) with shape [N] or [N,nt]
+
+        """
+        if self.phasedim() == 4:
+            raise AttributeError("planar orbits do not have z()")
+        return self(*args)[3]
+
+    @physical_conversion('velocity')
+    def vz(self,*args,**kwargs):
+        """
+        NAME:
+
+           vz
+
+        PURPOSE:
+
+           return the vertical velocity
+
+        INPUT:
+
+           t - (optional) time or array of times at which to get the vertical velocity (can be Quantity)
+
+           vo= (Object-wide default) physical scale for velocities to use to convert (can be Quantity)
+
+           use_physical= use to override Object-wide default for using a physical scale for output
+
+        OUTPUT:
+
+           vz(t) with shape [N] or [N,nt]
+
+        """
+        if self.phasedim() == 4:
+            raise AttributeError("planar orbits do not have vz()")
+        return self(*args)[4]
+
+    @physical_conversion('angle')
+    def phi(self,*args,**kwargs):
+        """
+        NAME:
+
+           phi
+
+        PURPOSE:
+
+           return the azimuth
+
+        INPUT:
+
+           t - (optional) time or array of times at which to get the azimuth (can be Quantity)
+
+        OUTPUT:
+
+           phi(t) with shape [N] or [N,nt]
+
+        """
+        return self(*args)[-1]
+
+    @physical_conversion('velocity')
+    def vphi(self,*args,**kwargs):
+        """
+        NAME:
+
+           vphi
+
+        PURPOSE:
+
+           return the angular velocity
+
+        INPUT:
+
+           t - (optional) time or array of times at which to get the angular velocity (can be Quantity)
+
+           vo= (Object-wide default) physical scale for velocities to use to convert (can be Quantity)
+
+           use_physical= use to override Object-wide default for using a physical scale for output
+
+        OUTPUT:
+
+           vphi(t) with shape [N] or [N,nt]
+
+        """
+        thiso= self(*args)
+        return thiso[2]/thiso[0]
+
+    @physical_conversion('position')
+    def x(self,*args,**kwargs):
+        """
+        NAME:
+
+           x
+
+        PURPOSE:
+
+           return the x coordinate
+
+        INPUT:
+
+           t - (optional) time or array of times at which to get x (can be Quantity)
+
+           ro= (Object-wide default) physical scale for distances to use to convert (can be Quantity)
+
+           use_physical= use to override Object-wide default for using a physical scale for output
+
+        OUTPUT:
+
+           x(t) with shape [N] or [N,nt]
+
+        """
+        thiso= self(*args)
+        return thiso[0]*nu.cos(thiso[-1])
+
+    @physical_conversion('position')
+    def y(self,*args,**kwargs):
+        """
+        NAME:
+
+           y
+
+        PURPOSE:
+
+           return the y coordinate
+
+        INPUT:
+
+           t - (optional) time or array of times at which to get y (can be Quantity)
+
+           ro= (Object-wide default) physical scale for distances to use to convert (can be Quantity)
+
+           use_physical= use to override Object-wide default for using a physical scale for output
+
+        OUTPUT:
+
+           y(t) with shape [N] or [N,nt]
+
+        """
+        thiso= self(*args)
+        return thiso[0]*nu.sin(thiso[-1])
+
+    @physical_conversion('velocity')
+    def vx(self,*args,**kwargs):
+        """
+        NAME:
+
+           vx
+
+        PURPOSE:
+
+           return the x velocity
+
+        INPUT:
+
+           t - (optional) time or array of times at which to get vx (can be Quantity)
+
+           vo= (Object-wide default) physical scale for velocities to use to convert (can be Quantity)
+
+           use_physical= use to override Object-wide default for using a physical scale for output
+
+        OUTPUT:
+
+           vx(t) with shape [N] or [N,nt]
+
+        """
+        thiso= self(*args)
+        return thiso[1]*nu.cos(thiso[-1])-thiso[2]*nu.sin(thiso[-1])
+
+    @physical_conversion('velocity')
+    def vy(self,*args,**kwargs):
+        """
+        NAME:
+
+           vy
+
+        PURPOSE:
+
+           return the y velocity
+
+        INPUT:
+
+           t - (optional) time or array of times at which to get vy (can be Quantity)
+
+           vo= (Object-wide default) physical scale for velocities to use to convert (can be Quantity)
+
+           use_physical= use to override Object-wide default for using a physical scale for output
+
+        OUTPUT:
+
+           vy(t) with shape [N] or [N,nt]
+
+        """
+        thiso= self(*args)
+        return thiso[2]*nu.cos(thiso[-1])+thiso[1]*nu.sin(thiso[-1])
+
+    @physical_conversion('energy')
+    def E(self,*args,**kwargs):
+        """
+        NAME:
+
+           E
+
+        PURPOSE:
+
+           calculate the energy
+
+        INPUT:
+
+           t - (optional) time or array of times at which to get the energy (can be Quantity)
+
+           pot= Potential instance or list of such instances
+
+           vo= (Object-wide default) physical scale for velocities to use to convert (can be Quantity)
+
+           use_physical= use to override Object-wide default for using a physical scale for output
+
+        OUTPUT:
+
+           energy with shape [N] or [N,nt]
+
+        """
+        pot= kwargs.get('pot',None)
+        if pot is None:
+            try:
+                pot= self._pot
+            except AttributeError:
+                raise AttributeError("Integrate orbits or specify pot=")
+        _check_consistent_units(self,pot)
+        if len(args) > 0 and not args[0] is None:
+            t= args[0]
+            if _APY_LOADED and isinstance(t,units.Quantity):
+                t= t.to(units.Gyr).value\
+                    /bovy_conversion.time_in_Gyr(self._vo,self._ro)
+        else:
+            t= 0.
+        thiso= self(t)
+        onet= nu.ndim(t) == 0
+        if onet: thiso= thiso[:,:,nu.newaxis]
+        t= nu.atleast_1d(t)
+        out= 0.5*nu.sum(thiso[1:3]**2.,axis=0)
+        if self.phasedim() == 4:
+            thispot= toPlanarPotential(pot)
+            for ii in range(len(t)):
+                out[:,ii]+= _evaluatePotentials(thispot,thiso[0,:,ii],None,
+                                                thiso[3,:,ii],t[ii])
+        else:
+            out+= 0.5*thiso[4]**2.
+            for ii in range(len(t)):
+                out[:,ii]+= _evaluatePotentials(pot,thiso[0,:,ii],
+                                                thiso[3,:,ii],
+                                                thiso[5,:,ii],t[ii])
+        if onet: return out[:,0]
+        else: return out
+
+    @physical_conversion('action')
+    def L(self,*args,**kwargs):
+        """
+        NAME:
+
+           L
+
+        PURPOSE:
+
+           calculate the angular momentum
+
+        INPUT:
+
+           t - (optional) time or array of times at which to get the angular momentum (can be Quantity)
+
+           ro= (Object-wide default) physical scale for distances to use to convert (can be Quantity)
+
+           vo= (Object-wide default) physical scale for velocities to use to convert (can be Quantity)
+
+           use_physical= use to override Object-wide default for using a physical scale for output
+
+        OUTPUT:
+
+           angular momentum with shape [N] or [N,nt] for planar orbits and [N,3] or [N,nt,3] for 3D orbits
+
+        """
+        thiso= self(*args)
+        if self.phasedim() == 4:
+            return thiso[0]*thiso[2]
+        x= thiso[0]*nu.cos(thiso[5])
+        y= thiso[0]*nu.sin(thiso[5])
+        vx= thiso[1]*nu.cos(thiso[5])-thiso[2]*nu.sin(thiso[5])
+        vy= thiso[2]*nu.cos(thiso[5])+thiso[1]*nu.sin(thiso[5])
+        z, vz= thiso[3], thiso[4]
+        out= nu.empty(x.shape+(3,))
+        out[...,0]= y*vz-z*vy
+        out[...,1]= z*vx-x*vz
+        out[...,2]= x*vy-y*vx
+        return out
+
+    def _setupaA(self,pot=None,type='adiabatic',**kwargs):
+        """Set up an actionAngle module for these Orbits"""
+        if pot is None:
+            try:
+                pot= self._pot
+            except AttributeError:
+                raise AttributeError("Integrate orbits or specify pot=")
+        if hasattr(self,'_aA') and self._aAPot is pot \
+                and self._aAType == type.lower() and len(kwargs) == 0:
+            return None
+        self._aAPot= pot
+        self._aAType= type.lower()
+        if self._aAType == 'adiabatic':
+            self._aA= actionAngle.actionAngleAdiabatic(pot=pot,**kwargs)
+        elif self._aAType == 'staeckel':
+            self._aA= actionAngle.actionAngleStaeckel(pot=pot,**kwargs)
+        elif self._aAType == 'spherical':
+            self._aA= actionAngle.actionAngleSpherical(pot=pot,**kwargs)
+        else:
+            raise NotImplementedError("actionAngle type %s not supported for Orbits; use 'adiabatic', 'staeckel', or 'spherical'" % type)
+        return None
+
+    def _actions(self,pot=None,**kwargs):
+        """Compute the actions of all orbits at their initial conditions"""
+        _check_consistent_units(self,pot)
+        kwargs.pop('ro',None)
+        kwargs.pop('vo',None)
+        kwargs.pop('use_physical',None)
+        kwargs.pop('quantity',None)
+        self._setupaA(pot=pot,**kwargs)
+        if self.phasedim() == 4:
+            zeros= nu.zeros(len(self))
+            return self._aA(self.vxvv[:,0],self.vxvv[:,1],self.vxvv[:,2],
+                            zeros,zeros,self.vxvv[:,3],use_physical=False)
+        else:
+            return self._aA(*self.vxvv.T,use_physical=False)
+
+    @physical_conversion('action')
+    def jr(self,pot=None,**kwargs):
+        """
+        NAME:
+
+           jr
+
+        PURPOSE:
+
+           calculate the radial action of all orbits
+
+        INPUT:
+
+           pot - potential
+
+           type= ('adiabatic') type of actionAngle module to use
+
+              1) 'adiabatic'
+
+              2) 'staeckel'
+
+              3) 'spherical'
+
+           +actionAngle module setup kwargs
+
+           ro= (Object-wide default) physical scale for distances to use to convert (can be Quantity)
+
+           vo= (Object-wide default) physical scale for velocities to use to convert (can be Quantity)
+
+           use_physical= use to override Object-wide default for using a physical scale for output
+
+        OUTPUT:
+
+           jr with shape [N]
+
+        """
+        return self._actions(pot=pot,**kwargs)[0]
+
+    @physical_conversion('action')
+    def jp(self,pot=None,**kwargs):
+        """
+        NAME:
+
+           jp
+
+        PURPOSE:
+
+           calculate the azimuthal action of all orbits
+
+        INPUT:
+
+           pot - potential
+
+           type= ('adiabatic') type of actionAngle module to use
+
+              1) 'adiabatic'
+
+              2) 'staeckel'
+
+              3) 'spherical'
+
+           +actionAngle module setup kwargs
+
+           ro= (Object-wide default) physical scale for distances to use to convert (can be Quantity)
+
+           vo= (Object-wide default) physical scale for velocities to use to convert (can be Quantity)
+
+           use_physical= use to override Object-wide default for using a physical scale for output
+
+        OUTPUT:
+
+           jp with shape [N]
+
+        """
+        return self._actions(pot=pot,**kwargs)[1]
+
+    @physical_conversion('action')
+    def jz(self,pot=None,**kwargs):
+        """
+        NAME:
+
+           jz
+
+        PURPOSE:
+
+           calculate the vertical action of all orbits
+
+        INPUT:
+
+           pot - potential
+
+           type= ('adiabatic') type of actionAngle module to use
+
+              1) 'adiabatic'
+
+              2) 'staeckel'
+
+              3) 'spherical'
+
+           +actionAngle module setup kwargs
+
+           ro= (Object-wide default) physical scale for distances to use to convert (can be Quantity)
+
+           vo= (Object-wide default) physical scale for velocities to use to convert (can be Quantity)
+
+           use_physical= use to override Object-wide default for using a physical scale for output
+
+        OUTPUT:
+
+           jz with shape [N]
+
+        """
+        return self._actions(pot=pot,**kwargs)[2]
+
+    @physical_conversion('angle_deg')
+    def ra(self,*args,**kwargs):
+        """
+        NAME:
+
+           ra
+
+        PURPOSE:
+
+           return the right ascension
+
+        INPUT:
+
+           t - (optional) time or array of times at which to get ra (can be Quantity)
+
+           obs=[X,Y,Z] - (optional) position of observer (in kpc; entries can be Quantity) (default=Object-wide default)
+
+           ro= (Object-wide default) physical scale for distances to use to convert (can be Quantity)
+
+        OUTPUT:
+
+           ra(t) in deg with shape [N] or [N,nt]
+
+        """
+        _check_roSet(self,kwargs,'ra')
+        return self._radec(*args,**kwargs)[0]
+
+    @physical_conversion('angle_deg')
+    def dec(self,*args,**kwargs):
+        """
+        NAME:
+
+           dec
+
+        PURPOSE:
+
+           return the declination
+
+        INPUT:
+
+           t - (optional) time or array of times at which to get dec (can be Quantity)
+
+           obs=[X,Y,Z] - (optional) position of observer (in kpc; entries can be Quantity) (default=Object-wide default)
+
+           ro= (Object-wide default) physical scale for distances to use to convert (can be Quantity)
+
+        OUTPUT:
+
+           dec(t) in deg with shape [N] or [N,nt]
+
+        """
+        _check_roSet(self,kwargs,'dec')
+        return self._radec(*args,**kwargs)[1]
+
+    @physical_conversion('angle_deg')
+    def ll(self,*args,**kwargs):
+        """
+        NAME:
+
+           ll
+
+        PURPOSE:
+
+           return Galactic longitude
+
+        INPUT:
+
+           t - (optional) time or array of times at which to get ll (can be Quantity)
+
+           obs=[X,Y,Z] - (optional) position of observer (in kpc; entries can be Quantity) (default=Object-wide default)
+
+           ro= (Object-wide default) physical scale for distances to use to convert (can be Quantity)
+
+        OUTPUT:
+
+           l(t) in deg with shape [N] or [N,nt]
+
+        """
+        _check_roSet(self,kwargs,'ll')
+        return self._lbd(*args,**kwargs)[0]
+
+    @physical_conversion('angle_deg')
+    def bb(self,*args,**kwargs):
+        """
+        NAME:
+
+           bb
+
+        PURPOSE:
+
+           return Galactic latitude
+
+        INPUT:
+
+           t - (optional) time or array of times at which to get bb (can be Quantity)
+
+           obs=[X,Y,Z] - (optional) position of observer (in kpc; entries can be Quantity) (default=Object-wide default)
+
+           ro= (Object-wide default) physical scale for distances to use to convert (can be Quantity)
+
+        OUTPUT:
+
+           b(t) in deg with shape [N] or [N,nt]
+
+        """
+        _check_roSet(self,kwargs,'bb')
+        return self._lbd(*args,**kwargs)[1]
+
+    @physical_conversion('position_kpc')
+    def dist(self,*args,**kwargs):
+        """
+        NAME:
+
+           dist
+
+        PURPOSE:
+
+           return distance from the observer
+
+        INPUT:
+
+           t - (optional) time or array of times at which to get dist (can be Quantity)
+
+           obs=[X,Y,Z] - (optional) position of observer (in kpc; entries can be Quantity) (default=Object-wide default)
+
+           ro= (Object-wide default) physical scale for distances to use to convert (can be Quantity)
+
+        OUTPUT:
+
+           dist(t) in kpc with shape [N] or [N,nt]
+
+        """
+        _check_roSet(self,kwargs,'dist')
+        return self._lbd(*args,**kwargs)[2]
+
+    @physical_conversion('proper-motion_masyr')
+    def pmra(self,*args,**kwargs):
+        """
+        NAME:
+
+           pmra
+
+        PURPOSE:
+
+           return proper motion in right ascension (in mas/yr)
+
+        INPUT:
+
+           t - (optional) time or array of times at which to get pmra (can be Quantity)
+
+           obs=[X,Y,Z,vx,vy,vz] - (optional) position and velocity of observer (in kpc and km/s; entries can be Quantity) (default=Object-wide default)
+
+           ro= (Object-wide default) physical scale for distances to use to convert (can be Quantity)
+
+           vo= (Object-wide default) physical scale for velocities to use to convert (can be Quantity)
+
+        OUTPUT:
+
+           pm_ra(t) in mas/yr with shape [N] or [N,nt]
+
+        """
+        _check_roSet(self,kwargs,'pmra')
+        _check_voSet(self,kwargs,'pmra')
+        return self._pmrapmdec(*args,**kwargs)[0]
+
+    @physical_conversion('proper-motion_masyr')
+    def pmdec(self,*args,**kwargs):
+        """
+        NAME:
+
+           pmdec
+
+        PURPOSE:
+
+           return proper motion in declination (in mas/yr)
+
+        INPUT:
+
+           t - (optional) time or array of times at which to get pmdec (can be Quantity)
+
+           obs=[X,Y,Z,vx,vy,vz] - (optional) position and velocity of observer (in kpc and km/s; entries can be Quantity) (default=Object-wide default)
+
+           ro= (Object-wide default) physical scale for distances to use to convert (can be Quantity)
+
+           vo= (Object-wide default) physical scale for velocities to use to convert (can be Quantity)
+
+        OUTPUT:
+
+           pm_dec(t) in mas/yr with shape [N] or [N,nt]
+
+        """
+        _check_roSet(self,kwargs,'pmdec')
+        _check_voSet(self,kwargs,'pmdec')
+        return self._pmrapmdec(*args,**kwargs)[1]
+
+    @physical_conversion('proper-motion_masyr')
+    def pmll(self,*args,**kwargs):
+        """
+        NAME:
+
+           pmll
+
+        PURPOSE:
+
+           return proper motion in Galactic longitude (in mas/yr)
+
+        INPUT:
+
+           t - (optional) time or array of times at which to get pmll (can be Quantity)
+
+           obs=[X,Y,Z,vx,vy,vz] - (optional) position and velocity of observer (in kpc and km/s; entries can be Quantity) (default=Object-wide default)
+
+           ro= (Object-wide default) physical scale for distances to use to convert (can be Quantity)
+
+           vo= (Object-wide default) physical scale for velocities to use to convert (can be Quantity)
+
+        OUTPUT:
+
+           pm_l(t) in mas/yr with shape [N] or [N,nt]
+
+        """
+        _check_roSet(self,kwargs,'pmll')
+        _check_voSet(self,kwargs,'pmll')
+        return self._lbdvrpmllpmbb(*args,**kwargs)[4]
+
+    @physical_conversion('proper-motion_masyr')
+    def pmbb(self,*args,**kwargs):
+        """
+        NAME:
+
+           pmbb
+
+        PURPOSE:
+
+           return proper motion in Galactic latitude (in mas/yr)
+
+        INPUT:
+
+           t - (optional) time or array of times at which to get pmbb (can be Quantity)
+
+           obs=[X,Y,Z,vx,vy,vz] - (optional) position and velocity of observer (in kpc and km/s; entries can be Quantity) (default=Object-wide default)
+
+           ro= (Object-wide default) physical scale for distances to use to convert (can be Quantity)
+
+           vo= (Object-wide default) physical scale for velocities to use to convert (can be Quantity)
+
+        OUTPUT:
+
+           pm_b(t) in mas/yr with shape [N] or [N,nt]
+
+        """
+        _check_roSet(self,kwargs,'pmbb')
+        _check_voSet(self,kwargs,'pmbb')
+        return self._lbdvrpmllpmbb(*args,**kwargs)[5]
+
+    @physical_conversion('velocity_kms')
+    def vlos(self,*args,**kwargs):
+        """
+        NAME:
+
+           vlos
+
+        PURPOSE:
+
+           return the line-of-sight velocity (in km/s)
+
+        INPUT:
+
+           t - (optional) time or array of times at which to get vlos (can be Quantity)
+
+           obs=[X,Y,Z,vx,vy,vz] - (optional) position and velocity of observer (in kpc and km/s; entries can be Quantity) (default=Object-wide default)
+
+           ro= (Object-wide default) physical scale for distances to use to convert (can be Quantity)
+
+           vo= (Object-wide default) physical scale for velocities to use to convert (can be Quantity)
+
+        OUTPUT:
+
+           vlos(t) in km/s with shape [N] or [N,nt]
+
+        """
+        _check_roSet(self,kwargs,'vlos')
+        _check_voSet(self,kwargs,'vlos')
+        return self._lbdvrpmllpmbb(*args,**kwargs)[3]
+
+    @physical_conversion('position_kpc')
+    def helioX(self,*args,**kwargs):
+        """
+        NAME:
+
+           helioX
+
+        PURPOSE:
+
+           return Heliocentric Galactic rectangular x-coordinate (aka "X")
+
+        INPUT:
+
+           t - (optional) time or array of times at which to get X (can be Quantity)
+
+           obs=[X,Y,Z] - (optional) position of observer (in kpc; entries can be Quantity) (default=Object-wide default)
+
+           ro= (Object-wide default) physical scale for distances to use to convert (can be Quantity)
+
+        OUTPUT:
+
+           helioX(t) in kpc with shape [N] or [N,nt]
+
+        """
+        _check_roSet(self,kwargs,'helioX')
+        return self._helioXYZ(*args,**kwargs)[0]
+
+    @physical_conversion('position_kpc')
+    def helioY(self,*args,**kwargs):
+        """
+        NAME:
+
+           helioY
+
+        PURPOSE:
+
+           return Heliocentric Galactic rectangular y-coordinate (aka "Y")
+
+        INPUT:
+
+           t - (optional) time or array of times at which to get Y (can be Quantity)
+
+           obs=[X,Y,Z] - (optional) position of observer (in kpc; entries can be Quantity) (default=Object-wide default)
+
+           ro= (Object-wide default) physical scale for distances to use to convert (can be Quantity)
+
+        OUTPUT:
+
+           helioY(t) in kpc with shape [N] or [N,nt]
+
+        """
+        _check_roSet(self,kwargs,'helioY')
+        return self._helioXYZ(*args,**kwargs)[1]
+
+    @physical_conversion('position_kpc')
+    def helioZ(self,*args,**kwargs):
+        """
+        NAME:
+
+           helioZ
+
+        PURPOSE:
+
+           return Heliocentric Galactic rectangular z-coordinate (aka "Z")
+
+        INPUT:
+
+           t - (optional) time or array of times at which to get Z (can be Quantity)
+
+           obs=[X,Y,Z] - (optional) position of observer (in kpc; entries can be Quantity) (default=Object-wide default)
+
+           ro= (Object-wide default) physical scale for distances to use to convert (can be Quantity)
+
+        OUTPUT:
+
+           helioZ(t) in kpc with shape [N] or [N,nt]
+
+        """
+        _check_roSet(self,kwargs,'helioZ')
+        return self._helioXYZ(*args,**kwargs)[2]
+
+    @physical_conversion('velocity_kms')
+    def U(self,*args,**kwargs):
+        """
+        NAME:
+
+           U
+
+        PURPOSE:
+
+           return Heliocentric Galactic rectangular x-velocity (aka "U")
+
+        INPUT:
+
+           t - (optional) time or array of times at which to get U (can be Quantity)
+
+           obs=[X,Y,Z,vx,vy,vz] - (optional) position and velocity of observer (in kpc and km/s; entries can be Quantity) (default=Object-wide default)
+
+           ro= (Object-wide default) physical scale for distances to use to convert (can be Quantity)
+
+           vo= (Object-wide default) physical scale for velocities to use to convert (can be Quantity)
+
+        OUTPUT:
+
+           U(t) in km/s with shape [N] or [N,nt]
+
+        """
+        _check_roSet(self,kwargs,'U')
+        _check_voSet(self,kwargs,'U')
+        return self._XYZvxvyvz(*args,**kwargs)[3]
+
+    @physical_conversion('velocity_kms')
+    def V(self,*args,**kwargs):
+        """
+        NAME:
+
+           V
+
+        PURPOSE:
+
+           return Heliocentric Galactic rectangular y-velocity (aka "V")
+
+        INPUT:
+
+           t - (optional) time or array of times at which to get V (can be Quantity)
+
+           obs=[X,Y,Z,vx,vy,vz] - (optional) position and velocity of observer (in kpc and km/s; entries can be Quantity) (default=Object-wide default)
+
+           ro= (Object-wide default) physical scale for distances to use to convert (can be Quantity)
+
+           vo= (Object-wide default) physical scale for velocities to use to convert (can be Quantity)
+
+        OUTPUT:
+
+           V(t) in km/s with shape [N] or [N,nt]
+
+        """
+        _check_roSet(self,kwargs,'V')
+        _check_voSet(self,kwargs,'V')
+        return self._XYZvxvyvz(*args,**kwargs)[4]
+
+    @physical_conversion('velocity_kms')
+    def W(self,*args,**kwargs):
+        """
+        NAME:
+
+           W
+
+        PURPOSE:
+
+           return Heliocentric Galactic rectangular z-velocity (aka "W")
+
+        INPUT:
+
+           t - (optional) time or array of times at which to get W (can be Quantity)
+
+           obs=[X,Y,Z,vx,vy,vz] - (optional) position and velocity of observer (in kpc and km/s; entries can be Quantity) (default=Object-wide default)
+
+           ro= (Object-wide default) physical scale for distances to use to convert (can be Quantity)
+
+           vo= (Object-wide default) physical scale for velocities to use to convert (can be Quantity)
+
+        OUTPUT:
+
+           W(t) in km/s with shape [N] or [N,nt]
+
+        """
+        _check_roSet(self,kwargs,'W')
+        _check_voSet(self,kwargs,'W')
+        return self._XYZvxvyvz(*args,**kwargs)[5]
+
+    def SkyCoord(self,*args,**kwargs):
+        """
+        NAME:
+
+           SkyCoord
+
+        PURPOSE:
+
+           return the positions as an astropy SkyCoord
+
+        INPUT:
+
+           t - (optional) time or array of times at which to get the positions (can be Quantity)
+
+           obs=[X,Y,Z] - (optional) position of observer (in kpc; entries can be Quantity) (default=Object-wide default)
+
+           ro= (Object-wide default) physical scale for distances to use to convert (can be Quantity)
+
+        OUTPUT:
+
+           SkyCoord(t) with shape [N] or [N,nt]
+
+        """
+        _check_roSet(self,kwargs,'SkyCoord')
+        ra, dec= self._radec(*args,**kwargs)
+        lbd= self._lbd(*args,**kwargs)
+        from astropy import coordinates
+        return coordinates.SkyCoord(ra*units.degree,dec*units.degree,
+                                    distance=lbd[2]*units.kpc,
+                                    frame='fk5',equinox='J2000')
+
+    def _radec(self,*args,**kwargs):
+        """Calculate ra and dec"""
+        l,b,d= self._lbd(*args,**kwargs)
+        radec= coords.lb_to_radec(l.flatten(),b.flatten(),degree=True)
+        return (radec[:,0].reshape(l.shape),radec[:,1].reshape(l.shape))
+
+    def _pmrapmdec(self,*args,**kwargs):
+        """Calculate pmra and pmdec"""
+        l,b,d,vr,pmll,pmbb= self._lbdvrpmllpmbb(*args,**kwargs)
+        pmrapmdec= coords.pmllpmbb_to_pmrapmdec(pmll.flatten(),
+                                                pmbb.flatten(),
+                                                l.flatten(),b.flatten(),
+                                                degree=True)
+        return (pmrapmdec[:,0].reshape(l.shape),
+                pmrapmdec[:,1].reshape(l.shape))
+
+    def _lbd(self,*args,**kwargs):
+        """Calculate l,b, and d"""
+        obs, ro, vo= self._parse_radec_kwargs(kwargs)
+        X,Y,Z= self._helioXYZ(*args,**kwargs)
+        shape= X.shape
+        X, Y, Z= X.flatten(), Y.flatten(), Z.flatten()
+        bad_indx= (X == 0.)*(Y == 0.)*(Z == 0.)
+        X[bad_indx]+= ro/10000.
+        lbd= coords.XYZ_to_lbd(X,Y,Z,degree=True)
+        return (lbd[:,0].reshape(shape),lbd[:,1].reshape(shape),
+                lbd[:,2].reshape(shape))
+
+    def _helioXYZ(self,*args,**kwargs):
+        """Calculate heliocentric rectangular coordinates"""
+        obs, ro, vo= self._parse_radec_kwargs(kwargs)
+        thiso= self(*args)
+        shape= thiso.shape[1:]
+        thiso= thiso.reshape((thiso.shape[0],-1))
+        if self.phasedim() == 4: z= 0.
+        else: z= thiso[3]
+        XYZ= coords.galcencyl_to_XYZ(thiso[0],thiso[-1],z,
+                                     Xsun=obs[0]/ro,Zsun=obs[2]/ro)
+        return (XYZ[:,0].reshape(shape)*ro,XYZ[:,1].reshape(shape)*ro,
+                XYZ[:,2].reshape(shape)*ro)
+
+    def _lbdvrpmllpmbb(self,*args,**kwargs):
+        """Calculate l,b,d,vr,pmll,pmbb"""
+        obs, ro, vo= self._parse_radec_kwargs(kwargs)
+        X,Y,Z,vX,vY,vZ= self._XYZvxvyvz(*args,**kwargs)
+        shape= X.shape
+        X, Y, Z= X.flatten(), Y.flatten(), Z.flatten()
+        bad_indx= (X == 0.)*(Y == 0.)*(Z == 0.)
+        X[bad_indx]+= ro/10000.
+        out= coords.rectgal_to_sphergal(X,Y,Z,vX.flatten(),vY.flatten(),
+                                        vZ.flatten(),degree=True)
+        return tuple([out[:,ii].reshape(shape) for ii in range(6)])
+
+    def _XYZvxvyvz(self,*args,**kwargs):
+        """Calculate X,Y,Z,U,V,W"""
+        obs, ro, vo= self._parse_radec_kwargs(kwargs,vel=True)
+        thiso= self(*args)
+        shape= thiso.shape[1:]
+        thiso= thiso.reshape((thiso.shape[0],-1))
+        if self.phasedim() == 4: z, vz= 0., 0.
+        else: z, vz= thiso[3], thiso[4]
+        XYZ= coords.galcencyl_to_XYZ(thiso[0],thiso[-1],z,
+                                     Xsun=obs[0]/ro,Zsun=obs[2]/ro)
+        vXYZ= coords.galcencyl_to_vxvyvz(thiso[1],thiso[2],vz,thiso[-1],
+                                         vsun=nu.array(obs[3:6])/vo,
+                                         Xsun=obs[0]/ro,Zsun=obs[2]/ro)
+        return tuple([XYZ[:,ii].reshape(shape)*ro for ii in range(3)]
+                     +[vXYZ[:,ii].reshape(shape)*vo for ii in range(3)])
+
+    def _parse_radec_kwargs(self,kwargs,vel=False):
+        if 'obs' in kwargs:
+            obs= list(kwargs['obs'])
+            if len(obs) == 2:
+                obs= [obs[0],obs[1],0.]
+            elif len(obs) == 4:
+                obs= [obs[0],obs[1],0.,obs[2],obs[3],0.]
+            for ii in range(len(obs)):
+                if _APY_LOADED and isinstance(obs[ii],units.Quantity):
+                    if ii < 3:
+                        obs[ii]= obs[ii].to(units.kpc).value
+                    else:
+                        obs[ii]= obs[ii].to(units.km/units.s).value
+        else:
+            if vel:
+                obs= [self._ro,0.,self._zo,
+                      self._solarmotion[0],self._solarmotion[1]+self._vo,
+                      self._solarmotion[2]]
+            else:
+                obs= [self._ro,0.,self._zo]
+        ro= kwargs.get('ro',self._ro)
+        if _APY_LOADED and isinstance(ro,units.Quantity):
+            ro= ro.to(units.kpc).value
+        vo= kwargs.get('vo',self._vo)
+        if _APY_LOADED and isinstance(vo,units.Quantity):
+            vo= vo.to(units.km/units.s).value
+        return (obs,ro,vo)
+
+def _to_rect(vxvv):
+    """Convert [N,4] [R,vR,vT,phi] or [N,6] [R,vR,vT,z,vz,phi] to the rectangular [x,y,vx,vy] or [x,y,z,vx,vy,vz]"""
+    R= vxvv[:,0]
+    vR= vxvv[:,1]
+    vT= vxvv[:,2]
+    phi= vxvv[:,-1]
+    cp, sp= nu.cos(phi), nu.sin(phi)
+    if vxvv.shape[1] == 4:
+        return nu.array([R*cp,R*sp,vR*cp-vT*sp,vT*cp+vR*sp]).T
+    else:
+        return nu.array([R*cp,R*sp,vxvv[:,3],
+                         vR*cp-vT*sp,vT*cp+vR*sp,vxvv[:,4]]).T
+
+def _from_rect(tmp_out,out):
+    """Convert rectangular orbits [...,4] or [...,6] back to the cylindrical frame, writing into out"""
+    x, y= tmp_out[...,0], tmp_out[...,1]
+    if tmp_out.shape[-1] == 4:
+        vx, vy= tmp_out[...,2], tmp_out[...,3]
+    else:
+        vx, vy= tmp_out[...,3], tmp_out[...,4]
+    out[...,0]= nu.sqrt(x**2.+y**2.)
+    phi= nu.arctan2(y,x) % (2.*nu.pi)
+    cp, sp= nu.cos(phi), nu.sin(phi)
+    out[...,1]= vx*cp+vy*sp
+    out[...,2]= vy*cp-vx*sp
+    out[...,-1]= phi
+    if tmp_out.shape[-1] == 6:
+        out[...,3]= tmp_out[...,2]
+        out[...,4]= tmp_out[...,5]
+    return None
+
+def _evaluatePotentials(pot,R,z,phi,t):
+    """Evaluate the (planar if z is None) potential for arrays R,z,phi, 
+    looping over the positions for potentials that are not vectorized"""
+    try:
+        if z is None:
+            return evaluateplanarPotentials(pot,R,phi=phi,t=t,
+                                            use_physical=False)
+        else:
+            return evaluatePotentials(pot,R,z,phi=phi,t=t,use_physical=False)
+    except ValueError:
+        if z is None:
+            return nu.array([evaluateplanarPotentials(pot,R[ii],phi=phi[ii],
+                                                      t=t,use_physical=False)
+                             for ii in range(len(R))])
+        else:
+            return nu.array([evaluatePotentials(pot,R[ii],z[ii],phi=phi[ii],
+                                                t=t,use_physical=False)
+                             for ii in range(len(R))])
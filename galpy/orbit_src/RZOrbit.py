@@ -5,11 +5,11 @@ from scipy import integrate
 from galpy.potential_src.Potential import _evaluateRforces, _evaluatezforces,\
     evaluatePotentials, evaluateDensities, _check_c
 from galpy.util import galpyWarning
-import galpy.util.bovy_plot as plot
 import galpy.util.bovy_symplecticode as symplecticode
 from galpy.orbit_src.FullOrbit import _integrateFullOrbit
 from galpy.util.bovy_conversion import physical_conversion
 from galpy.orbit_src.OrbitTop import OrbitTop
+from galpy.orbit_src.IntegrationStats import IntegrationStats
 class RZOrbit(OrbitTop):
     """Class that holds and integrates orbits in axisymetric potentials 
     in the (R,z) plane"""
@@ -51,7 +51,7 @@ class RZOrbit(OrbitTop):
                           ro=ro,zo=zo,vo=vo,solarmotion=solarmotion)
         return None
 
-    def integrate(self,t,pot,method='symplec4_c',dt=None):
+    def integrate(self,t,pot,method='symplec4_c',dt=None,walltime=None):
         """
         NAME:
            integrate
@@ -66,7 +66,10 @@ class RZOrbit(OrbitTop):
                    'rk4_c' for a 4th-order Runge-Kutta integrator in C
                    'rk6_c' for a 6-th order Runge-Kutta integrator in C
                    'dopr54_c' for a Dormand-Prince integrator in C (generally the fastest)
+                   'dop853_c' for an 8th-order Dormand-Prince integrator in C (fastest at tight tolerances)
+                   'bulirschstoer_c' for a Bulirsch-Stoer integrator with adaptive order in C (also efficient at tight tolerances)
            dt= (None) if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize
+           walltime= (None) wall-clock budget for the integration in s (only for the C integrators); when exceeded, the orbit is only integrated up to the last output time reached and the state to continue from is stored
         OUTPUT:
            (none) (get the actual orbit using getOrbit()
         HISTORY:
@@ -76,7 +79,10 @@ class RZOrbit(OrbitTop):
         if hasattr(self,'rs'): delattr(self,'rs')
         self.t= nu.array(t)
         self._pot= pot
-        self.orbit= _integrateRZOrbit(self.vxvv,pot,t,method,dt)
+        self.orbit, self._stats, checkpoint= \
+            _integrateRZOrbit(self.vxvv,pot,t,method,dt,stats=True,
+                              walltime=walltime,checkpoint=True)
+        self._set_checkpoint(checkpoint,pot,method,None)
 
     @physical_conversion('energy')
     def E(self,*args,**kwargs):
@@ -405,6 +411,7 @@ class RZOrbit(OrbitTop):
         HISTORY:
            2010-08-08 - Written - Bovy (NYU)
         """
+        from galpy.util import bovy_plot as plot
         labeldict= {'t':r'$t$','R':r'$R$','vR':r'$v_R$','vT':r'$v_T$',
                     'z':r'$z$','vz':r'$v_z$','phi':r'$\phi$',
                     'x':r'$x$','y':r'$y$','vx':r'$v_x$','vy':r'$v_y$'}
@@ -454,7 +461,8 @@ class RZOrbit(OrbitTop):
                                   nu.array(self.EzJz)/self.EzJz[0],
                                   *args,**kwargs)
 
-def _integrateRZOrbit(vxvv,pot,t,method,dt):
+def _integrateRZOrbit(vxvv,pot,t,method,dt,stats=False,walltime=None,
+                      checkpoint=False):
     """
     NAME:
        _integrateRZOrbit
@@ -467,11 +475,15 @@ def _integrateRZOrbit(vxvv,pot,t,method,dt):
        t - list of times at which to output (0 has to be in this!)
        method - 'odeint' or 'leapfrog'
        dt - if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize
+       stats= (False) if True, also return an IntegrationStats instance with statistics of the integration
+       walltime= (None) wall-clock budget for the integration in s (only for the C integrators)
+       checkpoint= (False) if True, also return (reason,ntdone,dtnext) describing where an interrupted integration stopped (see integrateFullOrbit_c)
     OUTPUT:
-       [:,5] array of [R,vR,vT,z,vz] at each t
+       [:,5] array of [R,vR,vT,z,vz] at each t (, statistics)(, checkpoint)
     HISTORY:
        2010-04-16 - Written - Bovy (NYU)
     """
+    checkpoint_out= (None,len(t),None)
     #First check that the potential has C
     if '_c' in method:
         if not _check_c(pot):
@@ -483,11 +495,15 @@ def _integrateRZOrbit(vxvv,pot,t,method,dt):
     if method.lower() == 'leapfrog' \
             or method.lower() == 'leapfrog_c' or method.lower() == 'rk4_c' \
             or method.lower() == 'rk6_c' or method.lower() == 'symplec4_c' \
-            or method.lower() == 'symplec6_c' or method.lower() == 'dopr54_c':
+            or method.lower() == 'symplec6_c' or method.lower() == 'dopr54_c' \
+            or method.lower() == 'dop853_c' \
+            or method.lower() == 'bulirschstoer_c':
         #We hack this by upgrading to a FullOrbit
         this_vxvv= nu.zeros(len(vxvv)+1)
         this_vxvv[0:len(vxvv)]= vxvv
-        tmp_out= _integrateFullOrbit(this_vxvv,pot,t,method,dt)
+        tmp_out, stats_out, checkpoint_out= \
+            _integrateFullOrbit(this_vxvv,pot,t,method,dt,stats=True,
+                                walltime=walltime,checkpoint=True)
         #tmp_out is (nt,6)
         out= tmp_out[:,0:5]
     elif method.lower() == 'odeint':
@@ -502,9 +518,14 @@ def _integrateRZOrbit(vxvv,pot,t,method,dt):
         out[:,3]= intOut[:,2]
         out[:,4]= intOut[:,3]
         out[:,2]= l/out[:,0]
+        stats_out= IntegrationStats(method)
     #post-process to remove negative radii
     neg_radii= (out[:,0] < 0.)
     out[neg_radii,0]= -out[neg_radii,0]
+    if not stats and not checkpoint: return out
+    out= (out,)
+    if stats: out+= (stats_out,)
+    if checkpoint: out+= (checkpoint_out,)
     return out
 
 def _RZEOM(y,t,pot,l2):
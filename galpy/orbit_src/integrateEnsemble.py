@@ -0,0 +1,256 @@
+###############################################################################
+#   integrateEnsemble: integrate an ensemble of orbits in lockstep in Python,
+#                      evaluating the forces for all orbits at once; used for
+#                      potentials that are not implemented in C
+###############################################################################
+import warnings
+import numpy as nu
+from galpy.util import galpyWarning
+from galpy.potential_src.Potential import _evaluateRforces, _evaluatezforces,\
+    _evaluatephiforces
+from galpy.potential_src.planarPotential import _evaluateplanarRforces,\
+    _evaluateplanarphiforces
+from galpy.orbit_src.IntegrationStats import IntegrationStats
+_FR_THETA= 1./(2.-2.**(1./3.)) # Forest-Ruth coefficient
+_MAX_STEPREDUCE= 10000. # as in the C integrators
+# Dormand-Prince 5(4) tableau
+_DOPR54_C= [0.,1./5.,3./10.,4./5.,8./9.,1.,1.]
+_DOPR54_A= [[],
+            [1./5.],
+            [3./40.,9./40.],
+            [44./45.,-56./15.,32./9.],
+            [19372./6561.,-25360./2187.,64448./6561.,-212./729.],
+            [9017./3168.,-355./33.,46732./5247.,49./176.,-5103./18656.],
+            [35./384.,0.,500./1113.,125./192.,-2187./6784.,11./84.]]
+_DOPR54_E= [71./57600.,0.,-71./16695.,71./1920.,-17253./339200.,22./525.,
+            -1./40.]
+def integrateFullOrbits_py(pot,yo,t,int_method,rtol=None,atol=None,dt=None):
+    """
+    NAME:
+       integrateFullOrbits_py
+    PURPOSE:
+       integrate an ensemble of orbits in a Phi(R,z,phi) potential in lockstep in Python, evaluating the forces for all orbits at once
+    INPUT:
+       pot - (list of) Potential instance(s)
+       yo - initial conditions [N,6] of [x,y,z,vx,vy,vz]
+       t - set of times at which one wants the result
+       int_method= 'leapfrog', 'symplec4', 'rk4', or 'dopr54' or a method that maps to these (see _parse_integrator)
+       rtol, atol= (None) tolerances (default: 1e-8)
+       dt= (None) force the integrator to use this stepsize (default is to automatically determine one; initial stepsize for 'dopr54')
+    OUTPUT:
+       (y,stats) : y : array, shape (N,len(t),6) of [x,y,z,vx,vy,vz]; stats: IntegrationStats instance; (None,None) if the potential cannot be evaluated for the whole ensemble at once
+    """
+    from galpy.orbit_src.FullOrbit import _rectForce
+    return _integrate_ensemble(lambda q,t: _rectForce_full(q,pot,t),
+                               lambda q,t: _rectForce(q,pot,t=t),
+                               yo,t,int_method,rtol,atol,dt)
+
+def integratePlanarOrbits_py(pot,yo,t,int_method,rtol=None,atol=None,
+                             dt=None):
+    """
+    NAME:
+       integratePlanarOrbits_py
+    PURPOSE:
+       integrate an ensemble of orbits in a Phi(R,phi) potential in lockstep in Python, evaluating the forces for all orbits at once
+    INPUT:
+       pot - (list of) planarPotential instance(s)
+       yo - initial conditions [N,4] of [x,y,vx,vy]
+       t - set of times at which one wants the result
+       int_method= 'leapfrog', 'symplec4', 'rk4', or 'dopr54' or a method that maps to these (see _parse_integrator)
+       rtol, atol= (None) tolerances (default: 1e-8)
+       dt= (None) force the integrator to use this stepsize (default is to automatically determine one; initial stepsize for 'dopr54')
+    OUTPUT:
+       (y,stats) : y : array, shape (N,len(t),4) of [x,y,vx,vy]; stats: IntegrationStats instance; (None,None) if the potential cannot be evaluated for the whole ensemble at once
+    """
+    from galpy.orbit_src.planarOrbit import _rectForce
+    return _integrate_ensemble(lambda q,t: _rectForce_planar(q,pot,t),
+                               lambda q,t: _rectForce(q,pot,t=t),
+                               yo,t,int_method,rtol,atol,dt)
+
+def _parse_integrator(int_method):
+    """Map an orbit-integration method onto the ensemble integrator that is closest to it"""
+    int_method= int_method.lower()
+    if int_method in ['leapfrog','leapfrog_c']:
+        return 'leapfrog'
+    elif int_method in ['symplec4','symplec4_c','symplec6_c']:
+        return 'symplec4'
+    elif int_method in ['rk4','rk4_c','rk6_c']:
+        return 'rk4'
+    else: # odeint and the adaptive C integrators
+        return 'dopr54'
+
+def _integrate_ensemble(force,scalar_force,yo,t,int_method,rtol,atol,dt):
+    """Integrate an ensemble [N,2d] of orbits in lockstep given the force function for the ensemble and for a single orbit"""
+    if rtol is None: rtol= 10.**-8.
+    if atol is None: atol= 10.**-8.
+    yo= nu.array(yo,dtype='float')
+    t= nu.array(t,dtype='float')
+    ndim= yo.shape[1]//2
+    if not _check_vectorized(force,scalar_force,yo[:,:ndim],t[0]):
+        return (None,None)
+    # Count the number of force evaluations for the statistics
+    nfev= [0]
+    def counted_force(q,t):
+        nfev[0]+= 1
+        return force(q,t)
+    int_method= _parse_integrator(int_method)
+    out= nu.empty((yo.shape[0],len(t),yo.shape[1]))
+    out[:,0]= yo
+    if len(t) == 1:
+        return (out,IntegrationStats(int_method))
+    if int_method == 'dopr54':
+        naccept, nreject, dt= _dopr54(counted_force,yo,t,rtol,atol,dt,out)
+        nsubsteps= None
+    else:
+        step= {'leapfrog':_leapfrog_step,'symplec4':_symplec4_step,
+               'rk4':_rk4_step}[int_method]
+        dt, nsubsteps= _fixed_step(step,counted_force,yo,t,rtol,atol,dt,out)
+        naccept, nreject= nsubsteps*(len(t)-1), 0
+    return (out,IntegrationStats(int_method,nfev=nfev[0],naccept=naccept,
+                                 nreject=nreject,dt=dt,nsubsteps=nsubsteps))
+
+def _check_vectorized(force,scalar_force,q,t):
+    """Check that the potential can be evaluated for the whole ensemble at once by comparing to evaluating it for a few orbits one by one"""
+    try:
+        f= force(q,t)
+        indx= nu.unique([0,q.shape[0]//2,q.shape[0]-1])
+        fone= nu.array([scalar_force(q[ii],t) for ii in indx])
+    except Exception:
+        # Any error in the vectorized evaluation means that we should
+        # integrate the orbits one by one, where real errors get raised
+        return False
+    if f.shape != q.shape: return False
+    return nu.all(nu.fabs(f[indx]-fone)
+                  <= 10.**-10.*(1.+nu.fabs(fone)))
+
+def _rectForce_full(x,pot,t=0.):
+    """Force in the rectangular frame at an ensemble [N,3] of positions"""
+    R= nu.sqrt(x[:,0]**2.+x[:,1]**2.)
+    phi= nu.arctan2(x[:,1],x[:,0]) % (2.*nu.pi)
+    cp= x[:,0]/R
+    sp= x[:,1]/R
+    zeros= nu.zeros(x.shape[0])
+    Rforce= _evaluateRforces(pot,R,x[:,2],phi=phi,t=t)+zeros
+    phiforce= _evaluatephiforces(pot,R,x[:,2],phi=phi,t=t)+zeros
+    return nu.array([cp*Rforce-sp*phiforce/R,
+                     sp*Rforce+cp*phiforce/R,
+                     _evaluatezforces(pot,R,x[:,2],phi=phi,t=t)+zeros]).T
+
+def _rectForce_planar(x,pot,t=0.):
+    """Force in the rectangular frame at an ensemble [N,2] of positions"""
+    R= nu.sqrt(x[:,0]**2.+x[:,1]**2.)
+    phi= nu.arctan2(x[:,1],x[:,0]) % (2.*nu.pi)
+    cp= x[:,0]/R
+    sp= x[:,1]/R
+    zeros= nu.zeros(x.shape[0])
+    Rforce= _evaluateplanarRforces(pot,R,phi=phi,t=t)+zeros
+    phiforce= _evaluateplanarphiforces(pot,R,phi=phi,t=t)+zeros
+    return nu.array([cp*Rforce-sp*phiforce/R,
+                     sp*Rforce+cp*phiforce/R]).T
+
+def _leapfrog_step(force,q,p,t,dt):
+    """Drift-kick-drift leapfrog step"""
+    q= q+dt/2.*p
+    p= p+dt*force(q,t+dt/2.)
+    return (q+dt/2.*p,p)
+
+def _symplec4_step(force,q,p,t,dt):
+    """Forest-Ruth fourth-order symplectic step, composed of three leapfrog steps"""
+    q,p= _leapfrog_step(force,q,p,t,_FR_THETA*dt)
+    q,p= _leapfrog_step(force,q,p,t+_FR_THETA*dt,(1.-2.*_FR_THETA)*dt)
+    return _leapfrog_step(force,q,p,t+(1.-_FR_THETA)*dt,_FR_THETA*dt)
+
+def _rk4_step(force,q,p,t,dt):
+    """Classical fourth-order Runge-Kutta step"""
+    k1p= force(q,t)
+    k2p= force(q+dt/2.*p,t+dt/2.)
+    k3p= force(q+dt/2.*(p+dt/2.*k1p),t+dt/2.)
+    k4p= force(q+dt*(p+dt/2.*k2p),t+dt)
+    return (q+dt*p+dt**2./6.*(k1p+k2p+k3p),
+            p+dt/6.*(k1p+2.*k2p+2.*k3p+k4p))
+
+def _fixed_step(step,force,yo,t,rtol,atol,dt,out):
+    """Integrate with a fixed-step method, writing into out; returns the step size and the number of steps per output step"""
+    ndim= yo.shape[1]//2
+    q, p= yo[:,:ndim], yo[:,ndim:]
+    init_dt= t[1]-t[0] #assumes that the steps are equally spaced
+    if dt is None:
+        dt= _estimate_step(step,force,q,p,t[0],init_dt,rtol,atol)
+    ndt= int(round(init_dt/dt))
+    for ii in range(1,len(t)):
+        for jj in range(ndt):
+            q,p= step(force,q,p,t[ii-1]+jj*dt,dt)
+        out[:,ii,:ndim]= q
+        out[:,ii,ndim:]= p
+    return (dt,ndt)
+
+def _estimate_step(step,force,q,p,to,dt,rtol,atol):
+    """Estimate the step size of a fixed-step method by halving the output step until one step and two half steps agree to within the tolerance for all orbits"""
+    scale= atol+rtol*nu.amax(nu.fabs(nu.hstack((q,p))),axis=1)
+    for ii in range(30):
+        q1,p1= step(force,q,p,to,dt)
+        q2,p2= step(force,q,p,to,dt/2.)
+        q2,p2= step(force,q2,p2,to+dt/2.,dt/2.)
+        delta= nu.hstack((q1-q2,p1-p2))/scale[:,None]
+        if nu.amax(nu.sqrt(nu.mean(delta**2.,axis=1))) <= 1.:
+            break
+        dt/= 2.
+    return dt
+
+def _dopr54(force,yo,t,rtol,atol,dt,out):
+    """Integrate with the adaptive Dormand-Prince 5(4) method, using a common step for all orbits that satisfies the tolerance for each orbit, writing into out; returns the number of accepted and rejected steps and the final step size. Orbits whose error estimate is not finite are set to NaN from then on, all orbits are when the step size drops by more than _MAX_STEPREDUCE within an output step"""
+    ndim= yo.shape[1]//2
+    alive= nu.ones(yo.shape[0],dtype='bool')
+    def deriv(y,t):
+        out= nu.hstack((y[:,ndim:],force(y[:,:ndim],t)))
+        out[~alive]= 0. # keep failed orbits at their last finite position
+        return out
+    h= t[1]-t[0] if dt is None else dt
+    y= yo
+    to= t[0]
+    k= [deriv(y,to)]+[None]*6
+    naccept, nreject= 0, 0
+    for ii in range(1,len(t)):
+        init_h= h
+        while (t[ii]-to)*h > 0.:
+            if nu.fabs(h)*_MAX_STEPREDUCE < nu.fabs(init_h):
+                warnings.warn("Orbit integration with dopr54 failed at t=%g, because the step size became too small; the orbits are set to NaN from here on" % to,galpyWarning)
+                out[:,ii:]= nu.nan
+                return (naccept,nreject,h)
+            clipped= nu.fabs(h) >= nu.fabs(t[ii]-to)
+            hstep= t[ii]-to if clipped else h
+            for ss in range(1,7):
+                k[ss]= deriv(y+hstep*sum([a*kk for a,kk
+                                            in zip(_DOPR54_A[ss],k)]),
+                             to+_DOPR54_C[ss]*hstep)
+            ynew= y+hstep*sum([a*kk for a,kk in zip(_DOPR54_A[6],k)])
+            # k[6] is the derivative at ynew (first-same-as-last)
+            yerr= hstep*sum([e*kk for e,kk in zip(_DOPR54_E,k)])
+            sc= atol+rtol*nu.maximum(nu.fabs(y),nu.fabs(ynew))
+            errs= nu.sqrt(nu.mean((yerr/sc)**2.,axis=1))
+            failed= ~nu.isfinite(errs)
+            if nu.any(failed):
+                warnings.warn("Orbit integration with dopr54 failed for %i orbit(s) at t=%g, because the error estimate is not finite; these orbits are set to NaN from here on" % (nu.sum(failed),to),galpyWarning)
+                alive[failed]= False
+                if not nu.any(alive):
+                    out[:,ii:]= nu.nan
+                    return (naccept,nreject,h)
+                # Retry the step for the remaining orbits
+                k[0][failed]= 0.
+                nreject+= 1
+                continue
+            err= nu.amax(errs)
+            fac= 5. if err == 0. else min(5.,max(0.2,0.9*err**-0.2))
+            if err <= 1.:
+                naccept+= 1
+                to= t[ii] if clipped else to+hstep
+                y= ynew
+                k[0]= k[6]
+                # Don't let hitting the output times shrink the step
+                h= hstep*fac if not clipped else h*max(1.,hstep/h*fac)
+            else:
+                nreject+= 1
+                h= hstep*fac
+        out[:,ii]= y
+        out[~alive,ii]= nu.nan
+    return (naccept,nreject,h)
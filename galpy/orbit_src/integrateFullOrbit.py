@@ -1,6 +1,7 @@
 import sys
 import sysconfig
 import warnings
+import time
 import numpy as nu
 import ctypes
 import ctypes.util
@@ -8,7 +9,10 @@ from numpy.ctypeslib import ndpointer
 import os
 from galpy import potential
 from galpy.util import galpyWarning
-from galpy.orbit_src.integratePlanarOrbit import _parse_integrator, _parse_tol
+from galpy.orbit_src.integratePlanarOrbit import _parse_integrator, _parse_tol, \
+    _parse_events, _events_output, _call_interruptible, _compile_pot, \
+    _c_buffer_pointers, _from_c_buffers
+from galpy.orbit_src.IntegrationStats import _c_stats
 #Find and load the library
 _lib= None
 outerr= None
@@ -38,6 +42,14 @@ else:
     _ext_loaded= True
 
 def _parse_pot(pot,potforactions=False,potfortorus=False):
+    """Parse the potential so it can be fed to C, using the cached parse of each potential when possible"""
+    return _compile_pot(pot,
+                        lambda p: _parse_pot_nocache(p,
+                                                     potforactions=potforactions,
+                                                     potfortorus=potfortorus),
+                        ('full',potforactions,potfortorus))
+
+def _parse_pot_nocache(pot,potforactions=False,potfortorus=False):
     """Parse the potential so it can be fed to C"""
     #Figure out what's in pot
     if not isinstance(pot,list):
@@ -190,6 +202,32 @@ def _parse_pot(pot,potforactions=False,potfortorus=False):
             pot_args.extend([len(p._Cs), p._amp, p._N, p._sin_alpha, p._tan_alpha, p._r_ref, p._phi_ref,
                              p._Rs, p._H, p._omega])
             pot_args.extend(p._Cs)
+        elif isinstance(p,potential.FerrersPotential):
+            pot_type.append(29)
+            pot_args.extend([p._amp*nu.pi*p._rhoc_M*p.a**3*p._b*p._c,
+                             p._a2,p._b2*p._a2,p._c2*p._a2,p.n,
+                             p._pa,p._omegab,p._glorder])
+            pot_args.extend(p._glx)
+            pot_args.extend(p._glw)
+            pot_args.extend([-1.,0.,0.,0.,0.,0.,0.,
+                             -1.,0.,0.,0.,0.,0.,0.]) # for caching
+        elif isinstance(p,potential.MovingObjectPotential):
+            # Type 30, see stand-alone parser below
+            pt,pa= _parse_moving_object_pot(p)
+            pot_type.append(pt)
+            pot_args.extend(pa)
+        elif isinstance(p,potential.CallbackPotential):
+            pot_type.append(33)
+            pot_args.extend(_parse_callback_pot(p))
+        elif isinstance(p,potential.interp3DPotential):
+            pot_type.append(34)
+            # The original potential is wrapped, for use outside of the grid
+            wrap_npot, wrap_pot_type, wrap_pot_args= \
+                _parse_interp3d_wrapped_pot(p,_parse_pot)
+            pot_args.extend([wrap_npot,len(wrap_pot_args)])
+            pot_type.extend(wrap_pot_type)
+            pot_args.extend(wrap_pot_args)
+            pot_args.extend(_parse_interp3d_pot(p))
         ############################## WRAPPERS ###############################
         elif isinstance(p,potential.DehnenSmoothWrapperPotential):
             pot_type.append(-1)
@@ -225,7 +263,121 @@ def _parse_scf_pot(p,extra_amp=1.):
     pot_args.extend([-1.,0,0,0,0,0,0])    
     return (24,pot_args)
 
-def integrateFullOrbit_c(pot,yo,t,int_method,rtol=None,atol=None,dt=None):
+def _parse_callback_pot(p):
+    """Arguments of a CallbackPotential for C: the amplitude followed by the addresses of the compiled functions (zero for functions that were not given)"""
+    return [p._amp]+[float(p._callback_addresses[name])
+                     for name in ['potential','Rforce','zforce','phiforce',
+                                  'R2deriv','phi2deriv','Rphideriv']]
+
+def _parse_interp3d_pot(p):
+    """Arguments of an interp3DPotential for C: the amplitude, whether the grid is Cartesian, the order of the interpolation, the number of points, minimum, spacing, and symmetry of each axis, the cache for the forces, and the potential and forces on the grid"""
+    pot_args= [p._amp,int(p._cartesian),p._order]
+    for axis in p._axes:
+        pot_args.extend(axis)
+    pot_args.extend([nu.nan,0.,0.,0.,0.,0.]) # for caching
+    pot_args.extend(p._grid.flatten(order='C'))
+    return pot_args
+
+def _parse_interp3d_wrapped_pot(p,parse):
+    """Parse the original potential of an interp3DPotential with parse if it has a C implementation, otherwise return no potentials (the interpolation is then extrapolated outside of the grid in C)"""
+    from galpy.potential_src.Potential import _check_c
+    if not _check_c(p._origPot):
+        return (0,[],[])
+    return parse(p._origPot)
+
+def _parse_moving_object_pot(p):
+    # Stand-alone parser for MovingObjectPotential, bc re-used; the orbit of
+    # the object is passed as piecewise polynomials in time for x, y, and z,
+    # the same ones that are used to evaluate the orbit in Python: the dense
+    # output of the integrator if available (quartic, ncoeff=5), otherwise
+    # the interpolating splines (cubic, ncoeff=4); the degree is passed to C
+    orb= p._orb._orb
+    threed= p._orb.dim() == 3
+    if getattr(orb,'_dense',None) is not None:
+        tb, coeffs= _dense_to_ppoly(orb._dense,threed)
+    elif hasattr(orb,'t'):
+        from scipy import interpolate
+        if threed: coords= ['x','y',3]
+        else: coords= ['x','y']
+        pps= [interpolate.PPoly.from_spline(orb._setupOrbitInterp(c)._eval_args)
+              for c in coords]
+        # Remove the zero-length intervals at the repeated end knots
+        keep= nu.diff(pps[0].x) > 0.
+        tb= nu.append(pps[0].x[:-1][keep],pps[0].x[-1])
+        coeffs= [pp.c[:,keep] for pp in pps]
+    else: # not integrated, so at rest
+        tb= nu.array([0.,1.])
+        coeffs= [nu.array([[p._orb.x()]]),nu.array([[p._orb.y()]])]
+        if threed: coeffs.append(nu.array([[p._orb.z()]]))
+    if not threed: coeffs.append(nu.zeros_like(coeffs[0]))
+    # Only Plummer softening (type 0) is currently implemented in C
+    pot_args= [p._amp,0,p._softening._softening_length,len(tb),len(coeffs[0])]
+    pot_args.extend(tb)
+    for c in coeffs:
+        pot_args.extend(c.T.flatten())
+    return (30,pot_args)
+
+def _check_moving_object_t(pot,t):
+    """Raise a ValueError, like evaluating the object's orbit in Python, if 
+    the times t are not within the integrated range of the orbit of any 
+    MovingObjectPotential in pot (the C code would extrapolate the orbit)"""
+    if not isinstance(pot,list): pot= [pot]
+    for p in pot:
+        if isinstance(p,potential.MovingObjectPotential):
+            orb= p._orb._orb
+            if getattr(orb,'_dense',None) is not None:
+                tb= _dense_to_ppoly(orb._dense,p._orb.dim() == 3)[0]
+            elif hasattr(orb,'t'):
+                tb= orb.t
+            else: # not integrated, so at rest
+                continue
+            if nu.amin(t) < nu.amin(tb) or nu.amax(t) > nu.amax(tb):
+                raise ValueError("One or more requested time is not within the integrated range")
+        # Planar and wrapper potentials hold the potential that they wrap
+        for attr in ['_Pot','_pot']:
+            if isinstance(getattr(p,attr,None),
+                          (potential.Potential,potential.planarPotential,
+                           list)):
+                _check_moving_object_t(getattr(p,attr),t)
+    return None
+
+def _dense_to_ppoly(dense,threed):
+    """Convert the dense output of the dopr54_c integrator ([t_start,h,
+    rcont1..5] for each step in rectangular coordinates, see _dense_eval)
+    for x, y, (z) to breakpoints and coefficients (highest order first) of
+    quartic polynomials in t-breakpoint"""
+    from scipy import special
+    tstart= dense[:,0]
+    h= dense[:,1]
+    ndim= (dense.shape[1]-2)//5
+    c= dense[:,2:].reshape((len(tstart),5,ndim))
+    if h[0] >= 0.: # forward integration: polynomials start at theta=0
+        theta0= 0.
+        tb= nu.append(tstart,tstart[-1]+h[-1])
+    else: # backward: reverse the steps, polynomials start at theta=1
+        theta0= 1.
+        c= c[::-1]
+        h= h[::-1]
+        tb= nu.append(tstart[::-1]+h,tstart[0])
+    # y(theta)= c0+theta(c1+(1-theta)(c2+theta(c3+(1-theta)c4))), in powers of theta
+    a= nu.empty_like(c)
+    a[:,0]= c[:,0]
+    a[:,1]= c[:,1]+c[:,2]
+    a[:,2]= -c[:,2]+c[:,3]+c[:,4]
+    a[:,3]= -c[:,3]-2.*c[:,4]
+    a[:,4]= c[:,4]
+    # Change variables to theta= theta0+dt/h and collect powers of dt
+    b= nu.zeros_like(a)
+    for jj in range(5):
+        for kk in range(jj,5):
+            b[:,jj]+= a[:,kk]*special.comb(kk,jj)*theta0**(kk-jj)
+        b[:,jj]/= h[:,nu.newaxis]**jj
+    coeffs= [b[:,::-1,ii].T for ii in range(3 if threed else 2)]
+    return (tb,coeffs)
+
+def integrateFullOrbit_c(pot,yo,t,int_method,rtol=None,atol=None,
+                         dt=None,result=None,dense=False,events=None,
+                         stats=False,walltime=None,checkpoint=False):
     """
     NAME:
        integrateFullOrbit_c
@@ -233,34 +385,64 @@ def integrateFullOrbit_c(pot,yo,t,int_method,rtol=None,atol=None,dt=None):
        C integrate an ode for a FullOrbit
     INPUT:
        pot - Potential or list of such instances
-       yo - initial condition [q,p]
+       yo - initial condition [q,p], shape [6] or [N,6] to integrate N orbits at once (in parallel using OpenMP)
        t - set of times at which one wants the result
        int_method= 'leapfrog_c', 'rk4_c', 'rk6_c', 'symplec4_c'
        rtol, atol
        dt= (None) force integrator to use this stepsize (default is to automatically determine one))
+       result= (None) if set, C-contiguous float64 array with the shape of the output y (e.g., a numpy.memmap) that the orbits are directly written into
+       dense= (False) if True and int_method is 'dopr54_c', also return the dense output of the integrator, which allows the orbit to be evaluated at any time
+       events= (None) list of events to detect during the integration, only for int_method='dopr54_c': 'pericenter', 'apocenter', 'zcrossing' (crossing z=0), 'zmax' (extrema of z), ('escape',r) to stop the integration when the orbit reaches radius r (later outputs are NaN)
+       stats= (False) if True, also return statistics of the integration
+       walltime= (None) wall-clock budget for the integration in s; when it is exceeded, the integration stops at the next output time (later outputs are NaN)
+       checkpoint= (False) if True, do not raise KeyboardInterrupt when the integration is interrupted by CTRL-C (SIGINT), but return the state from which the integration can be continued
     OUTPUT:
-       (y,err)
-       y : array, shape (len(y0), len(t))
+       (y,err), followed by dense when dense=True, by the events found when events are given, by the statistics when stats=True, and by the checkpoint when checkpoint=True
+       y : array, shape (len(t),6) or (N,len(t),6) for N orbits
        Array containing the value of y for each desired time in t, \
        with the initial value y0 in the first row.
-       err: error message, if not zero: 1 means maximum step reduction happened for adaptive integrators
+       err: error message, if not zero: 1 means maximum step reduction happened for adaptive integrators; array with shape (N,) for N orbits
+       dense: array with shape (nstep,2+5*6) of the dense output of each step [t_start,h,coefficients] or list of such arrays for N orbits
+       events: dictionary with for each event a tuple (times,y at those times) or list of such dictionaries for N orbits
+       stats: IntegrationStats instance with the number of force evaluations, accepted and rejected steps, the step size, and the wall-clock time (arrays with shape (N,) for N orbits)
+       checkpoint: (reason,ntdone,dtnext) with reason None if the integration was not interrupted and 'sigint' or 'walltime' otherwise, ntdone the number of output times reached (len(t) if the integration completed), and dtnext the step size to continue the integration with (arrays with shape (N,) for N orbits); the state to continue from is y at the last output time reached
     HISTORY:
        2011-11-13 - Written - Bovy (IAS)
     """
     rtol, atol= _parse_tol(rtol,atol)
     npot, pot_type, pot_args= _parse_pot(pot)
+    _check_moving_object_t(pot,t)
     int_method_c= _parse_integrator(int_method)
+    event_names, event_type, event_direction, event_terminal, event_value=\
+        _parse_events(events,6)
+    nevent= len(event_names)
+    if nevent > 0 and int_method_c != 5:
+        raise NotImplementedError("Event detection is only implemented for int_method='dopr54_c'")
     if dt is None: 
         dt= -9999.99
 
     #Set up result array
-    result= nu.empty((len(t),6))
-    err= ctypes.c_int(0)
+    yo= nu.asarray(yo)
+    scalarOrbit= yo.ndim == 1
+    nobj= 1 if scalarOrbit else len(yo)
+    if result is None:
+        result= nu.empty((nobj,len(t),6))
+    elif not isinstance(result,nu.ndarray) \
+            or result.shape != ((len(t),6) if scalarOrbit
+                                else (nobj,len(t),6)) \
+            or result.dtype != nu.float64 \
+            or not result.flags['C_CONTIGUOUS'] \
+            or not result.flags['WRITEABLE']:
+        raise ValueError("result= array for integrateFullOrbit_c needs to be a writeable, C-contiguous float64 array with shape (len(t),6) or (N,len(t),6)")
+    else:
+        result= result.reshape((nobj,len(t),6))
+    err= nu.zeros(nobj,dtype=nu.int32)
 
     #Set up the C code
     ndarrayFlags= ('C_CONTIGUOUS','WRITEABLE')
     integrationFunc= _lib.integrateFullOrbit
-    integrationFunc.argtypes= [ndpointer(dtype=nu.float64,flags=ndarrayFlags),
+    integrationFunc.argtypes= [ctypes.c_int,
+                               ndpointer(dtype=nu.float64,flags=ndarrayFlags),
                                ctypes.c_int,                             
                                ndpointer(dtype=nu.float64,flags=ndarrayFlags),
                                ctypes.c_int,
@@ -270,8 +452,22 @@ def integrateFullOrbit_c(pot,yo,t,int_method,rtol=None,atol=None,dt=None):
                                ctypes.c_double,
                                ctypes.c_double,
                                ndpointer(dtype=nu.float64,flags=ndarrayFlags),
-                               ctypes.POINTER(ctypes.c_int),
-                               ctypes.c_int]
+                               ndpointer(dtype=nu.int32,flags=ndarrayFlags),
+                               ctypes.c_int,
+                               ctypes.c_int,
+                               ctypes.POINTER(ctypes.POINTER(ctypes.c_double)),
+                               ndpointer(dtype=nu.int32,flags=ndarrayFlags),
+                               ctypes.c_int,
+                               ndpointer(dtype=nu.int32,flags=ndarrayFlags),
+                               ndpointer(dtype=nu.int32,flags=ndarrayFlags),
+                               ndpointer(dtype=nu.int32,flags=ndarrayFlags),
+                               ndpointer(dtype=nu.float64,flags=ndarrayFlags),
+                               ndpointer(dtype=nu.int32,flags=ndarrayFlags),
+                               ctypes.POINTER(ctypes.POINTER(ctypes.c_double)),
+                               ctypes.POINTER(ctypes.POINTER(ctypes.c_int)),
+                               ctypes.POINTER(ctypes.POINTER(ctypes.c_double)),
+                               ndpointer(dtype=nu.float64,flags=ndarrayFlags),
+                               ctypes.POINTER(ctypes.c_int)]
 
     #Array requirements, first store old order
     f_cont= [yo.flags['F_CONTIGUOUS'],
@@ -279,45 +475,103 @@ def integrateFullOrbit_c(pot,yo,t,int_method,rtol=None,atol=None,dt=None):
     yo= nu.require(yo,dtype=nu.float64,requirements=['C','W'])
     t= nu.require(t,dtype=nu.float64,requirements=['C','W'])
     result= nu.require(result,dtype=nu.float64,requirements=['C','W'])
+    err= nu.require(err,dtype=nu.int32,requirements=['C','W'])
+    dense= dense and int_method_c == 5
+    dense_nsteps= nu.zeros(nobj,dtype=nu.int32)
+    event_nfound= nu.zeros(nobj,dtype=nu.int32)
+    stats_out= nu.zeros((nobj,6))
+    #The C code allocates the dense output and the events and grows them
+    #as needed
+    dense_ptrs= _c_buffer_pointers(ctypes.c_double,nobj)
+    event_t_ptrs= _c_buffer_pointers(ctypes.c_double,nobj)
+    event_indx_ptrs= _c_buffer_pointers(ctypes.c_int,nobj)
+    event_y_ptrs= _c_buffer_pointers(ctypes.c_double,nobj)
 
     #Run the C code
-    integrationFunc(yo,
-                    ctypes.c_int(len(t)),
-                    t,
-                    ctypes.c_int(npot),
-                    pot_type,
-                    pot_args,
-                    ctypes.c_double(dt),
-                    ctypes.c_double(rtol),ctypes.c_double(atol),
-                    result,
-                    ctypes.byref(err),
-                    ctypes.c_int(int_method_c))
-    
-    if int(err.value) == -10: #pragma: no cover
-        raise KeyboardInterrupt("Orbit integration interrupted by CTRL-C (SIGINT)")
+    start= time.time()
+    try:
+        reason= _call_interruptible(integrationFunc,
+                                    ctypes.c_int(nobj),
+                                    yo,
+                                    ctypes.c_int(len(t)),
+                                    t,
+                                    ctypes.c_int(npot),
+                                    pot_type,
+                                    pot_args,
+                                    ctypes.c_double(dt),
+                                    ctypes.c_double(rtol),ctypes.c_double(atol),
+                                    result,
+                                    err,
+                                    ctypes.c_int(int_method_c),
+                                    ctypes.c_int(dense),
+                                    dense_ptrs,
+                                    dense_nsteps,
+                                    ctypes.c_int(nevent),
+                                    event_type,
+                                    event_direction,
+                                    event_terminal,
+                                    event_value,
+                                    event_nfound,
+                                    event_t_ptrs,
+                                    event_indx_ptrs,
+                                    event_y_ptrs,
+                                    stats_out,
+                                    walltime=walltime,checkpoint=checkpoint)
+    finally:
+        dense_out= _from_c_buffers(dense_ptrs,
+                                   dense_nsteps if dense else [0]*nobj,
+                                   (2+5*6,))
+        event_t= _from_c_buffers(event_t_ptrs,event_nfound,())
+        event_indx= _from_c_buffers(event_indx_ptrs,event_nfound,(),
+                                    dtype=nu.int32)
+        event_y= _from_c_buffers(event_y_ptrs,event_nfound,(6,))
+
+    # Outputs that were not reached because of an interrupt are NaN
+    ntdone= stats_out[:,4].astype('int')
+    for ii in nu.arange(nobj)[ntdone < len(t)]:
+        result[ii,ntdone[ii]:]= nu.nan
 
     #Reset input arrays
     if f_cont[0]: yo= nu.asfortranarray(yo)
     if f_cont[1]: t= nu.asfortranarray(t)
 
-    return (result,err.value)
+    if scalarOrbit:
+        out= (result[0],int(err[0]))
+    else:
+        out= (result,err)
+    if dense:
+        out+= (dense_out[0],) if scalarOrbit else (dense_out,)
+    if not events is None:
+        events_out= _events_output(event_names,event_t,event_indx,event_y)
+        out+= (events_out[0],) if scalarOrbit else (events_out,)
+    if stats:
+        out+= (_c_stats(int_method,stats_out,t,scalarOrbit,
+                        time.time()-start),)
+    if checkpoint:
+        if scalarOrbit:
+            out+= ((reason,ntdone[0],stats_out[0,5]),)
+        else:
+            out+= ((reason,ntdone,stats_out[:,5]),)
+    return out
 
-def integrateFullOrbit_dxdv_c(pot,yo,dyo,t,int_method,rtol=None,atol=None): #pragma: no cover because not included in v1, uncover when included
+def integrateFullOrbit_dxdv_c(pot,yo,dyo,t,int_method,rtol=None,atol=None,
+                              dt=None):
     """
     NAME:
        integrateFullOrbit_dxdv_c
     PURPOSE:
-       C integrate an ode for a planarOrbit+phase space volume dxdv
+       C integrate an ode for a FullOrbit+phase space volume dxdv
     INPUT:
        pot - Potential or list of such instances
        yo - initial condition [q,p]
-       dyo - initial condition [dq,dp]
+       dyo - initial condition [dq,dp], or array with shape [6,6] of six such deviation vectors (e.g., to compute the state-transition matrix)
        t - set of times at which one wants the result
-       int_method= 'leapfrog_c', 'rk4_c', 'rk6_c', 'symplec4_c'
+       int_method= 'rk4_c', 'rk6_c', 'dopr54_c', 'dop853_c', 'bulirschstoer_c'
        rtol, atol
+       dt= (None) force integrator to use this stepsize (default is to automatically determine one))
     OUTPUT:
        (y,err)
-       y : array, shape (len(y0), len(t))
+       y : array, shape (len(t),12) or (len(t),42) for six deviation vectors
        Array containing the value of y for each desired time in t, \
        with the initial value y0 in the first row.
        err: error message if not zero, 1: maximum step reduction happened for adaptive integrators
@@ -326,11 +580,18 @@ def integrateFullOrbit_dxdv_c(pot,yo,dyo,t,int_method,rtol=None,atol=None): #pra
     """
     rtol, atol= _parse_tol(rtol,atol)
     npot, pot_type, pot_args= _parse_pot(pot)
+    _check_moving_object_t(pot,t)
     int_method_c= _parse_integrator(int_method)
-    yo= nu.concatenate((yo,dyo))
+    if dt is None: 
+        dt= -9999.99
+    dyo= nu.asarray(dyo)
+    ndev= 1 if dyo.ndim == 1 else len(dyo)
+    if not ndev in [1,6]:
+        raise ValueError('integrateFullOrbit_dxdv_c can only integrate one or six deviation vectors')
+    yo= nu.concatenate((yo,dyo.flatten()))
 
     #Set up result array
-    result= nu.empty((len(t),12))
+    result= nu.empty((len(t),6*(1+ndev)))
     err= ctypes.c_int(0)
 
     #Set up the C code
@@ -344,9 +605,12 @@ def integrateFullOrbit_dxdv_c(pot,yo,dyo,t,int_method,rtol=None,atol=None): #pra
                                ndpointer(dtype=nu.float64,flags=ndarrayFlags),
                                ctypes.c_double,
                                ctypes.c_double,
+                               ctypes.c_double,
                                ndpointer(dtype=nu.float64,flags=ndarrayFlags),
                                ctypes.POINTER(ctypes.c_int),
-                               ctypes.c_int]
+                               ctypes.c_int,
+                               ctypes.c_int,
+                               ctypes.POINTER(ctypes.c_int)]
 
     #Array requirements, first store old order
     f_cont= [yo.flags['F_CONTIGUOUS'],
@@ -356,22 +620,121 @@ def integrateFullOrbit_dxdv_c(pot,yo,dyo,t,int_method,rtol=None,atol=None): #pra
     result= nu.require(result,dtype=nu.float64,requirements=['C','W'])
 
     #Run the C code
-    integrationFunc(yo,
-                    ctypes.c_int(len(t)),
-                    t,
-                    ctypes.c_int(npot),
-                    pot_type,
-                    pot_args,
-                    ctypes.c_double(rtol),ctypes.c_double(atol),
-                    result,
-                    ctypes.byref(err),
-                    ctypes.c_int(int_method_c))
-
-    if int(err.value) == -10: #pragma: no cover
-        raise KeyboardInterrupt("Orbit integration interrupted by CTRL-C (SIGINT)")
+    _call_interruptible(integrationFunc,
+                        yo,
+                        ctypes.c_int(len(t)),
+                        t,
+                        ctypes.c_int(npot),
+                        pot_type,
+                        pot_args,
+                        ctypes.c_double(dt),
+                        ctypes.c_double(rtol),ctypes.c_double(atol),
+                        result,
+                        ctypes.byref(err),
+                        ctypes.c_int(int_method_c),
+                        ctypes.c_int(ndev))
 
     #Reset input arrays
     if f_cont[0]: yo= nu.asfortranarray(yo)
     if f_cont[1]: t= nu.asfortranarray(t)
 
     return (result,err.value)
+
+def integrateFullOrbit_lyapunov_c(pot,yo,dyo,t,int_method,rtol=None,atol=None,
+                                  dt=None,stats=False):
+    """
+    NAME:
+       integrateFullOrbit_lyapunov_c
+    PURPOSE:
+       C integrate FullOrbits together with a deviation vector that is renormalized at each output time, to compute the maximal Lyapunov exponent and the mean MEGNO (Cincotta & Simo 2000) of each orbit without storing the deviation vectors
+    INPUT:
+       pot - Potential or list of such instances
+       yo - initial condition [q,p], shape [6] or [N,6] to integrate N orbits at once (in parallel using OpenMP)
+       dyo - initial deviation vector [dq,dp], same shape as yo
+       t - set of times at which one wants the result; the deviation vector is renormalized at each of these
+       int_method= 'rk4_c', 'rk6_c', 'dopr54_c', 'dop853_c', 'bulirschstoer_c'
+       rtol, atol
+       dt= (None) force integrator to use this stepsize (default is to automatically determine one))
+       stats= (False) if True, also return statistics of the integration
+    OUTPUT:
+       (y,lyap,megno,err)(, statistics)
+       y : array, shape (len(t),6) or (N,len(t),6) for N orbits
+       lyap: maximal Lyapunov exponent, sum of the logarithms of the growth of the deviation vector between output times divided by the total time (array with shape (N,) for N orbits)
+       megno: mean MEGNO <Y> at the final time, which tends to 2 for quasi-periodic orbits and grows linearly with time for chaotic orbits (array with shape (N,) for N orbits)
+       err: error message, if not zero: 1 means maximum step reduction happened for adaptive integrators; array with shape (N,) for N orbits
+    """
+    rtol, atol= _parse_tol(rtol,atol)
+    npot, pot_type, pot_args= _parse_pot(pot)
+    _check_moving_object_t(pot,t)
+    int_method_c= _parse_integrator(int_method)
+    if not int_method_c in [1,2,5,6,7]:
+        raise TypeError('Symplectic integration of the variational equations is not possible')
+    if dt is None: 
+        dt= -9999.99
+    start= time.time()
+
+    #Set up result arrays
+    yo= nu.asarray(yo)
+    scalarOrbit= yo.ndim == 1
+    nobj= 1 if scalarOrbit else len(yo)
+    result= nu.empty((nobj,len(t),6))
+    lyap= nu.empty(nobj)
+    megno= nu.empty(nobj)
+    err= nu.zeros(nobj,dtype=nu.int32)
+    stats_out= nu.zeros((nobj,6))
+
+    #Set up the C code
+    ndarrayFlags= ('C_CONTIGUOUS','WRITEABLE')
+    integrationFunc= _lib.integrateFullOrbit_lyapunov
+    integrationFunc.argtypes= [ctypes.c_int,
+                               ndpointer(dtype=nu.float64,flags=ndarrayFlags),
+                               ndpointer(dtype=nu.float64,flags=ndarrayFlags),
+                               ctypes.c_int,                             
+                               ndpointer(dtype=nu.float64,flags=ndarrayFlags),
+                               ctypes.c_int,
+                               ndpointer(dtype=nu.int32,flags=ndarrayFlags),
+                               ndpointer(dtype=nu.float64,flags=ndarrayFlags),
+                               ctypes.c_double,
+                               ctypes.c_double,
+                               ctypes.c_double,
+                               ndpointer(dtype=nu.float64,flags=ndarrayFlags),
+                               ndpointer(dtype=nu.float64,flags=ndarrayFlags),
+                               ndpointer(dtype=nu.float64,flags=ndarrayFlags),
+                               ndpointer(dtype=nu.int32,flags=ndarrayFlags),
+                               ctypes.c_int,
+                               ndpointer(dtype=nu.float64,flags=ndarrayFlags),
+                               ctypes.POINTER(ctypes.c_int)]
+
+    #Array requirements
+    yo= nu.require(yo,dtype=nu.float64,requirements=['C','W'])
+    dyo= nu.require(nu.broadcast_to(dyo,yo.shape),
+                    dtype=nu.float64,requirements=['C','W'])
+    t= nu.require(t,dtype=nu.float64,requirements=['C','W'])
+
+    #Run the C code
+    _call_interruptible(integrationFunc,
+                        ctypes.c_int(nobj),
+                        yo,
+                        dyo,
+                        ctypes.c_int(len(t)),
+                        t,
+                        ctypes.c_int(npot),
+                        pot_type,
+                        pot_args,
+                        ctypes.c_double(dt),
+                        ctypes.c_double(rtol),ctypes.c_double(atol),
+                        result,
+                        lyap,
+                        megno,
+                        err,
+                        ctypes.c_int(int_method_c),
+                        stats_out)
+
+    if scalarOrbit:
+        out= (result[0],lyap[0],megno[0],err[0])
+    else:
+        out= (result,lyap,megno,err)
+    if stats:
+        out+= (_c_stats(int_method,stats_out,t,scalarOrbit,
+                        time.time()-start),)
+    return out
@@ -0,0 +1,159 @@
+import sys
+import sysconfig
+import warnings
+import time
+import numpy as nu
+import ctypes
+import ctypes.util
+from numpy.ctypeslib import ndpointer
+import os
+from galpy import potential, potential_src
+from galpy.util import galpyWarning
+from galpy.orbit_src.integratePlanarOrbit import _parse_integrator, _parse_tol, \
+    _call_interruptible, _compile_pot
+from galpy.orbit_src.IntegrationStats import _c_stats
+#Find and load the library
+_lib= None
+outerr= None
+PY3= sys.version > '3'
+if PY3: #pragma: no cover
+    _ext_suffix= sysconfig.get_config_var('EXT_SUFFIX')
+else:
+    _ext_suffix= '.so'
+for path in sys.path:
+    try:
+        _lib = ctypes.CDLL(os.path.join(path,'galpy_integrate_c%s' % _ext_suffix))
+    except OSError as e:
+        if os.path.exists(os.path.join(path,'galpy_integrate_c%s' % _ext_suffix)): #pragma: no cover
+            outerr= e
+        _lib = None
+    else:
+        break
+if _lib is None: #pragma: no cover
+    if not outerr is None:
+        warnings.warn("integrateLinearOrbit_c extension module not loaded, because of error '%s' " % outerr,
+                      galpyWarning)
+    else:
+        warnings.warn("integrateLinearOrbit_c extension module not loaded, because galpy_integrate_c%s image was not found" % _ext_suffix,
+                      galpyWarning)
+    _ext_loaded= False
+else:
+    _ext_loaded= True
+
+def _parse_pot(pot):
+    """Parse the potential so it can be fed to C, using the cached parse of each potential when possible"""
+    return _compile_pot(pot,_parse_pot_nocache,'linear')
+
+def _parse_pot_nocache(pot):
+    """Parse the potential so it can be fed to C"""
+    from galpy.orbit_src.integrateFullOrbit import _parse_pot as _parse_pot_full
+    #Figure out what's in pot
+    if not isinstance(pot,list):
+        pot= [pot]
+    #Initialize everything
+    pot_type= []
+    pot_args= []
+    npot= len(pot)
+    for p in pot:
+        if isinstance(p,potential.KGPotential):
+            pot_type.append(31)
+            pot_args.extend([p._amp,p._K,p._D2,p._F])
+        elif isinstance(p,potential_src.verticalPotential.verticalPotential):
+            pot_type.append(32)
+            # The 3D potential is parsed like the potentials that wrappers
+            # wrap, using its cached parse
+            wrap_npot, wrap_pot_type, wrap_pot_args= _parse_pot_full(p._Pot)
+            pot_args.extend([wrap_npot,len(wrap_pot_args)])
+            pot_type.extend(wrap_pot_type)
+            pot_args.extend(wrap_pot_args)
+            # R, phi, and the cache of the time and the mid-plane force
+            pot_args.extend([p._R,0.,nu.nan,0.])
+    pot_type= nu.array(pot_type,dtype=nu.int32,order='C')
+    pot_args= nu.array(pot_args,dtype=nu.float64,order='C')
+    return (npot,pot_type,pot_args)
+
+def integrateLinearOrbit_c(pot,yo,t,int_method,rtol=None,atol=None,dt=None,
+                           stats=False):
+    """
+    NAME:
+       integrateLinearOrbit_c
+    PURPOSE:
+       C integrate an ode for a linearOrbit
+    INPUT:
+       pot - linearPotential or list of such instances
+       yo - initial condition [x,vx], shape [2] or [N,2] to integrate N orbits at once (in parallel using OpenMP)
+       t - set of times at which one wants the result
+       int_method= 'leapfrog_c', 'rk4_c', 'rk6_c', 'symplec4_c', 'symplec6_c', 'dopr54_c', 'dop853_c', 'bulirschstoer_c'
+       rtol, atol
+       dt= (None) force integrator to use this stepsize (default is to automatically determine one))
+       stats= (False) if True, also return statistics of the integration
+    OUTPUT:
+       (y,err)(,stats)
+       y : array, shape (len(t),2) or (N,len(t),2) for N orbits
+       Array containing the value of y for each desired time in t, \
+       with the initial value y0 in the first row.
+       err: error message, if not zero: 1 means maximum step reduction happened for adaptive integrators; array with shape (N,) for N orbits
+       stats: IntegrationStats instance with the number of force evaluations, accepted and rejected steps, the step size, and the wall-clock time (arrays with shape (N,) for N orbits)
+    """
+    rtol, atol= _parse_tol(rtol,atol)
+    npot, pot_type, pot_args= _parse_pot(pot)
+    int_method_c= _parse_integrator(int_method)
+    if dt is None:
+        dt= -9999.99
+
+    #Set up result array
+    yo= nu.asarray(yo)
+    scalarOrbit= yo.ndim == 1
+    nobj= 1 if scalarOrbit else len(yo)
+    result= nu.empty((nobj,len(t),2))
+    err= nu.zeros(nobj,dtype=nu.int32)
+    stats_out= nu.zeros((nobj,6))
+
+    #Set up the C code
+    ndarrayFlags= ('C_CONTIGUOUS','WRITEABLE')
+    integrationFunc= _lib.integrateLinearOrbit
+    integrationFunc.argtypes= [ctypes.c_int,
+                               ndpointer(dtype=nu.float64,flags=ndarrayFlags),
+                               ctypes.c_int,
+                               ndpointer(dtype=nu.float64,flags=ndarrayFlags),
+                               ctypes.c_int,
+                               ndpointer(dtype=nu.int32,flags=ndarrayFlags),
+                               ndpointer(dtype=nu.float64,flags=ndarrayFlags),
+                               ctypes.c_double,
+                               ctypes.c_double,
+                               ctypes.c_double,
+                               ndpointer(dtype=nu.float64,flags=ndarrayFlags),
+                               ndpointer(dtype=nu.int32,flags=ndarrayFlags),
+                               ctypes.c_int,
+                               ndpointer(dtype=nu.float64,flags=ndarrayFlags),
+                               ctypes.POINTER(ctypes.c_int)]
+
+    #Array requirements
+    yo= nu.require(yo,dtype=nu.float64,requirements=['C','W'])
+    t= nu.require(t,dtype=nu.float64,requirements=['C','W'])
+
+    #Run the C code
+    start= time.time()
+    _call_interruptible(integrationFunc,
+                        ctypes.c_int(nobj),
+                        yo,
+                        ctypes.c_int(len(t)),
+                        t,
+                        ctypes.c_int(npot),
+                        pot_type,
+                        pot_args,
+                        ctypes.c_double(dt),
+                        ctypes.c_double(rtol),ctypes.c_double(atol),
+                        result,
+                        err,
+                        ctypes.c_int(int_method_c),
+                        stats_out)
+
+    if scalarOrbit:
+        out= (result[0],int(err[0]))
+    else:
+        out= (result,err)
+    if stats:
+        out+= (_c_stats(int_method,stats_out,t,scalarOrbit,
+                        time.time()-start),)
+    return out
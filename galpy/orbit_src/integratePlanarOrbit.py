@@ -1,6 +1,8 @@
 import sys
 import sysconfig
 import warnings
+import time
+import threading
 import numpy as nu
 import ctypes
 import ctypes.util
@@ -8,6 +10,7 @@ from numpy.ctypeslib import ndpointer
 import os
 from galpy import potential, potential_src
 from galpy.util import galpyWarning
+from galpy.orbit_src.IntegrationStats import _c_stats
 #Find and load the library
 _lib= None
 outerr= None
@@ -37,8 +40,14 @@ else:
     _ext_loaded= True
 
 def _parse_pot(pot):
+    """Parse the potential so it can be fed to C, using the cached parse of each potential when possible"""
+    return _compile_pot(pot,_parse_pot_nocache,'planar')
+
+def _parse_pot_nocache(pot):
     """Parse the potential so it can be fed to C"""
-    from galpy.orbit_src.integrateFullOrbit import _parse_scf_pot
+    from galpy.orbit_src.integrateFullOrbit import _parse_scf_pot, \
+        _parse_moving_object_pot, _parse_callback_pot, _parse_interp3d_pot, \
+        _parse_interp3d_wrapped_pot
     #Figure out what's in pot
     if not isinstance(pot,list):
         pot= [pot]
@@ -245,6 +254,38 @@ def _parse_pot(pot):
             pot_type.append(28)
             pot_args.extend([p._amp,p._mphio,p._p,p._mphib,p._m,
                              p._rb,p._rbp,p._rb2p,p._r1p])
+        elif (isinstance(p,potential_src.planarPotential.planarPotentialFromFullPotential) or isinstance(p,potential_src.planarPotential.planarPotentialFromRZPotential)) \
+                and isinstance(p._Pot,potential.FerrersPotential):
+            pot_type.append(29)
+            pot_args.extend([p._Pot._amp*nu.pi*p._Pot._rhoc_M*p._Pot.a**3
+                             *p._Pot._b*p._Pot._c,
+                             p._Pot._a2,p._Pot._b2*p._Pot._a2,
+                             p._Pot._c2*p._Pot._a2,p._Pot.n,
+                             p._Pot._pa,p._Pot._omegab,p._Pot._glorder])
+            pot_args.extend(p._Pot._glx)
+            pot_args.extend(p._Pot._glw)
+            pot_args.extend([-1.,0.,0.,0.,0.,0.,0.,
+                             -1.,0.,0.,0.,0.,0.,0.]) # for caching
+        elif isinstance(p,potential_src.planarPotential.planarPotentialFromFullPotential) \
+                and isinstance(p._Pot,potential.MovingObjectPotential):
+            pt,pa= _parse_moving_object_pot(p._Pot)
+            pot_type.append(pt)
+            pot_args.extend(pa)
+        elif (isinstance(p,potential_src.planarPotential.planarPotentialFromFullPotential) or isinstance(p,potential_src.planarPotential.planarPotentialFromRZPotential)) \
+                and isinstance(p._Pot,potential.CallbackPotential):
+            pot_type.append(33)
+            pot_args.extend(_parse_callback_pot(p._Pot))
+        elif isinstance(p,potential_src.planarPotential.planarPotentialFromFullPotential) \
+                and isinstance(p._Pot,potential.interp3DPotential):
+            pot_type.append(34)
+            # The original potential is wrapped, for use outside of the grid
+            wrap_npot, wrap_pot_type, wrap_pot_args= \
+                _parse_interp3d_wrapped_pot(p._Pot,
+                    lambda pot: _parse_pot(potential.toPlanarPotential(pot)))
+            pot_args.extend([wrap_npot,len(wrap_pot_args)])
+            pot_type.extend(wrap_pot_type)
+            pot_args.extend(wrap_pot_args)
+            pot_args.extend(_parse_interp3d_pot(p._Pot))
         ############################## WRAPPERS ###############################
         elif ((isinstance(p,potential_src.planarPotential.planarPotentialFromFullPotential) or isinstance(p,potential_src.planarPotential.planarPotentialFromRZPotential)) \
               and isinstance(p._Pot,potential.DehnenSmoothWrapperPotential)) \
@@ -272,6 +313,64 @@ def _parse_pot(pot):
     pot_args= nu.array(pot_args,dtype=nu.float64,order='C')
     return (npot,pot_type,pot_args)
 
+class _CompiledPotential(object):
+    """Description of a single potential for the C code: the number of C potentials that it consists of and its pot_type and pot_args arrays"""
+    def __init__(self,npot,pot_type,pot_args):
+        self.npot= npot
+        self.pot_type= pot_type
+        self.pot_args= pot_args
+        return None
+
+_COMPILED_LISTS= {}
+_MAX_COMPILED_LISTS= 100
+def _compile_pot(pot,parse,key):
+    """Parse a (list of) potential(s) for the C code with parse, re-using the _CompiledPotential of each potential cached under key; the cache lives on the potential (or, for planar potentials obtained from 3D potentials, on the 3D potential) and is cleared when any of its attributes change; wrappers and vertical potentials are not cached, but the potentials that they wrap are; MovingObjectPotentials are not cached, because their description contains the object's orbit, which changes when the orbit is re-integrated"""
+    if not isinstance(pot,list):
+        pot= [pot]
+    compiled= []
+    all_cached= True
+    for p in pot:
+        holder= p
+        if key == 'planar' \
+                and isinstance(p,(potential_src.planarPotential.planarPotentialFromRZPotential,
+                                  potential_src.planarPotential.planarPotentialFromFullPotential)):
+            holder= p._Pot
+        if isinstance(holder,(potential_src.WrapperPotential.parentWrapperPotential,
+                              potential_src.verticalPotential.verticalPotential,
+                              potential.MovingObjectPotential)):
+            compiled.append(_CompiledPotential(*parse([p])))
+            all_cached= False
+            continue
+        cache= holder.__dict__.get('_cached_c')
+        if cache is None:
+            cache= {}
+        if not key in cache:
+            cache[key]= _CompiledPotential(*parse([p]))
+            holder._cached_c= cache
+        compiled.append(cache[key])
+    if len(compiled) == 1: # no need to copy
+        return (compiled[0].npot,compiled[0].pot_type,compiled[0].pot_args)
+    elif not all_cached:
+        return _combine_compiled_pot(compiled)
+    # Also cache the combined arrays for a list; the dictionary holds on to
+    # the _CompiledPotentials, so their ids cannot be re-used
+    list_key= (key,)+tuple([id(c) for c in compiled])
+    out= _COMPILED_LISTS.get(list_key)
+    if out is None:
+        if len(_COMPILED_LISTS) >= _MAX_COMPILED_LISTS:
+            _COMPILED_LISTS.clear()
+        out= (compiled,_combine_compiled_pot(compiled))
+        _COMPILED_LISTS[list_key]= out
+    return out[1]
+
+def _combine_compiled_pot(compiled):
+    """Combine a list of _CompiledPotentials into the (npot,pot_type,pot_args) passed to C"""
+    return (sum([c.npot for c in compiled]),
+            nu.concatenate([c.pot_type for c in compiled]
+                           +[nu.empty(0,dtype=nu.int32)]),
+            nu.concatenate([c.pot_args for c in compiled]
+                           +[nu.empty(0,dtype=nu.float64)]))
+
 def _parse_integrator(int_method):
     """parse the integrator method to pass to C"""
     #Pick integrator
@@ -285,10 +384,80 @@ def _parse_integrator(int_method):
         int_method_c= 4
     elif int_method.lower() == 'dopr54_c':
         int_method_c= 5
+    elif int_method.lower() == 'dop853_c':
+        int_method_c= 6
+    elif int_method.lower() == 'bulirschstoer_c':
+        int_method_c= 7
     else:
         int_method_c= 0
     return int_method_c
             
+def _parse_events(events,dim):
+    """Parse the events to detect during the integration to pass to C"""
+    if events is None: events= []
+    names= []
+    event_type= []
+    event_direction= []
+    event_terminal= []
+    event_value= []
+    for event in events:
+        if isinstance(event,(list,tuple)):
+            name, value= event
+        else:
+            name, value= event, 0.
+        if name.lower() == 'pericenter':
+            etype, direction, terminal= 0, 1, 0
+        elif name.lower() == 'apocenter':
+            etype, direction, terminal= 0, -1, 0
+        elif name.lower() == 'zcrossing' and dim == 6:
+            etype, direction, terminal= 1, 0, 0
+        elif name.lower() == 'zmax' and dim == 6:
+            etype, direction, terminal= 2, 0, 0
+        elif name.lower() == 'escape':
+            etype, direction, terminal= 3, 1, 1
+        else:
+            raise ValueError("Event '%s' not recognized for an orbit with %i phase-space dimensions" % (name,dim))
+        names.append(name.lower())
+        event_type.append(etype)
+        event_direction.append(direction)
+        event_terminal.append(terminal)
+        event_value.append(value)
+    return (names,
+            nu.array(event_type,dtype=nu.int32,ndmin=1),
+            nu.array(event_direction,dtype=nu.int32,ndmin=1),
+            nu.array(event_terminal,dtype=nu.int32,ndmin=1),
+            nu.array(event_value,dtype=nu.float64,ndmin=1))
+
+def _events_output(names,event_t,event_indx,event_y):
+    """Collect the events found by the C code into a dictionary name: (t,y) for each orbit"""
+    out= []
+    for ii in range(len(event_t)):
+        found= {}
+        for jj,name in enumerate(names):
+            indx= event_indx[ii] == jj
+            found[name]= (event_t[ii][indx],event_y[ii][indx])
+        out.append(found)
+    return out
+
+def _c_buffer_pointers(ctype,nobj):
+    """Array of nobj NULL pointers for the C code to store arrays that it 
+    allocates and grows as needed"""
+    return (ctypes.POINTER(ctype)*nobj)()
+
+def _from_c_buffers(ptrs,n,shape,dtype=nu.float64):
+    """Copy the arrays that the C code allocated for each orbit, with n 
+    blocks of the given shape, into numpy arrays and free them"""
+    _lib.galpy_free.argtypes= [ctypes.c_void_p]
+    out= []
+    for ii in range(len(n)):
+        if n[ii] > 0:
+            out.append(nu.ctypeslib.as_array(ptrs[ii],
+                                             shape=(int(n[ii]),)+shape).copy())
+        else:
+            out.append(nu.empty((0,)+shape,dtype=dtype))
+        _lib.galpy_free(ptrs[ii])
+    return out
+
 def _parse_tol(rtol,atol):
     """Parse the tolerance keywords"""
     #Process atol and rtol
@@ -302,8 +471,55 @@ def _parse_tol(rtol,atol):
         atol= nu.log(atol)
     return (rtol,atol)
 
+try:
+    _main_thread= threading.main_thread
+except AttributeError: #pragma: no cover
+    # Python 2
+    _main_thread= None
+def _on_main_thread():
+    """Whether the current thread is the main thread (which receives SIGINT)"""
+    if _main_thread is None: #pragma: no cover
+        return threading.current_thread().name == 'MainThread'
+    return threading.current_thread() is _main_thread()
+
+def _call_interruptible(func,*args,**kwargs):
+    """Call the C function func with args, followed by a pointer to a 
+    per-call interrupt flag that the C integrators check before each output 
+    step. On the main thread, a SIGINT handler that sets the flag is 
+    installed for the duration of the call, such that CTRL-C stops the 
+    integration; elsewhere the flag is passed without a handler. With a 
+    wall-clock budget walltime= (s), a timer sets the flag when the budget 
+    is exceeded. Returns None, or 'sigint' or 'walltime' if the flag was 
+    set; CTRL-C raises KeyboardInterrupt unless checkpoint=True"""
+    walltime= kwargs.get('walltime',None)
+    interrupted= ctypes.c_int(0)
+    args= args+(ctypes.byref(interrupted),)
+    if walltime is not None:
+        def _set_walltime():
+            if interrupted.value == 0: interrupted.value= 2
+        timer= threading.Timer(walltime,_set_walltime)
+        timer.start()
+    catch_sigint= _on_main_thread()
+    if catch_sigint:
+        _lib.galpy_set_sigint_flag(ctypes.byref(interrupted))
+    try:
+        func(*args)
+    finally:
+        if catch_sigint:
+            _lib.galpy_reset_sigint()
+        if walltime is not None:
+            timer.cancel()
+    if interrupted.value == 0:
+        return None
+    elif interrupted.value == 2:
+        return 'walltime'
+    if not kwargs.get('checkpoint',False):
+        raise KeyboardInterrupt("Orbit integration interrupted by CTRL-C (SIGINT)")
+    return 'sigint'
+
 def integratePlanarOrbit_c(pot,yo,t,int_method,rtol=None,atol=None,
-                           dt=None):
+                           dt=None,result=None,dense=False,events=None,
+                           stats=False,walltime=None,checkpoint=False):
     """
     NAME:
        integratePlanarOrbit_c
@@ -311,34 +527,65 @@ def integratePlanarOrbit_c(pot,yo,t,int_method,rtol=None,atol=None,
        C integrate an ode for a planarOrbit
     INPUT:
        pot - Potential or list of such instances
-       yo - initial condition [q,p]
+       yo - initial condition [q,p], shape [4] or [N,4] to integrate N orbits at once (in parallel using OpenMP)
        t - set of times at which one wants the result
        int_method= 'leapfrog_c', 'rk4_c', 'rk6_c', 'symplec4_c'
        rtol, atol
        dt= (None) force integrator to use this stepsize (default is to automatically determine one))
+       result= (None) if set, C-contiguous float64 array with the shape of the output y (e.g., a numpy.memmap) that the orbits are directly written into
+       dense= (False) if True and int_method is 'dopr54_c', also return the dense output of the integrator, which allows the orbit to be evaluated at any time
+       events= (None) list of events to detect during the integration, only for int_method='dopr54_c': 'pericenter', 'apocenter', ('escape',r) to stop the integration when the orbit reaches radius r (later outputs are NaN)
+       stats= (False) if True, also return statistics of the integration
+       walltime= (None) wall-clock budget for the integration in s; when it is exceeded, the integration stops at the next output time (later outputs are NaN)
+       checkpoint= (False) if True, do not raise KeyboardInterrupt when the integration is interrupted by CTRL-C (SIGINT), but return the state from which the integration can be continued
     OUTPUT:
-       (y,err)
-       y : array, shape (len(y0), len(t))
+       (y,err), followed by dense when dense=True, by the events found when events are given, by the statistics when stats=True, and by the checkpoint when checkpoint=True
+       y : array, shape (len(t),4) or (N,len(t),4) for N orbits
        Array containing the value of y for each desired time in t, \
        with the initial value y0 in the first row.
-       err: error message, if not zero: 1 means maximum step reduction happened for adaptive integrators
+       err: error message, if not zero: 1 means maximum step reduction happened for adaptive integrators; array with shape (N,) for N orbits
+       dense: array with shape (nstep,2+5*4) of the dense output of each step [t_start,h,coefficients] or list of such arrays for N orbits
+       events: dictionary with for each event a tuple (times,y at those times) or list of such dictionaries for N orbits
+       stats: IntegrationStats instance with the number of force evaluations, accepted and rejected steps, the step size, and the wall-clock time (arrays with shape (N,) for N orbits)
+       checkpoint: (reason,ntdone,dtnext) with reason None if the integration was not interrupted and 'sigint' or 'walltime' otherwise, ntdone the number of output times reached (len(t) if the integration completed), and dtnext the step size to continue the integration with (arrays with shape (N,) for N orbits); the state to continue from is y at the last output time reached
     HISTORY:
        2011-10-03 - Written - Bovy (IAS)
     """
     rtol, atol= _parse_tol(rtol,atol)
+    from galpy.orbit_src.integrateFullOrbit import _check_moving_object_t
     npot, pot_type, pot_args= _parse_pot(pot)
+    _check_moving_object_t(pot,t)
     int_method_c= _parse_integrator(int_method)
+    event_names, event_type, event_direction, event_terminal, event_value=\
+        _parse_events(events,4)
+    nevent= len(event_names)
+    if nevent > 0 and int_method_c != 5:
+        raise NotImplementedError("Event detection is only implemented for int_method='dopr54_c'")
     if dt is None: 
         dt= -9999.99
 
     #Set up result array
-    result= nu.empty((len(t),4))
-    err= ctypes.c_int(0)
+    yo= nu.asarray(yo)
+    scalarOrbit= yo.ndim == 1
+    nobj= 1 if scalarOrbit else len(yo)
+    if result is None:
+        result= nu.empty((nobj,len(t),4))
+    elif not isinstance(result,nu.ndarray) \
+            or result.shape != ((len(t),4) if scalarOrbit
+                                else (nobj,len(t),4)) \
+            or result.dtype != nu.float64 \
+            or not result.flags['C_CONTIGUOUS'] \
+            or not result.flags['WRITEABLE']:
+        raise ValueError("result= array for integratePlanarOrbit_c needs to be a writeable, C-contiguous float64 array with shape (len(t),4) or (N,len(t),4)")
+    else:
+        result= result.reshape((nobj,len(t),4))
+    err= nu.zeros(nobj,dtype=nu.int32)
 
     #Set up the C code
     ndarrayFlags= ('C_CONTIGUOUS','WRITEABLE')
     integrationFunc= _lib.integratePlanarOrbit
-    integrationFunc.argtypes= [ndpointer(dtype=nu.float64,flags=ndarrayFlags),
+    integrationFunc.argtypes= [ctypes.c_int,
+                               ndpointer(dtype=nu.float64,flags=ndarrayFlags),
                                ctypes.c_int,                             
                                ndpointer(dtype=nu.float64,flags=ndarrayFlags),
                                ctypes.c_int,
@@ -348,8 +595,22 @@ def integratePlanarOrbit_c(pot,yo,t,int_method,rtol=None,atol=None,
                                ctypes.c_double,
                                ctypes.c_double,
                                ndpointer(dtype=nu.float64,flags=ndarrayFlags),
-                               ctypes.POINTER(ctypes.c_int),
-                               ctypes.c_int]
+                               ndpointer(dtype=nu.int32,flags=ndarrayFlags),
+                               ctypes.c_int,
+                               ctypes.c_int,
+                               ctypes.POINTER(ctypes.POINTER(ctypes.c_double)),
+                               ndpointer(dtype=nu.int32,flags=ndarrayFlags),
+                               ctypes.c_int,
+                               ndpointer(dtype=nu.int32,flags=ndarrayFlags),
+                               ndpointer(dtype=nu.int32,flags=ndarrayFlags),
+                               ndpointer(dtype=nu.int32,flags=ndarrayFlags),
+                               ndpointer(dtype=nu.float64,flags=ndarrayFlags),
+                               ndpointer(dtype=nu.int32,flags=ndarrayFlags),
+                               ctypes.POINTER(ctypes.POINTER(ctypes.c_double)),
+                               ctypes.POINTER(ctypes.POINTER(ctypes.c_int)),
+                               ctypes.POINTER(ctypes.POINTER(ctypes.c_double)),
+                               ndpointer(dtype=nu.float64,flags=ndarrayFlags),
+                               ctypes.POINTER(ctypes.c_int)]
 
     #Array requirements, first store old order
     f_cont= [yo.flags['F_CONTIGUOUS'],
@@ -357,28 +618,84 @@ def integratePlanarOrbit_c(pot,yo,t,int_method,rtol=None,atol=None,
     yo= nu.require(yo,dtype=nu.float64,requirements=['C','W'])
     t= nu.require(t,dtype=nu.float64,requirements=['C','W'])
     result= nu.require(result,dtype=nu.float64,requirements=['C','W'])
+    err= nu.require(err,dtype=nu.int32,requirements=['C','W'])
+    dense= dense and int_method_c == 5
+    dense_nsteps= nu.zeros(nobj,dtype=nu.int32)
+    event_nfound= nu.zeros(nobj,dtype=nu.int32)
+    stats_out= nu.zeros((nobj,6))
+    #The C code allocates the dense output and the events and grows them
+    #as needed
+    dense_ptrs= _c_buffer_pointers(ctypes.c_double,nobj)
+    event_t_ptrs= _c_buffer_pointers(ctypes.c_double,nobj)
+    event_indx_ptrs= _c_buffer_pointers(ctypes.c_int,nobj)
+    event_y_ptrs= _c_buffer_pointers(ctypes.c_double,nobj)
 
     #Run the C code
-    integrationFunc(yo,
-                    ctypes.c_int(len(t)),
-                    t,
-                    ctypes.c_int(npot),
-                    pot_type,
-                    pot_args,
-                    ctypes.c_double(dt),                    
-                    ctypes.c_double(rtol),ctypes.c_double(atol),
-                    result,
-                    ctypes.byref(err),
-                    ctypes.c_int(int_method_c))
+    start= time.time()
+    try:
+        reason= _call_interruptible(integrationFunc,
+                                    ctypes.c_int(nobj),
+                                    yo,
+                                    ctypes.c_int(len(t)),
+                                    t,
+                                    ctypes.c_int(npot),
+                                    pot_type,
+                                    pot_args,
+                                    ctypes.c_double(dt),
+                                    ctypes.c_double(rtol),ctypes.c_double(atol),
+                                    result,
+                                    err,
+                                    ctypes.c_int(int_method_c),
+                                    ctypes.c_int(dense),
+                                    dense_ptrs,
+                                    dense_nsteps,
+                                    ctypes.c_int(nevent),
+                                    event_type,
+                                    event_direction,
+                                    event_terminal,
+                                    event_value,
+                                    event_nfound,
+                                    event_t_ptrs,
+                                    event_indx_ptrs,
+                                    event_y_ptrs,
+                                    stats_out,
+                                    walltime=walltime,checkpoint=checkpoint)
+    finally:
+        dense_out= _from_c_buffers(dense_ptrs,
+                                   dense_nsteps if dense else [0]*nobj,
+                                   (2+5*4,))
+        event_t= _from_c_buffers(event_t_ptrs,event_nfound,())
+        event_indx= _from_c_buffers(event_indx_ptrs,event_nfound,(),
+                                    dtype=nu.int32)
+        event_y= _from_c_buffers(event_y_ptrs,event_nfound,(4,))
 
-    if err.value == -10: #pragma: no cover
-        raise KeyboardInterrupt("Orbit integration interrupted by CTRL-C (SIGINT)")
+    # Outputs that were not reached because of an interrupt are NaN
+    ntdone= stats_out[:,4].astype('int')
+    for ii in nu.arange(nobj)[ntdone < len(t)]:
+        result[ii,ntdone[ii]:]= nu.nan
 
     #Reset input arrays
     if f_cont[0]: yo= nu.asfortranarray(yo)
     if f_cont[1]: t= nu.asfortranarray(t)
 
-    return (result,err.value)
+    if scalarOrbit:
+        out= (result[0],int(err[0]))
+    else:
+        out= (result,err)
+    if dense:
+        out+= (dense_out[0],) if scalarOrbit else (dense_out,)
+    if not events is None:
+        events_out= _events_output(event_names,event_t,event_indx,event_y)
+        out+= (events_out[0],) if scalarOrbit else (events_out,)
+    if stats:
+        out+= (_c_stats(int_method,stats_out,t,scalarOrbit,
+                        time.time()-start),)
+    if checkpoint:
+        if scalarOrbit:
+            out+= ((reason,ntdone[0],stats_out[0,5]),)
+        else:
+            out+= ((reason,ntdone,stats_out[:,5]),)
+    return out
 
 
 def integratePlanarOrbit_dxdv_c(pot,yo,dyo,t,int_method,rtol=None,atol=None,
@@ -406,7 +723,9 @@ def integratePlanarOrbit_dxdv_c(pot,yo,dyo,t,int_method,rtol=None,atol=None,
        2011-10-19 - Written - Bovy (IAS)
     """
     rtol, atol= _parse_tol(rtol,atol)
+    from galpy.orbit_src.integrateFullOrbit import _check_moving_object_t
     npot, pot_type, pot_args= _parse_pot(pot)
+    _check_moving_object_t(pot,t)
     int_method_c= _parse_integrator(int_method)
     if dt is None: 
         dt= -9999.99
@@ -430,7 +749,8 @@ def integratePlanarOrbit_dxdv_c(pot,yo,dyo,t,int_method,rtol=None,atol=None,
                                ctypes.c_double,
                                ndpointer(dtype=nu.float64,flags=ndarrayFlags),
                                ctypes.POINTER(ctypes.c_int),
-                               ctypes.c_int]
+                               ctypes.c_int,
+                               ctypes.POINTER(ctypes.c_int)]
 
     #Array requirements, first store old order
     f_cont= [yo.flags['F_CONTIGUOUS'],
@@ -440,17 +760,18 @@ def integratePlanarOrbit_dxdv_c(pot,yo,dyo,t,int_method,rtol=None,atol=None,
     result= nu.require(result,dtype=nu.float64,requirements=['C','W'])
 
     #Run the C code
-    integrationFunc(yo,
-                    ctypes.c_int(len(t)),
-                    t,
-                    ctypes.c_int(npot),
-                    pot_type,
-                    pot_args,
-                    ctypes.c_double(dt),                    
-                    ctypes.c_double(rtol),ctypes.c_double(atol),
-                    result,
-                    ctypes.byref(err),
-                    ctypes.c_int(int_method_c))
+    _call_interruptible(integrationFunc,
+                        yo,
+                        ctypes.c_int(len(t)),
+                        t,
+                        ctypes.c_int(npot),
+                        pot_type,
+                        pot_args,
+                        ctypes.c_double(dt),                    
+                        ctypes.c_double(rtol),ctypes.c_double(atol),
+                        result,
+                        ctypes.byref(err),
+                        ctypes.c_int(int_method_c))
 
     if err.value == -10: #pragma: no cover
         raise KeyboardInterrupt("Orbit integration interrupted by CTRL-C (SIGINT)")
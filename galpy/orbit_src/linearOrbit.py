@@ -1,11 +1,17 @@
+import warnings
 import numpy as nu
 from scipy import integrate
 from galpy.orbit_src.OrbitTop import OrbitTop
+from galpy.orbit_src.IntegrationStats import IntegrationStats
 from galpy.potential_src.linearPotential import _evaluatelinearForces,\
     evaluatelinearPotentials
-import galpy.util.bovy_plot as plot
 import galpy.util.bovy_symplecticode as symplecticode
 from galpy.util.bovy_conversion import physical_conversion
+from galpy.util import galpyWarning
+from galpy.potential_src.Potential import _check_c
+from galpy.orbit_src.integrateLinearOrbit import integrateLinearOrbit_c, \
+    _ext_loaded
+ext_loaded= _ext_loaded
 class linearOrbit(OrbitTop):
     """Class that represents an orbit in a (effectively) one-dimensional potential"""
     def __init__(self,vxvv=[1.,0.],vo=220.,ro=8.0):
@@ -39,7 +45,7 @@ class linearOrbit(OrbitTop):
                           ro=ro,zo=None,vo=vo,solarmotion=None)
         return None
 
-    def integrate(self,t,pot,method='odeint',dt=None):
+    def integrate(self,t,pot,method='odeint',dt=None,walltime=None):
         """
         NAME:
            integrate
@@ -48,8 +54,9 @@ class linearOrbit(OrbitTop):
         INPUT:
            t - list of times at which to output (0 has to be in this!)
            pot - potential instance or list of instances
-           method= 'odeint'= scipy's odeint, or 'leapfrog'
-           dt= (None) if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize (NOT USED FOR LINEAR ORBIT SO FAR)
+           method= 'odeint'= scipy's odeint, 'leapfrog', or one of the C integrators ('leapfrog_c', 'rk4_c', 'rk6_c', 'symplec4_c', 'symplec6_c', 'dopr54_c', 'dop853_c', 'bulirschstoer_c'), which are used when the potential is implemented in C
+           dt= (None) if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize (only for the C integrators)
+           walltime= (None) wall-clock budget for the integration in s (NOT USED FOR LINEAR ORBIT SO FAR)
         OUTPUT:
            (none) (get the actual orbit using getOrbit()
         HISTORY:
@@ -58,7 +65,9 @@ class linearOrbit(OrbitTop):
         if hasattr(self,'_orbInterp'): delattr(self,'_orbInterp')
         self.t= nu.array(t)
         self._pot= pot
-        self.orbit= _integrateLinearOrbit(self.vxvv,pot,t,method)
+        self.orbit, self._stats= _integrateLinearOrbit(self.vxvv,pot,t,method,
+                                                       dt=dt,stats=True)
+        self._checkpoint= None
 
     @physical_conversion('energy')
     def E(self,*args,**kwargs):
@@ -125,34 +134,50 @@ class linearOrbit(OrbitTop):
     def zmax(self): #pragma: no cover
         raise AttributeError("linearOrbit does not have a zmax")
 
-def _integrateLinearOrbit(vxvv,pot,t,method):
+def _integrateLinearOrbit(vxvv,pot,t,method,dt=None,stats=False):
     """
     NAME:
        integrateLinearOrbit
     PURPOSE:
        integrate a one-dimensional orbit
     INPUT:
-       vxvv - initial condition [x,vx]
+       vxvv - initial condition [x,vx] or [N,2] array of initial conditions (only integrated at once in C)
        pot - linearPotential or list of linearPotentials
        t - list of times at which to output (0 has to be in this!)
-       method - 'odeint' or 'leapfrog'
+       method - 'odeint', 'leapfrog', or one of the C integrators ('leapfrog_c', 'rk4_c', 'rk6_c', 'symplec4_c', 'symplec6_c', 'dopr54_c', 'dop853_c', 'bulirschstoer_c')
+       dt= (None) if set, force the C integrators to use this basic stepsize; must be an integer divisor of output stepsize
+       stats= (False) if True, also return an IntegrationStats instance with statistics of the integration (only the method for the Python integrators)
     OUTPUT:
-       [:,2] array of [x,vx] at each t
+       [:,2] array of [x,vx] at each t ([N,:,2] for N orbits) (, statistics)
     HISTORY:
        2010-07-13- Written - Bovy (NYU)
     """
+    #First check that the potential has C
     if '_c' in method:
-        if 'leapfrog' in method or 'symplec' in method:
-            method= 'leapfrog'
-        else:
-            method= 'odeint'
+        if not ext_loaded or not _check_c(pot):
+            if 'leapfrog' in method or 'symplec' in method:
+                method= 'leapfrog'
+            else:
+                method= 'odeint'
+            warnings.warn("Cannot use C integration because some of the potentials are not implemented in C (using %s instead)" % (method), galpyWarning)
+    if '_c' in method:
+        out= integrateLinearOrbit_c(pot,nu.array(vxvv,dtype='float64'),t,
+                                    method,dt=dt,stats=stats)
+        if stats: return (out[0],out[2])
+        return out[0]
+    vxvv= nu.array(vxvv)
+    if vxvv.ndim > 1:
+        out= [_integrateLinearOrbit(v,pot,t,method) for v in vxvv]
+        if stats: return (nu.array(out),IntegrationStats(method))
+        return nu.array(out)
     if method.lower() == 'leapfrog':
-        return symplecticode.leapfrog(lambda x,t=t: _evaluatelinearForces(pot,x,
-                                                                         t=t),
-                                      nu.array(vxvv),
-                                      t,rtol=10.**-8)
+        out= symplecticode.leapfrog(lambda x,t=t: _evaluatelinearForces(pot,x,
+                                                                       t=t),
+                                    vxvv,t,rtol=10.**-8)
     elif method.lower() == 'odeint':
-        return integrate.odeint(_linearEOM,vxvv,t,args=(pot,),rtol=10.**-8.)
+        out= integrate.odeint(_linearEOM,vxvv,t,args=(pot,),rtol=10.**-8.)
+    if stats: return (out,IntegrationStats(method))
+    return out
 
 def _linearEOM(y,t,pot):
     """
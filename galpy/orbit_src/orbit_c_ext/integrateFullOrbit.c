@@ -4,7 +4,12 @@
 #include <stdio.h>
 #include <stdlib.h>
 #include <stdbool.h>
+#include <string.h>
 #include <math.h>
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+#define CHUNKSIZE 1
 #include <bovy_symplecticode.h>
 #include <bovy_rk.h>
 //Potentials
@@ -12,6 +17,8 @@
 #ifndef M_PI
 #define M_PI 3.14159265358979323846
 #endif
+//Relative step of the finite difference for the change in the force
+#define _TANGENT_FD_STEP 1.e-5
 /*
   Function Declarations
 */
@@ -19,8 +26,14 @@ void evalRectForce(double, double *, double *,
 		   int, struct potentialArg *);
 void evalRectDeriv(double, double *, double *,
 			 int, struct potentialArg *);
+void evalRectTangentForce(double,double *,double *,double *,
+			  int, struct potentialArg *);
 void evalRectDeriv_dxdv(double,double *, double *,
 			      int, struct potentialArg *);
+void evalRectDeriv_stm(double,double *, double *,
+		       int, struct potentialArg *);
+void evalRectDeriv_megno(double,double *, double *,
+			 int, struct potentialArg *);
 /*
   Actual functions
 */
@@ -30,6 +43,7 @@ void parse_leapFuncArgs_Full(int npot,
 			     double * pot_args){
   int ii,jj,kk;
   int nR, nz;
+  int wrap_offset;
   double * Rgrid, * zgrid, * potGrid_splinecoeffs;
   init_potentialArgs(npot,potentialArgs);
   for (ii=0; ii < npot; ii++){
@@ -238,6 +252,41 @@ void parse_leapFuncArgs_Full(int npot,
       potentialArgs->Rphideriv = &SpiralArmsPotentialRphideriv;
       potentialArgs->nargs = (int) 10 + *pot_args;
       break;    
+    case 29: //FerrersPotential, 22 arguments + 2 x glorder
+      potentialArgs->Rforce= &FerrersPotentialRforce;
+      potentialArgs->zforce= &FerrersPotentialzforce;
+      potentialArgs->phiforce= &FerrersPotentialphiforce;
+      potentialArgs->R2deriv= &FerrersPotentialR2deriv;
+      potentialArgs->phi2deriv= &FerrersPotentialphi2deriv;
+      potentialArgs->Rphideriv= &FerrersPotentialRphideriv;
+      potentialArgs->nargs= (int) (22 + 2 * *(pot_args+7));
+      break;
+    case 30: //MovingObjectPotential, 5 arguments + nbreak breakpoints + coefficients
+      potentialArgs->Rforce= &MovingObjectPotentialRforce;
+      potentialArgs->zforce= &MovingObjectPotentialzforce;
+      potentialArgs->phiforce= &MovingObjectPotentialphiforce;
+      potentialArgs->nargs= (int) (5 + *(pot_args+3)
+				   + 3 * *(pot_args+4) * ( *(pot_args+3) - 1 ));
+      break;
+    case 33: //CallbackPotential, 8 arguments
+      potentialArgs->Rforce= &CallbackPotentialRforce;
+      potentialArgs->zforce= &CallbackPotentialzforce;
+      potentialArgs->phiforce= &CallbackPotentialphiforce;
+      potentialArgs->R2deriv= &CallbackPotentialR2deriv;
+      potentialArgs->phi2deriv= &CallbackPotentialphi2deriv;
+      potentialArgs->Rphideriv= &CallbackPotentialRphideriv;
+      potentialArgs->nargs= 8;
+      break;
+    case 34: //interp3DPotential, wraps the original potential, 21 arguments + 4 grids
+      potentialArgs->potentialEval= &interp3DPotentialEval;
+      potentialArgs->Rforce= &interp3DPotentialRforce;
+      potentialArgs->zforce= &interp3DPotentialzforce;
+      potentialArgs->phiforce= &interp3DPotentialphiforce;
+      wrap_offset= 2 + (int) *(pot_args+1);
+      potentialArgs->nargs= (int) (21 + 4 * *(pot_args+wrap_offset+3)
+				   * *(pot_args+wrap_offset+7)
+				   * *(pot_args+wrap_offset+11));
+      break;
 //////////////////////////////// WRAPPERS /////////////////////////////////////
     case -1: //DehnenSmoothWrapperPotential
       potentialArgs->Rforce= &DehnenSmoothWrapperPotentialRforce;
@@ -252,7 +301,7 @@ void parse_leapFuncArgs_Full(int npot,
       potentialArgs->nargs= (int) 3;
       break;
     }
-    if ( *(pot_type-1) < 0 ) { // Parse wrapped potential for wrappers
+    if ( *(pot_type-1) < 0 || *(pot_type-1) == 34 ) { // Parse wrapped potential for wrappers and interp3DPotential
       potentialArgs->nwrapped= (int) *pot_args++;
       potentialArgs->wrappedPotentialArg= \
 	(struct potentialArg *) malloc ( potentialArgs->nwrapped	\
@@ -273,7 +322,8 @@ void parse_leapFuncArgs_Full(int npot,
   }
   potentialArgs-= npot;
 }
-void integrateFullOrbit(double *yo,
+void integrateFullOrbit(int nobj,
+			double *yo,
 			int nt, 
 			double *t,
 			int npot,
@@ -284,11 +334,34 @@ void integrateFullOrbit(double *yo,
 			double atol,
 			double *result,
 			int * err,
-			int odeint_type){
+			int odeint_type,
+			int dense,
+			double ** dense_out,
+			int * dense_nsteps,
+			int nevent,
+			int * event_type,
+			int * event_direction,
+			int * event_terminal,
+			double * event_value,
+			int * event_nfound,
+			double ** event_t,
+			int ** event_indx,
+			double ** event_y,
+			double * stats,
+			volatile int * interrupted){
   //Set up the forces, first count
+  int ii, tid, nthreads;
   int dim;
-  struct potentialArg * potentialArgs= (struct potentialArg *) malloc ( npot * sizeof (struct potentialArg) );
-  parse_leapFuncArgs_Full(npot,potentialArgs,pot_type,pot_args);
+#ifdef _OPENMP
+  nthreads = omp_get_max_threads();
+  if ( nobj < nthreads ) nthreads= nobj > 0 ? nobj : 1;
+#else
+  nthreads = 1;
+#endif
+  //Each thread gets its own copy, because some potentials cache in args
+  struct potentialArg * potentialArgs= (struct potentialArg *) malloc ( nthreads * npot * sizeof (struct potentialArg) );
+  for (tid=0; tid < nthreads; tid++)
+    parse_leapFuncArgs_Full(npot,potentialArgs+tid*npot,pot_type,pot_args);
   //Integrate
   void (*odeint_func)(void (*func)(double, double *, double *,
 			   int, struct potentialArg *),
@@ -297,7 +370,8 @@ void integrateFullOrbit(double *yo,
 		      int, double, double *,
 		      int, struct potentialArg *,
 		      double, double,
-		      double *,int *);
+		      double *,int *,struct odeStats *,
+		      volatile int *);
   void (*odeint_deriv_func)(double, double *, double *,
 			    int,struct potentialArg *);
   switch ( odeint_type ) {
@@ -331,28 +405,81 @@ void integrateFullOrbit(double *yo,
     odeint_deriv_func= &evalRectDeriv;
     dim= 6;
     break;
+  case 6: //DOP853
+    odeint_func= &bovy_dop853;
+    odeint_deriv_func= &evalRectDeriv;
+    dim= 6;
+    break;
+  case 7: //Bulirsch-Stoer
+    odeint_func= &bovy_bs;
+    odeint_deriv_func= &evalRectDeriv;
+    dim= 6;
+    break;
+  }
+#pragma omp parallel for schedule(dynamic,CHUNKSIZE) private(tid,ii) num_threads(nthreads)
+  for (ii=0; ii < nobj; ii++){
+#ifdef _OPENMP
+    tid= omp_get_thread_num();
+#else
+    tid = 0;
+#endif
+    struct odeStats thisstats= {0,0,0,0.,0,0.};
+    if ( odeint_type == 5 && ( dense || nevent > 0 ) ) {
+      // DOPR54 w/ dense output and/or events
+      struct odeEvents events;
+      events.nevent= nevent;
+      events.type= event_type;
+      events.direction= event_direction;
+      events.terminal= event_terminal;
+      events.value= event_value;
+      events.maxfound= 0;
+      events.nfound= event_nfound+ii;
+      events.t= NULL;
+      events.indx= NULL;
+      events.y= NULL;
+      bovy_dopr54_dense(odeint_deriv_func,dim,yo+6*ii,nt,dt,t,npot,
+			potentialArgs+tid*npot,rtol,atol,result+6*nt*ii,err+ii,
+			dense ? dense_out+ii : NULL,dense_nsteps+ii,
+			nevent > 0 ? &events : NULL,&thisstats,interrupted);
+      *(event_t+ii)= events.t;
+      *(event_indx+ii)= events.indx;
+      *(event_y+ii)= events.y;
+    }
+    else
+      odeint_func(odeint_deriv_func,dim,yo+6*ii,nt,dt,t,npot,
+		  potentialArgs+tid*npot,rtol,atol,result+6*nt*ii,err+ii,
+		  &thisstats,interrupted);
+    *(stats+6*ii)= (double) thisstats.nfev;
+    *(stats+6*ii+1)= (double) thisstats.naccept;
+    *(stats+6*ii+2)= (double) thisstats.nreject;
+    *(stats+6*ii+3)= thisstats.dt;
+    *(stats+6*ii+4)= (double) thisstats.ntdone;
+    *(stats+6*ii+5)= thisstats.dtnext;
   }
-  odeint_func(odeint_deriv_func,dim,yo,nt,dt,t,npot,potentialArgs,rtol,atol,
-	      result,err);
   //Free allocated memory
-  free_potentialArgs(npot,potentialArgs);
+  for (tid=0; tid < nthreads; tid++)
+    free_potentialArgs(npot,potentialArgs+tid*npot);
   free(potentialArgs);
   //Done!
 }
-// LCOV_EXCL_START
-void integrateOrbit_dxdv(double *yo,
-			 int nt, 
-			 double *t,
-			 int npot,
-			 int * pot_type,
-			 double * pot_args,
-			 double rtol,
-			 double atol,
-			 double *result,
-			 int * err,
-			 int odeint_type){
+void integrateFullOrbit_dxdv(double *yo,
+			     int nt, 
+			     double *t,
+			     int npot,
+			     int * pot_type,
+			     double * pot_args,
+			     double dt,
+			     double rtol,
+			     double atol,
+			     double *result,
+			     int * err,
+			     int odeint_type,
+			     int ndev,
+			     volatile int * interrupted){
+  // ndev= 1 for a single deviation vector, 6 for the full state-transition
+  // matrix (six deviation vectors)
   //Set up the forces, first count
-  int dim;
+  int dim= 6*(1+ndev);
   struct potentialArg * potentialArgs= (struct potentialArg *) malloc ( npot * sizeof (struct potentialArg) );
   parse_leapFuncArgs_Full(npot,potentialArgs,pot_type,pot_args);
   //Integrate
@@ -363,49 +490,152 @@ void integrateOrbit_dxdv(double *yo,
 		      int, double, double *,
 		      int, struct potentialArg *,
 		      double, double,
-		      double *,int *);
-  void (*odeint_deriv_func)(double, double *, double *,
-			    int,struct potentialArg *);
+		      double *,int *,struct odeStats *,
+		      volatile int *);
   switch ( odeint_type ) {
-  case 0: //leapfrog
-    odeint_func= &leapfrog;
-    odeint_deriv_func= &evalRectForce;
-    dim= 6;
-    break;
   case 1: //RK4
     odeint_func= &bovy_rk4;
-    odeint_deriv_func= &evalRectDeriv_dxdv;
-    dim= 12;
     break;
   case 2: //RK6
     odeint_func= &bovy_rk6;
-    odeint_deriv_func= &evalRectDeriv_dxdv;
-    dim= 12;
     break;
-  case 3: //symplec4
-    odeint_func= &symplec4;
-    odeint_deriv_func= &evalRectForce;
-    dim= 6;
+  case 5: //DOPR54
+    odeint_func= &bovy_dopr54;
     break;
-  case 4: //symplec6
-    odeint_func= &symplec6;
-    odeint_deriv_func= &evalRectForce;
-    dim= 6;
+  case 6: //DOP853
+    odeint_func= &bovy_dop853;
+    break;
+  case 7: //Bulirsch-Stoer
+    odeint_func= &bovy_bs;
+    break;
+  }
+  odeint_func(ndev == 6 ? &evalRectDeriv_stm : &evalRectDeriv_dxdv,
+	      dim,yo,nt,dt,t,npot,potentialArgs,
+	      rtol,atol,result,err,NULL,interrupted);
+  //Free allocated memory
+  free_potentialArgs(npot,potentialArgs);
+  free(potentialArgs);
+  //Done!
+}
+void integrateFullOrbit_lyapunov(int nobj,
+				 double *yo,
+				 double *dyo,
+				 int nt, 
+				 double *t,
+				 int npot,
+				 int * pot_type,
+				 double * pot_args,
+				 double dt,
+				 double rtol,
+				 double atol,
+				 double *result,
+				 double *lyap,
+				 double *megno,
+				 int * err,
+				 int odeint_type,
+				 double * stats,
+				 volatile int * interrupted){
+  /*
+    Integrate orbits together with a deviation vector, renormalizing the 
+    deviation vector at each output time, to compute the maximal Lyapunov 
+    exponent and the mean MEGNO (Cincotta & Simo 2000) of each orbit; 
+    the deviation vector and the MEGNO integrals are not stored
+  */
+  int ii, tid, nthreads;
+  int dim= 15; // [x,v,dx,dv,MEGNO integrals (2),time since start]
+#ifdef _OPENMP
+  nthreads = omp_get_max_threads();
+  if ( nobj < nthreads ) nthreads= nobj > 0 ? nobj : 1;
+#else
+  nthreads = 1;
+#endif
+  //Each thread gets its own copy, because some potentials cache in args
+  struct potentialArg * potentialArgs= (struct potentialArg *) malloc ( nthreads * npot * sizeof (struct potentialArg) );
+  for (tid=0; tid < nthreads; tid++)
+    parse_leapFuncArgs_Full(npot,potentialArgs+tid*npot,pot_type,pot_args);
+  //Integrate
+  void (*odeint_func)(void (*func)(double, double *, double *,
+			   int, struct potentialArg *),
+		      int,
+		      double *,
+		      int, double, double *,
+		      int, struct potentialArg *,
+		      double, double,
+		      double *,int *,struct odeStats *,
+		      volatile int *);
+  switch ( odeint_type ) {
+  case 1: //RK4
+    odeint_func= &bovy_rk4;
+    break;
+  case 2: //RK6
+    odeint_func= &bovy_rk6;
     break;
   case 5: //DOPR54
     odeint_func= &bovy_dopr54;
-    odeint_deriv_func= &evalRectDeriv_dxdv;
-    dim= 12;
     break;
+  case 6: //DOP853
+    odeint_func= &bovy_dop853;
+    break;
+  case 7: //Bulirsch-Stoer
+    odeint_func= &bovy_bs;
+    break;
+  }
+#pragma omp parallel for schedule(dynamic,CHUNKSIZE) private(tid,ii) num_threads(nthreads)
+  for (ii=0; ii < nobj; ii++){
+#ifdef _OPENMP
+    tid= omp_get_thread_num();
+#else
+    tid = 0;
+#endif
+    int jj, kk, thiserr;
+    double y[15], ytmp[30], dnorm, lnsum= 0.;
+    double thisdt= dt;
+    struct odeStats thisstats= {0,0,0,0.,0,0.};
+    *(err+ii)= 0;
+    for (kk=0; kk < 6; kk++) {
+      y[kk]= *(yo+6*ii+kk);
+      y[6+kk]= *(dyo+6*ii+kk);
+    }
+    for (kk=12; kk < 15; kk++) y[kk]= 0.;
+    // Start from a unit deviation vector
+    dnorm= 0.;
+    for (kk=6; kk < 12; kk++) dnorm+= y[kk]*y[kk];
+    dnorm= sqrt(dnorm);
+    for (kk=6; kk < 12; kk++) y[kk]/= dnorm;
+    for (kk=0; kk < 6; kk++) *(result+6*nt*ii+kk)= y[kk];
+    for (jj=0; jj < (nt-1); jj++){
+      odeint_func(&evalRectDeriv_megno,dim,y,2,thisdt,t+jj,npot,
+		  potentialArgs+tid*npot,rtol,atol,ytmp,&thiserr,&thisstats,
+		  interrupted);
+      if ( thiserr != 0 ) *(err+ii)= thiserr;
+      if ( thisstats.ntdone < 2 ) break; // interrupted
+      for (kk=0; kk < dim; kk++) y[kk]= ytmp[dim+kk];
+      thisdt= thisstats.dtnext;
+      //Renormalize the deviation vector
+      dnorm= 0.;
+      for (kk=6; kk < 12; kk++) dnorm+= y[kk]*y[kk];
+      dnorm= sqrt(dnorm);
+      lnsum+= log(dnorm);
+      for (kk=6; kk < 12; kk++) y[kk]/= dnorm;
+      for (kk=0; kk < 6; kk++) *(result+6*nt*ii+6*(jj+1)+kk)= y[kk];
+    }
+    // Outputs that were not reached because of an interrupt are NaN
+    for (kk=6*(jj+1); kk < 6*nt; kk++) *(result+6*nt*ii+kk)= NAN;
+    *(lyap+ii)= jj > 0 ? lnsum/(*(t+jj)-*t) : NAN;
+    *(megno+ii)= y[14] != 0. ? y[13]/y[14] : NAN;
+    *(stats+6*ii)= (double) thisstats.nfev;
+    *(stats+6*ii+1)= (double) thisstats.naccept;
+    *(stats+6*ii+2)= (double) thisstats.nreject;
+    *(stats+6*ii+3)= thisstats.dt;
+    *(stats+6*ii+4)= (double) (jj+1);
+    *(stats+6*ii+5)= thisstats.dtnext;
   }
-  odeint_func(odeint_deriv_func,dim,yo,nt,-9999.99,t,npot,potentialArgs,
-	      rtol,atol,result,err);
   //Free allocated memory
-  free_potentialArgs(npot,potentialArgs);
+  for (tid=0; tid < nthreads; tid++)
+    free_potentialArgs(npot,potentialArgs+tid*npot);
   free(potentialArgs);
   //Done!
 }
-// LCOV_EXCL_STOP
 void evalRectForce(double t, double *q, double *a,
 		   int nargs, struct potentialArg * potentialArgs){
   double sinphi, cosphi, x, y, phi,R,Rforce,phiforce, z, zforce;
@@ -452,64 +682,81 @@ void evalRectDeriv(double t, double *q, double *a,
   *a= zforce;
 }
 
-// LCOV_EXCL_START
+void evalRectTangentForce(double t, double *q, double *dq, double *da,
+			  int nargs, struct potentialArg * potentialArgs){
+  // The change in the force along the deviation dq, i.e., the Jacobian of 
+  // the force times dq, computed as a central finite difference along dq, 
+  // such that only the forces of the potentials are necessary
+  int ii;
+  double qnorm= 0., dqnorm= 0., h;
+  double qp[3], qm[3], ap[3], am[3];
+  for (ii=0; ii < 3; ii++) {
+    qnorm+= *(q+ii) * *(q+ii);
+    dqnorm+= *(dq+ii) * *(dq+ii);
+  }
+  if ( dqnorm == 0. ) {
+    for (ii=0; ii < 3; ii++) *(da+ii)= 0.;
+    return;
+  }
+  qnorm= sqrt(qnorm);
+  h= _TANGENT_FD_STEP * ( qnorm > 1. ? qnorm : 1. ) / sqrt(dqnorm);
+  for (ii=0; ii < 3; ii++) {
+    qp[ii]= *(q+ii) + h * *(dq+ii);
+    qm[ii]= *(q+ii) - h * *(dq+ii);
+  }
+  evalRectForce(t,qp,ap,nargs,potentialArgs);
+  evalRectForce(t,qm,am,nargs,potentialArgs);
+  for (ii=0; ii < 3; ii++) *(da+ii)= 0.5 * ( ap[ii] - am[ii] ) / h;
+}
 void evalRectDeriv_dxdv(double t, double *q, double *a,
 			int nargs, struct potentialArg * potentialArgs){
-  double sinphi, cosphi, x, y, phi,R,Rforce,phiforce,z,zforce;
-  double R2deriv, phi2deriv, Rphideriv, dFxdx, dFxdy, dFydx, dFydy;
   //first three derivatives are just the velocities
-  *a++= *(q+3);
-  *a++= *(q+4);
-  *a++= *(q+5);
+  *a= *(q+3);
+  *(a+1)= *(q+4);
+  *(a+2)= *(q+5);
   //Rest is force
-  //q is rectangular so calculate R and phi
-  x= *q;
-  y= *(q+1);
-  z= *(q+2);
-  R= sqrt(x*x+y*y);
-  phi= acos(x/R);
-  sinphi= y/R;
-  cosphi= x/R;
-  if ( y < 0. ) phi= 2.*M_PI-phi;
-  //Calculate the forces
-  Rforce= calcRforce(R,z,phi,t,nargs,potentialArgs);
-  zforce= calczforce(R,z,phi,t,nargs,potentialArgs);
-  phiforce= calcPhiforce(R,z,phi,t,nargs,potentialArgs);
-  *a++= cosphi*Rforce-1./R*sinphi*phiforce;
-  *a++= sinphi*Rforce+1./R*cosphi*phiforce;
-  *a++= zforce;
+  evalRectForce(t,q,a+3,nargs,potentialArgs);
   //dx derivatives are just dv
-  *a++= *(q+9);
-  *a++= *(q+10);
-  *a++= *(q+11);
-  //for the dv derivatives we need also R2deriv, phi2deriv, and Rphideriv
-  R2deriv= calcR2deriv(R,z,phi,t,nargs,potentialArgs);
-  phi2deriv= calcphi2deriv(R,z,phi,t,nargs,potentialArgs);
-  Rphideriv= calcRphideriv(R,z,phi,t,nargs,potentialArgs);
-  //..and dFxdx, dFxdy, dFydx, dFydy
-  dFxdx= -cosphi*cosphi*R2deriv
-    +2.*cosphi*sinphi/R/R*phiforce
-    +sinphi*sinphi/R*Rforce
-    +2.*sinphi*cosphi/R*Rphideriv
-    -sinphi*sinphi/R/R*phi2deriv;
-  dFxdy= -sinphi*cosphi*R2deriv
-    +(sinphi*sinphi-cosphi*cosphi)/R/R*phiforce
-    -cosphi*sinphi/R*Rforce
-    -(cosphi*cosphi-sinphi*sinphi)/R*Rphideriv
-    +cosphi*sinphi/R/R*phi2deriv;
-  dFydx= -cosphi*sinphi*R2deriv
-    +(sinphi*sinphi-cosphi*cosphi)/R/R*phiforce
-    +(sinphi*sinphi-cosphi*cosphi)/R*Rphideriv
-    -sinphi*cosphi/R*Rforce
-    +sinphi*cosphi/R/R*phi2deriv;
-  dFydy= -sinphi*sinphi*R2deriv
-    -2.*sinphi*cosphi/R/R*phiforce
-    -2.*sinphi*cosphi/R*Rphideriv
-    +cosphi*cosphi/R*Rforce
-    -cosphi*cosphi/R/R*phi2deriv;
-  *a++= dFxdx * *(q+4) + dFxdy * *(q+5);
-  *a++= dFydx * *(q+4) + dFydy * *(q+5);
-  *a= 0; //BOVY: PUT IN Z2DERIVS
+  *(a+6)= *(q+9);
+  *(a+7)= *(q+10);
+  *(a+8)= *(q+11);
+  //dv derivatives are the change in the force along dx
+  evalRectTangentForce(t,q,q+6,a+9,nargs,potentialArgs);
+}
+void evalRectDeriv_stm(double t, double *q, double *a,
+		       int nargs, struct potentialArg * potentialArgs){
+  // q= [x,v,dx_1,dv_1,...,dx_6,dv_6]: the orbit and six deviation vectors
+  int ii;
+  //first three derivatives are just the velocities
+  *a= *(q+3);
+  *(a+1)= *(q+4);
+  *(a+2)= *(q+5);
+  //Rest is force
+  evalRectForce(t,q,a+3,nargs,potentialArgs);
+  for (ii=1; ii < 7; ii++) {
+    //dx derivatives are just dv
+    *(a+6*ii)= *(q+6*ii+3);
+    *(a+6*ii+1)= *(q+6*ii+4);
+    *(a+6*ii+2)= *(q+6*ii+5);
+    //dv derivatives are the change in the force along dx
+    evalRectTangentForce(t,q,q+6*ii,a+6*ii+3,nargs,potentialArgs);
+  }
+}
+void evalRectDeriv_megno(double t, double *q, double *a,
+			 int nargs, struct potentialArg * potentialArgs){
+  /*
+    q= [x,v,dx,dv,I1,I2,s] with s the time since the start, 
+    I1= int ds s (d delta/ds . delta) / |delta|^2, and I2= int ds 2 I1 / s, 
+    such that MEGNO Y= 2 I1 / s and its mean <Y>= I2 / s
+  */
+  int ii;
+  double dnorm2= 0., ddotd= 0.;
+  evalRectDeriv_dxdv(t,q,a,nargs,potentialArgs);
+  for (ii=6; ii < 12; ii++) {
+    dnorm2+= *(q+ii) * *(q+ii);
+    ddotd+= *(a+ii) * *(q+ii);
+  }
+  *(a+12)= dnorm2 > 0. ? ddotd / dnorm2 * *(q+14) : 0.;
+  *(a+13)= *(q+14) != 0. ? 2. * *(q+12) / *(q+14) : 0.;
+  *(a+14)= 1.;
 }
-
-// LCOV_EXCL_STOP
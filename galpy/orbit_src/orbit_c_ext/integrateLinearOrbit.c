@@ -0,0 +1,181 @@
+/*
+  Wrappers around the C integration code for linear Orbits
+*/
+#include <stdio.h>
+#include <stdlib.h>
+#include <stdbool.h>
+#include <math.h>
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+#define CHUNKSIZE 1
+#include <bovy_symplecticode.h>
+#include <bovy_rk.h>
+//Potentials
+#include <galpy_potentials.h>
+#include <integrateFullOrbit.h>
+/*
+  Function Declarations
+*/
+void evalLinearForce(double, double *, double *,
+		     int, struct potentialArg *);
+void evalLinearDeriv(double, double *, double *,
+		     int, struct potentialArg *);
+/*
+  Actual functions
+*/
+void parse_leapFuncArgs_Linear(int npot,struct potentialArg * potentialArgs,
+			       int * pot_type,
+			       double * pot_args){
+  int ii,jj;
+  init_potentialArgs(npot,potentialArgs);
+  for (ii=0; ii < npot; ii++){
+    switch ( *pot_type++ ) {
+    case 31: //KGPotential, 4 arguments
+      potentialArgs->linearForce= &KGPotentialLinearForce;
+      potentialArgs->nargs= 4;
+      break;
+    case 32: //verticalPotential, 4 arguments
+      potentialArgs->linearForce= &verticalPotentialLinearForce;
+      potentialArgs->nargs= 4;
+      break;
+    }
+    if ( *(pot_type-1) == 32 ) { // Parse the 3D potential, like for wrappers
+      potentialArgs->nwrapped= (int) *pot_args++;
+      potentialArgs->wrappedPotentialArg= \
+	(struct potentialArg *) malloc ( potentialArgs->nwrapped	\
+					 * sizeof (struct potentialArg) );
+      parse_leapFuncArgs_Full(potentialArgs->nwrapped,
+			      potentialArgs->wrappedPotentialArg,
+			      pot_type,pot_args+1);
+      pot_type+= potentialArgs->nwrapped;
+      pot_args+= ( (int) *pot_args ) +  1;
+    }
+    potentialArgs->args= (double *) malloc( potentialArgs->nargs * sizeof(double));
+    for (jj=0; jj < potentialArgs->nargs; jj++){
+      *(potentialArgs->args)= *pot_args++;
+      potentialArgs->args++;
+    }
+    potentialArgs->args-= potentialArgs->nargs;
+    potentialArgs++;
+  }
+  potentialArgs-= npot;
+}
+void integrateLinearOrbit(int nobj,
+			  double *yo,
+			  int nt,
+			  double *t,
+			  int npot,
+			  int * pot_type,
+			  double * pot_args,
+			  double dt,
+			  double rtol,
+			  double atol,
+			  double *result,
+			  int * err,
+			  int odeint_type,
+			  double * stats,
+			  volatile int * interrupted){
+  //Set up the forces, first count
+  int ii, tid, nthreads;
+  int dim;
+#ifdef _OPENMP
+  nthreads = omp_get_max_threads();
+  if ( nobj < nthreads ) nthreads= nobj > 0 ? nobj : 1;
+#else
+  nthreads = 1;
+#endif
+  //Each thread gets its own copy, because some potentials cache in args
+  struct potentialArg * potentialArgs= (struct potentialArg *) malloc ( nthreads * npot * sizeof (struct potentialArg) );
+  for (tid=0; tid < nthreads; tid++)
+    parse_leapFuncArgs_Linear(npot,potentialArgs+tid*npot,pot_type,pot_args);
+  //Integrate
+  void (*odeint_func)(void (*func)(double, double *, double *,
+			   int, struct potentialArg *),
+		      int,
+		      double *,
+		      int, double, double *,
+		      int, struct potentialArg *,
+		      double, double,
+		      double *,int *,struct odeStats *,
+		      volatile int *);
+  void (*odeint_deriv_func)(double, double *, double *,
+			    int,struct potentialArg *);
+  switch ( odeint_type ) {
+  case 0: //leapfrog
+    odeint_func= &leapfrog;
+    odeint_deriv_func= &evalLinearForce;
+    dim= 1;
+    break;
+  case 1: //RK4
+    odeint_func= &bovy_rk4;
+    odeint_deriv_func= &evalLinearDeriv;
+    dim= 2;
+    break;
+  case 2: //RK6
+    odeint_func= &bovy_rk6;
+    odeint_deriv_func= &evalLinearDeriv;
+    dim= 2;
+    break;
+  case 3: //symplec4
+    odeint_func= &symplec4;
+    odeint_deriv_func= &evalLinearForce;
+    dim= 1;
+    break;
+  case 4: //symplec6
+    odeint_func= &symplec6;
+    odeint_deriv_func= &evalLinearForce;
+    dim= 1;
+    break;
+  case 5: //DOPR54
+    odeint_func= &bovy_dopr54;
+    odeint_deriv_func= &evalLinearDeriv;
+    dim= 2;
+    break;
+  case 6: //DOP853
+    odeint_func= &bovy_dop853;
+    odeint_deriv_func= &evalLinearDeriv;
+    dim= 2;
+    break;
+  case 7: //Bulirsch-Stoer
+    odeint_func= &bovy_bs;
+    odeint_deriv_func= &evalLinearDeriv;
+    dim= 2;
+    break;
+  }
+#pragma omp parallel for schedule(dynamic,CHUNKSIZE) private(tid,ii) num_threads(nthreads)
+  for (ii=0; ii < nobj; ii++){
+#ifdef _OPENMP
+    tid= omp_get_thread_num();
+#else
+    tid = 0;
+#endif
+    struct odeStats thisstats= {0,0,0,0.,0,0.};
+    odeint_func(odeint_deriv_func,dim,yo+2*ii,nt,dt,t,npot,
+		potentialArgs+tid*npot,rtol,atol,result+2*nt*ii,err+ii,
+		&thisstats,interrupted);
+    *(stats+6*ii)= (double) thisstats.nfev;
+    *(stats+6*ii+1)= (double) thisstats.naccept;
+    *(stats+6*ii+2)= (double) thisstats.nreject;
+    *(stats+6*ii+3)= thisstats.dt;
+    *(stats+6*ii+4)= (double) thisstats.ntdone;
+    *(stats+6*ii+5)= thisstats.dtnext;
+  }
+  //Free allocated memory
+  for (tid=0; tid < nthreads; tid++)
+    free_potentialArgs(npot,potentialArgs+tid*npot);
+  free(potentialArgs);
+  //Done!
+}
+
+void evalLinearForce(double t, double *q, double *a,
+		     int nargs, struct potentialArg * potentialArgs){
+  *a= calcLinearForce(*q,t,nargs,potentialArgs);
+}
+void evalLinearDeriv(double t, double *q, double *a,
+		     int nargs, struct potentialArg * potentialArgs){
+  //first derivative is just the velocity
+  *a++= *(q+1);
+  //Rest is force
+  *a= calcLinearForce(*q,t,nargs,potentialArgs);
+}
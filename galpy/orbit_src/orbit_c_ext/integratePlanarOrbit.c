@@ -4,7 +4,12 @@
 #include <stdio.h>
 #include <stdlib.h>
 #include <stdbool.h>
+#include <string.h>
 #include <math.h>
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+#define CHUNKSIZE 1
 #include <bovy_symplecticode.h>
 #include <bovy_rk.h>
 //Potentials
@@ -28,6 +33,7 @@ void parse_leapFuncArgs(int npot,struct potentialArg * potentialArgs,
 			int * pot_type,
 			double * pot_args){
   int ii,jj;
+  int wrap_offset;
   init_potentialArgs(npot,potentialArgs);
   for (ii=0; ii < npot; ii++){
     switch ( *pot_type++ ) {
@@ -235,6 +241,36 @@ void parse_leapFuncArgs(int npot,struct potentialArg * potentialArgs,
       potentialArgs->planarRphideriv= &CosmphiDiskPotentialRphideriv;
       potentialArgs->nargs= 9;
       break;
+    case 29: //FerrersPotential, 22 arguments + 2 x glorder
+      potentialArgs->planarRforce= &FerrersPotentialPlanarRforce;
+      potentialArgs->planarphiforce= &FerrersPotentialPlanarphiforce;
+      potentialArgs->planarR2deriv= &FerrersPotentialPlanarR2deriv;
+      potentialArgs->planarphi2deriv= &FerrersPotentialPlanarphi2deriv;
+      potentialArgs->planarRphideriv= &FerrersPotentialPlanarRphideriv;
+      potentialArgs->nargs= (int) (22 + 2 * *(pot_args+7));
+      break;
+    case 30: //MovingObjectPotential, 5 arguments + nbreak breakpoints + coefficients
+      potentialArgs->planarRforce= &MovingObjectPotentialPlanarRforce;
+      potentialArgs->planarphiforce= &MovingObjectPotentialPlanarphiforce;
+      potentialArgs->nargs= (int) (5 + *(pot_args+3)
+				   + 3 * *(pot_args+4) * ( *(pot_args+3) - 1 ));
+      break;
+    case 33: //CallbackPotential, 8 arguments
+      potentialArgs->planarRforce= &CallbackPotentialPlanarRforce;
+      potentialArgs->planarphiforce= &CallbackPotentialPlanarphiforce;
+      potentialArgs->planarR2deriv= &CallbackPotentialPlanarR2deriv;
+      potentialArgs->planarphi2deriv= &CallbackPotentialPlanarphi2deriv;
+      potentialArgs->planarRphideriv= &CallbackPotentialPlanarRphideriv;
+      potentialArgs->nargs= 8;
+      break;
+    case 34: //interp3DPotential, wraps the original potential, 21 arguments + 4 grids
+      potentialArgs->planarRforce= &interp3DPotentialPlanarRforce;
+      potentialArgs->planarphiforce= &interp3DPotentialPlanarphiforce;
+      wrap_offset= 2 + (int) *(pot_args+1);
+      potentialArgs->nargs= (int) (21 + 4 * *(pot_args+wrap_offset+3)
+				   * *(pot_args+wrap_offset+7)
+				   * *(pot_args+wrap_offset+11));
+      break;
 //////////////////////////////// WRAPPERS /////////////////////////////////////
     case -1: //DehnenSmoothWrapperPotential
       potentialArgs->planarRforce= &DehnenSmoothWrapperPotentialPlanarRforce;
@@ -253,7 +289,7 @@ void parse_leapFuncArgs(int npot,struct potentialArg * potentialArgs,
       potentialArgs->nargs= (int) 3;
       break;
     }
-    if ( *(pot_type-1) < 0) { // Parse wrapped potential for wrappers
+    if ( *(pot_type-1) < 0 || *(pot_type-1) == 34 ) { // Parse wrapped potential for wrappers and interp3DPotential
       potentialArgs->nwrapped= (int) *pot_args++;
       potentialArgs->wrappedPotentialArg= \
 	(struct potentialArg *) malloc ( potentialArgs->nwrapped	\
@@ -274,7 +310,8 @@ void parse_leapFuncArgs(int npot,struct potentialArg * potentialArgs,
   }
   potentialArgs-= npot;
 }
-void integratePlanarOrbit(double *yo,
+void integratePlanarOrbit(int nobj,
+			  double *yo,
 			  int nt, 
 			  double *t,
 			  int npot,
@@ -285,11 +322,34 @@ void integratePlanarOrbit(double *yo,
 			  double atol,
 			  double *result,
 			  int * err,
-			  int odeint_type){
+			  int odeint_type,
+			  int dense,
+			  double ** dense_out,
+			  int * dense_nsteps,
+			  int nevent,
+			  int * event_type,
+			  int * event_direction,
+			  int * event_terminal,
+			  double * event_value,
+			  int * event_nfound,
+			  double ** event_t,
+			  int ** event_indx,
+			  double ** event_y,
+			  double * stats,
+			  volatile int * interrupted){
   //Set up the forces, first count
+  int ii, tid, nthreads;
   int dim;
-  struct potentialArg * potentialArgs= (struct potentialArg *) malloc ( npot * sizeof (struct potentialArg) );
-  parse_leapFuncArgs(npot,potentialArgs,pot_type,pot_args);
+#ifdef _OPENMP
+  nthreads = omp_get_max_threads();
+  if ( nobj < nthreads ) nthreads= nobj > 0 ? nobj : 1;
+#else
+  nthreads = 1;
+#endif
+  //Each thread gets its own copy, because some potentials cache in args
+  struct potentialArg * potentialArgs= (struct potentialArg *) malloc ( nthreads * npot * sizeof (struct potentialArg) );
+  for (tid=0; tid < nthreads; tid++)
+    parse_leapFuncArgs(npot,potentialArgs+tid*npot,pot_type,pot_args);
   //Integrate
   void (*odeint_func)(void (*func)(double, double *, double *,
 			   int, struct potentialArg *),
@@ -298,7 +358,8 @@ void integratePlanarOrbit(double *yo,
 		      int, double, double *,
 		      int, struct potentialArg *,
 		      double, double,
-		      double *,int *);
+		      double *,int *,struct odeStats *,
+		      volatile int *);
   void (*odeint_deriv_func)(double, double *, double *,
 			    int,struct potentialArg *);
   switch ( odeint_type ) {
@@ -332,11 +393,60 @@ void integratePlanarOrbit(double *yo,
     odeint_deriv_func= &evalPlanarRectDeriv;
     dim= 4;
     break;
+  case 6: //DOP853
+    odeint_func= &bovy_dop853;
+    odeint_deriv_func= &evalPlanarRectDeriv;
+    dim= 4;
+    break;
+  case 7: //Bulirsch-Stoer
+    odeint_func= &bovy_bs;
+    odeint_deriv_func= &evalPlanarRectDeriv;
+    dim= 4;
+    break;
+  }
+#pragma omp parallel for schedule(dynamic,CHUNKSIZE) private(tid,ii) num_threads(nthreads)
+  for (ii=0; ii < nobj; ii++){
+#ifdef _OPENMP
+    tid= omp_get_thread_num();
+#else
+    tid = 0;
+#endif
+    struct odeStats thisstats= {0,0,0,0.,0,0.};
+    if ( odeint_type == 5 && ( dense || nevent > 0 ) ) {
+      // DOPR54 w/ dense output and/or events
+      struct odeEvents events;
+      events.nevent= nevent;
+      events.type= event_type;
+      events.direction= event_direction;
+      events.terminal= event_terminal;
+      events.value= event_value;
+      events.maxfound= 0;
+      events.nfound= event_nfound+ii;
+      events.t= NULL;
+      events.indx= NULL;
+      events.y= NULL;
+      bovy_dopr54_dense(odeint_deriv_func,dim,yo+4*ii,nt,dt,t,npot,
+			potentialArgs+tid*npot,rtol,atol,result+4*nt*ii,err+ii,
+			dense ? dense_out+ii : NULL,dense_nsteps+ii,
+			nevent > 0 ? &events : NULL,&thisstats,interrupted);
+      *(event_t+ii)= events.t;
+      *(event_indx+ii)= events.indx;
+      *(event_y+ii)= events.y;
+    }
+    else
+      odeint_func(odeint_deriv_func,dim,yo+4*ii,nt,dt,t,npot,
+		  potentialArgs+tid*npot,rtol,atol,result+4*nt*ii,err+ii,
+		  &thisstats,interrupted);
+    *(stats+6*ii)= (double) thisstats.nfev;
+    *(stats+6*ii+1)= (double) thisstats.naccept;
+    *(stats+6*ii+2)= (double) thisstats.nreject;
+    *(stats+6*ii+3)= thisstats.dt;
+    *(stats+6*ii+4)= (double) thisstats.ntdone;
+    *(stats+6*ii+5)= thisstats.dtnext;
   }
-  odeint_func(odeint_deriv_func,dim,yo,nt,dt,t,npot,potentialArgs,rtol,atol,
-	      result,err);
   //Free allocated memory
-  free_potentialArgs(npot,potentialArgs);
+  for (tid=0; tid < nthreads; tid++)
+    free_potentialArgs(npot,potentialArgs+tid*npot);
   free(potentialArgs);
   //Done!
 }
@@ -352,7 +462,8 @@ void integratePlanarOrbit_dxdv(double *yo,
 			       double atol,
 			       double *result,
 			       int * err,
-			       int odeint_type){
+			       int odeint_type,
+			       volatile int * interrupted){
   //Set up the forces, first count
   int dim;
   struct potentialArg * potentialArgs= (struct potentialArg *) malloc ( npot * sizeof (struct potentialArg) );
@@ -365,7 +476,8 @@ void integratePlanarOrbit_dxdv(double *yo,
 		      int, double, double *,
 		      int, struct potentialArg *,
 		      double, double,
-		      double *,int *);
+		      double *,int *,struct odeStats *,
+		      volatile int *);
   void (*odeint_deriv_func)(double, double *, double *,
 			    int,struct potentialArg *);
   switch ( odeint_type ) {
@@ -384,9 +496,19 @@ void integratePlanarOrbit_dxdv(double *yo,
     odeint_deriv_func= &evalPlanarRectDeriv_dxdv;
     dim= 8;
     break;
+  case 6: //DOP853
+    odeint_func= &bovy_dop853;
+    odeint_deriv_func= &evalPlanarRectDeriv_dxdv;
+    dim= 8;
+    break;
+  case 7: //Bulirsch-Stoer
+    odeint_func= &bovy_bs;
+    odeint_deriv_func= &evalPlanarRectDeriv_dxdv;
+    dim= 8;
+    break;
   }
   odeint_func(odeint_deriv_func,dim,yo,nt,dt,t,npot,potentialArgs,rtol,atol,
-	      result,err);
+	      result,err,NULL,interrupted);
   //Free allocated memory
   free_potentialArgs(npot,potentialArgs);
   free(potentialArgs);
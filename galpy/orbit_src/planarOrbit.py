@@ -5,6 +5,7 @@ from scipy import integrate
 import galpy.util.bovy_symplecticode as symplecticode
 from galpy.util.bovy_conversion import physical_conversion
 from galpy.orbit_src.OrbitTop import OrbitTop
+from galpy.orbit_src.IntegrationStats import IntegrationStats
 from galpy.potential_src.planarPotential import _evaluateplanarRforces,\
     RZToplanarPotential, toPlanarPotential, _evaluateplanarphiforces,\
     _evaluateplanarPotentials
@@ -73,8 +74,7 @@ class planarOrbitTop(OrbitTop):
             return (rap-rperi)/(rap+rperi)
         if not hasattr(self,'orbit'):
             raise AttributeError("Integrate the orbit first")
-        if not hasattr(self,'rs'):
-            self.rs= self.orbit[:,0]
+        self._setup_rs()
         return (nu.amax(self.rs)-nu.amin(self.rs))/(nu.amax(self.rs)+nu.amin(self.rs))
 
     @physical_conversion('energy')
@@ -144,8 +144,7 @@ class planarOrbitTop(OrbitTop):
             return rap
         if not hasattr(self,'orbit'):
             raise AttributeError("Integrate the orbit first")
-        if not hasattr(self,'rs'):
-            self.rs= self.orbit[:,0]
+        self._setup_rs()
         return nu.amax(self.rs)
 
     @physical_conversion('position')
@@ -169,14 +168,22 @@ class planarOrbitTop(OrbitTop):
             return rperi
         if not hasattr(self,'orbit'):
             raise AttributeError("Integrate the orbit first")
-        if not hasattr(self,'rs'):
-            self.rs= self.orbit[:,0]
+        self._setup_rs()
         return nu.amin(self.rs)
 
     @physical_conversion('position')
     def zmax(self,pot=None,analytic=False,**kwargs):
         raise AttributeError("planarOrbit does not have a zmax")    
 
+    def _setup_rs(self):
+        """Set up the radii along the orbit, including those at the events (e.g., peri- and apocenters) found during the integration"""
+        if hasattr(self,'rs'): return None
+        rs= self.orbit[:,0]
+        for et, ey in getattr(self,'_events',{}).values():
+            rs= nu.hstack((rs,ey[:,0]))
+        self.rs= rs[True^nu.isnan(rs)]
+        return None
+
 class planarROrbit(planarOrbitTop):
     """Class representing a planar orbit, without \phi. Useful for 
     orbit-integration in axisymmetric potentials when you don't care about the
@@ -217,7 +224,7 @@ class planarROrbit(planarOrbitTop):
                           ro=ro,zo=zo,vo=vo,solarmotion=solarmotion)
         return None
 
-    def integrate(self,t,pot,method='symplec4_c',dt=None):
+    def integrate(self,t,pot,method='symplec4_c',dt=None,walltime=None):
         """
         NAME:
            integrate
@@ -232,7 +239,10 @@ class planarROrbit(planarOrbitTop):
                    'rk4_c' for a 4th-order Runge-Kutta integrator in C
                    'rk6_c' for a 6-th order Runge-Kutta integrator in C
                    'dopr54_c' for a Dormand-Prince integrator in C (generally the fastest)
+                   'dop853_c' for an 8th-order Dormand-Prince integrator in C (fastest at tight tolerances)
+                   'bulirschstoer_c' for a Bulirsch-Stoer integrator with adaptive order in C (also efficient at tight tolerances)
            dt= (None) if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize
+           walltime= (None) wall-clock budget for the integration in s (only for the C integrators); when exceeded, the orbit is only integrated up to the last output time reached and the state to continue from is stored
         OUTPUT:
            error message number (get the actual orbit using getOrbit()
         HISTORY:
@@ -243,7 +253,10 @@ class planarROrbit(planarOrbitTop):
         thispot= RZToplanarPotential(pot)
         self.t= nu.array(t)
         self._pot= thispot
-        self.orbit, msg= _integrateROrbit(self.vxvv,thispot,t,method,dt)
+        self.orbit, msg, self._stats, checkpoint= \
+            _integrateROrbit(self.vxvv,thispot,t,method,dt,stats=True,
+                             walltime=walltime,checkpoint=True)
+        self._set_checkpoint(checkpoint,thispot,method,None)
         return msg
 
     @physical_conversion('energy')
@@ -338,7 +351,8 @@ class planarOrbit(planarOrbitTop):
                           ro=ro,zo=zo,vo=vo,solarmotion=solarmotion)
         return None
 
-    def integrate(self,t,pot,method='symplec4_c',dt=None):
+    def integrate(self,t,pot,method='symplec4_c',dt=None,events=None,
+                  walltime=None,dense=False):
         """
         NAME:
            integrate
@@ -353,7 +367,12 @@ class planarOrbit(planarOrbitTop):
                    'rk4_c' for a 4th-order Runge-Kutta integrator in C
                    'rk6_c' for a 6-th order Runge-Kutta integrator in C
                    'dopr54_c' for a Dormand-Prince integrator in C (generally the fastest)
+                   'dop853_c' for an 8th-order Dormand-Prince integrator in C (fastest at tight tolerances)
+                   'bulirschstoer_c' for a Bulirsch-Stoer integrator with adaptive order in C (also efficient at tight tolerances)
            dt= (None) if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize
+           events= (None) list of events to detect during the integration (only for method='dopr54_c'): 'pericenter', 'apocenter', or ('escape',r) to stop the integration at radius r
+           dense= (False) if True, keep the dense output of the integrator (only for method='dopr54_c') to evaluate the orbit at any time within the integration range
+           walltime= (None) wall-clock budget for the integration in s (only for the C integrators); when exceeded, the orbit is only integrated up to the last output time reached and the state to continue from is stored
         OUTPUT:
            (none) (get the actual orbit using getOrbit()
         HISTORY:
@@ -364,7 +383,14 @@ class planarOrbit(planarOrbitTop):
         thispot= toPlanarPotential(pot)
         self.t= nu.array(t)
         self._pot= thispot
-        self.orbit, msg= _integrateOrbit(self.vxvv,thispot,t,method,dt)
+        out= _integrateOrbit(self.vxvv,thispot,t,method,dt,dense=dense,
+                             events=events,stats=True,
+                             walltime=walltime,checkpoint=True)
+        self.orbit, msg= out[:2]
+        self._dense= out[2] if dense else None
+        self._events= out[2+dense] if not events is None else {}
+        self._stats= out[-2]
+        self._set_checkpoint(out[-1],thispot,method,events,dense=dense)
         return msg
 
     def integrate_dxdv(self,dxdv,t,pot,method='dopr54_c',
@@ -382,6 +408,8 @@ class planarOrbit(planarOrbitTop):
                    'rk4_c' for a 4th-order Runge-Kutta integrator in C
                    'rk6_c' for a 6-th order Runge-Kutta integrator in C
                    'dopr54_c' for a Dormand-Prince integrator in C (generally the fastest)
+                   'dop853_c' for an 8th-order Dormand-Prince integrator in C (fastest at tight tolerances)
+                   'bulirschstoer_c' for a Bulirsch-Stoer integrator with adaptive order in C (also efficient at tight tolerances)
            rectIn= (False) if True, input dxdv is in rectangular coordinates
            rectOut= (False) if True, output dxdv (that in orbit_dxdv) is in rectangular coordinates
         OUTPUT:
@@ -399,6 +427,7 @@ class planarOrbit(planarOrbitTop):
         self.orbit_dxdv, msg= _integrateOrbit_dxdv(self.vxvv,dxdv,thispot,t,
                                                    method,rectIn,rectOut)
         self.orbit= self.orbit_dxdv[:,:4]
+        self._dense= None
         return msg
 
     @physical_conversion('energy')
@@ -473,11 +502,11 @@ class planarOrbit(planarOrbitTop):
             return (rap-rperi)/(rap+rperi)
         if not hasattr(self,'orbit'):
             raise AttributeError("Integrate the orbit first")
-        if not hasattr(self,'rs'):
-            self.rs= self.orbit[:,0]
+        self._setup_rs()
         return (nu.amax(self.rs)-nu.amin(self.rs))/(nu.amax(self.rs)+nu.amin(self.rs))
 
-def _integrateROrbit(vxvv,pot,t,method,dt):
+def _integrateROrbit(vxvv,pot,t,method,dt,stats=False,walltime=None,
+                     checkpoint=False):
     """
     NAME:
        _integrateROrbit
@@ -490,11 +519,15 @@ def _integrateROrbit(vxvv,pot,t,method,dt):
        t - list of times at which to output (0 has to be in this!)
        method - 'odeint' or 'leapfrog'
        dt - if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize
+       stats= (False) if True, also return an IntegrationStats instance with statistics of the integration
+       walltime= (None) wall-clock budget for the integration in s (only for the C integrators)
+       checkpoint= (False) if True, also return (reason,ntdone,dtnext) describing where an interrupted integration stopped (see integratePlanarOrbit_c)
     OUTPUT:
-       [:,3] array of [R,vR,vT] at each t
+       [:,3] array of [R,vR,vT] at each t, error message (, statistics)(, checkpoint)
     HISTORY:
        2010-07-20 - Written - Bovy (NYU)
     """
+    checkpoint_out= (None,len(t),None)
     #First check that the potential has C
     if '_c' in method:
         if not _check_c(pot):
@@ -507,16 +540,21 @@ def _integrateROrbit(vxvv,pot,t,method,dt):
         #We hack this by putting in a dummy phi
         this_vxvv= nu.zeros(len(vxvv)+1)
         this_vxvv[0:len(vxvv)]= vxvv
-        tmp_out, msg= _integrateOrbit(this_vxvv,pot,t,method,dt)
+        tmp_out, msg, stats_out= _integrateOrbit(this_vxvv,pot,t,method,dt,
+                                                 stats=True)
         #tmp_out is (nt,4)
         out= tmp_out[:,0:3]
     elif method.lower() == 'leapfrog_c' or method.lower() == 'rk4_c' \
             or method.lower() == 'rk6_c' or method.lower() == 'symplec4_c' \
-            or method.lower() == 'symplec6_c' or method.lower() == 'dopr54_c':
+            or method.lower() == 'symplec6_c' or method.lower() == 'dopr54_c' \
+            or method.lower() == 'dop853_c' \
+            or method.lower() == 'bulirschstoer_c':
         #We hack this by putting in a dummy phi
         this_vxvv= nu.zeros(len(vxvv)+1)
         this_vxvv[0:len(vxvv)]= vxvv
-        tmp_out, msg= _integrateOrbit(this_vxvv,pot,t,method,dt)
+        tmp_out, msg, stats_out, checkpoint_out= \
+            _integrateOrbit(this_vxvv,pot,t,method,dt,stats=True,
+                            walltime=walltime,checkpoint=True)
         #tmp_out is (nt,4)
         out= tmp_out[:,0:3]
     elif method.lower() == 'odeint':
@@ -530,11 +568,15 @@ def _integrateROrbit(vxvv,pot,t,method,dt):
         out[:,1]= intOut[:,1]
         out[:,2]= l/out[:,0]
         msg= 0
+        stats_out= IntegrationStats(method)
     #post-process to remove negative radii
     neg_radii= (out[:,0] < 0.)
     out[neg_radii,0]= -out[neg_radii,0]
     _parse_warnmessage(msg)
-    return (out,msg)
+    out= (out,msg)
+    if stats: out+= (stats_out,)
+    if checkpoint: out+= (checkpoint_out,)
+    return out
 
 def _REOM(y,t,pot,l2):
     """
@@ -556,7 +598,8 @@ def _REOM(y,t,pot,l2):
     return [y[1],
             l2/y[0]**3.+_evaluateplanarRforces(pot,y[0],t=t)]
 
-def _integrateOrbit(vxvv,pot,t,method,dt):
+def _integrateOrbit(vxvv,pot,t,method,dt,dense=False,events=None,
+                    stats=False,walltime=None,checkpoint=False):
     """
     NAME:
        _integrateOrbit
@@ -569,11 +612,19 @@ def _integrateOrbit(vxvv,pot,t,method,dt):
        t - list of times at which to output (0 has to be in this!)
        method - 'odeint' or 'leapfrog'
        dt- if set, force the integrator to use this basic stepsize; must be an integer divisor of output stepsize
+       dense= (False) if True, also return the dense output of the integrator (None if the method does not have dense output)
+       events= (None) list of events to detect (see integratePlanarOrbit_c), only for method='dopr54_c'
+       stats= (False) if True, also return an IntegrationStats instance with statistics of the integration (only the method for the Python integrators)
+       walltime= (None) wall-clock budget for the integration in s (only for the C integrators)
+       checkpoint= (False) if True, also return (reason,ntdone,dtnext) describing where an interrupted integration stopped (see integratePlanarOrbit_c; (None,len(t),None) for the Python integrators)
     OUTPUT:
-       [:,4] array of [R,vR,vT,phi] at each t
+       [:,4] array of [R,vR,vT,phi] at each t, msg (, dense output)(, dictionary with for each event the times and [R,vR,vT,phi] at the events)(, statistics)(, checkpoint)
     HISTORY:
        2010-07-20 - Written - Bovy (NYU)
     """
+    dense_out= None
+    stats_out= None
+    checkpoint_out= (None,len(t),None)
     #First check that the potential has C
     if '_c' in method:
         if not _check_c(pot):
@@ -582,6 +633,8 @@ def _integrateOrbit(vxvv,pot,t,method,dt):
             else:
                 method= 'odeint'
             warnings.warn("Cannot use C integration because some of the potentials are not implemented in C (using %s instead)" % (method), galpyWarning)
+    if not events is None and not method.lower() == 'dopr54_c':
+        raise NotImplementedError("Event detection is only implemented for method='dopr54_c' and potentials that are implemented in C")
     if method.lower() == 'leapfrog':
         #go to the rectangular frame
         this_vxvv= nu.array([vxvv[0]*nu.cos(vxvv[3]),
@@ -605,7 +658,9 @@ def _integrateOrbit(vxvv,pot,t,method,dt):
         msg= 0
     elif method.lower() == 'leapfrog_c' or method.lower() == 'rk4_c' \
             or method.lower() == 'rk6_c' or method.lower() == 'symplec4_c' \
-            or method.lower() == 'symplec6_c' or method.lower() == 'dopr54_c':
+            or method.lower() == 'symplec6_c' or method.lower() == 'dopr54_c' \
+            or method.lower() == 'dop853_c' \
+            or method.lower() == 'bulirschstoer_c':
         warnings.warn("Using C implementation to integrate orbits",galpyWarning)
         #go to the rectangular frame
         this_vxvv= nu.array([vxvv[0]*nu.cos(vxvv[3]),
@@ -613,8 +668,30 @@ def _integrateOrbit(vxvv,pot,t,method,dt):
                              vxvv[1]*nu.cos(vxvv[3])-vxvv[2]*nu.sin(vxvv[3]),
                              vxvv[2]*nu.cos(vxvv[3])+vxvv[1]*nu.sin(vxvv[3])])
         #integrate
-        tmp_out, msg= integratePlanarOrbit_c(pot,this_vxvv,
-                                             t,method,dt=dt)
+        tmp_out= integratePlanarOrbit_c(pot,this_vxvv,
+                                        t,method,dt=dt,dense=dense,
+                                        events=events,stats=stats,
+                                        walltime=walltime,
+                                        checkpoint=checkpoint)
+        if checkpoint:
+            checkpoint_out= tmp_out[-1]
+            tmp_out= tmp_out[:-1]
+        if stats:
+            stats_out= tmp_out[-1]
+            tmp_out= tmp_out[:-1]
+        if not events is None:
+            events_out= tmp_out[-1]
+            tmp_out= tmp_out[:-1]
+            for name in events_out:
+                ey= events_out[name][1]
+                R= nu.sqrt(ey[:,0]**2.+ey[:,1]**2.)
+                phi= nu.arctan2(ey[:,1],ey[:,0]) % (2.*nu.pi)
+                vR= ey[:,2]*nu.cos(phi)+ey[:,3]*nu.sin(phi)
+                vT= ey[:,3]*nu.cos(phi)-ey[:,2]*nu.sin(phi)
+                events_out[name]= (events_out[name][0],
+                                   nu.array([R,vR,vT,phi]).T)
+        if len(tmp_out) == 3: tmp_out, msg, dense_out= tmp_out
+        else: tmp_out, msg= tmp_out
         #go back to the cylindrical frame
         R= nu.sqrt(tmp_out[:,0]**2.+tmp_out[:,1]**2.)
         phi= nu.arccos(tmp_out[:,0]/R)
@@ -644,7 +721,14 @@ def _integrateOrbit(vxvv,pot,t,method,dt):
     out[neg_radii,0]= -out[neg_radii,0]
     out[neg_radii,3]+= m.pi
     _parse_warnmessage(msg)
-    return (out,msg)
+    out= (out,msg)
+    if dense: out+= (dense_out,)
+    if not events is None: out+= (events_out,)
+    if stats:
+        if stats_out is None: stats_out= IntegrationStats(method)
+        out+= (stats_out,)
+    if checkpoint: out+= (checkpoint_out,)
+    return out
 
 def _integrateOrbit_dxdv(vxvv,dxdv,pot,t,method,rectIn,rectOut):
     """
@@ -695,7 +779,8 @@ def _integrateOrbit_dxdv(vxvv,dxdv,pot,t,method,rectIn,rectOut):
     if 'leapfrog' in method.lower() or 'symplec' in method.lower():
         raise TypeError('Symplectic integration for phase-space volume is not possible')
     elif method.lower() == 'rk4_c' or method.lower() == 'rk6_c' \
-            or method.lower() == 'dopr54_c':
+            or method.lower() == 'dopr54_c' or method.lower() == 'dop853_c' \
+            or method.lower() == 'bulirschstoer_c':
         warnings.warn("Using C implementation to integrate orbits",galpyWarning)
         #integrate
         tmp_out, msg= integratePlanarOrbit_dxdv_c(pot,this_vxvv,this_dxdv,
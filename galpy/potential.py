@@ -16,6 +16,7 @@ from galpy.potential_src import plotRotcurve
 from galpy.potential_src import plotEscapecurve
 from galpy.potential_src import KGPotential
 from galpy.potential_src import interpRZPotential
+from galpy.potential_src import interp3DPotential
 from galpy.potential_src import DehnenBarPotential
 from galpy.potential_src import SteadyLogSpiralPotential
 from galpy.potential_src import TransientLogSpiralPotential
@@ -40,6 +41,8 @@ from galpy.potential_src import DiskSCFPotential
 from galpy.potential_src import SpiralArmsPotential
 from galpy.potential_src import DehnenSmoothWrapperPotential
 from galpy.potential_src import SolidBodyRotationWrapperPotential
+from galpy.potential_src import CallbackPotential
+from galpy.potential_src import evaluate_c
 #
 # Functions
 #
@@ -52,6 +55,21 @@ evaluaterforces= Potential.evaluaterforces
 evaluateR2derivs= Potential.evaluateR2derivs
 evaluatez2derivs= Potential.evaluatez2derivs
 evaluateRzderivs= Potential.evaluateRzderivs
+evaluatePotentials_c= evaluate_c.evaluatePotentials_c
+evaluateRforces_c= evaluate_c.evaluateRforces_c
+evaluatezforces_c= evaluate_c.evaluatezforces_c
+evaluatephiforces_c= evaluate_c.evaluatephiforces_c
+evaluateDensities_c= evaluate_c.evaluateDensities_c
+evaluateR2derivs_c= evaluate_c.evaluateR2derivs_c
+evaluatez2derivs_c= evaluate_c.evaluatez2derivs_c
+evaluateRzderivs_c= evaluate_c.evaluateRzderivs_c
+evaluatePotentials_raw= Potential._evaluatePotentials
+evaluateRforces_raw= Potential._evaluateRforces
+evaluatezforces_raw= Potential._evaluatezforces
+evaluatephiforces_raw= Potential._evaluatephiforces
+evaluateR2derivs_raw= Potential._evaluateR2derivs
+evaluatez2derivs_raw= Potential._evaluatez2derivs
+evaluateRzderivs_raw= Potential._evaluateRzderivs
 RZToplanarPotential= planarPotential.RZToplanarPotential
 toPlanarPotential= planarPotential.toPlanarPotential
 RZToverticalPotential= verticalPotential.RZToverticalPotential
@@ -67,6 +85,10 @@ verticalfreq= Potential.verticalfreq
 flattening= Potential.flattening
 rl= Potential.rl
 omegac= Potential.omegac
+vcirc_raw= Potential._vcirc
+omegac_raw= Potential._omegac
+epifreq_raw= Potential._epifreq
+verticalfreq_raw= Potential._verticalfreq
 vterm= Potential.vterm
 lindbladR= Potential.lindbladR
 plotRotcurve= plotRotcurve.plotRotcurve
@@ -90,6 +112,7 @@ _isNonAxi= Potential._isNonAxi
 scf_compute_coeffs_spherical = SCFPotential.scf_compute_coeffs_spherical
 scf_compute_coeffs_axi = SCFPotential.scf_compute_coeffs_axi
 scf_compute_coeffs = SCFPotential.scf_compute_coeffs
+scf_compute_coeffs_nbody = SCFPotential.scf_compute_coeffs_nbody
 #
 # Classes
 #
@@ -110,6 +133,7 @@ HernquistPotential= TwoPowerSphericalPotential.HernquistPotential
 TwoPowerSphericalPotential= TwoPowerSphericalPotential.TwoPowerSphericalPotential
 KGPotential= KGPotential.KGPotential
 interpRZPotential= interpRZPotential.interpRZPotential
+interp3DPotential= interp3DPotential.interp3DPotential
 DehnenBarPotential= DehnenBarPotential.DehnenBarPotential
 SteadyLogSpiralPotential= SteadyLogSpiralPotential.SteadyLogSpiralPotential
 TransientLogSpiralPotential= TransientLogSpiralPotential.TransientLogSpiralPotential
@@ -136,6 +160,7 @@ SCFPotential = SCFPotential.SCFPotential
 SoftenedNeedleBarPotential= SoftenedNeedleBarPotential.SoftenedNeedleBarPotential
 DiskSCFPotential = DiskSCFPotential.DiskSCFPotential
 SpiralArmsPotential = SpiralArmsPotential.SpiralArmsPotential
+CallbackPotential= CallbackPotential.CallbackPotential
 #Wrappers
 DehnenSmoothWrapperPotential= DehnenSmoothWrapperPotential.DehnenSmoothWrapperPotential
 SolidBodyRotationWrapperPotential= SolidBodyRotationWrapperPotential.SolidBodyRotationWrapperPotential
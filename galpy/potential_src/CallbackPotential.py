@@ -0,0 +1,267 @@
+###############################################################################
+#   CallbackPotential.py: class that implements a potential given by
+#                         compiled functions (ctypes function pointers or
+#                         addresses of functions in a shared library)
+#
+#   Each function has the signature double f(double R, double z,
+#   double phi, double t)
+###############################################################################
+import ctypes
+import numpy as nu
+from galpy.potential_src.Potential import Potential
+_CALLBACK_FUNCTYPE= ctypes.CFUNCTYPE(ctypes.c_double,ctypes.c_double,
+                                     ctypes.c_double,ctypes.c_double,
+                                     ctypes.c_double)
+class CallbackPotential(Potential):
+    """Class that implements a potential whose value, forces, and second derivatives are given by compiled functions with the C signature
+
+    .. code-block:: c
+
+        double f(double R, double z, double phi, double t);
+
+    These can be ctypes function pointers (e.g., functions in a shared library loaded with ctypes and ctypes.CFUNCTYPE callbacks) or the addresses of such functions (e.g., obtained with cffi). The C orbit integrators and actionAngleStaeckel call these functions directly, such that a potential compiled by the user is evaluated at native speed (ctypes.CFUNCTYPE callbacks of Python functions work, but need to acquire Python's global interpreter lock for each call).
+    """
+    def __init__(self,potential=None,Rforce=None,zforce=None,phiforce=None,
+                 R2deriv=None,z2deriv=None,Rzderiv=None,phi2deriv=None,
+                 Rphideriv=None,amp=1.,ro=None,vo=None):
+        """
+        NAME:
+
+           __init__
+
+        PURPOSE:
+
+           initialize a CallbackPotential
+
+        INPUT:
+
+           potential - function that evaluates the potential
+
+           Rforce - function that evaluates the radial force
+
+           zforce - function that evaluates the vertical force
+
+           phiforce= (None) function that evaluates the azimuthal torque; if None, the potential is axisymmetric
+
+           R2deriv= (None) function that evaluates the second radial derivative (necessary for integrating the phase-space volume in C, together with phi2deriv and Rphideriv for non-axisymmetric potentials)
+
+           z2deriv= (None) function that evaluates the second vertical derivative (only used in Python)
+
+           Rzderiv= (None) function that evaluates the mixed radial-vertical derivative (only used in Python)
+
+           phi2deriv= (None) function that evaluates the second azimuthal derivative (zero if None)
+
+           Rphideriv= (None) function that evaluates the mixed radial-azimuthal derivative (zero if None)
+
+           amp - amplitude to be applied to the potential (default: 1)
+
+           ro=, vo= distance and velocity scales for translation into internal units (default from configuration file)
+
+        OUTPUT:
+
+           (none)
+
+        """
+        Potential.__init__(self,amp=amp,ro=ro,vo=vo)
+        if potential is None or Rforce is None or zforce is None:
+            raise ValueError("CallbackPotential requires at least the potential, Rforce, and zforce functions")
+        # Keep the functions and their addresses; holding on to the input
+        # also keeps ctypes callbacks from being garbage collected
+        self._callbacks= {}
+        self._callback_addresses= {}
+        for name,func in zip(['potential','Rforce','zforce','phiforce',
+                              'R2deriv','z2deriv','Rzderiv','phi2deriv',
+                              'Rphideriv'],
+                             [potential,Rforce,zforce,phiforce,
+                              R2deriv,z2deriv,Rzderiv,phi2deriv,Rphideriv]):
+            if func is None:
+                self._callback_addresses[name]= 0
+                continue
+            address= _callback_address(func)
+            self._callbacks[name]= (func,_CALLBACK_FUNCTYPE(address))
+            self._callback_addresses[name]= address
+        self.isNonAxi= not phiforce is None
+        self.hasC= True
+        self.hasC_dxdv= not R2deriv is None
+        return None
+
+    def _call(self,name,R,z,phi,t):
+        """Evaluate the function name, looping over array inputs"""
+        if phi is None: phi= 0.
+        if t is None: t= 0.
+        if not name in self._callbacks: return 0.*R*z*phi*t
+        func= self._callbacks[name][1]
+        R,z,phi,t= nu.broadcast_arrays(R,z,phi,t)
+        if R.ndim == 0:
+            return func(float(R),float(z),float(phi),float(t))
+        out= nu.empty(R.shape)
+        for indx in nu.ndindex(R.shape):
+            out[indx]= func(float(R[indx]),float(z[indx]),
+                            float(phi[indx]),float(t[indx]))
+        return out
+
+    def _evaluate(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _evaluate
+        PURPOSE:
+           evaluate the potential at R,z
+        INPUT:
+           R - Galactocentric cylindrical radius
+           z - vertical height
+           phi - azimuth
+           t - time
+        OUTPUT:
+           Phi(R,z)
+        """
+        return self._call('potential',R,z,phi,t)
+
+    def _Rforce(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _Rforce
+        PURPOSE:
+           evaluate the radial force for this potential
+        INPUT:
+           R - Galactocentric cylindrical radius
+           z - vertical height
+           phi - azimuth
+           t - time
+        OUTPUT:
+           the radial force
+        """
+        return self._call('Rforce',R,z,phi,t)
+
+    def _zforce(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _zforce
+        PURPOSE:
+           evaluate the vertical force for this potential
+        INPUT:
+           R - Galactocentric cylindrical radius
+           z - vertical height
+           phi - azimuth
+           t - time
+        OUTPUT:
+           the vertical force
+        """
+        return self._call('zforce',R,z,phi,t)
+
+    def _phiforce(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _phiforce
+        PURPOSE:
+           evaluate the azimuthal force for this potential
+        INPUT:
+           R - Galactocentric cylindrical radius
+           z - vertical height
+           phi - azimuth
+           t - time
+        OUTPUT:
+           the azimuthal force
+        """
+        return self._call('phiforce',R,z,phi,t)
+
+    def _R2deriv(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _R2deriv
+        PURPOSE:
+           evaluate the second radial derivative for this potential
+        INPUT:
+           R - Galactocentric cylindrical radius
+           z - vertical height
+           phi - azimuth
+           t - time
+        OUTPUT:
+           the second radial derivative
+        """
+        if not 'R2deriv' in self._callbacks:
+            raise NotImplementedError("R2deriv was not given for this CallbackPotential")
+        return self._call('R2deriv',R,z,phi,t)
+
+    def _z2deriv(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _z2deriv
+        PURPOSE:
+           evaluate the second vertical derivative for this potential
+        INPUT:
+           R - Galactocentric cylindrical radius
+           z - vertical height
+           phi - azimuth
+           t - time
+        OUTPUT:
+           the second vertical derivative
+        """
+        if not 'z2deriv' in self._callbacks:
+            raise NotImplementedError("z2deriv was not given for this CallbackPotential")
+        return self._call('z2deriv',R,z,phi,t)
+
+    def _Rzderiv(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _Rzderiv
+        PURPOSE:
+           evaluate the mixed R,z derivative for this potential
+        INPUT:
+           R - Galactocentric cylindrical radius
+           z - vertical height
+           phi - azimuth
+           t - time
+        OUTPUT:
+           d2phi/dR/dz
+        """
+        if not 'Rzderiv' in self._callbacks:
+            raise NotImplementedError("Rzderiv was not given for this CallbackPotential")
+        return self._call('Rzderiv',R,z,phi,t)
+
+    def _phi2deriv(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _phi2deriv
+        PURPOSE:
+           evaluate the second azimuthal derivative for this potential
+        INPUT:
+           R - Galactocentric cylindrical radius
+           z - vertical height
+           phi - azimuth
+           t - time
+        OUTPUT:
+           the second azimuthal derivative
+        """
+        return self._call('phi2deriv',R,z,phi,t)
+
+    def _Rphideriv(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _Rphideriv
+        PURPOSE:
+           evaluate the mixed radial, azimuthal derivative for this potential
+        INPUT:
+           R - Galactocentric cylindrical radius
+           z - vertical height
+           phi - azimuth
+           t - time
+        OUTPUT:
+           d2phi/dR/dphi
+        """
+        return self._call('Rphideriv',R,z,phi,t)
+
+def _callback_address(func):
+    """Return the address of a compiled function given as a ctypes function pointer or as an address"""
+    if isinstance(func,(int,nu.integer)):
+        address= int(func)
+    elif isinstance(func,ctypes._CFuncPtr):
+        address= ctypes.cast(func,ctypes.c_void_p).value
+    else:
+        raise TypeError("Functions for CallbackPotential need to be ctypes function pointers or addresses of compiled functions")
+    if address is None or address <= 0:
+        raise ValueError("Address of a function for CallbackPotential is NULL")
+    # Addresses are passed to C as doubles, which represent all integers
+    # below 2^53 exactly
+    if address >= 2**53: #pragma: no cover
+        raise ValueError("Address of a function for CallbackPotential cannot be passed to C")
+    return address
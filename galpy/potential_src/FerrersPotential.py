@@ -32,11 +32,11 @@ class FerrersPotential(Potential):
     and :math:`(x',y',z')` is a rotated frame wrt :math:`(x,y,z)`
     so that the major axis is aligned with :math:`x'`.
 
-    Note that this potential has not yet been optimized for speed and has no C implementation, so orbit integration is currently slow.
+    The potential and forces are computed in Python with numerical quadrature and are therefore slow; orbit integration and the actionAngle C code use a C implementation that computes the integrals with Gauss-Legendre quadrature.
     """
 
     def __init__(self,amp=1.,a=1.,n=2,b=0.35,c=0.2375,omegab=0.,
-                 pa=0.,normalize=False,ro=None,vo=None):
+                 pa=0.,normalize=False,glorder=50,ro=None,vo=None):
         """
         NAME:
 
@@ -64,6 +64,8 @@ class FerrersPotential(Potential):
 
            normalize - if True, normalize such that vc(1.,0.)=1., or, if given as a number, such that the force is this fraction of the force necessary to make vc(1.,0.)=1.
 
+           glorder= (50) order of the Gaussian quadrature used to compute the potential, forces, and second derivatives in C
+
            ro=, vo= distance and velocity scales for translation into internal units (default from configuration file)
 
         OUTPUT:
@@ -99,6 +101,13 @@ class FerrersPotential(Potential):
             self.normalize(normalize)
         if np.fabs(self._b-1.) > 10.**-10.:
             self.isNonAxi= True
+        # Gauss-Legendre points and weights on [0,1] for the C implementation
+        self._glorder= glorder
+        self._glx, self._glw= np.polynomial.legendre.leggauss(self._glorder)
+        self._glx= 0.5*self._glx+0.5
+        self._glw*= 0.5
+        self.hasC= True
+        self.hasC_dxdv= True
         return None
 
     def _evaluate(self,R,z,phi=0.,t=0.):
@@ -243,16 +252,13 @@ class FerrersPotential(Potential):
         if not self.isNonAxi:
             phi= 0.
         x,y,z= self._compute_xyz(R,phi,z,t)
-        phixxa= self._2ndderiv_xyz(x,y,z,0,0)
-        phixya= self._2ndderiv_xyz(x,y,z,0,1)
-        phiyya= self._2ndderiv_xyz(x,y,z,1,1)
-        ang = self._omegab*t + self._pa
-        c, s = np.cos(ang), np.sin(ang)
-        phixx = c**2*phixxa + 2.*c*s*phixya + s**2*phiyya
-        phixy = (c**2-s**2)*phixya + c*s*(phiyya - phixxa)
-        phiyy = s**2*phixxa - 2.*c*s*phixya + c**2*phiyya
-        return np.cos(phi)**2.*phixx + np.sin(phi)**2.*phiyy + \
-            2.*np.cos(phi)*np.sin(phi)*phixy
+        phixx= self._2ndderiv_xyz(x,y,z,0,0)
+        phixy= self._2ndderiv_xyz(x,y,z,0,1)
+        phiyy= self._2ndderiv_xyz(x,y,z,1,1)
+        # azimuth in the aligned frame
+        ang= phi-self._pa-self._omegab*t
+        return np.cos(ang)**2.*phixx + np.sin(ang)**2.*phiyy + \
+            2.*np.cos(ang)*np.sin(ang)*phixy
 
     def _Rzderiv(self,R,z,phi=0.,t=0.):
         """
@@ -271,13 +277,10 @@ class FerrersPotential(Potential):
         if not self.isNonAxi:
             phi= 0.
         x,y,z= self._compute_xyz(R,phi,z,t)
-        phixza= self._2ndderiv_xyz(x,y,z,0,2)
-        phiyza= self._2ndderiv_xyz(x,y,z,1,2)
-        ang = self._omegab*t + self._pa
-        c, s = np.cos(ang), np.sin(ang)
-        phixz = c*phixza + s*phiyza
-        phiyz = c*phixza - s*phiyza
-        return np.cos(phi)*phixz + np.sin(phi)*phiyz
+        phixz= self._2ndderiv_xyz(x,y,z,0,2)
+        phiyz= self._2ndderiv_xyz(x,y,z,1,2)
+        ang= phi-self._pa-self._omegab*t
+        return np.cos(ang)*phixz + np.sin(ang)*phiyz
 
     def _z2deriv(self,R,z,phi=0.,t=0.):
         """
@@ -317,19 +320,13 @@ class FerrersPotential(Potential):
         x,y,z= self._compute_xyz(R,phi,z,t)
         Fx= self._xforce_xyz(x,y,z)
         Fy= self._yforce_xyz(x,y,z)
-        Fxy= np.dot(self.rot(t, transposed = True),np.array([Fx,Fy]))
-        Fx, Fy= Fxy[0], Fxy[1]
-        phixxa= self._2ndderiv_xyz(x,y,z,0,0)
-        phixya= self._2ndderiv_xyz(x,y,z,0,1)
-        phiyya= self._2ndderiv_xyz(x,y,z,1,1)
-        ang = self._omegab*t + self._pa
-        c, s = np.cos(ang), np.sin(ang)
-        phixx = c**2*phixxa + 2.*c*s*phixya + s**2*phiyya
-        phixy = (c**2-s**2)*phixya + c*s*(phiyya - phixxa)
-        phiyy = s**2*phixxa - 2.*c*s*phixya + c**2*phiyya
-        return R**2.*(np.sin(phi)**2.*phixx+np.cos(phi)**2.*phiyy\
-                          -2.*np.cos(phi)*np.sin(phi)*phixy)\
-                          +R*(np.cos(phi)*Fx+np.sin(phi)*Fy)
+        phixx= self._2ndderiv_xyz(x,y,z,0,0)
+        phixy= self._2ndderiv_xyz(x,y,z,0,1)
+        phiyy= self._2ndderiv_xyz(x,y,z,1,1)
+        ang= phi-self._pa-self._omegab*t
+        return R**2.*(np.sin(ang)**2.*phixx+np.cos(ang)**2.*phiyy\
+                          -2.*np.cos(ang)*np.sin(ang)*phixy)\
+                          +R*(np.cos(ang)*Fx+np.sin(ang)*Fy)
 
     def _Rphideriv(self,R,z,phi=0.,t=0.):
         """
@@ -350,19 +347,13 @@ class FerrersPotential(Potential):
         x,y,z= self._compute_xyz(R,phi,z,t)
         Fx= self._xforce_xyz(x,y,z)
         Fy= self._yforce_xyz(x,y,z)
-        Fxy= np.dot(self.rot(t, transposed = True),np.array([Fx,Fy]))
-        Fx, Fy= Fxy[0], Fxy[1]
-        phixxa= self._2ndderiv_xyz(x,y,z,0,0)
-        phixya= self._2ndderiv_xyz(x,y,z,0,1)
-        phiyya= self._2ndderiv_xyz(x,y,z,1,1)
-        ang = self._omegab*t + self._pa
-        c, s = np.cos(ang), np.sin(ang)
-        phixx = c**2*phixxa + 2.*c*s*phixya + s**2*phiyya
-        phixy = (c**2-s**2)*phixya + c*s*(phiyya - phixxa)
-        phiyy = s**2*phixxa - 2.*c*s*phixya + c**2*phiyya
-        return R*np.cos(phi)*np.sin(phi)*\
-            (phiyy-phixx)+R*np.cos(2.*(phi))*phixy\
-            +np.sin(phi)*Fx-np.cos(phi)*Fy
+        phixx= self._2ndderiv_xyz(x,y,z,0,0)
+        phixy= self._2ndderiv_xyz(x,y,z,0,1)
+        phiyy= self._2ndderiv_xyz(x,y,z,1,1)
+        ang= phi-self._pa-self._omegab*t
+        return R*np.cos(ang)*np.sin(ang)*\
+            (phiyy-phixx)+R*np.cos(2.*ang)*phixy\
+            +np.sin(ang)*Fx-np.cos(ang)*Fy
 
     def _2ndderiv_xyz(self,x,y,z,i,j):
         """General 2nd derivative of the potential as a function of (x,y,z)
@@ -26,6 +26,8 @@ class MovingObjectPotential(Potential):
 
     Plummer is currently the only implemented softening.
 
+    Orbit integration in this potential is performed in C, using piecewise polynomials in time for the object's orbit in :math:`(x,y,z)`: the quartic polynomials of the integrator's dense output if the object's orbit was integrated with dense output, and otherwise the cubic splines that are used when evaluating the orbit in Python. Like in Python, integrating an orbit outside of the integrated range of the object's orbit raises a ValueError.
+
     """
     def __init__(self,orbit,amp=1.,GM=.06,
                  ro=None,vo=None,
@@ -79,6 +81,8 @@ class MovingObjectPotential(Potential):
         else:
             self._softening= softening
         self.isNonAxi= True
+        # C implementation only for Plummer softening
+        self.hasC= isinstance(self._softening,PlummerSoftening)
         return None
 
     def _evaluate(self,R,z,phi=0.,t=0.):
@@ -21,7 +21,6 @@ from functools import wraps
 import math
 import numpy as nu
 from scipy import optimize, integrate
-import galpy.util.bovy_plot as plot
 from galpy.util import bovy_coords
 from galpy.util import config
 from galpy.util.bovy_conversion import velocity_in_kpcGyr, \
@@ -157,6 +156,14 @@ class Potential(object):
                 self._voSet= True
         return None
 
+    def __setattr__(self,name,value):
+        # Changing any attribute other than the evaluation caches invalidates
+        # the description of the potential cached for the C code
+        if not name.startswith('_cached') and not name.endswith('_hash'):
+            object.__setattr__(self,'_cached_c',None)
+        object.__setattr__(self,name,value)
+        return None
+
     def turn_physical_off(self):
         """
         NAME:
@@ -570,10 +577,14 @@ class Potential(object):
            2011-10-09 - Written - Bovy (IAS)
 
         """
+        return self._R2deriv_nodecorator(R,Z,phi=phi,t=t)
+
+    def _R2deriv_nodecorator(self,R,Z,phi=0.,t=0.):
+        # Separate, so it can be used by the raw functions for internal use
         try:
             return self._amp*self._R2deriv(R,Z,phi=phi,t=t)
         except AttributeError: #pragma: no cover
-            raise PotentialError("'_R2deriv' function not implemented for this potential")      
+            raise PotentialError("'_R2deriv' function not implemented for this potential")
 
     @potential_physical_input
     @physical_conversion('forcederivative',pop=True)
@@ -606,10 +617,14 @@ class Potential(object):
            2012-07-25 - Written - Bovy (IAS@MPIA)
 
         """
+        return self._z2deriv_nodecorator(R,Z,phi=phi,t=t)
+
+    def _z2deriv_nodecorator(self,R,Z,phi=0.,t=0.):
+        # Separate, so it can be used by the raw functions for internal use
         try:
             return self._amp*self._z2deriv(R,Z,phi=phi,t=t)
         except AttributeError: #pragma: no cover
-            raise PotentialError("'_z2deriv' function not implemented for this potential")      
+            raise PotentialError("'_z2deriv' function not implemented for this potential")
 
     @potential_physical_input
     @physical_conversion('forcederivative',pop=True)
@@ -642,10 +657,14 @@ class Potential(object):
            2013-08-26 - Written - Bovy (IAS)
 
         """
+        return self._Rzderiv_nodecorator(R,Z,phi=phi,t=t)
+
+    def _Rzderiv_nodecorator(self,R,Z,phi=0.,t=0.):
+        # Separate, so it can be used by the raw functions for internal use
         try:
             return self._amp*self._Rzderiv(R,Z,phi=phi,t=t)
         except AttributeError: #pragma: no cover
-            raise PotentialError("'_Rzderiv' function not implemented for this potential")      
+            raise PotentialError("'_Rzderiv' function not implemented for this potential")
 
     def normalize(self,norm,t=0.):
         """
@@ -907,6 +926,7 @@ class Potential(object):
            2014-04-08 - Added effective= - Bovy (IAS)
 
         """
+        from galpy.util import bovy_plot as plot
         if _APY_LOADED:
             if isinstance(rmin,units.Quantity):
                 rmin= rmin.to(units.kpc).value/self._ro
@@ -1554,7 +1574,34 @@ def evaluatePotentials(Pot,R,z,phi=None,t=0.,dR=0,dphi=0):
     return _evaluatePotentials(Pot,R,z,phi=phi,t=t,dR=dR,dphi=dphi)
 
 def _evaluatePotentials(Pot,R,z,phi=None,t=0.,dR=0,dphi=0):
-    """Raw, undecorated function for internal use"""
+    """
+    NAME:
+
+       evaluatePotentials_raw
+
+    PURPOSE:
+
+       evaluate a possible sum of potentials without any handling of physical units; low-overhead version of evaluatePotentials for use in loops with inputs in internal units (does not accept Quantity inputs and always returns internal units)
+
+    INPUT:
+
+       Pot - potential or list of potentials
+
+       R - cylindrical Galactocentric distance (float or numpy.ndarray, internal units)
+
+       z - distance above the plane (float or numpy.ndarray, internal units)
+
+       phi - azimuth (optional; rad)
+
+       t - time (optional; internal units)
+
+       dR= dphi=, if set to non-zero integers, return the dR, dphi't derivative instead
+
+    OUTPUT:
+
+       Phi(R,z)
+
+    """
     nonAxi= _isNonAxi(Pot)
     if nonAxi and phi is None:
         raise PotentialError("The (list of) Potential instances is non-axisymmetric, but you did not provide phi")
@@ -1658,7 +1705,32 @@ def evaluateRforces(Pot,R,z,phi=None,t=0.):
     return _evaluateRforces(Pot,R,z,phi=phi,t=t)
 
 def _evaluateRforces(Pot,R,z,phi=None,t=0.):
-    """Raw, undecorated function for internal use"""
+    """
+    NAME:
+
+       evaluateRforces_raw
+
+    PURPOSE:
+
+       evaluate the radial force of a possible sum of potentials without any handling of physical units; low-overhead version of evaluateRforces for use in loops with inputs in internal units (does not accept Quantity inputs and always returns internal units)
+
+    INPUT:
+
+       Pot - potential or list of potentials
+
+       R - cylindrical Galactocentric distance (float or numpy.ndarray, internal units)
+
+       z - distance above the plane (float or numpy.ndarray, internal units)
+
+       phi - azimuth (optional; rad)
+
+       t - time (optional; internal units)
+
+    OUTPUT:
+
+       F_R(R,z,phi,t)
+
+    """
     isList= isinstance(Pot,list)
     nonAxi= _isNonAxi(Pot)
     if nonAxi and phi is None:
@@ -1708,7 +1780,32 @@ def evaluatephiforces(Pot,R,z,phi=None,t=0.):
     return _evaluatephiforces(Pot,R,z,phi=phi,t=t)
 
 def _evaluatephiforces(Pot,R,z,phi=None,t=0.):
-    """Raw, undecorated function for internal use"""
+    """
+    NAME:
+
+       evaluatephiforces_raw
+
+    PURPOSE:
+
+       evaluate the azimuthal force of a possible sum of potentials without any handling of physical units; low-overhead version of evaluatephiforces for use in loops with inputs in internal units (does not accept Quantity inputs and always returns internal units)
+
+    INPUT:
+
+       Pot - potential or list of potentials
+
+       R - cylindrical Galactocentric distance (float or numpy.ndarray, internal units)
+
+       z - distance above the plane (float or numpy.ndarray, internal units)
+
+       phi - azimuth (optional; rad)
+
+       t - time (optional; internal units)
+
+    OUTPUT:
+
+       F_phi(R,z,phi,t)
+
+    """
     isList= isinstance(Pot,list)
     nonAxi= _isNonAxi(Pot)
     if nonAxi and phi is None:
@@ -1759,7 +1856,32 @@ def evaluatezforces(Pot,R,z,phi=None,t=0.):
     return _evaluatezforces(Pot,R,z,phi=phi,t=t)
 
 def _evaluatezforces(Pot,R,z,phi=None,t=0.):
-    """Raw, undecorated function for internal use"""
+    """
+    NAME:
+
+       evaluatezforces_raw
+
+    PURPOSE:
+
+       evaluate the vertical force of a possible sum of potentials without any handling of physical units; low-overhead version of evaluatezforces for use in loops with inputs in internal units (does not accept Quantity inputs and always returns internal units)
+
+    INPUT:
+
+       Pot - potential or list of potentials
+
+       R - cylindrical Galactocentric distance (float or numpy.ndarray, internal units)
+
+       z - distance above the plane (float or numpy.ndarray, internal units)
+
+       phi - azimuth (optional; rad)
+
+       t - time (optional; internal units)
+
+    OUTPUT:
+
+       F_z(R,z,phi,t)
+
+    """
     isList= isinstance(Pot,list)
     nonAxi= _isNonAxi(Pot)
     if nonAxi and phi is None:
@@ -1853,6 +1975,35 @@ def evaluateR2derivs(Pot,R,z,phi=None,t=0.):
 
        2012-07-25 - Written - Bovy (IAS)
 
+    """
+    return _evaluateR2derivs(Pot,R,z,phi=phi,t=t)
+
+def _evaluateR2derivs(Pot,R,z,phi=None,t=0.):
+    """
+    NAME:
+
+       evaluateR2derivs_raw
+
+    PURPOSE:
+
+       evaluate the second radial derivative of a possible sum of potentials without any handling of physical units; low-overhead version of evaluateR2derivs for use in loops with inputs in internal units (does not accept Quantity inputs and always returns internal units)
+
+    INPUT:
+
+       Pot - potential or list of potentials
+
+       R - cylindrical Galactocentric distance (float or numpy.ndarray, internal units)
+
+       z - distance above the plane (float or numpy.ndarray, internal units)
+
+       phi - azimuth (optional; rad)
+
+       t - time (optional; internal units)
+
+    OUTPUT:
+
+       d2Phi/d2R(R,z,phi,t)
+
     """
     isList= isinstance(Pot,list)
     nonAxi= _isNonAxi(Pot)
@@ -1861,10 +2012,10 @@ def evaluateR2derivs(Pot,R,z,phi=None,t=0.):
     if isList:
         sum= 0.
         for pot in Pot:
-            sum+= pot.R2deriv(R,z,phi=phi,t=t,use_physical=False)
+            sum+= pot._R2deriv_nodecorator(R,z,phi=phi,t=t)
         return sum
     elif isinstance(Pot,Potential):
-        return Pot.R2deriv(R,z,phi=phi,t=t,use_physical=False)
+        return Pot._R2deriv_nodecorator(R,z,phi=phi,t=t)
     else: #pragma: no cover 
         raise PotentialError("Input to 'evaluateR2derivs' is neither a Potential-instance or a list of such instances")
 
@@ -1900,6 +2051,35 @@ def evaluatez2derivs(Pot,R,z,phi=None,t=0.):
 
        2012-07-25 - Written - Bovy (IAS)
 
+    """
+    return _evaluatez2derivs(Pot,R,z,phi=phi,t=t)
+
+def _evaluatez2derivs(Pot,R,z,phi=None,t=0.):
+    """
+    NAME:
+
+       evaluatez2derivs_raw
+
+    PURPOSE:
+
+       evaluate the second vertical derivative of a possible sum of potentials without any handling of physical units; low-overhead version of evaluatez2derivs for use in loops with inputs in internal units (does not accept Quantity inputs and always returns internal units)
+
+    INPUT:
+
+       Pot - potential or list of potentials
+
+       R - cylindrical Galactocentric distance (float or numpy.ndarray, internal units)
+
+       z - distance above the plane (float or numpy.ndarray, internal units)
+
+       phi - azimuth (optional; rad)
+
+       t - time (optional; internal units)
+
+    OUTPUT:
+
+       d2Phi/d2z(R,z,phi,t)
+
     """
     isList= isinstance(Pot,list)
     nonAxi= _isNonAxi(Pot)
@@ -1908,10 +2088,10 @@ def evaluatez2derivs(Pot,R,z,phi=None,t=0.):
     if isList:
         sum= 0.
         for pot in Pot:
-            sum+= pot.z2deriv(R,z,phi=phi,t=t,use_physical=False)
+            sum+= pot._z2deriv_nodecorator(R,z,phi=phi,t=t)
         return sum
     elif isinstance(Pot,Potential):
-        return Pot.z2deriv(R,z,phi=phi,t=t,use_physical=False)
+        return Pot._z2deriv_nodecorator(R,z,phi=phi,t=t)
     else: #pragma: no cover 
         raise PotentialError("Input to 'evaluatez2derivs' is neither a Potential-instance or a list of such instances")
 
@@ -1947,6 +2127,35 @@ def evaluateRzderivs(Pot,R,z,phi=None,t=0.):
 
        2013-08-28 - Written - Bovy (IAS)
 
+    """
+    return _evaluateRzderivs(Pot,R,z,phi=phi,t=t)
+
+def _evaluateRzderivs(Pot,R,z,phi=None,t=0.):
+    """
+    NAME:
+
+       evaluateRzderivs_raw
+
+    PURPOSE:
+
+       evaluate the mixed radial-vertical derivative of a possible sum of potentials without any handling of physical units; low-overhead version of evaluateRzderivs for use in loops with inputs in internal units (does not accept Quantity inputs and always returns internal units)
+
+    INPUT:
+
+       Pot - potential or list of potentials
+
+       R - cylindrical Galactocentric distance (float or numpy.ndarray, internal units)
+
+       z - distance above the plane (float or numpy.ndarray, internal units)
+
+       phi - azimuth (optional; rad)
+
+       t - time (optional; internal units)
+
+    OUTPUT:
+
+       d2Phi/dz/dR(R,z,phi,t)
+
     """
     isList= isinstance(Pot,list)
     nonAxi= _isNonAxi(Pot)
@@ -1955,10 +2164,10 @@ def evaluateRzderivs(Pot,R,z,phi=None,t=0.):
     if isList:
         sum= 0.
         for pot in Pot:
-            sum+= pot.Rzderiv(R,z,phi=phi,t=t,use_physical=False)
+            sum+= pot._Rzderiv_nodecorator(R,z,phi=phi,t=t)
         return sum
     elif isinstance(Pot,Potential):
-        return Pot.Rzderiv(R,z,phi=phi,t=t,use_physical=False)
+        return Pot._Rzderiv_nodecorator(R,z,phi=phi,t=t)
     else: #pragma: no cover 
         raise PotentialError("Input to 'evaluateRzderivs' is neither a Potential-instance or a list of such instances")
 
@@ -2020,6 +2229,7 @@ def plotPotentials(Pot,rmin=0.,rmax=1.5,nrs=21,zmin=-0.5,zmax=0.5,nzs=21,
            2010-07-09 - Written - Bovy (NYU)
 
         """
+        from galpy.util import bovy_plot as plot
         if _APY_LOADED:
             if hasattr(Pot,'_ro'):
                 tro= Pot._ro
@@ -2137,6 +2347,7 @@ def plotDensities(Pot,rmin=0.,rmax=1.5,nrs=21,zmin=-0.5,zmax=0.5,nzs=21,
            2013-07-05 - Written - Bovy (IAS)
 
         """
+        from galpy.util import bovy_plot as plot
         if _APY_LOADED:
             if hasattr(Pot,'_ro'):
                 tro= Pot._ro
@@ -2240,6 +2451,35 @@ def epifreq(Pot,R):
         return nu.sqrt(evaluateplanarR2derivs(Pot,R,use_physical=False)
                        -3./R*evaluateplanarRforces(Pot,R,use_physical=False))
 
+def _epifreq(Pot,R):
+    """
+    NAME:
+
+       epifreq_raw
+
+    PURPOSE:
+
+       calculate the epicycle frequency at R without any handling of physical units; low-overhead version of epifreq for use in loops with inputs in internal units (does not accept Quantity inputs and always returns internal units)
+
+    INPUT:
+
+       Pot - Potential instance or list thereof
+
+       R - Galactocentric radius (float or numpy.ndarray, internal units)
+
+    OUTPUT:
+
+       epicycle frequency
+
+    """
+    if isinstance(Pot,Potential):
+        return nu.sqrt(Pot._R2deriv_nodecorator(R,0.)
+                       -3./R*Pot._Rforce_nodecorator(R,0.))
+    elif _isList3D(Pot):
+        return nu.sqrt(_evaluateR2derivs(Pot,R,0.)
+                       -3./R*_evaluateRforces(Pot,R,0.))
+    return epifreq(Pot,R,use_physical=False)
+
 @potential_physical_input
 @physical_conversion('frequency',pop=True)
 def verticalfreq(Pot,R):
@@ -2273,6 +2513,33 @@ def verticalfreq(Pot,R):
         return Pot.verticalfreq(R,use_physical=False)
     return nu.sqrt(evaluatez2derivs(Pot,R,0.,use_physical=False))
 
+def _verticalfreq(Pot,R):
+    """
+    NAME:
+
+       verticalfreq_raw
+
+    PURPOSE:
+
+       calculate the vertical frequency at R without any handling of physical units; low-overhead version of verticalfreq for use in loops with inputs in internal units (does not accept Quantity inputs and always returns internal units)
+
+    INPUT:
+
+       Pot - Potential instance or list thereof
+
+       R - Galactocentric radius (float or numpy.ndarray, internal units)
+
+    OUTPUT:
+
+       vertical frequency
+
+    """
+    if isinstance(Pot,Potential):
+        return nu.sqrt(Pot._z2deriv_nodecorator(R,0.))
+    elif _isList3D(Pot):
+        return nu.sqrt(_evaluatez2derivs(Pot,R,0.))
+    return verticalfreq(Pot,R,use_physical=False)
+
 @potential_physical_input
 @physical_conversion('dimensionless',pop=True)
 def flattening(Pot,R,z):
@@ -2401,7 +2668,7 @@ def rl(Pot,lz):
 
 def _rlfunc(rl,lz,pot):
     """Function that gives rvc-lz"""
-    thisvcirc= vcirc(pot,rl,use_physical=False)
+    thisvcirc= _vcirc(pot,rl)
     return rl*thisvcirc-lz
 
 def _rlFindStart(rl,lz,pot,lower=False):
@@ -2477,10 +2744,9 @@ def lindbladR(Pot,OmegaP,m=2,**kwargs):
         return out
 
 def _corotationR_eq(R,Pot,OmegaP):
-    return omegac(Pot,R,use_physical=False)-OmegaP
+    return _omegac(Pot,R)-OmegaP
 def _lindbladR_eq(R,Pot,OmegaP,m):
-    return m*(omegac(Pot,R,use_physical=False)-OmegaP)\
-        -epifreq(Pot,R,use_physical=False)
+    return m*(_omegac(Pot,R)-OmegaP)-_epifreq(Pot,R)
 
 @potential_physical_input
 @physical_conversion('frequency',pop=True)
@@ -2518,6 +2784,58 @@ def omegac(Pot,R):
         Pot= RZToplanarPotential(Pot)
         return nu.sqrt(-evaluateplanarRforces(Pot,R,use_physical=False)/R)
 
+def _omegac(Pot,R):
+    """
+    NAME:
+
+       omegac_raw
+
+    PURPOSE:
+
+       calculate the circular angular speed at R without any handling of physical units; low-overhead version of omegac for use in loops with inputs in internal units (does not accept Quantity inputs and always returns internal units)
+
+    INPUT:
+
+       Pot - Potential instance or list thereof
+
+       R - Galactocentric radius (float or numpy.ndarray, internal units)
+
+    OUTPUT:
+
+       circular angular speed
+
+    """
+    if isinstance(Pot,Potential) or _isList3D(Pot):
+        return nu.sqrt(-_evaluateRforces(Pot,R,0.)/R)
+    return omegac(Pot,R,use_physical=False)
+
+def _vcirc(Pot,R,phi=None):
+    """
+    NAME:
+
+       vcirc_raw
+
+    PURPOSE:
+
+       calculate the circular velocity at R without any handling of physical units; low-overhead version of vcirc for use in loops with inputs in internal units (does not accept Quantity inputs and always returns internal units)
+
+    INPUT:
+
+       Pot - Potential instance or list thereof
+
+       R - Galactocentric radius (float or numpy.ndarray, internal units)
+
+       phi= (None) azimuth to use for non-axisymmetric potentials
+
+    OUTPUT:
+
+       circular rotation velocity
+
+    """
+    if isinstance(Pot,Potential) or _isList3D(Pot):
+        return nu.sqrt(-R*_evaluateRforces(Pot,R,0.,phi=phi))
+    return vcirc(Pot,R,phi=phi,use_physical=False)
+
 def nemo_accname(Pot):
     """
     NAME:
@@ -2680,7 +2998,7 @@ def _check_c(Pot,dxdv=False):
        2017-07-01 - Generalized to dxdv, added general support for WrapperPotentials, and added support for planarPotentials
 
     """
-    from galpy.potential import planarPotential
+    from galpy.potential import planarPotential, linearPotential
     if dxdv: hasC_attr= 'hasC_dxdv'
     else: hasC_attr= 'hasC'
     from galpy.potential_src.WrapperPotential import parentWrapperPotential
@@ -2689,8 +3007,9 @@ def _check_c(Pot,dxdv=False):
                                dtype='bool'))
     elif isinstance(Pot,parentWrapperPotential):
         return bool(Pot.__dict__[hasC_attr]*_check_c(Pot._pot))
-    elif isinstance(Pot,Potential) or isinstance(Pot,planarPotential):
-        return Pot.__dict__[hasC_attr]
+    elif isinstance(Pot,Potential) or isinstance(Pot,planarPotential) \
+            or isinstance(Pot,linearPotential):
+        return Pot.__dict__.get(hasC_attr,False)
 
 def _dim(Pot):
     """
@@ -2749,6 +3068,13 @@ def _isNonAxi(Pot):
         nonAxi= Pot.isNonAxi
     return nonAxi
 
+def _isList3D(Pot):
+    """Determine whether Pot is a list of 3D Potential instances"""
+    if not isinstance(Pot,list): return False
+    for p in Pot:
+        if not isinstance(p,Potential): return False
+    return True
+
 def kms_to_kpcGyrDecorator(func):
     """Decorator to convert velocities from km/s to kpc/Gyr"""
     @wraps(func)
@@ -4,8 +4,8 @@ from galpy.potential_src.Potential import Potential, _APY_LOADED
 if _APY_LOADED:
     from astropy import units
     
-from galpy.util import bovy_coords
-from scipy.special import eval_gegenbauer, lpmn, gamma
+from galpy.util import bovy_coords, multi
+from scipy.special import eval_gegenbauer, gamma
 
 from numpy.polynomial.legendre import leggauss
 
@@ -47,7 +47,7 @@ class SCFPotential(Potential):
     
     and :math:`P_{lm}` is the Associated Legendre Polynomials whereas :math:`C_n^{\\alpha}` is the Gegenbauer polynomial.
     """
-    def __init__(self, amp=1., Acos=nu.array([[[1]]]),Asin=None, a = 1., normalize=False, ro=None,vo=None):
+    def __init__(self, amp=1., Acos=nu.array([[[1]]]),Asin=None, a = 1., normalize=False, cache_basis=False, ro=None,vo=None):
         """
         NAME:
 
@@ -69,6 +69,8 @@ class SCFPotential(Potential):
     
            normalize - if True, normalize such that vc(1.,0.)=1., or, if given as a number, such that the force is this fraction of the force necessary to make vc(1.,0.)=1.
 
+           cache_basis= (False) if True, keep the radial and angular basis functions evaluated at the last set of points, such that repeated evaluations of the density, potential, and forces at the same points do not re-evaluate them (memory use scales as N x L x the number of points)
+
            ro=, vo= distance and velocity scales for translation into internal units (default from configuration file)
 
         OUTPUT:
@@ -128,6 +130,9 @@ class SCFPotential(Potential):
         else:
             self._Asin = nu.zeros_like(Acos)
         self._force_hash= None
+        self._cache_basis= cache_basis
+        self._basis_hash= None
+        self._basis_cache= {}
         self.hasC= True
         self.hasC_dxdv=True
         
@@ -183,23 +188,22 @@ class SCFPotential(Potential):
         PURPOSE:
            Evaluate rho_tilde as defined in equation 3.9 and 2.24 for 0 <= n < N and 0 <= l < L
         INPUT:
-           r - Evaluate at radius r
+           r - Evaluate at radius r (can be an array)
            N - size of the N dimension
            L - size of the L dimension
         OUTPUT:
-           rho tilde 
+           rho tilde (NxL, or NxLx[shape of r] for array r)
         HISTORY:
            2016-05-17 - Written - Aladdin 
         """
+        r = nu.asarray(r, dtype=float)
         xi = self._calculateXi(r)
         CC = _C(xi,N,L)
         a = self._a
-        rho = nu.zeros((N,L), float)
-        n = nu.arange(0,N, dtype=float)[:, nu.newaxis]
-        l = nu.arange(0, L, dtype=float)[nu.newaxis,:]
+        n = nu.arange(0,N, dtype=float).reshape((N,1) + (1,)*r.ndim)
+        l = nu.arange(0, L, dtype=float).reshape((1,L) + (1,)*r.ndim)
         K = 0.5 * n * (n + 4*l + 3) + (l + 1.)*(2*l + 1)
-        rho[:,:] = K * ((a*r)**l) / ((r/a)*(a + r)**(2*l + 3.)) * CC[:,:]* (nu.pi)**-0.5
-        return rho   
+        return K * ((a*r)**l) / ((r/a)*(a + r)**(2*l + 3.)) * CC * (nu.pi)**-0.5
 
     def _phiTilde(self, r, N,L):
         """
@@ -208,56 +212,89 @@ class SCFPotential(Potential):
         PURPOSE:
            Evaluate phi_tilde as defined in equation 3.10 and 2.25 for 0 <= n < N and 0 <= l < L
         INPUT:
-           r - Evaluate at radius r
+           r - Evaluate at radius r (can be an array)
            N - size of the N dimension
            L - size of the L dimension
         OUTPUT:
-           phi tilde 
+           phi tilde (NxL, or NxLx[shape of r] for array r)
         HISTORY:
            2016-05-17 - Written - Aladdin 
         """
+        r = nu.asarray(r, dtype=float)
         xi = self._calculateXi(r)
         CC = _C(xi,N,L)
         a = self._a
-        phi = nu.zeros((N,L), float)
-        n = nu.arange(0,N)[:, nu.newaxis]
-        l = nu.arange(0, L)[nu.newaxis,:]
-        phi[:,:] = - (r*a)**l/ ((a + r)**(2*l + 1.)) * CC[:,:]* (4*nu.pi)**0.5
-        return phi  
+        l = nu.arange(0, L, dtype=float).reshape((1,L) + (1,)*r.ndim)
+        return - (r*a)**l/ ((a + r)**(2*l + 1.)) * CC * (4*nu.pi)**0.5
         
+    def _basis(self, key, func, *args):
+        """
+        NAME:
+           _basis
+        PURPOSE:
+           evaluate a set of basis functions, using the cached values if cache_basis is set
+        INPUT:
+           key - name of the basis functions in the cache
+           func - function that evaluates the basis functions
+           args - arguments of func
+        OUTPUT:
+           func(*args)
+        """
+        if not self._cache_basis:
+            return func(*args)
+        if not key in self._basis_cache:
+            self._basis_cache[key] = func(*args)
+        return self._basis_cache[key]
+
+    def _setBasisPoints(self, r, theta, phi):
+        """
+        NAME:
+           _setBasisPoints
+        PURPOSE:
+           clear the cache of basis functions if they were evaluated at a different set of points
+        INPUT:
+           r - spherical radius
+           theta - polar angle
+           phi - azimuth
+        OUTPUT:
+           (none)
+        """
+        if not self._cache_basis: return None
+        new_hash= hashlib.md5(nu.array([r, theta, phi])).hexdigest()
+        if new_hash != self._basis_hash:
+            self._basis_hash = new_hash
+            self._basis_cache = {}
+        return None
+
     def _compute(self, funcTilde, R, z, phi):
         """
         NAME:
            _compute
         PURPOSE:
-           evaluate the NxLxM density or potential
+           evaluate the density or potential at a 1D array of points
         INPUT:
            funcTidle - must be _rhoTilde or _phiTilde
            R - Cylindrical Galactocentric radius
            z - vertical height
            phi - azimuth
         OUTPUT:
-           An NxLxM density or potential at (R,z, phi)
+           The density or potential at (R,z, phi)
         HISTORY:
            2016-05-18 - Written - Aladdin 
         """
         Acos, Asin = self._Acos, self._Asin
         N, L, M = Acos.shape    
         r, theta, phi = bovy_coords.cyl_to_spher(R,z,phi)
+        self._setBasisPoints(r, theta, phi)
         
+        PP = self._basis('legendre', _legendre, nu.cos(theta), L, M)[0] ##Get the Legendre polynomials
+        func_tilde = self._basis(funcTilde.__name__, funcTilde, r, N, L) ## Tilde of the function of interest 
+        mcos, msin = self._basis('trig', _trig, phi, M)
         
-   
-        PP = lpmn(M-1,L-1,nu.cos(theta))[0].T ##Get the Legendre polynomials
-        func_tilde = funcTilde(r, N, L) ## Tilde of the function of interest 
-        
-        func = nu.zeros((N,L,M), float) ## The function of interest (density or potential)
-        
-        m = nu.arange(0, M)[nu.newaxis, nu.newaxis, :]
-        mcos = nu.cos(m*phi)
-        msin = nu.sin(m*phi)
-        func = func_tilde[:,:,None]*(Acos[:,:,:]*mcos + Asin[:,:,:]*msin)*PP[None,:,:]
-        return func
-        
+        ##Sum over n first, then over l and m
+        Ac = _sumN(Acos, func_tilde)
+        As = _sumN(Asin, func_tilde)
+        return nu.sum(PP*(Ac*mcos + As*msin), axis=(0,1))
         
     def _computeArray(self, funcTilde, R, z, phi):
         """
@@ -275,19 +312,13 @@ class SCFPotential(Potential):
         HISTORY:
            2016-06-02 - Written - Aladdin 
         """
-        R = nu.array(R,dtype=float); z = nu.array(z,dtype=float); phi = nu.array(phi,dtype=float);
-        
-        shape = (R*z*phi).shape
-        if shape == (): return nu.sum(self._compute(funcTilde, R,z,phi))
-        R = R*nu.ones(shape); z = z*nu.ones(shape); phi = phi*nu.ones(shape);
-        func = nu.zeros(shape, float)
-
-        
-        li = _cartesian(shape)
-        for i in range(li.shape[0]):
-            j = nu.split(li[i], li.shape[1])
-            func[j] = nu.sum(self._compute(funcTilde, R[j][0],z[j][0],phi[j][0]))
-        return func
+        R, z, phi = nu.broadcast_arrays(nu.array(R,dtype=float),
+                                        nu.array(z,dtype=float),
+                                        nu.array(phi,dtype=float))
+        shape = R.shape
+        func = self._compute(funcTilde, R.flatten(), z.flatten(), phi.flatten())
+        if shape == (): return func[0]
+        return func.reshape(shape)
         
     def _dens(self, R, z, phi=0., t=0.):
         """
@@ -336,17 +367,17 @@ class SCFPotential(Potential):
         PURPOSE:
            Evaluate the derivative of phiTilde with respect to r
         INPUT:
-           r - spherical radius
+           r - spherical radius (can be an array)
            N - size of the N dimension
            L - size of the L dimension
         OUTPUT:
-           the derivative of phiTilde with respect to r
+           the derivative of phiTilde with respect to r (NxL, or NxLx[shape of r] for array r)
         HISTORY:
            2016-06-06 - Written - Aladdin 
         """
+        r = nu.asarray(r, dtype=float)
         a = self._a
-        l = nu.arange(0, L, dtype=float)[nu.newaxis, :]
-        n = nu.arange(0, N, dtype=float)[:, nu.newaxis]
+        l = nu.arange(0, L, dtype=float).reshape((1,L) + (1,)*r.ndim)
         xi = self._calculateXi(r)
         dC = _dC(xi,N,L)
         return -(4*nu.pi)**.5 * (nu.power(a*r, l)*(l*(a + r)*nu.power(r,-1) -(2*l + 1))/((a + r)**(2*l + 2))*_C(xi,N,L) + 
@@ -358,7 +389,7 @@ class SCFPotential(Potential):
         NAME:
            _computeforce
         PURPOSE:
-           Evaluate the first derivative of Phi with respect to R, z and phi
+           Evaluate the first derivative of Phi with respect to R, z and phi at a 1D array of points
         INPUT:
            R - Cylindrical Galactocentric radius
            z - vertical height
@@ -380,18 +411,21 @@ class SCFPotential(Potential):
             dPhi_dphi = self._cached_dPhi_dphi
             
         else:        
-            PP, dPP = lpmn(M-1,L-1,nu.cos(theta)) ##Get the Legendre polynomials
-            PP = PP.T[None,:,:]
-            dPP = dPP.T[None,:,:]
-            phi_tilde = self._phiTilde(r, N, L)[:,:,nu.newaxis] 
-            dphi_tilde = self._dphiTilde(r,N,L)[:,:,nu.newaxis]
+            self._setBasisPoints(r, theta, phi)
+            PP, dPP = self._basis('legendre', _legendre, nu.cos(theta), L, M) ##Get the Legendre polynomials and their derivative wrt theta
+            phi_tilde = self._basis('_phiTilde', self._phiTilde, r, N, L)
+            dphi_tilde = self._basis('_dphiTilde', self._dphiTilde, r, N, L)
+            mcos, msin = self._basis('trig', _trig, phi, M)
             
-            m = nu.arange(0, M)[nu.newaxis, nu.newaxis, :]
-            mcos = nu.cos(m*phi)
-            msin = nu.sin(m*phi)
-            dPhi_dr = -nu.sum((Acos*mcos + Asin*msin)*PP*dphi_tilde)
-            dPhi_dtheta = -nu.sum((Acos*mcos + Asin*msin)*phi_tilde*dPP*(-nu.sin(theta)))
-            dPhi_dphi =-nu.sum(m*(Asin*mcos - Acos*msin)*phi_tilde*PP)
+            ##Sum over n first, then over l and m
+            Ac = _sumN(Acos, phi_tilde)
+            As = _sumN(Asin, phi_tilde)
+            dAc = _sumN(Acos, dphi_tilde)
+            dAs = _sumN(Asin, dphi_tilde)
+            m = nu.arange(0, M)[nu.newaxis, :, nu.newaxis]
+            dPhi_dr = -nu.sum((dAc*mcos + dAs*msin)*PP, axis=(0,1))
+            dPhi_dtheta = -nu.sum((Ac*mcos + As*msin)*dPP, axis=(0,1))
+            dPhi_dphi =-nu.sum(m*(As*mcos - Ac*msin)*PP, axis=(0,1))
             
             self._force_hash = new_hash
             self._cached_dPhi_dr = dPhi_dr
@@ -418,25 +452,16 @@ class SCFPotential(Potential):
         HISTORY:
            2016-06-02 - Written - Aladdin 
         """     
-        R = nu.array(R,dtype=float); z = nu.array(z,dtype=float); phi = nu.array(phi,dtype=float);
-        shape = (R*z*phi).shape
-        if shape == (): 
-            dPhi_dr,dPhi_dtheta,dPhi_dphi = \
-            self._computeforce(R,z,phi)
-            return dr_dx*dPhi_dr + dtheta_dx*dPhi_dtheta +dPhi_dphi*dphi_dx
-        
-        R = R*nu.ones(shape);
-        z = z* nu.ones(shape);
-        phi = phi* nu.ones(shape);
-        force = nu.zeros(shape, float)
-        dr_dx = dr_dx*nu.ones(shape); dtheta_dx = dtheta_dx*nu.ones(shape);dphi_dx = dphi_dx*nu.ones(shape);  
-        li = _cartesian(shape)
-
-        for i in range(li.shape[0]):
-            j = nu.split(li[i], li.shape[1])
-            dPhi_dr,dPhi_dtheta,dPhi_dphi = \
-            self._computeforce(R[j][0],z[j][0],phi[j][0])
-            force[j] = dr_dx[j][0]*dPhi_dr + dtheta_dx[j][0]*dPhi_dtheta +dPhi_dphi*dphi_dx[j][0]
+        R, z, phi = nu.broadcast_arrays(nu.array(R,dtype=float),
+                                        nu.array(z,dtype=float),
+                                        nu.array(phi,dtype=float))
+        shape = R.shape
+        dPhi_dr,dPhi_dtheta,dPhi_dphi = \
+            self._computeforce(R.flatten(),z.flatten(),phi.flatten())
+        force = dr_dx*dPhi_dr.reshape(shape) \
+            + dtheta_dx*dPhi_dtheta.reshape(shape) \
+            + dphi_dx*dPhi_dphi.reshape(shape)
+        if shape == (): return force[()]
         return force
     def _Rforce(self, R, z, phi=0, t=0):
         """
@@ -522,36 +547,99 @@ def _C(xi, N,L, alpha = lambda x: 2*x + 3./2):
     PURPOSE:
        Evaluate C_n,l (the Gegenbauer polynomial) for 0 <= l < L and 0<= n < N 
     INPUT:
-       xi - radial transformed variable
+       xi - radial transformed variable (can be an array)
        N - Size of the N dimension
        L - Size of the L dimension
        alpha = A lambda function of l. Default alpha = 2l + 3/2 
        
     OUTPUT:
-       An LxN Gegenbauer Polynomial 
+       An NxL Gegenbauer Polynomial (NxLx[shape of xi] for array xi)
     HISTORY:
        2016-05-16 - Written - Aladdin 
     """
-    CC = nu.zeros((N,L), float) 
-     
-    for l in range(L):
-        for n in range(N):
-            a = alpha(l)
-            if n==0:
-                CC[n][l] = 1.
-                continue 
-            elif n==1: CC[n][l] = 2.*a*xi
-            if n + 1 != N:
-                CC[n+1][l] = (n + 1.)**-1. * (2*(n + a)*xi*CC[n][l] - (n + 2*a - 1)*CC[n-1][l])
+    xi = nu.asarray(xi)
+    a = alpha(nu.arange(L, dtype=float)).reshape((L,) + (1,)*xi.ndim)
+    CC = nu.zeros((N,L) + xi.shape, float)
+    CC[0] = 1.
+    if N > 1: CC[1] = 2.*a*xi
+    ##Recurrence in n, vectorized over l and xi
+    for n in range(1, N - 1):
+        CC[n+1] = (n + 1.)**-1. * (2*(n + a)*xi*CC[n] - (n + 2*a - 1)*CC[n-1])
     return CC 
     
 def _dC(xi, N, L):
-    l = nu.arange(0,L)[nu.newaxis, :]
+    xi = nu.asarray(xi)
+    l = nu.arange(0,L).reshape((1,L) + (1,)*xi.ndim)
     CC = _C(xi,N + 1,L, alpha = lambda x: 2*x + 5./2)
-    CC = nu.roll(CC, 1, axis=0)[:-1,:]
-    CC[0, :] = 0
+    CC = nu.roll(CC, 1, axis=0)[:-1]
+    CC[0] = 0
     CC *= 2*(2*l + 3./2)
     return CC
+
+def _legendre(x, L, M):
+    """
+    NAME:
+       _legendre
+    PURPOSE:
+       Evaluate the associated Legendre polynomials P_lm(x) and their derivative with respect to theta (x = cos(theta)) for 0 <= l < L and 0 <= m < M using recurrence relations
+    INPUT:
+       x - cos(theta) (can be an array)
+       L - Size of the L dimension
+       M - Size of the M dimension
+    OUTPUT:
+       (P,dP/dtheta) each LxM (LxMx[shape of x] for array x); same convention as scipy.special.lpmn
+    """
+    x = nu.asarray(x, dtype=float)
+    sintheta = nu.sqrt(1. - x**2.)
+    ##Evaluate up to m = M, which is necessary for the derivative
+    PP = nu.zeros((L, M + 1) + x.shape, float)
+    Pmm = nu.ones(x.shape, float)
+    for m in range(min(L, M + 1)):
+        if m > 0: Pmm = -(2*m - 1.)*sintheta*Pmm
+        PP[m,m] = Pmm
+    ##Recurrence in l, vectorized over m and x; uses that P_lm = 0 for m > l
+    for l in range(1, L):
+        mm = min(l, M + 1)
+        m = nu.arange(0, mm, dtype=float).reshape((mm,) + (1,)*x.ndim)
+        Pl2 = PP[l-2,:mm] if l > 1 else 0.
+        PP[l,:mm] = ((2*l - 1.)*x*PP[l-1,:mm] - (l + m - 1.)*Pl2)/(l - m)
+    ##dP_lm/dtheta = (P_l(m+1) - (l+m)(l-m+1)P_l(m-1))/2, which is regular at the poles
+    l = nu.arange(0, L, dtype=float).reshape((L, 1) + (1,)*x.ndim)
+    m = nu.arange(1, M, dtype=float).reshape((1, M - 1) + (1,)*x.ndim)
+    dPP = nu.empty((L, M) + x.shape, float)
+    dPP[:,0] = PP[:,1]
+    dPP[:,1:] = .5*(PP[:,2:] - (l + m)*(l - m + 1.)*PP[:,:M-1])
+    return PP[:,:M], dPP
+
+def _sumN(A, func_tilde):
+    """
+    NAME:
+       _sumN
+    PURPOSE:
+       Sum the coefficients times the radial basis functions over n
+    INPUT:
+       A - NxLxM expansion coefficients
+       func_tilde - NxLxK radial basis functions at K points
+    OUTPUT:
+       LxMxK sum over n
+    """
+    return nu.matmul(nu.transpose(A, (1,2,0)), nu.transpose(func_tilde, (1,0,2)))
+
+def _trig(phi, M):
+    """
+    NAME:
+       _trig
+    PURPOSE:
+       Evaluate cos(m phi) and sin(m phi) for 0 <= m < M
+    INPUT:
+       phi - azimuth (can be an array)
+       M - Size of the M dimension
+    OUTPUT:
+       (cos(m phi),sin(m phi)) each Mx[shape of phi]
+    """
+    phi = nu.asarray(phi, dtype=float)
+    mphi = nu.arange(0, M).reshape((M,) + (1,)*phi.ndim)*phi
+    return nu.cos(mphi), nu.sin(mphi)
      
 def scf_compute_coeffs_spherical(dens, N, a=1., radial_order=None):
         """
@@ -659,7 +747,7 @@ def scf_compute_coeffs_axi(dens, N, L, a=1.,radial_order=None, costheta_order=No
             r = _xiToR(xi,a)
             R = r*nu.sqrt(1 - costheta**2.)
             z = r*costheta
-            Legandre = lpmn(0,L-1,costheta)[0].T[nu.newaxis,:,0]
+            Legandre = _legendre(costheta, L, 1)[0][nu.newaxis,:,0]
             dV = (1. + xi)**2. * nu.power(1. - xi, -4.) 
             phi_nl =  a**3*(1. + xi)**l * (1. - xi)**(l + 1.)*_C(xi, N, L)[:,:] * Legandre
             param[0] = R
@@ -733,7 +821,7 @@ def scf_compute_coeffs(dens, N, L, a=1., radial_order=None, costheta_order=None,
             r = _xiToR(xi, a)
             R = r*nu.sqrt(1 - costheta**2.)
             z = r*costheta
-            Legandre = lpmn(L - 1,L-1,costheta)[0].T[nu.newaxis,:,:]
+            Legandre = _legendre(costheta, L, L)[0][nu.newaxis,:,:]
             dV = (1. + xi)**2. * nu.power(1. - xi, -4.)
             
             
@@ -754,24 +842,132 @@ def scf_compute_coeffs(dens, N, L, a=1., radial_order=None, costheta_order=None,
         if phi_order != None:
             Ksample[2] = phi_order
         integrated = _gaussianQuadrature(integrand, [[-1., 1.], [-1., 1.], [0, 2*nu.pi]], Ksample = Ksample)
-        n = nu.arange(0,N)[:,nu.newaxis, nu.newaxis]
-        l = nu.arange(0,L)[nu.newaxis,:, nu.newaxis]
-        m = nu.arange(0,L)[nu.newaxis,nu.newaxis,:]
-        K = .5*n*(n + 4*l + 3) + (l + 1)*(2*l + 1)
-        
+        Acos[:,:,:],Asin[:,:,:] = 2*_coeffs_normalization(N, L)[nu.newaxis,:,:,:] * integrated
         
-        Nln = .5*gammaln(l - m + 1) - .5*gammaln(l + m + 1) - (2*l)*nu.log(2)
-        NN = nu.e**(Nln)
+        return Acos, Asin
 
-        NN[nu.where(NN == nu.inf)] = 0 ## To account for the fact that m cant be bigger than l
-            
-        constants = NN*(2*l + 1.)**.5
-        
-        lnI = -(8*l + 6)*nu.log(2) + gammaln(n + 4*l + 3) - gammaln(n + 1) - nu.log(n + 2*l + 3./2) - 2*gammaln(2*l + 3./2)
-        I = -K*(4*nu.pi) * nu.e**(lnI)
-        Acos[:,:,:],Asin[:,:,:] = 2*(I**-1.)[nu.newaxis,:,:,:] * integrated * constants[nu.newaxis,:,:,:]
+def _coeffs_normalization(N, L):
+    """
+    NAME:
+       _coeffs_normalization
+    PURPOSE:
+       Compute the factor that converts the integral of the density times the basis functions into the expansion coefficients
+    INPUT:
+       N - size of the Nth dimension of the expansion coefficients
+       L - size of the Lth and Mth dimension of the expansion coefficients
+    OUTPUT:
+       NxLxL array of I_nl^-1 times the normalization of the basis functions
+    """
+    n = nu.arange(0,N)[:,nu.newaxis, nu.newaxis]
+    l = nu.arange(0,L)[nu.newaxis,:, nu.newaxis]
+    m = nu.arange(0,L)[nu.newaxis,nu.newaxis,:]
+    K = .5*n*(n + 4*l + 3) + (l + 1)*(2*l + 1)
+    
+    Nln = .5*gammaln(l - m + 1) - .5*gammaln(l + m + 1) - (2*l)*nu.log(2)
+    NN = nu.e**(Nln)
+
+    NN[nu.where(NN == nu.inf)] = 0 ## To account for the fact that m cant be bigger than l
         
-        return Acos, Asin
+    constants = NN*(2*l + 1.)**.5
+    
+    lnI = -(8*l + 6)*nu.log(2) + gammaln(n + 4*l + 3) - gammaln(n + 1) - nu.log(n + 2*l + 3./2) - 2*gammaln(2*l + 3./2)
+    I = -K*(4*nu.pi) * nu.e**(lnI)
+    return I**-1.*constants
+
+def scf_compute_coeffs_nbody(pos, N, L, mass=1., a=1., variance=False,
+                             chunksize=10000, numcores=1):
+        """
+        NAME:
+
+           scf_compute_coeffs_nbody
+
+        PURPOSE:
+
+           Compute the expansion coefficients for a density represented by a set of N-body particles
+
+        INPUT:
+
+           pos - positions of the particles in rectangular coordinates with shape [3,n]
+
+           N - size of the Nth dimension of the expansion coefficients
+
+           L - size of the Lth and Mth dimension of the expansion coefficients
+
+           mass= (1.) mass of the particles (scalar or array with shape [n]); in internal units, such that the total mass of the particles is the integral of the density
+
+           a - parameter used to shift the basis functions
+
+           variance= (False) if True, also return the variance of the coefficients due to the finite number of particles
+
+           chunksize= (10000) number of particles for which the basis functions are evaluated at once
+
+           numcores= (1) number of cores to spread the chunks of particles over using multiprocessing
+
+        OUTPUT:
+
+           (Acos,Asin) - Expansion coefficients for the particles that can be given to SCFPotential.__init__
+
+           (Acos,Asin,Acos_var,Asin_var) if variance; coefficients whose square is smaller than their variance are dominated by particle noise and can be set to zero to truncate the expansion (e.g., Weinberg 1996)
+
+        """
+        pos = nu.asarray(pos, dtype=float)
+        npart = pos.shape[1]
+        mass = mass*nu.ones(npart)
+        nchunk = int(nu.ceil(npart/float(chunksize)))
+        def chunk_sums(ii):
+            indx = slice(ii*chunksize, (ii + 1)*chunksize)
+            return _nbody_sums(pos[0,indx], pos[1,indx], pos[2,indx],
+                               mass[indx], N, L, a, variance)
+        if numcores > 1:
+            sums = list(multi.parallel_map(chunk_sums, range(nchunk),
+                                           numcores=numcores))
+        else:
+            sums = [chunk_sums(ii) for ii in range(nchunk)]
+        ##Sum of mass x basis functions (and of their squares) over particles
+        sums = nu.sum(sums, axis=0)
+        S = sums[:2]
+        norm = _coeffs_normalization(N, L)[nu.newaxis,:,:,:]
+        Acos, Asin = norm*S
+        if not variance:
+            return Acos, Asin
+        S2 = sums[2:]
+        Acos_var, Asin_var = norm**2.*(S2 - S**2./npart)
+        return Acos, Asin, Acos_var, Asin_var
+
+def _nbody_sums(x, y, z, mass, N, L, a, variance):
+    """
+    NAME:
+       _nbody_sums
+    PURPOSE:
+       Sum the basis functions, weighted by the mass, over a set of particles
+    INPUT:
+       x, y, z - rectangular coordinates of the particles
+       mass - mass of the particles
+       N - size of the Nth dimension of the expansion coefficients
+       L - size of the Lth and Mth dimension of the expansion coefficients
+       a - parameter used to shift the basis functions
+       variance - if True, also sum the squares
+    OUTPUT:
+       array with shape 2xNxLxL with the sums of the cos and sin terms, followed by the sums of their squares if variance (4xNxLxL)
+    """
+    r = nu.sqrt(x**2. + y**2. + z**2.)
+    costheta = nu.ones_like(r)
+    costheta[r > 0.] = z[r > 0.]/r[r > 0.]
+    phi = nu.arctan2(y, x)
+    xi = (r - a)/(r + a)
+    l = nu.arange(0, L)[:,nu.newaxis]
+    m = nu.arange(0, L)[:,nu.newaxis]
+    phi_nl = - (1. + xi)**l * (1. - xi)**(l + 1.)*_C(xi, N, L)
+    Legandre = _legendre(costheta, L, L)[0]
+    mcos = nu.cos(m*phi)*mass
+    msin = nu.sin(m*phi)*mass
+    out = nu.array([nu.einsum('nlk,lmk->nlm', phi_nl, Legandre*mcos),
+                    nu.einsum('nlk,lmk->nlm', phi_nl, Legandre*msin)])
+    if not variance:
+        return out
+    out2 = nu.array([nu.einsum('nlk,lmk->nlm', phi_nl**2., (Legandre*mcos)**2.),
+                     nu.einsum('nlk,lmk->nlm', phi_nl**2., (Legandre*msin)**2.)])
+    return nu.concatenate((out, out2))
 
 def _cartesian(arraySizes, out=None):
     """
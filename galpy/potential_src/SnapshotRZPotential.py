@@ -6,14 +6,21 @@ from galpy.potential_src.Potential import Potential
 from galpy.potential_src import interpRZPotential
 from galpy.potential_src.interpRZPotential import scalarVectorDecorator, \
     zsymDecorator
-try: 
-    import pynbody
-    from pynbody import gravity
-    from pynbody.units import NoUnit
-except ImportError: #pragma: no cover
-    _PYNBODY_LOADED= False
-else:
-    _PYNBODY_LOADED= True    
+# pynbody is slow to import, so it is only imported when a snapshot
+# potential is set up
+pynbody= None
+def _load_pynbody(name):
+    """Import pynbody into this module's namespace, raising an ImportError mentioning the class name if it cannot be loaded"""
+    global pynbody, gravity, NoUnit
+    if not pynbody is None: return None
+    try: 
+        import pynbody as _pynbody
+        from pynbody import gravity
+        from pynbody.units import NoUnit
+    except ImportError: #pragma: no cover
+        raise ImportError("The %s class is designed to work with pynbody snapshots, which cannot be loaded (probably because it is not installed) -- obtain from pynbody.github.io" % name)
+    pynbody= _pynbody
+    return None
 class SnapshotRZPotential(Potential):
     """Class that implements an axisymmetrized version of the potential of an N-body snapshot (requires `pynbody <http://pynbody.github.io>`__)
 
@@ -56,8 +63,7 @@ class SnapshotRZPotential(Potential):
            2014-11-24 - Edited for merging into main galpy - Bovy (IAS)
 
         """
-        if not _PYNBODY_LOADED:
-            raise ImportError("The SnapShotRZPotential class is designed to work with pynbody snapshots, which cannot be loaded (probably because it is not installed) -- obtain from pynbody.github.io")
+        _load_pynbody('SnapShotRZPotential')
         Potential.__init__(self,amp=1.0,ro=ro,vo=vo)
         self._s = s
         self._point_hash = {}
@@ -190,8 +196,7 @@ class InterpSnapshotRZPotential(interpRZPotential.interpRZPotential) :
            2014-11-24 - Edited for merging into main galpy - Bovy (IAS)
 
         """
-        if not _PYNBODY_LOADED:
-            raise ImportError("The InterpSnapRZShotPotential class is designed to work with pynbody snapshots, which cannot be loaded (probably because it is not installed) -- obtain from pynbody.github.io")
+        _load_pynbody('InterpSnapRZShotPotential')
         
         # inititalize using the base class
         Potential.__init__(self,amp=1.0,ro=ro,vo=vo)
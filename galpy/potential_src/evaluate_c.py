@@ -0,0 +1,334 @@
+###############################################################################
+#   evaluate_c.py: bulk evaluation of potentials and forces in C
+#
+#   Evaluates the potential or forces of any (list of) potential(s) with a
+#   C implementation at a large number of points in parallel (using OpenMP),
+#   writing into a given output array; falls back onto the Python
+#   implementation for potentials without C. Densities and second
+#   derivatives have the same interface, but are always evaluated in Python,
+#   because the C potentials do not implement them in 3D
+###############################################################################
+import ctypes
+import numpy
+from numpy.ctypeslib import ndpointer
+from galpy.potential_src.interpRZPotential import _lib, ext_loaded
+# Types of potentials (in the parsing of integrateFullOrbit._parse_pot) that
+# can be evaluated in C (through the parsing for actions), forces can be
+# evaluated for all potentials with a C implementation
+_POTENTIALEVAL_TYPES= set([0,5,7,8,9,10,11,12,13,14,15,16,17,18,19,20,21,
+                           22,23,24,25,26,29,33,-1])
+def evaluatePotentials_c(Pot,R,z,phi=None,t=0.,out=None):
+    """
+    NAME:
+
+       evaluatePotentials_c
+
+    PURPOSE:
+
+       evaluate a (list of) potential(s) at many points at once in C (in parallel using OpenMP)
+
+    INPUT:
+
+       Pot - a potential or list of potentials
+
+       R - cylindrical Galactocentric distance (array; internal units)
+
+       z - distance above the plane (array; internal units)
+
+       phi - azimuth (optional; array)
+
+       t - time (optional; array; internal units)
+
+       out= (None) if set, float64, C-contiguous array with the shape of the broadcast inputs to write the output into
+
+    OUTPUT:
+
+       Phi(R,z,phi,t) (in internal units)
+
+    """
+    return _evaluate_c(Pot,R,z,phi,t,0,out)
+
+def evaluateRforces_c(Pot,R,z,phi=None,t=0.,out=None):
+    """
+    NAME:
+
+       evaluateRforces_c
+
+    PURPOSE:
+
+       evaluate the radial force of a (list of) potential(s) at many points at once in C (in parallel using OpenMP)
+
+    INPUT:
+
+       Pot - a potential or list of potentials
+
+       R - cylindrical Galactocentric distance (array; internal units)
+
+       z - distance above the plane (array; internal units)
+
+       phi - azimuth (optional; array)
+
+       t - time (optional; array; internal units)
+
+       out= (None) if set, float64, C-contiguous array with the shape of the broadcast inputs to write the output into
+
+    OUTPUT:
+
+       F_R(R,z,phi,t) (in internal units)
+
+    """
+    return _evaluate_c(Pot,R,z,phi,t,1,out)
+
+def evaluatezforces_c(Pot,R,z,phi=None,t=0.,out=None):
+    """
+    NAME:
+
+       evaluatezforces_c
+
+    PURPOSE:
+
+       evaluate the vertical force of a (list of) potential(s) at many points at once in C (in parallel using OpenMP)
+
+    INPUT:
+
+       Pot - a potential or list of potentials
+
+       R - cylindrical Galactocentric distance (array; internal units)
+
+       z - distance above the plane (array; internal units)
+
+       phi - azimuth (optional; array)
+
+       t - time (optional; array; internal units)
+
+       out= (None) if set, float64, C-contiguous array with the shape of the broadcast inputs to write the output into
+
+    OUTPUT:
+
+       F_z(R,z,phi,t) (in internal units)
+
+    """
+    return _evaluate_c(Pot,R,z,phi,t,2,out)
+
+def evaluatephiforces_c(Pot,R,z,phi=None,t=0.,out=None):
+    """
+    NAME:
+
+       evaluatephiforces_c
+
+    PURPOSE:
+
+       evaluate the azimuthal force of a (list of) potential(s) at many points at once in C (in parallel using OpenMP)
+
+    INPUT:
+
+       Pot - a potential or list of potentials
+
+       R - cylindrical Galactocentric distance (array; internal units)
+
+       z - distance above the plane (array; internal units)
+
+       phi - azimuth (optional; array)
+
+       t - time (optional; array; internal units)
+
+       out= (None) if set, float64, C-contiguous array with the shape of the broadcast inputs to write the output into
+
+    OUTPUT:
+
+       F_phi(R,z,phi,t) (in internal units)
+
+    """
+    return _evaluate_c(Pot,R,z,phi,t,3,out)
+
+def evaluateDensities_c(Pot,R,z,phi=None,t=0.,out=None):
+    """
+    NAME:
+
+       evaluateDensities_c
+
+    PURPOSE:
+
+       evaluate the density of a (list of) potential(s) at many points at once, with the same interface as evaluatePotentials_c; because the C implementations of the potentials do not include the density, this is always done in Python
+
+    INPUT:
+
+       Pot - a potential or list of potentials
+
+       R - cylindrical Galactocentric distance (array; internal units)
+
+       z - distance above the plane (array; internal units)
+
+       phi - azimuth (optional; array)
+
+       t - time (optional; array; internal units)
+
+       out= (None) if set, float64, C-contiguous array with the shape of the broadcast inputs to write the output into
+
+    OUTPUT:
+
+       rho(R,z,phi,t) (in internal units)
+
+    """
+    return _evaluate_c(Pot,R,z,phi,t,4,out)
+
+def evaluateR2derivs_c(Pot,R,z,phi=None,t=0.,out=None):
+    """
+    NAME:
+
+       evaluateR2derivs_c
+
+    PURPOSE:
+
+       evaluate the second radial derivative of a (list of) potential(s) at many points at once, with the same interface as evaluatePotentials_c; because the C implementations of the potentials do not include the second radial derivative, this is always done in Python
+
+    INPUT:
+
+       Pot - a potential or list of potentials
+
+       R - cylindrical Galactocentric distance (array; internal units)
+
+       z - distance above the plane (array; internal units)
+
+       phi - azimuth (optional; array)
+
+       t - time (optional; array; internal units)
+
+       out= (None) if set, float64, C-contiguous array with the shape of the broadcast inputs to write the output into
+
+    OUTPUT:
+
+       d2Phi/dR2(R,z,phi,t) (in internal units)
+
+    """
+    return _evaluate_c(Pot,R,z,phi,t,5,out)
+
+def evaluatez2derivs_c(Pot,R,z,phi=None,t=0.,out=None):
+    """
+    NAME:
+
+       evaluatez2derivs_c
+
+    PURPOSE:
+
+       evaluate the second vertical derivative of a (list of) potential(s) at many points at once, with the same interface as evaluatePotentials_c; because the C implementations of the potentials do not include the second vertical derivative, this is always done in Python
+
+    INPUT:
+
+       Pot - a potential or list of potentials
+
+       R - cylindrical Galactocentric distance (array; internal units)
+
+       z - distance above the plane (array; internal units)
+
+       phi - azimuth (optional; array)
+
+       t - time (optional; array; internal units)
+
+       out= (None) if set, float64, C-contiguous array with the shape of the broadcast inputs to write the output into
+
+    OUTPUT:
+
+       d2Phi/dz2(R,z,phi,t) (in internal units)
+
+    """
+    return _evaluate_c(Pot,R,z,phi,t,6,out)
+
+def evaluateRzderivs_c(Pot,R,z,phi=None,t=0.,out=None):
+    """
+    NAME:
+
+       evaluateRzderivs_c
+
+    PURPOSE:
+
+       evaluate the mixed radial, vertical derivative of a (list of) potential(s) at many points at once, with the same interface as evaluatePotentials_c; because the C implementations of the potentials do not include the mixed radial, vertical derivative, this is always done in Python
+
+    INPUT:
+
+       Pot - a potential or list of potentials
+
+       R - cylindrical Galactocentric distance (array; internal units)
+
+       z - distance above the plane (array; internal units)
+
+       phi - azimuth (optional; array)
+
+       t - time (optional; array; internal units)
+
+       out= (None) if set, float64, C-contiguous array with the shape of the broadcast inputs to write the output into
+
+    OUTPUT:
+
+       d2Phi/dR/dz(R,z,phi,t) (in internal units)
+
+    """
+    return _evaluate_c(Pot,R,z,phi,t,7,out)
+
+def _evaluate_c(Pot,R,z,phi,t,which,out):
+    """Evaluate the potential (which=0), Rforce (1), zforce (2), or phiforce (3) in C if possible, in Python otherwise; the density (4), R2deriv (5), z2deriv (6), and Rzderiv (7) are always evaluated in Python"""
+    from galpy.potential_src.Potential import Potential, PotentialError, \
+        _isNonAxi, _check_c, _evaluatePotentials, _evaluateRforces, \
+        _evaluatezforces, _evaluatephiforces, evaluateDensities, \
+        _evaluateR2derivs, _evaluatez2derivs, _evaluateRzderivs
+    if not isinstance(Pot,(list,Potential)) \
+            or (isinstance(Pot,list) \
+                    and not numpy.all([isinstance(p,Potential) for p in Pot])):
+        raise PotentialError("Input to bulk evaluation in C is neither a Potential-instance or a list of such instances")
+    if phi is None:
+        if _isNonAxi(Pot):
+            raise PotentialError("The (list of) Potential instances is non-axisymmetric, but you did not provide phi")
+        phi= 0.
+    R,z,phi,t= numpy.broadcast_arrays(R,z,phi,t)
+    if out is None:
+        out= numpy.empty(R.shape)
+    elif not out.shape == R.shape or not out.dtype == numpy.float64 \
+            or not out.flags['C_CONTIGUOUS'] or not out.flags['WRITEABLE']:
+        raise ValueError("out= needs to be a writeable, C-contiguous float64 array with shape %s" % str(R.shape))
+    use_c= ext_loaded and _check_c(Pot) and which < 4
+    if use_c:
+        from galpy.orbit_src.integrateFullOrbit import _parse_pot #here bc otherwise there is an infinite loop
+        npot, pot_type, pot_args= _parse_pot(Pot,potforactions=which == 0)
+        # Not all potentials can be evaluated in C
+        if which == 0 and not set(pot_type).issubset(_POTENTIALEVAL_TYPES):
+            use_c= False
+    if not use_c:
+        func= [_evaluatePotentials,_evaluateRforces,
+               _evaluatezforces,_evaluatephiforces,
+               lambda *args,**kwargs: evaluateDensities(*args,
+                                                        use_physical=False,
+                                                        **kwargs),
+               _evaluateR2derivs,_evaluatez2derivs,
+               _evaluateRzderivs][which]
+        try:
+            out[...]= func(Pot,R,z,phi=phi,t=t)
+        except (TypeError,ValueError):
+            # Some potentials only accept scalar inputs
+            for indx in numpy.ndindex(*R.shape):
+                out[indx]= func(Pot,R[indx],z[indx],phi=phi[indx],t=t[indx])
+        return out
+    #Set up the C code
+    ndarrayFlags= ('C_CONTIGUOUS','WRITEABLE')
+    eval_bulk= _lib.eval_bulk
+    eval_bulk.argtypes= [ctypes.c_int,
+                         ndpointer(dtype=numpy.float64,flags='C_CONTIGUOUS'),
+                         ndpointer(dtype=numpy.float64,flags='C_CONTIGUOUS'),
+                         ndpointer(dtype=numpy.float64,flags='C_CONTIGUOUS'),
+                         ndpointer(dtype=numpy.float64,flags='C_CONTIGUOUS'),
+                         ctypes.c_int,
+                         ndpointer(dtype=numpy.int32,flags=ndarrayFlags),
+                         ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                         ctypes.c_int,
+                         ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                         ctypes.POINTER(ctypes.c_int)]
+    #Array requirements; only copies inputs that are not contiguous (e.g.,
+    #broadcast scalars)
+    R= numpy.require(R,dtype=numpy.float64,requirements=['C'])
+    z= numpy.require(z,dtype=numpy.float64,requirements=['C'])
+    phi= numpy.require(phi,dtype=numpy.float64,requirements=['C'])
+    t= numpy.require(t,dtype=numpy.float64,requirements=['C'])
+    err= ctypes.c_int(0)
+    #Run the C code
+    eval_bulk(ctypes.c_int(R.size),R,z,phi,t,ctypes.c_int(npot),
+              pot_type,pot_args,ctypes.c_int(which),out,ctypes.byref(err))
+    return out
@@ -0,0 +1,434 @@
+###############################################################################
+#   interp3DPotential.py: class that interpolates a (non-axisymmetric)
+#                         potential and its forces on a 3D grid in
+#                         cylindrical (R,phi,z) or Cartesian (x,y,z)
+#                         coordinates
+###############################################################################
+import ctypes
+import numpy
+from numpy.ctypeslib import ndpointer
+from galpy.potential_src.Potential import Potential, _check_c
+from galpy.potential_src.interpRZPotential import _lib, ext_loaded
+# Symmetries of the axes of the grid, as in the C code
+_NOSYM= 0
+_MIRROR= 1
+_PERIODIC= 2
+class interp3DPotential(Potential):
+    """Class that interpolates a given (non-axisymmetric) potential and its forces on a 3D grid in cylindrical (R,phi,z) or Cartesian (x,y,z) coordinates for fast orbit integration. Interpolation is piecewise (tri-)linear or (tri-)cubic; outside of the grid, the original potential is used. The grid is calculated at t=0; to model a potential that rotates with a constant pattern speed, wrap the interp3DPotential in a SolidBodyRotationWrapperPotential"""
+    def __init__(self,pot=None,
+                 Rgrid=(0.,2.,51),nphi=32,symm=1,
+                 zgrid=(0.,1.,21),
+                 xgrid=None,ygrid=None,
+                 zsym=True,xsym=False,ysym=False,
+                 order=3,use_c=True,enable_c=True,
+                 ro=None,vo=None):
+        """
+        NAME:
+
+           __init__
+
+        PURPOSE:
+
+           Initialize an interp3DPotential instance
+
+        INPUT:
+
+           pot - Potential instance or list of such instances to be interpolated
+
+           Rgrid= R grid to be given to linspace as in Rs= linspace(*Rgrid)
+
+           nphi= number of points in the (periodic) azimuthal grid, which covers [0,2pi/symm)
+
+           symm= (1) the potential is periodic in phi with period 2pi/symm
+
+           zgrid= z grid to be given to linspace as in zs= linspace(*zgrid)
+
+           xgrid=, ygrid= (None) if both are given, use a Cartesian grid, with xs= linspace(*xgrid) and ys= linspace(*ygrid) (Rgrid, nphi, and symm are then ignored)
+
+           zsym= (True) if True, the potential is assumed to be symmetric around z=0 (so you can use, e.g., zgrid=(0.,1.,21))
+
+           xsym=, ysym= (False) for a Cartesian grid, if True, the potential is assumed to be symmetric around x=0 or y=0 (e.g., for a bar along the x axis)
+
+           order= (3) order of the interpolation: 1 (linear) or 3 (cubic, Catmull-Rom, which has continuous first derivatives; higher derivatives jump at the edges of the grid cells, such that high-order adaptive integrators like dop853_c take more steps than for the original potential, while symplectic integrators like symplec4_c are unaffected)
+
+           use_c= (True) use C to speed up the calculation of the grid (only for potentials with a C implementation)
+
+           enable_c= (True) use C to evaluate the interpolation
+
+           ro=, vo= distance and velocity scales for translation into internal units (default from the potential)
+
+        OUTPUT:
+
+           instance
+
+        """
+        if isinstance(pot,interp3DPotential):
+            from galpy.potential import PotentialError
+            raise PotentialError('Cannot setup interp3DPotential with another interp3DPotential')
+        # Propagate ro and vo
+        roSet= True
+        voSet= True
+        firstPot= pot[0] if isinstance(pot,list) else pot
+        if ro is None:
+            ro= firstPot._ro
+            roSet= firstPot._roSet
+        if vo is None:
+            vo= firstPot._vo
+            voSet= firstPot._voSet
+        Potential.__init__(self,amp=1.,ro=ro,vo=vo)
+        # Turn off physical if it hadn't been on
+        if not roSet: self._roSet= False
+        if not voSet: self._voSet= False
+        self._origPot= pot
+        if not order in [1,3]:
+            raise ValueError('order= needs to be 1 (linear) or 3 (cubic)')
+        self._order= order
+        self._cartesian= not xgrid is None and not ygrid is None
+        # Axes: number of points, minimum, spacing, and symmetry
+        if self._cartesian:
+            self._axes= [_setup_axis(xgrid,xsym,'x'),
+                         _setup_axis(ygrid,ysym,'y'),
+                         _setup_axis(zgrid,zsym,'z')]
+        else:
+            self._axes= [_setup_axis(Rgrid,False,'R'),
+                         (int(nphi),0.,2.*numpy.pi/symm/nphi,_PERIODIC),
+                         _setup_axis(zgrid,zsym,'z')]
+            if Rgrid[0] < 0.:
+                raise ValueError('Rgrid cannot extend to negative R')
+        for axis in self._axes:
+            if axis[0] < 4:
+                raise ValueError('Each axis of the grid needs at least 4 points')
+        self._grids= [a[1]+a[2]*numpy.arange(a[0]) for a in self._axes]
+        # Calculate the potential and the forces on the grid
+        g1,g2,z= numpy.meshgrid(*self._grids,indexing='ij')
+        if self._cartesian:
+            R= numpy.sqrt(g1**2.+g2**2.)
+            phi= numpy.arctan2(g2,g1)
+            R[R < 10.**-10.]= 10.**-10.
+        else:
+            R, phi= g1, g2
+        grid= numpy.empty((4,)+R.shape)
+        from galpy.potential import evaluatePotentials, evaluateRforces, \
+            evaluatezforces, evaluatephiforces
+        if use_c*ext_loaded and _check_c(pot):
+            from galpy.potential_src.evaluate_c import evaluatePotentials_c
+            evaluatePotentials_c(pot,R,z,phi=phi,out=grid[0])
+            grid[1:], err= calc_forces_3d_c(pot,self._cartesian,*self._grids)
+        else:
+            grid[0]= _evaluate_on_grid(evaluatePotentials,pot,R,z,phi)
+            FR= _evaluate_on_grid(evaluateRforces,pot,R,z,phi)
+            Fz= _evaluate_on_grid(evaluatezforces,pot,R,z,phi)
+            Fphi= _evaluate_on_grid(evaluatephiforces,pot,R,z,phi)
+            if self._cartesian:
+                grid[1]= numpy.cos(phi)*FR-numpy.sin(phi)*Fphi/R
+                grid[2]= numpy.sin(phi)*FR+numpy.cos(phi)*Fphi/R
+                grid[3]= Fz
+            else:
+                grid[1]= FR
+                grid[2]= Fz
+                grid[3]= Fphi
+        # Store the potential and the forces at each node next to each other
+        self._grid= numpy.ascontiguousarray(numpy.moveaxis(grid,0,-1))
+        self._enable_c= enable_c*ext_loaded
+        self.isNonAxi= True
+        self.hasC= True
+        return None
+
+    def _ingrid(self,R,z,phi):
+        """Return a mask of the points that are on the grid"""
+        if self._cartesian:
+            coords= [R*numpy.cos(phi),R*numpy.sin(phi),z]
+        else:
+            coords= [R,phi,z]
+        indx= numpy.ones(R.shape,dtype='bool')
+        for u,axis in zip(coords,self._axes):
+            if axis[3] == _PERIODIC: continue
+            elif axis[3] == _MIRROR: u= numpy.fabs(u)
+            indx*= (u >= axis[1])*(u <= axis[1]+(axis[0]-1)*axis[2])
+        return indx
+
+    def _interp(self,R,z,phi,which):
+        """Evaluate the interpolated potential (which=0) or the R, z, or phi force (which=1,2,3); the original potential is used outside of the grid"""
+        scalarOut= numpy.array(R).shape == () and numpy.array(z).shape == () \
+            and numpy.array(phi).shape == ()
+        R,z,phi= numpy.broadcast_arrays(*[numpy.atleast_1d(numpy.array(x,dtype='float'))
+                                          for x in (R,z,phi)])
+        shape= R.shape
+        R,z,phi= R.flatten(), z.flatten(), phi.flatten()
+        out= numpy.empty(R.shape)
+        indx= self._ingrid(R,z,phi)
+        if numpy.sum(indx) > 0:
+            if self._enable_c:
+                out[indx]= eval_interp3d_c(self,R[indx],z[indx],phi[indx],
+                                           which)[0]/self._amp
+            else:
+                out[indx]= self._interp_python(R[indx],z[indx],phi[indx],
+                                               which)
+        if numpy.sum(True^indx) > 0:
+            from galpy.potential import evaluatePotentials, evaluateRforces, \
+                evaluatezforces, evaluatephiforces
+            evalFunc= [evaluatePotentials,evaluateRforces,evaluatezforces,
+                       evaluatephiforces][which]
+            out[True^indx]= _evaluate_on_grid(evalFunc,self._origPot,
+                                              R[True^indx],z[True^indx],
+                                              phi[True^indx])
+        if scalarOut:
+            return out[0]
+        else:
+            return numpy.reshape(out,shape)
+
+    def _interp_python(self,R,z,phi,which):
+        """Evaluate the interpolation in Python, in the same way as in C"""
+        if self._cartesian:
+            coords= [R*numpy.cos(phi),R*numpy.sin(phi),z]
+        else:
+            coords= [R,phi,z]
+        weights= [_interp_weights(u,axis,self._order)
+                  for u,axis in zip(coords,self._axes)]
+        def interpolate(q,oddaxis):
+            # Forces are odd in the mirrored coordinate along their direction
+            w= [weights[ii][2] if ii == oddaxis else weights[ii][1]
+                for ii in range(3)]
+            indx= [weights[ii][0] for ii in range(3)]
+            out= numpy.zeros(R.shape)
+            for ii in range(self._order+1):
+                for jj in range(self._order+1):
+                    for kk in range(self._order+1):
+                        out+= w[0][ii]*w[1][jj]*w[2][kk]\
+                            *self._grid[indx[0][ii],indx[1][jj],indx[2][kk],q]
+            if oddaxis >= 0 and self._axes[oddaxis][3] == _MIRROR:
+                out[coords[oddaxis] < 0.]*= -1.
+            return out
+        if which == 0:
+            return interpolate(0,-1)
+        elif not self._cartesian:
+            return interpolate(which,[-1,2,-1][which-1])
+        elif which == 2:
+            return interpolate(3,2)
+        fx= interpolate(1,0)
+        fy= interpolate(2,1)
+        if which == 1:
+            return numpy.cos(phi)*fx+numpy.sin(phi)*fy
+        else:
+            return R*(numpy.cos(phi)*fy-numpy.sin(phi)*fx)
+
+    def _evaluate(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _evaluate
+        PURPOSE:
+           evaluate the potential at R,z,phi
+        INPUT:
+           R - Galactocentric cylindrical radius
+           z - vertical height
+           phi - azimuth
+           t - time
+        OUTPUT:
+           Phi(R,z,phi)
+        """
+        return self._interp(R,z,phi,0)
+
+    def _Rforce(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _Rforce
+        PURPOSE:
+           evaluate the radial force for this potential
+        INPUT:
+           R - Galactocentric cylindrical radius
+           z - vertical height
+           phi - azimuth
+           t - time
+        OUTPUT:
+           the radial force
+        """
+        return self._interp(R,z,phi,1)
+
+    def _zforce(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _zforce
+        PURPOSE:
+           evaluate the vertical force for this potential
+        INPUT:
+           R - Galactocentric cylindrical radius
+           z - vertical height
+           phi - azimuth
+           t - time
+        OUTPUT:
+           the vertical force
+        """
+        return self._interp(R,z,phi,2)
+
+    def _phiforce(self,R,z,phi=0.,t=0.):
+        """
+        NAME:
+           _phiforce
+        PURPOSE:
+           evaluate the azimuthal force for this potential
+        INPUT:
+           R - Galactocentric cylindrical radius
+           z - vertical height
+           phi - azimuth
+           t - time
+        OUTPUT:
+           the azimuthal force
+        """
+        return self._interp(R,z,phi,3)
+
+def _evaluate_on_grid(func,pot,R,z,phi):
+    """Evaluate func (e.g., evaluatePotentials) for pot at arrays R, z, phi, point-by-point for potentials that do not accept array inputs"""
+    try:
+        out= func(pot,R.flatten(),z.flatten(),phi=phi.flatten())
+    except (TypeError,ValueError):
+        out= numpy.array([func(pot,RR,zz,phi=pp) for RR,zz,pp
+                          in zip(R.flatten(),z.flatten(),phi.flatten())])
+    return numpy.reshape(out,R.shape)
+
+def _setup_axis(grid,sym,name):
+    """Number of points, minimum, spacing, and symmetry of an axis of the grid given as the input to linspace"""
+    if sym and not grid[0] == 0.:
+        raise ValueError('%sgrid needs to start at zero for a potential that is symmetric around %s=0' % (name,name))
+    return (int(grid[2]),float(grid[0]),
+            (grid[1]-grid[0])/(grid[2]-1.),
+            _MIRROR if sym else _NOSYM)
+
+def _interp_weights(u,axis,order):
+    """Indices and weights of the linear or cubic (Catmull-Rom) interpolation along one axis of the grid, in the same way as in C; the last output has the sign of the weights flipped for nodes mirrored around zero"""
+    n, umin, du, sym= axis
+    if sym == _MIRROR: u= numpy.fabs(u)
+    s= (u-umin)/du
+    if sym == _PERIODIC: s= numpy.mod(s,n)
+    i0= numpy.floor(s).astype('int')
+    if sym != _PERIODIC: i0= numpy.clip(i0,0,n-2)
+    tt= s-i0
+    if order == 1:
+        indx= i0+numpy.arange(2)[:,None]
+        w= numpy.array([1.-tt,tt])
+    else:
+        indx= i0-1+numpy.arange(4)[:,None]
+        w= numpy.array([tt*((2.-tt)*tt-1.)/2.,
+                        (tt**2.*(3.*tt-5.)+2.)/2.,
+                        tt*((4.-3.*tt)*tt+1.)/2.,
+                        tt**2.*(tt-1.)/2.])
+        # Quadratically extrapolate the node beyond the edge of the grid
+        if sym == _NOSYM:
+            edge= i0 == 0
+            w[1:,edge]+= numpy.array([3.,-3.,1.])[:,None]*w[0,edge]
+            w[0,edge]= 0.
+            indx[0,edge]= 0
+        if sym != _PERIODIC:
+            edge= i0 == n-2
+            w[:3,edge]+= numpy.array([1.,-3.,3.])[:,None]*w[3,edge]
+            w[3,edge]= 0.
+            indx[3,edge]= n-1
+    wodd= numpy.copy(w)
+    if sym == _PERIODIC:
+        indx= numpy.mod(indx,n)
+    else:
+        mirrored= indx < 0
+        indx[mirrored]*= -1
+        wodd[mirrored]*= -1.
+    return (indx,w,wodd)
+
+def calc_forces_3d_c(pot,cartesian,x1,x2,x3):
+    """
+    NAME:
+       calc_forces_3d_c
+    PURPOSE:
+       Use C to calculate the forces on a 3D grid
+    INPUT:
+       pot - Potential or list of such instances
+       cartesian - if True, the grid is in (x,y,z), otherwise in (R,phi,z)
+       x1, x2, x3 - grids along the three axes
+    OUTPUT:
+       (forces on the grid, shape (3,len(x1),len(x2),len(x3)): FR,Fz,Fphi or Fx,Fy,Fz,error code)
+    """
+    from galpy.orbit_src.integrateFullOrbit import _parse_pot #here bc otherwise there is an infinite loop
+    #Parse the potential
+    npot, pot_type, pot_args= _parse_pot(pot)
+
+    #Set up result arrays
+    out= numpy.empty((3,len(x1),len(x2),len(x3)))
+    err= ctypes.c_int(0)
+
+    #Set up the C code
+    ndarrayFlags= ('C_CONTIGUOUS','WRITEABLE')
+    calc_forces_3dFunc= _lib.calc_forces_3d
+    calc_forces_3dFunc.argtypes= [ctypes.c_int,
+                                  ctypes.c_int,
+                                  ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                  ctypes.c_int,
+                                  ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                  ctypes.c_int,
+                                  ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                  ctypes.c_int,
+                                  ndpointer(dtype=numpy.int32,flags=ndarrayFlags),
+                                  ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                  ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                  ctypes.POINTER(ctypes.c_int)]
+
+    #Array requirements
+    x1= numpy.require(x1,dtype=numpy.float64,requirements=['C','W'])
+    x2= numpy.require(x2,dtype=numpy.float64,requirements=['C','W'])
+    x3= numpy.require(x3,dtype=numpy.float64,requirements=['C','W'])
+
+    #Run the C code
+    calc_forces_3dFunc(ctypes.c_int(cartesian),
+                       len(x1),x1,len(x2),x2,len(x3),x3,
+                       ctypes.c_int(npot),
+                       pot_type,
+                       pot_args,
+                       out,
+                       ctypes.byref(err))
+    return (out,err.value)
+
+def eval_interp3d_c(pot,R,z,phi,which):
+    """
+    NAME:
+       eval_interp3d_c
+    PURPOSE:
+       Use C to evaluate an interp3DPotential
+    INPUT:
+       pot - interp3DPotential instance
+       R, z, phi - arrays
+       which - 0: potential, 1: Rforce, 2: zforce, 3: phiforce
+    OUTPUT:
+       (potential or force evaluated at R, z, phi,error code)
+    """
+    from galpy.orbit_src.integrateFullOrbit import _parse_pot #here bc otherwise there is an infinite loop
+    #Parse the potential
+    npot, pot_type, pot_args= _parse_pot(pot)
+
+    #Set up result arrays
+    out= numpy.empty((len(R)))
+    err= ctypes.c_int(0)
+
+    #Set up the C code
+    ndarrayFlags= ('C_CONTIGUOUS','WRITEABLE')
+    eval_interp3dFunc= _lib.eval_interp3d
+    eval_interp3dFunc.argtypes= [ctypes.c_int,
+                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                 ctypes.c_int,
+                                 ndpointer(dtype=numpy.int32,flags=ndarrayFlags),
+                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                 ctypes.c_int,
+                                 ndpointer(dtype=numpy.float64,flags=ndarrayFlags),
+                                 ctypes.POINTER(ctypes.c_int)]
+
+    #Array requirements
+    R= numpy.require(R,dtype=numpy.float64,requirements=['C','W'])
+    z= numpy.require(z,dtype=numpy.float64,requirements=['C','W'])
+    phi= numpy.require(phi,dtype=numpy.float64,requirements=['C','W'])
+
+    #Run the C code
+    eval_interp3dFunc(len(R),R,z,phi,
+                      ctypes.c_int(npot),
+                      pot_type,
+                      pot_args,
+                      ctypes.c_int(which),
+                      out,
+                      ctypes.byref(err))
+    return (out,err.value)
@@ -4,6 +4,9 @@ import sysconfig
 import copy
 import ctypes
 import ctypes.util
+import hashlib
+import tempfile
+import types
 import warnings
 from functools import wraps
 import numpy
@@ -110,7 +113,7 @@ class interpRZPotential(Potential):
                  interpepifreq=False,interpverticalfreq=False,
                  ro=None,vo=None,
                  use_c=False,enable_c=False,zsym=True,
-                 numcores=None):
+                 numcores=None,cachedir=None):
         """
         NAME:
 
@@ -140,6 +143,8 @@ class interpRZPotential(Potential):
 
            numcores= if set to an integer, use this many cores (only used for vcirc, dvcircdR, epifreq, and verticalfreq; NOT NECESSARILY FASTER, TIME TO MAKE SURE)
 
+           cachedir= (None) if set, directory in which the computed grids and their spline coefficients are cached as .npy files, keyed by a hash of the potential's parameters and of the grid; subsequent set-ups of the same interpolation (e.g., in other processes) load them from this directory using memory mapping instead of re-computing them; the hash includes the code, default arguments, closure variables, and referenced globals of functions in the potential, and potentials that contain objects that cannot be hashed reliably are not cached (with a warning)
+
            ro=, vo= distance and velocity scales for translation into internal units (default from configuration file)
 
         OUTPUT:
@@ -195,16 +200,26 @@ class interpRZPotential(Potential):
         self._enable_c= enable_c*ext_loaded
         self.hasC= self._enable_c
         self._zsym= zsym
+        key= None if cachedir is None \
+            else _cache_key(self._origPot,self._rgrid,self._zgrid)
+        if key is None:
+            self._cachedir= None
+        else:
+            self._cachedir= os.path.join(cachedir,'interpRZPotential_%s'
+                                         % key)
         if interpPot:
-            if use_c*ext_loaded:
-                self._potGrid, err= calc_potential_c(self._origPot,self._rgrid,self._zgrid)
-            else:
-                from galpy.potential import evaluatePotentials
-                potGrid= numpy.zeros((len(self._rgrid),len(self._zgrid)))
-                for ii in range(len(self._rgrid)):
-                    for jj in range(len(self._zgrid)):
-                        potGrid[ii,jj]= evaluatePotentials(self._origPot,self._rgrid[ii],self._zgrid[jj])
-                self._potGrid= potGrid
+            self._potGrid= self._load_cached_grid('potGrid')
+            if self._potGrid is None:
+                if use_c*ext_loaded:
+                    self._potGrid, err= calc_potential_c(self._origPot,self._rgrid,self._zgrid)
+                else:
+                    from galpy.potential import evaluatePotentials
+                    potGrid= numpy.zeros((len(self._rgrid),len(self._zgrid)))
+                    for ii in range(len(self._rgrid)):
+                        for jj in range(len(self._zgrid)):
+                            potGrid[ii,jj]= evaluatePotentials(self._origPot,self._rgrid[ii],self._zgrid[jj])
+                    self._potGrid= potGrid
+                self._save_cached_grid('potGrid',self._potGrid)
             if self._logR:
                 self._potInterp= interpolate.RectBivariateSpline(self._logrgrid,
                                                                  self._zgrid,
@@ -216,17 +231,23 @@ class interpRZPotential(Potential):
                                                                  self._potGrid,
                                                                  kx=3,ky=3,s=0.)
             if enable_c*ext_loaded:
-                self._potGrid_splinecoeffs= calc_2dsplinecoeffs_c(self._potGrid)
+                self._potGrid_splinecoeffs= self._load_cached_grid('potGrid_splinecoeffs')
+                if self._potGrid_splinecoeffs is None:
+                    self._potGrid_splinecoeffs= calc_2dsplinecoeffs_c(self._potGrid)
+                    self._save_cached_grid('potGrid_splinecoeffs',self._potGrid_splinecoeffs)
         if interpRforce:
-            if use_c*ext_loaded:
-                self._rforceGrid, err= calc_potential_c(self._origPot,self._rgrid,self._zgrid,rforce=True)
-            else:
-                from galpy.potential import evaluateRforces
-                rforceGrid= numpy.zeros((len(self._rgrid),len(self._zgrid)))
-                for ii in range(len(self._rgrid)):
-                    for jj in range(len(self._zgrid)):
-                        rforceGrid[ii,jj]= evaluateRforces(self._origPot,self._rgrid[ii],self._zgrid[jj])
-                self._rforceGrid= rforceGrid
+            self._rforceGrid= self._load_cached_grid('rforceGrid')
+            if self._rforceGrid is None:
+                if use_c*ext_loaded:
+                    self._rforceGrid, err= calc_potential_c(self._origPot,self._rgrid,self._zgrid,rforce=True)
+                else:
+                    from galpy.potential import evaluateRforces
+                    rforceGrid= numpy.zeros((len(self._rgrid),len(self._zgrid)))
+                    for ii in range(len(self._rgrid)):
+                        for jj in range(len(self._zgrid)):
+                            rforceGrid[ii,jj]= evaluateRforces(self._origPot,self._rgrid[ii],self._zgrid[jj])
+                    self._rforceGrid= rforceGrid
+                self._save_cached_grid('rforceGrid',self._rforceGrid)
             if self._logR:
                 self._rforceInterp= interpolate.RectBivariateSpline(self._logrgrid,
                                                                     self._zgrid,
@@ -238,17 +259,23 @@ class interpRZPotential(Potential):
                                                                     self._rforceGrid,
                                                                     kx=3,ky=3,s=0.)
             if enable_c*ext_loaded:
-                self._rforceGrid_splinecoeffs= calc_2dsplinecoeffs_c(self._rforceGrid)
+                self._rforceGrid_splinecoeffs= self._load_cached_grid('rforceGrid_splinecoeffs')
+                if self._rforceGrid_splinecoeffs is None:
+                    self._rforceGrid_splinecoeffs= calc_2dsplinecoeffs_c(self._rforceGrid)
+                    self._save_cached_grid('rforceGrid_splinecoeffs',self._rforceGrid_splinecoeffs)
         if interpzforce:
-            if use_c*ext_loaded:
-                self._zforceGrid, err= calc_potential_c(self._origPot,self._rgrid,self._zgrid,zforce=True)
-            else:
-                from galpy.potential import evaluatezforces
-                zforceGrid= numpy.zeros((len(self._rgrid),len(self._zgrid)))
-                for ii in range(len(self._rgrid)):
-                    for jj in range(len(self._zgrid)):
-                        zforceGrid[ii,jj]= evaluatezforces(self._origPot,self._rgrid[ii],self._zgrid[jj])
-                self._zforceGrid= zforceGrid
+            self._zforceGrid= self._load_cached_grid('zforceGrid')
+            if self._zforceGrid is None:
+                if use_c*ext_loaded:
+                    self._zforceGrid, err= calc_potential_c(self._origPot,self._rgrid,self._zgrid,zforce=True)
+                else:
+                    from galpy.potential import evaluatezforces
+                    zforceGrid= numpy.zeros((len(self._rgrid),len(self._zgrid)))
+                    for ii in range(len(self._rgrid)):
+                        for jj in range(len(self._zgrid)):
+                            zforceGrid[ii,jj]= evaluatezforces(self._origPot,self._rgrid[ii],self._zgrid[jj])
+                    self._zforceGrid= zforceGrid
+                self._save_cached_grid('zforceGrid',self._zforceGrid)
             if self._logR:
                 self._zforceInterp= interpolate.RectBivariateSpline(self._logrgrid,
                                                                     self._zgrid,
@@ -260,14 +287,20 @@ class interpRZPotential(Potential):
                                                                     self._zforceGrid,
                                                                     kx=3,ky=3,s=0.)
             if enable_c*ext_loaded:
-                self._zforceGrid_splinecoeffs= calc_2dsplinecoeffs_c(self._zforceGrid)
+                self._zforceGrid_splinecoeffs= self._load_cached_grid('zforceGrid_splinecoeffs')
+                if self._zforceGrid_splinecoeffs is None:
+                    self._zforceGrid_splinecoeffs= calc_2dsplinecoeffs_c(self._zforceGrid)
+                    self._save_cached_grid('zforceGrid_splinecoeffs',self._zforceGrid_splinecoeffs)
         if interpDens:
-            from galpy.potential import evaluateDensities
-            densGrid= numpy.zeros((len(self._rgrid),len(self._zgrid)))
-            for ii in range(len(self._rgrid)):
-                for jj in range(len(self._zgrid)):
-                    densGrid[ii,jj]= evaluateDensities(self._origPot,self._rgrid[ii],self._zgrid[jj])
-            self._densGrid= densGrid
+            self._densGrid= self._load_cached_grid('densGrid')
+            if self._densGrid is None:
+                from galpy.potential import evaluateDensities
+                densGrid= numpy.zeros((len(self._rgrid),len(self._zgrid)))
+                for ii in range(len(self._rgrid)):
+                    for jj in range(len(self._zgrid)):
+                        densGrid[ii,jj]= evaluateDensities(self._origPot,self._rgrid[ii],self._zgrid[jj])
+                self._densGrid= densGrid
+                self._save_cached_grid('densGrid',self._densGrid)
             if self._logR:
                 self._densInterp= interpolate.RectBivariateSpline(self._logrgrid,
                                                                   self._zgrid,
@@ -279,34 +312,43 @@ class interpRZPotential(Potential):
                                                                   numpy.log(self._densGrid+10.**-10.),
                                                                   kx=3,ky=3,s=0.)
         if interpvcirc:
-            from galpy.potential import vcirc
-            if not numcores is None:
-                self._vcircGrid= multi.parallel_map((lambda x: vcirc(self._origPot,self._rgrid[x])),
-                                                    list(range(len(self._rgrid))),numcores=numcores)
-            else:
-                self._vcircGrid= numpy.array([vcirc(self._origPot,r) for r in self._rgrid])
+            self._vcircGrid= self._load_cached_grid('vcircGrid')
+            if self._vcircGrid is None:
+                from galpy.potential import vcirc
+                if not numcores is None:
+                    self._vcircGrid= multi.parallel_map((lambda x: vcirc(self._origPot,self._rgrid[x])),
+                                                        list(range(len(self._rgrid))),numcores=numcores)
+                else:
+                    self._vcircGrid= numpy.array([vcirc(self._origPot,r) for r in self._rgrid])
+                self._save_cached_grid('vcircGrid',self._vcircGrid)
             if self._logR:
                 self._vcircInterp= interpolate.InterpolatedUnivariateSpline(self._logrgrid,self._vcircGrid,k=3)
             else:
                 self._vcircInterp= interpolate.InterpolatedUnivariateSpline(self._rgrid,self._vcircGrid,k=3)
         if interpdvcircdr:
-            from galpy.potential import dvcircdR
-            if not numcores is None:
-                self._dvcircdrGrid= multi.parallel_map((lambda x: dvcircdR(self._origPot,self._rgrid[x])),
-                                                       list(range(len(self._rgrid))),numcores=numcores)
-            else:
-                self._dvcircdrGrid= numpy.array([dvcircdR(self._origPot,r) for r in self._rgrid])
+            self._dvcircdrGrid= self._load_cached_grid('dvcircdrGrid')
+            if self._dvcircdrGrid is None:
+                from galpy.potential import dvcircdR
+                if not numcores is None:
+                    self._dvcircdrGrid= multi.parallel_map((lambda x: dvcircdR(self._origPot,self._rgrid[x])),
+                                                           list(range(len(self._rgrid))),numcores=numcores)
+                else:
+                    self._dvcircdrGrid= numpy.array([dvcircdR(self._origPot,r) for r in self._rgrid])
+                self._save_cached_grid('dvcircdrGrid',self._dvcircdrGrid)
             if self._logR:
                 self._dvcircdrInterp= interpolate.InterpolatedUnivariateSpline(self._logrgrid,self._dvcircdrGrid,k=3)
             else:
                 self._dvcircdrInterp= interpolate.InterpolatedUnivariateSpline(self._rgrid,self._dvcircdrGrid,k=3)
         if interpepifreq:
-            from galpy.potential import epifreq
-            if not numcores is None:
-                self._epifreqGrid= numpy.array(multi.parallel_map((lambda x: epifreq(self._origPot,self._rgrid[x])),
-                                                      list(range(len(self._rgrid))),numcores=numcores))
-            else:
-                self._epifreqGrid= numpy.array([epifreq(self._origPot,r) for r in self._rgrid])
+            self._epifreqGrid= self._load_cached_grid('epifreqGrid')
+            if self._epifreqGrid is None:
+                from galpy.potential import epifreq
+                if not numcores is None:
+                    self._epifreqGrid= numpy.array(multi.parallel_map((lambda x: epifreq(self._origPot,self._rgrid[x])),
+                                                          list(range(len(self._rgrid))),numcores=numcores))
+                else:
+                    self._epifreqGrid= numpy.array([epifreq(self._origPot,r) for r in self._rgrid])
+                self._save_cached_grid('epifreqGrid',self._epifreqGrid)
             indx= True^numpy.isnan(self._epifreqGrid)
             if numpy.sum(indx) < 4:
                 if self._logR:
@@ -319,17 +361,52 @@ class interpRZPotential(Potential):
                 else:
                     self._epifreqInterp= interpolate.InterpolatedUnivariateSpline(self._rgrid[indx],self._epifreqGrid[indx],k=3)
         if interpverticalfreq:
-            from galpy.potential import verticalfreq
-            if not numcores is None:
-                self._verticalfreqGrid= multi.parallel_map((lambda x: verticalfreq(self._origPot,self._rgrid[x])),
-                                                       list(range(len(self._rgrid))),numcores=numcores)
-            else:
-                self._verticalfreqGrid= numpy.array([verticalfreq(self._origPot,r) for r in self._rgrid])
+            self._verticalfreqGrid= self._load_cached_grid('verticalfreqGrid')
+            if self._verticalfreqGrid is None:
+                from galpy.potential import verticalfreq
+                if not numcores is None:
+                    self._verticalfreqGrid= multi.parallel_map((lambda x: verticalfreq(self._origPot,self._rgrid[x])),
+                                                           list(range(len(self._rgrid))),numcores=numcores)
+                else:
+                    self._verticalfreqGrid= numpy.array([verticalfreq(self._origPot,r) for r in self._rgrid])
+                self._save_cached_grid('verticalfreqGrid',self._verticalfreqGrid)
             if self._logR:
                 self._verticalfreqInterp= interpolate.InterpolatedUnivariateSpline(self._logrgrid,self._verticalfreqGrid,k=3)
             else:
                 self._verticalfreqInterp= interpolate.InterpolatedUnivariateSpline(self._rgrid,self._verticalfreqGrid,k=3)
         return None
+
+    def _load_cached_grid(self,name):
+        """Load the grid name from the cache directory using memory mapping; returns None if it is not cached"""
+        if self._cachedir is None: return None
+        filename= os.path.join(self._cachedir,'%s.npy' % name)
+        if not os.path.exists(filename): return None
+        try:
+            return numpy.load(filename,mmap_mode='r')
+        except (IOError,OSError,ValueError): #pragma: no cover
+            # Corrupted file, re-compute the grid
+            return None
+
+    def _save_cached_grid(self,name,grid):
+        """Save the grid name to the cache directory"""
+        if self._cachedir is None: return None
+        try:
+            os.makedirs(self._cachedir)
+        except OSError:
+            if not os.path.isdir(self._cachedir): raise
+        # Write to a temporary file and move it into place, such that
+        # processes setting up the same interpolation at the same time never
+        # load a partially-written grid
+        fd, tmpname= tempfile.mkstemp(dir=self._cachedir,suffix='.tmp')
+        with os.fdopen(fd,'wb') as savefile:
+            numpy.save(savefile,numpy.asarray(grid,dtype=numpy.float64))
+        try:
+            os.rename(tmpname,os.path.join(self._cachedir,'%s.npy' % name))
+        except OSError: #pragma: no cover
+            # On Windows, renaming fails when another process already
+            # cached the same grid
+            os.remove(tmpname)
+        return None
                                                  
     @scalarVectorDecorator
     @zsymDecorator(False)
@@ -502,6 +579,87 @@ class interpRZPotential(Potential):
         else:
             return verticalfreq(self._origPot,R)
     
+class _UnhashableError(Exception):
+    pass
+
+def _cache_key(pot,R,z):
+    """Hash of the parameters of the potential, the grid, and the galpy version, used to look up cached grids; None if the potential contains objects that cannot be hashed reliably"""
+    from galpy import __version__
+    md5= hashlib.md5()
+    try:
+        _update_hash(md5,[__version__,pot,R,z],set())
+    except _UnhashableError as e:
+        warnings.warn("Not caching the interpolation grids in cachedir, because the potential contains %s, which cannot be hashed to reliably identify the cached grids" % e,galpyWarning)
+        return None
+    return md5.hexdigest()
+
+def _update_hash(md5,obj,seen):
+    """Update md5 with the contents of obj, recursing into lists, dictionaries, the attributes of objects (such as potentials), and the code, default arguments, closure variables, and referenced globals of functions; the evaluation caches of potentials are skipped; raises _UnhashableError for objects whose contents cannot be hashed"""
+    if obj is None or isinstance(obj,(bool,int,float,complex,str,bytes,
+                                      numpy.number,numpy.bool_)):
+        md5.update(repr(obj).encode('utf-8'))
+    elif isinstance(obj,numpy.ndarray) and not obj.dtype == object:
+        md5.update(repr((obj.dtype.str,obj.shape)).encode('utf-8'))
+        md5.update(numpy.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj,(list,tuple,numpy.ndarray)):
+        md5.update(('%s%i' % (type(obj).__name__,len(obj))).encode('utf-8'))
+        for item in obj:
+            _update_hash(md5,item,seen)
+    elif isinstance(obj,dict):
+        md5.update(('dict%i' % len(obj)).encode('utf-8'))
+        for key in sorted(obj,key=str):
+            _update_hash(md5,key,seen)
+            _update_hash(md5,obj[key],seen)
+    elif isinstance(obj,(types.ModuleType,type,types.BuiltinFunctionType,
+                         numpy.ufunc)): # identified by their name
+        md5.update(('%s.%s' % (getattr(obj,'__module__',None),
+                               obj.__name__)).encode('utf-8'))
+    elif isinstance(obj,types.MethodType):
+        _update_hash(md5,obj.__func__,seen)
+        _update_hash(md5,obj.__self__,seen)
+    elif isinstance(obj,types.FunctionType):
+        if id(obj) in seen: return None
+        seen.add(id(obj))
+        _update_hash_code(md5,obj.__code__,seen)
+        _update_hash(md5,obj.__defaults__,seen)
+        _update_hash(md5,obj.__kwdefaults__,seen)
+        for cell in obj.__closure__ or ():
+            try:
+                _update_hash(md5,cell.cell_contents,seen)
+            except ValueError: # empty cell
+                md5.update(b'emptycell')
+        for name in _code_names(obj.__code__):
+            if name in obj.__globals__:
+                _update_hash(md5,name,seen)
+                _update_hash(md5,obj.__globals__[name],seen)
+    elif isinstance(obj,types.CodeType):
+        _update_hash_code(md5,obj,seen)
+    elif hasattr(obj,'__dict__'):
+        md5.update(type(obj).__name__.encode('utf-8'))
+        if id(obj) in seen: return None
+        seen.add(id(obj))
+        for key in sorted(obj.__dict__):
+            if key.startswith('_cached') or key.endswith('_hash'): continue
+            _update_hash(md5,key,seen)
+            _update_hash(md5,obj.__dict__[key],seen)
+    else:
+        raise _UnhashableError("a %s object" % type(obj).__name__)
+    return None
+
+def _update_hash_code(md5,code,seen):
+    """Update md5 with a code object: its bytecode, constants (including the code of nested functions), and the names that it uses"""
+    md5.update(code.co_code)
+    _update_hash(md5,code.co_consts,seen)
+    _update_hash(md5,code.co_names,seen)
+    return None
+
+def _code_names(code):
+    """Names used by a code object and the code of the functions nested in it"""
+    out= list(code.co_names)
+    for c in code.co_consts:
+        if isinstance(c,types.CodeType): out.extend(_code_names(c))
+    return out
+
 def calc_potential_c(pot,R,z,rforce=False,zforce=False):
     """
     NAME:
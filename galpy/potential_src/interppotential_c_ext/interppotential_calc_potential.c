@@ -189,3 +189,165 @@ void eval_zforce(int nR,
   free_potentialArgs(npot,potentialArgs);
   free(potentialArgs);
 }
+void calc_forces_3d(int cartesian,
+		    int n1,
+		    double *x1,
+		    int n2,
+		    double *x2,
+		    int n3,
+		    double *x3,
+		    int npot,
+		    int * pot_type,
+		    double * pot_args,
+		    double *out,
+		    int * err){
+  // Calculate the three forces (FR,Fz,Fphi or Fx,Fy,Fz) on a 3D grid in
+  // cylindrical (R,phi,z) or Cartesian (x,y,z) coordinates
+  int ii, jj, kk, indx, tid, nthreads;
+  int ngrid= n1 * n2 * n3;
+  double R, z, phi, FR, Fz, Fphi;
+#ifdef _OPENMP
+  nthreads = omp_get_max_threads();
+  if ( n1 < nthreads ) nthreads= n1 > 0 ? n1 : 1;
+#else
+  nthreads = 1;
+#endif
+  //Set up the potentials, each thread gets its own copy, because some
+  //potentials cache in args
+  struct potentialArg * potentialArgs= (struct potentialArg *) malloc ( nthreads * npot * sizeof (struct potentialArg) );
+  for (tid=0; tid < nthreads; tid++)
+    parse_leapFuncArgs_Full(npot,potentialArgs+tid*npot,pot_type,pot_args);
+  //Run through the grid and calculate
+  UNUSED int chunk= CHUNKSIZE;
+#pragma omp parallel for schedule(dynamic,chunk) private(ii,jj,kk,indx,tid,R,z,phi,FR,Fz,Fphi) num_threads(nthreads)
+  for (ii=0; ii < n1; ii++){
+#ifdef _OPENMP
+    tid= omp_get_thread_num();
+#else
+    tid = 0;
+#endif
+    for (jj=0; jj < n2; jj++){
+      for (kk=0; kk < n3; kk++){
+	if ( cartesian ) {
+	  R= sqrt( *(x1+ii) * *(x1+ii) + *(x2+jj) * *(x2+jj) );
+	  phi= atan2( *(x2+jj),*(x1+ii) );
+	  if ( R < 1.e-10 ) R= 1.e-10;
+	}
+	else {
+	  R= *(x1+ii);
+	  phi= *(x2+jj);
+	}
+	z= *(x3+kk);
+	FR= calcRforce(R,z,phi,0.,npot,potentialArgs+tid*npot);
+	Fz= calczforce(R,z,phi,0.,npot,potentialArgs+tid*npot);
+	Fphi= calcPhiforce(R,z,phi,0.,npot,potentialArgs+tid*npot);
+	indx= ( ii * n2 + jj ) * n3 + kk;
+	if ( cartesian ) {
+	  *(out+indx)= cos(phi) * FR - sin(phi) * Fphi / R;
+	  *(out+ngrid+indx)= sin(phi) * FR + cos(phi) * Fphi / R;
+	  *(out+2*ngrid+indx)= Fz;
+	}
+	else {
+	  *(out+indx)= FR;
+	  *(out+ngrid+indx)= Fz;
+	  *(out+2*ngrid+indx)= Fphi;
+	}
+      }
+    }
+  }
+  for (tid=0; tid < nthreads; tid++)
+    free_potentialArgs(npot,potentialArgs+tid*npot);
+  free(potentialArgs);
+}
+void eval_interp3d(int n,
+		   double *R,
+		   double *z,
+		   double *phi,
+		   int npot,
+		   int * pot_type,
+		   double * pot_args,
+		   int which,
+		   double *out,
+		   int * err){
+  // Evaluate an interp3DPotential: the potential (which=0), Rforce (1),
+  // zforce (2), or phiforce (3)
+  int ii;
+  //Set up the potentials
+  struct potentialArg * potentialArgs= (struct potentialArg *) malloc ( npot * sizeof (struct potentialArg) );
+  parse_leapFuncArgs_Full(npot,potentialArgs,pot_type,pot_args);
+  //Run through and evaluate
+  for (ii=0; ii < n; ii++){
+    if ( which == 0 )
+      *(out+ii)= potentialArgs->potentialEval(*(R+ii),*(z+ii),*(phi+ii),0.,
+					      potentialArgs);
+    else if ( which == 1 )
+      *(out+ii)= calcRforce(*(R+ii),*(z+ii),*(phi+ii),0.,npot,potentialArgs);
+    else if ( which == 2 )
+      *(out+ii)= calczforce(*(R+ii),*(z+ii),*(phi+ii),0.,npot,potentialArgs);
+    else
+      *(out+ii)= calcPhiforce(*(R+ii),*(z+ii),*(phi+ii),0.,npot,
+			      potentialArgs);
+  }
+  free_potentialArgs(npot,potentialArgs);
+  free(potentialArgs);
+}
+void eval_bulk(int n,
+	       double *R,
+	       double *z,
+	       double *phi,
+	       double *t,
+	       int npot,
+	       int * pot_type,
+	       double * pot_args,
+	       int which,
+	       double *out,
+	       int * err){
+  // Evaluate the potential (which=0; pot_args parsed for actions), Rforce
+  // (1), zforce (2), or phiforce (3) at n points (R,z,phi,t) in parallel
+  int ii, jj, tid, nthreads;
+  struct potentialArg * thisPotentialArgs;
+#ifdef _OPENMP
+  nthreads = omp_get_max_threads();
+  if ( n < nthreads ) nthreads= n > 0 ? n : 1;
+#else
+  nthreads = 1;
+#endif
+  //Set up the potentials, each thread gets its own copy, because some
+  //potentials cache in args
+  struct potentialArg * potentialArgs= (struct potentialArg *) malloc ( nthreads * npot * sizeof (struct potentialArg) );
+  for (tid=0; tid < nthreads; tid++)
+    if ( which == 0 )
+      parse_actionAngleArgs(npot,potentialArgs+tid*npot,pot_type,pot_args,
+			    false);
+    else
+      parse_leapFuncArgs_Full(npot,potentialArgs+tid*npot,pot_type,pot_args);
+  //Run through the points and evaluate
+#pragma omp parallel for schedule(static) private(ii,jj,tid,thisPotentialArgs) num_threads(nthreads)
+  for (ii=0; ii < n; ii++){
+#ifdef _OPENMP
+    tid= omp_get_thread_num();
+#else
+    tid = 0;
+#endif
+    thisPotentialArgs= potentialArgs+tid*npot;
+    if ( which == 0 ) {
+      *(out+ii)= 0.;
+      for (jj=0; jj < npot; jj++)
+	*(out+ii)+= (thisPotentialArgs+jj)->potentialEval(*(R+ii),*(z+ii),
+							   *(phi+ii),*(t+ii),
+							   thisPotentialArgs+jj);
+    }
+    else if ( which == 1 )
+      *(out+ii)= calcRforce(*(R+ii),*(z+ii),*(phi+ii),*(t+ii),npot,
+			    thisPotentialArgs);
+    else if ( which == 2 )
+      *(out+ii)= calczforce(*(R+ii),*(z+ii),*(phi+ii),*(t+ii),npot,
+			    thisPotentialArgs);
+    else
+      *(out+ii)= calcPhiforce(*(R+ii),*(z+ii),*(phi+ii),*(t+ii),npot,
+			      thisPotentialArgs);
+  }
+  for (tid=0; tid < nthreads; tid++)
+    free_potentialArgs(npot,potentialArgs+tid*npot);
+  free(potentialArgs);
+}
@@ -3,7 +3,6 @@ from __future__ import division, print_function
 import os, os.path
 import pickle
 import numpy as nu
-import galpy.util.bovy_plot as plot
 from galpy.util import config
 from galpy.potential_src.Potential import PotentialError
 from galpy.util.bovy_conversion import physical_conversion,\
@@ -39,6 +38,14 @@ class linearPotential(object):
             self._voSet= True
         return None
 
+    def __setattr__(self,name,value):
+        # Changing any attribute other than the evaluation caches invalidates
+        # the description of the potential cached for the C code
+        if not name.startswith('_cached') and not name.endswith('_hash'):
+            object.__setattr__(self,'_cached_c',None)
+        object.__setattr__(self,name,value)
+        return None
+
     def turn_physical_off(self):
         """
         NAME:
@@ -204,6 +211,7 @@ class linearPotential(object):
            2010-07-13 - Written - Bovy (NYU)
 
         """
+        from galpy.util import bovy_plot as plot
         if not savefilename == None and os.path.exists(savefilename):
             print("Restoring savefile "+savefilename+" ...")
             savefile= open(savefilename,'rb')
@@ -342,6 +350,7 @@ def plotlinearPotentials(Pot,t=0.,min=-15.,max=15,ns=21,savefilename=None):
        2010-07-13 - Written - Bovy (NYU)
 
     """
+    from galpy.util import bovy_plot as plot
     if not savefilename == None and os.path.exists(savefilename):
         print("Restoring savefile "+savefilename+" ...")
         savefile= open(savefilename,'rb')
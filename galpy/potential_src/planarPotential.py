@@ -4,7 +4,6 @@ import os
 import pickle
 import numpy as nu
 from scipy import integrate
-import galpy.util.bovy_plot as plot
 from galpy.util import config
 from galpy.util.bovy_conversion import physical_conversion,\
     potential_physical_input, freq_in_Gyr
@@ -44,6 +43,14 @@ class planarPotential(object):
             self._voSet= True
         return None
 
+    def __setattr__(self,name,value):
+        # Changing any attribute other than the evaluation caches invalidates
+        # the description of the potential cached for the C code
+        if not name.startswith('_cached') and not name.endswith('_hash'):
+            object.__setattr__(self,'_cached_c',None)
+        object.__setattr__(self,name,value)
+        return None
+
     def turn_physical_off(self):
         """
         NAME:
@@ -1225,6 +1232,7 @@ def plotplanarPotentials(Pot,*args,**kwargs):
        2010-07-13 - Written - Bovy (NYU)
 
     """
+    from galpy.util import bovy_plot as plot
     Rrange= kwargs.pop('Rrange',[0.01,5.])
     xrange= kwargs.pop('xrange',[-5.,5.])
     yrange= kwargs.pop('yrange',[-5.,5.])
@@ -3,7 +3,6 @@ from __future__ import division, print_function
 import os
 import pickle
 import numpy as nu
-import galpy.util.bovy_plot as plot
 from galpy.util.bovy_conversion import physical_conversion,\
     potential_physical_input
 _APY_LOADED= True
@@ -44,6 +43,7 @@ def plotEscapecurve(Pot,*args,**kwargs):
        2010-08-08 - Written - Bovy (NYU)
 
     """
+    from galpy.util import bovy_plot as plot
     # Using physical units or not?
     if isinstance(Pot,list):
         potro= Pot[0]._ro
@@ -3,7 +3,6 @@ from __future__ import division, print_function
 import os
 import pickle
 import numpy as nu
-import galpy.util.bovy_plot as plot
 from galpy.util.bovy_conversion import physical_conversion,\
     potential_physical_input
 _APY_LOADED= True
@@ -47,6 +46,7 @@ def plotRotcurve(Pot,*args,**kwargs):
        2016-06-15 - Added phi= keyword for non-axisymmetric potential - Bovy (UofT)
 
     """
+    from galpy.util import bovy_plot as plot
     # Using physical units or not?
     if isinstance(Pot,list):
         potro= Pot[0]._ro
@@ -0,0 +1,71 @@
+#include <stdint.h>
+#include <galpy_potentials.h>
+//CallbackPotential
+// Potential, forces, and second derivatives are given by compiled functions
+// double f(double R, double z, double phi, double t) whose addresses are
+// passed as arguments (zero for functions that are not given)
+//8 arguments: amp, potential, Rforce, zforce, phiforce, R2deriv, phi2deriv,
+//             Rphideriv
+typedef double (*CallbackPotentialFunc)(double,double,double,double);
+static inline double CallbackPotential_call(int indx,double R,double z,
+					    double phi,double t,
+					    double * args){
+  CallbackPotentialFunc func= (CallbackPotentialFunc) (uintptr_t) *(args+indx);
+  if ( ! func ) return 0.;
+  return *args * func(R,z,phi,t);
+}
+double CallbackPotentialEval(double R,double z, double phi,
+			     double t,
+			     struct potentialArg * potentialArgs){
+  return CallbackPotential_call(1,R,z,phi,t,potentialArgs->args);
+}
+double CallbackPotentialRforce(double R,double z, double phi,
+			       double t,
+			       struct potentialArg * potentialArgs){
+  return CallbackPotential_call(2,R,z,phi,t,potentialArgs->args);
+}
+double CallbackPotentialPlanarRforce(double R,double phi,double t,
+				     struct potentialArg * potentialArgs){
+  return CallbackPotential_call(2,R,0.,phi,t,potentialArgs->args);
+}
+double CallbackPotentialzforce(double R,double z, double phi,
+			       double t,
+			       struct potentialArg * potentialArgs){
+  return CallbackPotential_call(3,R,z,phi,t,potentialArgs->args);
+}
+double CallbackPotentialphiforce(double R,double z, double phi,
+				 double t,
+				 struct potentialArg * potentialArgs){
+  return CallbackPotential_call(4,R,z,phi,t,potentialArgs->args);
+}
+double CallbackPotentialPlanarphiforce(double R,double phi,double t,
+				       struct potentialArg * potentialArgs){
+  return CallbackPotential_call(4,R,0.,phi,t,potentialArgs->args);
+}
+double CallbackPotentialR2deriv(double R,double z, double phi,
+				double t,
+				struct potentialArg * potentialArgs){
+  return CallbackPotential_call(5,R,z,phi,t,potentialArgs->args);
+}
+double CallbackPotentialPlanarR2deriv(double R,double phi,double t,
+				      struct potentialArg * potentialArgs){
+  return CallbackPotential_call(5,R,0.,phi,t,potentialArgs->args);
+}
+double CallbackPotentialphi2deriv(double R,double z, double phi,
+				  double t,
+				  struct potentialArg * potentialArgs){
+  return CallbackPotential_call(6,R,z,phi,t,potentialArgs->args);
+}
+double CallbackPotentialPlanarphi2deriv(double R,double phi,double t,
+					struct potentialArg * potentialArgs){
+  return CallbackPotential_call(6,R,0.,phi,t,potentialArgs->args);
+}
+double CallbackPotentialRphideriv(double R,double z, double phi,
+				  double t,
+				  struct potentialArg * potentialArgs){
+  return CallbackPotential_call(7,R,z,phi,t,potentialArgs->args);
+}
+double CallbackPotentialPlanarRphideriv(double R,double phi,double t,
+					struct potentialArg * potentialArgs){
+  return CallbackPotential_call(7,R,0.,phi,t,potentialArgs->args);
+}
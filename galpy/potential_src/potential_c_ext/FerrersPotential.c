@@ -0,0 +1,258 @@
+#include <math.h>
+#include <galpy_potentials.h>
+//FerrersPotential
+// The potential, forces, and second derivatives are integrals over tau from
+// lambda to infinity; these are computed with Gauss-Legendre quadrature
+// after the change of variables tau+m = (lambda+m)/s^2 with m the smallest
+// of a2, b2, c2, for which the integrands are smooth functions of s in [0,1]
+static inline double FerrersPotential_lowerlim(double x,double y,double z,
+					       double a2,double b2,double c2){
+  // Largest root of x^2/(a2+tau)+y^2/(b2+tau)+z^2/(c2+tau) = 1 outside of
+  // the ellipsoid, zero inside; the lhs is convex and decreasing in tau, so
+  // Newton's method from tau=0 converges monotonically
+  double tau= 0.;
+  double x2= x * x, y2= y * y, z2= z * z;
+  double ia, ib, ic, dtau;
+  int ii;
+  if ( x2 / a2 + y2 / b2 + z2 / c2 <= 1. ) return 0.;
+  for (ii=0; ii < 100; ii++){
+    ia= 1. / ( a2 + tau );
+    ib= 1. / ( b2 + tau );
+    ic= 1. / ( c2 + tau );
+    dtau= ( x2 * ia + y2 * ib + z2 * ic - 1. )		\
+      / ( x2 * ia * ia + y2 * ib * ib + z2 * ic * ic );
+    tau+= dtau;
+    if ( dtau <= 1.e-15 * tau ) break;
+  }
+  return tau;
+}
+static void FerrersPotentialIntegrals(double x,double y,double z,
+				      double a2,double b2,double c2,
+				      double n,int glorder,
+				      double * glx,double * glw,
+				      double * pot,double * force,
+				      double * d2){
+  // pot: int B^(n+1)/Delta, force[i]: int x_i/(tau+a2_i) B^n/Delta,
+  // d2: int d^2 B^(n+1)/dx_i/dx_j / (n+1) / Delta for (xx,xy,xz,yy,yz,zz)
+  // each is only computed when not NULL
+  int ii, jj;
+  double m= a2 < b2 ? ( a2 < c2 ? a2 : c2 ) : ( b2 < c2 ? b2 : c2 );
+  double L= FerrersPotential_lowerlim(x,y,z,a2,b2,c2) + m;
+  double s2, Pa, Pb, Pc, ia, ib, ic, w, B, Bn, Bn1;
+  double xia, yib, zic;
+  if ( pot ) *pot= 0.;
+  if ( force ) for (jj=0; jj < 3; jj++) *(force+jj)= 0.;
+  if ( d2 ) for (jj=0; jj < 6; jj++) *(d2+jj)= 0.;
+  for (ii=0; ii < glorder; ii++){
+    s2= *(glx+ii) * *(glx+ii);
+    Pa= L + ( a2 - m ) * s2;
+    Pb= L + ( b2 - m ) * s2;
+    Pc= L + ( c2 - m ) * s2;
+    ia= s2 / Pa;
+    ib= s2 / Pb;
+    ic= s2 / Pc;
+    // weight includes the Jacobian dtau/Delta
+    w= 2. * *(glw+ii) * L / sqrt ( Pa * Pb * Pc );
+    B= 1. - x * x * ia - y * y * ib - z * z * ic;
+    if ( B <= 0. ) continue;
+    Bn= pow(B,n);
+    if ( pot ) *pot+= w * B * Bn;
+    xia= x * ia;
+    yib= y * ib;
+    zic= z * ic;
+    if ( force ) {
+      *force+= w * xia * Bn;
+      *(force+1)+= w * yib * Bn;
+      *(force+2)+= w * zic * Bn;
+    }
+    if ( d2 ) {
+      Bn1= 4. * n * Bn / B;
+      *d2+= w * ( Bn1 * xia * xia - 2. * ia * Bn );
+      *(d2+1)+= w * Bn1 * xia * yib;
+      *(d2+2)+= w * Bn1 * xia * zic;
+      *(d2+3)+= w * ( Bn1 * yib * yib - 2. * ib * Bn );
+      *(d2+4)+= w * Bn1 * yib * zic;
+      *(d2+5)+= w * ( Bn1 * zic * zic - 2. * ic * Bn );
+    }
+  }
+}
+double FerrersPotentialEval(double R,double z, double phi,
+			    double t,
+			    struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  //Get args: amp (includes pi rho_c a^3 b c), a2, b2, c2, n, pa, omegab,
+  //          glorder, glx, glw
+  double amp= *args++;
+  double a2= *args++;
+  double b2= *args++;
+  double c2= *args++;
+  double n= *args++;
+  double pa= *args++;
+  double omegab= *args++;
+  int glorder= (int) *args++;
+  double x,y;
+  double pot;
+  //Calculate potential
+  cyl_to_rect(R,phi-pa-omegab*t,&x,&y);
+  FerrersPotentialIntegrals(x,y,z,a2,b2,c2,n,glorder,args,args+glorder,
+			    &pot,NULL,NULL);
+  return -amp * pot / ( n + 1. );
+}
+static void FerrersPotentialxyzforces_xyz(double R,double z,double phi,
+					  double t,double * args){
+  // Computes -dPhi/dx_i / amp in the aligned frame and stores them in the
+  // cache, which sits after the glx and glw arrays
+  double a2= *(args+1);
+  double b2= *(args+2);
+  double c2= *(args+3);
+  double n= *(args+4);
+  double pa= *(args+5);
+  double omegab= *(args+6);
+  int glorder= (int) *(args+7);
+  double * cache= args + 8 + 2 * glorder;
+  double x,y;
+  double force[3];
+  if ( R != *cache || z != *(cache+1) || phi != *(cache+2)
+       || t != *(cache+3) ){
+    *cache= R;
+    *(cache+1)= z;
+    *(cache+2)= phi;
+    *(cache+3)= t;
+    cyl_to_rect(R,phi-pa-omegab*t,&x,&y);
+    FerrersPotentialIntegrals(x,y,z,a2,b2,c2,n,glorder,
+			      args+8,args+8+glorder,NULL,force,NULL);
+    *(cache+4)= -2. * force[0];
+    *(cache+5)= -2. * force[1];
+    *(cache+6)= -2. * force[2];
+  }
+}
+static void FerrersPotentialxyz2ndderivs_xyz(double R,double z,double phi,
+					     double t,double * args){
+  // Computes d^2Phi/dx_i/dx_j / amp for (xx,xy,yy) in the aligned frame and
+  // stores them in the second cache, also fills the force cache
+  double a2= *(args+1);
+  double b2= *(args+2);
+  double c2= *(args+3);
+  double n= *(args+4);
+  double pa= *(args+5);
+  double omegab= *(args+6);
+  int glorder= (int) *(args+7);
+  double * fcache= args + 8 + 2 * glorder;
+  double * cache= fcache + 7;
+  double x,y;
+  double force[3];
+  double d2[6];
+  if ( R != *cache || z != *(cache+1) || phi != *(cache+2)
+       || t != *(cache+3) ){
+    *cache= R;
+    *(cache+1)= z;
+    *(cache+2)= phi;
+    *(cache+3)= t;
+    cyl_to_rect(R,phi-pa-omegab*t,&x,&y);
+    FerrersPotentialIntegrals(x,y,z,a2,b2,c2,n,glorder,
+			      args+8,args+8+glorder,NULL,force,d2);
+    *(cache+4)= -d2[0];
+    *(cache+5)= -d2[1];
+    *(cache+6)= -d2[3];
+    *fcache= R;
+    *(fcache+1)= z;
+    *(fcache+2)= phi;
+    *(fcache+3)= t;
+    *(fcache+4)= -2. * force[0];
+    *(fcache+5)= -2. * force[1];
+    *(fcache+6)= -2. * force[2];
+  }
+}
+double FerrersPotentialRforce(double R,double z, double phi,
+			      double t,
+			      struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  double amp= *args;
+  double phia= phi - *(args+5) - *(args+6) * t;
+  double * cache= args + 8 + 2 * (int) *(args+7);
+  FerrersPotentialxyzforces_xyz(R,z,phi,t,args);
+  return amp * ( cos ( phia ) * *(cache+4) + sin ( phia ) * *(cache+5) );
+}
+double FerrersPotentialPlanarRforce(double R,double phi,double t,
+				    struct potentialArg * potentialArgs){
+  return FerrersPotentialRforce(R,0.,phi,t,potentialArgs);
+}
+double FerrersPotentialphiforce(double R,double z, double phi,
+				double t,
+				struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  double amp= *args;
+  double phia= phi - *(args+5) - *(args+6) * t;
+  double * cache= args + 8 + 2 * (int) *(args+7);
+  FerrersPotentialxyzforces_xyz(R,z,phi,t,args);
+  return amp * R * ( -sin ( phia ) * *(cache+4) \
+		     + cos ( phia ) * *(cache+5) );
+}
+double FerrersPotentialPlanarphiforce(double R,double phi,double t,
+				      struct potentialArg * potentialArgs){
+  return FerrersPotentialphiforce(R,0.,phi,t,potentialArgs);
+}
+double FerrersPotentialzforce(double R,double z, double phi,
+			      double t,
+			      struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  double amp= *args;
+  double * cache= args + 8 + 2 * (int) *(args+7);
+  FerrersPotentialxyzforces_xyz(R,z,phi,t,args);
+  return amp * *(cache+6);
+}
+double FerrersPotentialR2deriv(double R,double z, double phi,
+			       double t,
+			       struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  double amp= *args;
+  double phia= phi - *(args+5) - *(args+6) * t;
+  double * cache= args + 15 + 2 * (int) *(args+7);
+  double cp= cos ( phia );
+  double sp= sin ( phia );
+  FerrersPotentialxyz2ndderivs_xyz(R,z,phi,t,args);
+  return amp * ( cp * cp * *(cache+4) + 2. * cp * sp * *(cache+5)
+		 + sp * sp * *(cache+6) );
+}
+double FerrersPotentialPlanarR2deriv(double R,double phi,double t,
+				     struct potentialArg * potentialArgs){
+  return FerrersPotentialR2deriv(R,0.,phi,t,potentialArgs);
+}
+double FerrersPotentialphi2deriv(double R,double z, double phi,
+				 double t,
+				 struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  double amp= *args;
+  double phia= phi - *(args+5) - *(args+6) * t;
+  double * fcache= args + 8 + 2 * (int) *(args+7);
+  double * cache= fcache + 7;
+  double cp= cos ( phia );
+  double sp= sin ( phia );
+  FerrersPotentialxyz2ndderivs_xyz(R,z,phi,t,args);
+  return amp * ( R * R * ( sp * sp * *(cache+4) - 2. * cp * sp * *(cache+5)
+			   + cp * cp * *(cache+6) )
+		 + R * ( cp * *(fcache+4) + sp * *(fcache+5) ) );
+}
+double FerrersPotentialPlanarphi2deriv(double R,double phi,double t,
+				       struct potentialArg * potentialArgs){
+  return FerrersPotentialphi2deriv(R,0.,phi,t,potentialArgs);
+}
+double FerrersPotentialRphideriv(double R,double z, double phi,
+				 double t,
+				 struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  double amp= *args;
+  double phia= phi - *(args+5) - *(args+6) * t;
+  double * fcache= args + 8 + 2 * (int) *(args+7);
+  double * cache= fcache + 7;
+  double cp= cos ( phia );
+  double sp= sin ( phia );
+  FerrersPotentialxyz2ndderivs_xyz(R,z,phi,t,args);
+  return amp * ( R * cp * sp * ( *(cache+6) - *(cache+4) )
+		 + R * ( cp * cp - sp * sp ) * *(cache+5)
+		 + sp * *(fcache+4) - cp * *(fcache+5) );
+}
+double FerrersPotentialPlanarRphideriv(double R,double phi,double t,
+				       struct potentialArg * potentialArgs){
+  return FerrersPotentialRphideriv(R,0.,phi,t,potentialArgs);
+}
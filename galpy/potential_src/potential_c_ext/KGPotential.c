@@ -0,0 +1,14 @@
+#include <math.h>
+#include <galpy_potentials.h>
+//KGPotential
+//4 arguments: amp, K, D^2, F
+double KGPotentialLinearForce(double x,double t,
+			      struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  //Get args
+  double amp= *args++;
+  double K= *args++;
+  double D2= *args++;
+  double F= *args;
+  return -amp * x * ( K / sqrt ( x * x + D2 ) + 2. * F );
+}
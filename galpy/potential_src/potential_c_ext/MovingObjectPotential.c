@@ -0,0 +1,129 @@
+#include <math.h>
+#include <galpy_potentials.h>
+//MovingObjectPotential
+// The trajectory of the object is given as a piecewise polynomial in time
+// for each of x, y, and z, with nbreak breakpoints tb and ncoeff
+// coefficients (highest order first) stored per interval; the Python side
+// checks that the integration times are within the breakpoints, like when
+// evaluating the object's orbit in Python
+static inline double MovingObjectPotential_horner(double dt,int ncoeff,
+						  double * c){
+  int ii;
+  double out= *c;
+  for (ii=1; ii < ncoeff; ii++)
+    out= out * dt + *(c+ii);
+  return out;
+}
+static inline void MovingObjectPotential_position(double t,int nbreak,
+						  int ncoeff,double * tb,
+						  double * cx,double * cy,
+						  double * cz,double * x,
+						  double * y,double * z){
+  int lo= 0, hi= nbreak-1, mid;
+  double dt;
+  // Binary search for the interval containing t
+  while ( hi - lo > 1 ) {
+    mid= ( lo + hi ) / 2;
+    if ( *(tb+mid) > t ) hi= mid;
+    else lo= mid;
+  }
+  dt= t - *(tb+lo);
+  *x= MovingObjectPotential_horner(dt,ncoeff,cx+ncoeff*lo);
+  *y= MovingObjectPotential_horner(dt,ncoeff,cy+ncoeff*lo);
+  *z= MovingObjectPotential_horner(dt,ncoeff,cz+ncoeff*lo);
+}
+// Softening kernels: 0 = Plummer
+static inline double MovingObjectPotential_softening_potential(double d2,
+							       int type,
+							       double eps){
+  switch ( type ) {
+  case 0: //Plummer
+  default:
+    return 1. / sqrt ( d2 + eps * eps );
+  }
+}
+static inline double MovingObjectPotential_softening_force_over_d(double d2,
+								  int type,
+								  double eps){
+  switch ( type ) {
+  case 0: //Plummer
+  default:
+    return pow ( d2 + eps * eps , -1.5 );
+  }
+}
+double MovingObjectPotentialEval(double R,double z, double phi,
+				 double t,
+				 struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  //Get args: amp, softening type, softening length, nbreak, ncoeff, tb,
+  //          cx, cy, cz
+  double amp= *args++;
+  int type= (int) *args++;
+  double eps= *args++;
+  int nbreak= (int) *args++;
+  int ncoeff= (int) *args++;
+  double * tb= args;
+  double * cx= tb + nbreak;
+  double * cy= cx + ncoeff * ( nbreak - 1 );
+  double * cz= cy + ncoeff * ( nbreak - 1 );
+  double x, y, xo, yo, zo;
+  cyl_to_rect(R,phi,&x,&y);
+  MovingObjectPotential_position(t,nbreak,ncoeff,tb,cx,cy,cz,&xo,&yo,&zo);
+  return -amp * MovingObjectPotential_softening_potential(\
+	    ( x - xo ) * ( x - xo ) + ( y - yo ) * ( y - yo )
+	    + ( z - zo ) * ( z - zo ),type,eps);
+}
+static void MovingObjectPotentialxyzforces(double R,double z,double phi,
+					   double t,double * args,
+					   double * Fx,double * Fy,
+					   double * Fz){
+  double amp= *args++;
+  int type= (int) *args++;
+  double eps= *args++;
+  int nbreak= (int) *args++;
+  int ncoeff= (int) *args++;
+  double * tb= args;
+  double * cx= tb + nbreak;
+  double * cy= cx + ncoeff * ( nbreak - 1 );
+  double * cz= cy + ncoeff * ( nbreak - 1 );
+  double x, y, xo, yo, zo, fod;
+  cyl_to_rect(R,phi,&x,&y);
+  MovingObjectPotential_position(t,nbreak,ncoeff,tb,cx,cy,cz,&xo,&yo,&zo);
+  xo-= x;
+  yo-= y;
+  zo-= z;
+  fod= amp * MovingObjectPotential_softening_force_over_d(\
+	    xo * xo + yo * yo + zo * zo,type,eps);
+  *Fx= fod * xo;
+  *Fy= fod * yo;
+  *Fz= fod * zo;
+}
+double MovingObjectPotentialRforce(double R,double z, double phi,
+				   double t,
+				   struct potentialArg * potentialArgs){
+  double Fx, Fy, Fz;
+  MovingObjectPotentialxyzforces(R,z,phi,t,potentialArgs->args,&Fx,&Fy,&Fz);
+  return cos ( phi ) * Fx + sin ( phi ) * Fy;
+}
+double MovingObjectPotentialPlanarRforce(double R,double phi,double t,
+					 struct potentialArg * potentialArgs){
+  return MovingObjectPotentialRforce(R,0.,phi,t,potentialArgs);
+}
+double MovingObjectPotentialphiforce(double R,double z, double phi,
+				     double t,
+				     struct potentialArg * potentialArgs){
+  double Fx, Fy, Fz;
+  MovingObjectPotentialxyzforces(R,z,phi,t,potentialArgs->args,&Fx,&Fy,&Fz);
+  return R * ( -sin ( phi ) * Fx + cos ( phi ) * Fy );
+}
+double MovingObjectPotentialPlanarphiforce(double R,double phi,double t,
+					   struct potentialArg * potentialArgs){
+  return MovingObjectPotentialphiforce(R,0.,phi,t,potentialArgs);
+}
+double MovingObjectPotentialzforce(double R,double z, double phi,
+				   double t,
+				   struct potentialArg * potentialArgs){
+  double Fx, Fy, Fz;
+  MovingObjectPotentialxyzforces(R,z,phi,t,potentialArgs->args,&Fx,&Fy,&Fz);
+  return Fz;
+}
@@ -39,8 +39,11 @@ void free_potentialArgs(int npot, struct potentialArg * potentialArgs){
       gsl_interp_accel_free ((potentialArgs+ii)->accxzforce);
     if ( (potentialArgs+ii)->accyzforce )
       gsl_interp_accel_free ((potentialArgs+ii)->accyzforce);
-   if ( (potentialArgs+ii)->wrappedPotentialArg )
+    if ( (potentialArgs+ii)->wrappedPotentialArg ) {
+      free_potentialArgs((potentialArgs+ii)->nwrapped,
+			 (potentialArgs+ii)->wrappedPotentialArg);
       free((potentialArgs+ii)->wrappedPotentialArg);
+    }
     free((potentialArgs+ii)->args);
   }
 }
@@ -193,3 +196,14 @@ double calcPlanarRphideriv(double R, double phi, double t,
   potentialArgs-= nargs;
   return Rphideriv;
 }
+double calcLinearForce(double x, double t, 
+		       int nargs, struct potentialArg * potentialArgs){
+  int ii;
+  double force= 0.;
+  for (ii=0; ii < nargs; ii++){
+    force+= potentialArgs->linearForce(x,t,potentialArgs);
+    potentialArgs++;
+  }
+  potentialArgs-= nargs;
+  return force;
+}
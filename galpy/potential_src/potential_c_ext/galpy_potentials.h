@@ -33,6 +33,7 @@ struct potentialArg{
 			    struct potentialArg *);
   double (*planarRphideriv)(double R,double phi, double t,
 			    struct potentialArg *);
+  double (*linearForce)(double x, double t, struct potentialArg *);
   int nargs;
   double * args;
   interp_2d * i2d;
@@ -77,6 +78,7 @@ double calcPlanarphi2deriv(double, double, double,
 			   int, struct potentialArg *);
 double calcPlanarRphideriv(double, double, double, 
 			   int, struct potentialArg *);
+double calcLinearForce(double, double, int, struct potentialArg *);
 //ZeroForce
 double ZeroPlanarForce(double,double,double,
 		       struct potentialArg *);
@@ -374,6 +376,44 @@ double SoftenedNeedleBarPotentialPlanarRforce(double,double,double,
 					      struct potentialArg *);
 double SoftenedNeedleBarPotentialPlanarphiforce(double,double,double,
 					  struct potentialArg *);
+//FerrersPotential
+double FerrersPotentialEval(double,double,double,double,
+			    struct potentialArg *);
+double FerrersPotentialRforce(double,double,double,double,
+			      struct potentialArg *);
+double FerrersPotentialzforce(double,double,double,double,
+			      struct potentialArg *);
+double FerrersPotentialphiforce(double,double,double,double,
+				struct potentialArg *);
+double FerrersPotentialR2deriv(double,double,double,double,
+			       struct potentialArg *);
+double FerrersPotentialphi2deriv(double,double,double,double,
+				 struct potentialArg *);
+double FerrersPotentialRphideriv(double,double,double,double,
+				 struct potentialArg *);
+double FerrersPotentialPlanarRforce(double,double,double,
+				    struct potentialArg *);
+double FerrersPotentialPlanarphiforce(double,double,double,
+				      struct potentialArg *);
+double FerrersPotentialPlanarR2deriv(double,double,double,
+				     struct potentialArg *);
+double FerrersPotentialPlanarphi2deriv(double,double,double,
+				       struct potentialArg *);
+double FerrersPotentialPlanarRphideriv(double,double,double,
+				       struct potentialArg *);
+//MovingObjectPotential
+double MovingObjectPotentialEval(double,double,double,double,
+				 struct potentialArg *);
+double MovingObjectPotentialRforce(double,double,double,double,
+				   struct potentialArg *);
+double MovingObjectPotentialzforce(double,double,double,double,
+				   struct potentialArg *);
+double MovingObjectPotentialphiforce(double,double,double,double,
+				     struct potentialArg *);
+double MovingObjectPotentialPlanarRforce(double,double,double,
+					 struct potentialArg *);
+double MovingObjectPotentialPlanarphiforce(double,double,double,
+					   struct potentialArg *);
 //DiskSCFPotential
 double DiskSCFPotentialEval(double,double,double,double,
 				      struct potentialArg *);
@@ -462,6 +502,48 @@ double CosmphiDiskPotentialphi2deriv(double,double,double,
 					   struct potentialArg *);
 double CosmphiDiskPotentialRphideriv(double,double,double,
 					   struct potentialArg *);
+//CallbackPotential
+double CallbackPotentialEval(double,double,double,double,
+			     struct potentialArg *);
+double CallbackPotentialRforce(double,double,double,double,
+			       struct potentialArg *);
+double CallbackPotentialPlanarRforce(double,double,double,
+				     struct potentialArg *);
+double CallbackPotentialzforce(double,double,double,double,
+			       struct potentialArg *);
+double CallbackPotentialphiforce(double,double,double,double,
+				 struct potentialArg *);
+double CallbackPotentialPlanarphiforce(double,double,double,
+				       struct potentialArg *);
+double CallbackPotentialR2deriv(double,double,double,double,
+				struct potentialArg *);
+double CallbackPotentialPlanarR2deriv(double,double,double,
+				      struct potentialArg *);
+double CallbackPotentialphi2deriv(double,double,double,double,
+				  struct potentialArg *);
+double CallbackPotentialPlanarphi2deriv(double,double,double,
+					struct potentialArg *);
+double CallbackPotentialRphideriv(double,double,double,double,
+				  struct potentialArg *);
+double CallbackPotentialPlanarRphideriv(double,double,double,
+					struct potentialArg *);
+//interp3DPotential
+double interp3DPotentialEval(double,double,double,double,
+			     struct potentialArg *);
+double interp3DPotentialRforce(double,double,double,double,
+			       struct potentialArg *);
+double interp3DPotentialzforce(double,double,double,double,
+			       struct potentialArg *);
+double interp3DPotentialphiforce(double,double,double,double,
+				 struct potentialArg *);
+double interp3DPotentialPlanarRforce(double,double,double,
+				     struct potentialArg *);
+double interp3DPotentialPlanarphiforce(double,double,double,
+				       struct potentialArg *);
+//KGPotential
+double KGPotentialLinearForce(double,double,struct potentialArg *);
+//verticalPotential
+double verticalPotentialLinearForce(double,double,struct potentialArg *);
 #ifdef __cplusplus
 }
 #endif
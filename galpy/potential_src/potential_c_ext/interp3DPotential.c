@@ -0,0 +1,217 @@
+#include <math.h>
+#include <galpy_potentials.h>
+//interp3DPotential
+// Arguments: amp, cartesian, order, then for each of the three axes of the
+// grid (R,phi,z or x,y,z) the number of points, the minimum, the spacing, and
+// the symmetry (0: none, 1: mirror around zero, 2: periodic), six values to
+// cache the forces at the last point (R,z,phi,FR,Fz,Fphi), and the grid,
+// with the potential and the three forces (FR,Fz,Fphi or Fx,Fy,Fz) at each
+// node stored next to each other; outside of the
+// grid, the wrapped original potential is used if it is available in C
+// (otherwise the interpolation is extrapolated)
+#define INTERP3D_NHEADER 15
+#define INTERP3D_NCACHE 6
+#define INTERP3D_NOSYM 0
+#define INTERP3D_MIRROR 1
+#define INTERP3D_PERIODIC 2
+static inline int interp3DPotentialWeights(double u,double * axis,int order,
+					   int * indx,double * w,
+					   double * wodd){
+  // Indices and weights of the linear or cubic (Catmull-Rom, which has
+  // continuous first derivatives) interpolation along one axis; at the edges
+  // of the grid, the node beyond the edge is quadratically extrapolated; wodd
+  // has the sign flipped for nodes mirrored around zero (for odd functions);
+  // returns 1 if u is outside of the grid
+  int n= (int) *axis;
+  double umin= *(axis+1);
+  double du= *(axis+2);
+  int sym= (int) *(axis+3);
+  int i0, kk, outside= 0;
+  double s, tt;
+  if ( sym == INTERP3D_MIRROR ) u= fabs(u);
+  s= ( u - umin ) / du;
+  if ( sym == INTERP3D_PERIODIC ) {
+    s= fmod(s,(double) n);
+    if ( s < 0. ) s+= n;
+  }
+  else if ( s > n - 1 || ( sym != INTERP3D_MIRROR && s < 0. ) ) outside= 1;
+  i0= (int) floor(s);
+  if ( sym != INTERP3D_PERIODIC ) {
+    if ( i0 > n - 2 ) i0= n - 2;
+    if ( i0 < 0 ) i0= 0;
+  }
+  tt= s - i0;
+  if ( order == 1 ) {
+    *indx= i0;
+    *(indx+1)= i0 + 1;
+    *w= 1. - tt;
+    *(w+1)= tt;
+  }
+  else {
+    for (kk=0; kk < 4; kk++) *(indx+kk)= i0 - 1 + kk;
+    *w= tt * ( ( 2. - tt ) * tt - 1. ) / 2.;
+    *(w+1)= ( tt * tt * ( 3. * tt - 5. ) + 2. ) / 2.;
+    *(w+2)= tt * ( ( 4. - 3. * tt ) * tt + 1. ) / 2.;
+    *(w+3)= tt * tt * ( tt - 1. ) / 2.;
+    if ( sym == INTERP3D_NOSYM && i0 == 0 ) {
+      *(w+1)+= 3. * *w;
+      *(w+2)-= 3. * *w;
+      *(w+3)+= *w;
+      *w= 0.;
+      *indx= 0;
+    }
+    if ( sym != INTERP3D_PERIODIC && i0 == n - 2 ) {
+      *(w+2)+= 3. * *(w+3);
+      *(w+1)-= 3. * *(w+3);
+      *w+= *(w+3);
+      *(w+3)= 0.;
+      *(indx+3)= n - 1;
+    }
+  }
+  for (kk=0; kk <= order; kk++){
+    *(wodd+kk)= *(w+kk);
+    if ( sym == INTERP3D_PERIODIC )
+      *(indx+kk)= ( ( *(indx+kk) % n ) + n ) % n;
+    else if ( *(indx+kk) < 0 ) {
+      *(indx+kk)*= -1;
+      *(wodd+kk)*= -1.;
+    }
+  }
+  return outside;
+}
+static int interp3DPotentialInterp(double R,double z,double phi,
+				   double * args,int forces,double * out){
+  // Interpolate the potential (forces=0) or the three cylindrical forces
+  // (forces=1); returns 1 if the point is outside of the grid, in which case
+  // the interpolation is extrapolated
+  int cartesian= (int) *(args+1);
+  int order= (int) *(args+2);
+  double * axis1= args+3;
+  double * axis2= args+7;
+  double * axis3= args+11;
+  int n2= (int) *axis2, n3= (int) *axis3;
+  double * grid= args + INTERP3D_NHEADER + INTERP3D_NCACHE;
+  double * node;
+  int indx1[4], indx2[4], indx3[4];
+  double w1[4], w2[4], w3[4], w1odd[4], w2odd[4], w3odd[4];
+  double u1, u2, cosphi= 1., sinphi= 0.;
+  double w12, w12odd1, w12odd2, ww, f1= 0., f2= 0., f3= 0.;
+  int ii, jj, kk, outside;
+  if ( cartesian ) {
+    cosphi= cos(phi);
+    sinphi= sin(phi);
+    u1= R * cosphi;
+    u2= R * sinphi;
+  }
+  else {
+    u1= R;
+    u2= phi;
+  }
+  outside= interp3DPotentialWeights(u1,axis1,order,indx1,w1,w1odd);
+  outside+= interp3DPotentialWeights(u2,axis2,order,indx2,w2,w2odd);
+  outside+= interp3DPotentialWeights(z,axis3,order,indx3,w3,w3odd);
+  // The potential and the forces are stored next to each other for each
+  // node; forces are odd in the mirrored coordinate along their direction
+  *out= 0.;
+  for (ii=0; ii <= order; ii++)
+    for (jj=0; jj <= order; jj++){
+      w12= w1[ii] * w2[jj];
+      w12odd1= w1odd[ii] * w2[jj];
+      w12odd2= w1[ii] * w2odd[jj];
+      node= grid + 4 * ( ( indx1[ii] * n2 + indx2[jj] ) * n3 );
+      for (kk=0; kk <= order; kk++){
+	ww= w12 * w3[kk];
+	if ( ! forces ) {
+	  *out+= ww * *(node + 4 * indx3[kk]);
+	  continue;
+	}
+	if ( cartesian ) {
+	  f1+= w12odd1 * w3[kk] * *(node + 4 * indx3[kk] + 1);
+	  f2+= w12odd2 * w3[kk] * *(node + 4 * indx3[kk] + 2);
+	}
+	else {
+	  f1+= ww * *(node + 4 * indx3[kk] + 1);
+	  f2+= ww * *(node + 4 * indx3[kk] + 3);
+	}
+	f3+= w12 * w3odd[kk] * *(node + 4 * indx3[kk] + 2 + cartesian);
+      }
+    }
+  if ( ! forces ) return outside > 0;
+  // f1, f2, f3: FR, Fphi, Fz or Fx, Fy, Fz
+  if ( (int) *(axis3+3) == INTERP3D_MIRROR && z < 0. ) f3*= -1.;
+  *(out+1)= f3;
+  if ( cartesian ) {
+    if ( (int) *(axis1+3) == INTERP3D_MIRROR && u1 < 0. ) f1*= -1.;
+    if ( (int) *(axis2+3) == INTERP3D_MIRROR && u2 < 0. ) f2*= -1.;
+    *out= cosphi * f1 + sinphi * f2;
+    *(out+2)= R * ( cosphi * f2 - sinphi * f1 );
+  }
+  else {
+    *out= f1;
+    *(out+2)= f2;
+  }
+  return outside > 0;
+}
+static double interp3DPotentialForce(double R,double z,double phi,double t,
+				     struct potentialArg * potentialArgs,
+				     int which,int planar){
+  // which= 0: Rforce, 1: zforce, 2: phiforce
+  double * args= potentialArgs->args;
+  double * cache= args + INTERP3D_NHEADER;
+  double amp= *args;
+  if ( R == *cache && z == *(cache+1) && phi == *(cache+2) )
+    return amp * *(cache+3+which);
+  if ( interp3DPotentialInterp(R,z,phi,args,1,cache+3)
+       && potentialArgs->nwrapped > 0 ) {
+    // Outside of the grid: use the original potential; not cached, because
+    // it can be time-dependent
+    *cache= NAN;
+    if ( planar && which == 0 )
+      return amp * calcPlanarRforce(R,phi,t,potentialArgs->nwrapped,
+				    potentialArgs->wrappedPotentialArg);
+    else if ( planar )
+      return amp * calcPlanarphiforce(R,phi,t,potentialArgs->nwrapped,
+				      potentialArgs->wrappedPotentialArg);
+    else if ( which == 0 )
+      return amp * calcRforce(R,z,phi,t,potentialArgs->nwrapped,
+			      potentialArgs->wrappedPotentialArg);
+    else if ( which == 1 )
+      return amp * calczforce(R,z,phi,t,potentialArgs->nwrapped,
+			      potentialArgs->wrappedPotentialArg);
+    else
+      return amp * calcPhiforce(R,z,phi,t,potentialArgs->nwrapped,
+				potentialArgs->wrappedPotentialArg);
+  }
+  *cache= R;
+  *(cache+1)= z;
+  *(cache+2)= phi;
+  return amp * *(cache+3+which);
+}
+double interp3DPotentialEval(double R,double z,double phi,double t,
+			     struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  double out;
+  // Only used to evaluate the potential on the grid
+  interp3DPotentialInterp(R,z,phi,args,0,&out);
+  return *args * out;
+}
+double interp3DPotentialRforce(double R,double z,double phi,double t,
+			       struct potentialArg * potentialArgs){
+  return interp3DPotentialForce(R,z,phi,t,potentialArgs,0,0);
+}
+double interp3DPotentialzforce(double R,double z,double phi,double t,
+			       struct potentialArg * potentialArgs){
+  return interp3DPotentialForce(R,z,phi,t,potentialArgs,1,0);
+}
+double interp3DPotentialphiforce(double R,double z,double phi,double t,
+				 struct potentialArg * potentialArgs){
+  return interp3DPotentialForce(R,z,phi,t,potentialArgs,2,0);
+}
+double interp3DPotentialPlanarRforce(double R,double phi,double t,
+				     struct potentialArg * potentialArgs){
+  return interp3DPotentialForce(R,0.,phi,t,potentialArgs,0,1);
+}
+double interp3DPotentialPlanarphiforce(double R,double phi,double t,
+				       struct potentialArg * potentialArgs){
+  return interp3DPotentialForce(R,0.,phi,t,potentialArgs,2,1);
+}
@@ -0,0 +1,21 @@
+#include <math.h>
+#include <galpy_potentials.h>
+//verticalPotential
+// The vertical force at fixed R and phi of a 3D potential: 
+// F_z(R,z,phi,t)-F_z(R,0,phi,t); the 3D potential is parsed like those of 
+// the wrappers
+//4 arguments: R, phi, and a cache of the time and F_z(R,0,phi,t)
+double verticalPotentialLinearForce(double x,double t,
+				    struct potentialArg * potentialArgs){
+  double * args= potentialArgs->args;
+  double R= *args;
+  double phi= *(args+1);
+  // The mid-plane force only changes with time, so cache it
+  if ( t != *(args+2) ) {
+    *(args+2)= t;
+    *(args+3)= calczforce(R,0.,phi,t,potentialArgs->nwrapped,
+			  potentialArgs->wrappedPotentialArg);
+  }
+  return calczforce(R,x,phi,t,potentialArgs->nwrapped,
+		    potentialArgs->wrappedPotentialArg) - *(args+3);
+}
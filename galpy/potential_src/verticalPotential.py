@@ -1,5 +1,5 @@
 from galpy.potential_src.linearPotential import linearPotential
-from galpy.potential_src.Potential import PotentialError, Potential
+from galpy.potential_src.Potential import PotentialError, Potential, _check_c
 _APY_LOADED= True
 try:
     from astropy import units
@@ -28,6 +28,8 @@ class verticalPotential(linearPotential):
         # Also transfer roSet and voSet
         self._roSet= RZPot._roSet
         self._voSet= RZPot._voSet
+        # The vertical force is evaluated in C using the 3D potential
+        self.hasC= _check_c(RZPot)
         return None
 
     def _evaluate(self,z,t=0.):
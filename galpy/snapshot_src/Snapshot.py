@@ -1,7 +1,6 @@
 import numpy as nu
 from galpy.orbit import Orbit
 from galpy.potential_src.planarPotential import RZToplanarPotential
-import galpy.util.bovy_plot as plot
 from directnbody import direct_nbody
 class Snapshot(object):
     """General snapshot = collection of particles class"""
@@ -172,6 +171,7 @@ class Snapshot(object):
            2011-02-06 - Written based on Orbit's plot
 
         """
+        from galpy.util import bovy_plot as plot
         labeldict= {'t':r'$t$','R':r'$R$','vR':r'$v_R$','vT':r'$v_T$',
                     'z':r'$z$','vz':r'$v_z$','phi':r'$\phi$',
                     'x':r'$x$','y':r'$y$','vx':r'$v_x$','vy':r'$v_y$'}
@@ -283,6 +283,7 @@ class Snapshot(object):
            2011-02-06 - Written based on Orbit's plot3d
 
         """
+        from galpy.util import bovy_plot as plot
         labeldict= {'t':r'$t$','R':r'$R$','vR':r'$v_R$','vT':r'$v_T$',
                     'z':r'$z$','vz':r'$v_z$','phi':r'$\phi$',
                     'x':r'$x$','y':r'$y$','vx':r'$v_x$','vy':r'$v_y$'}
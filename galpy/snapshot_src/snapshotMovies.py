@@ -6,7 +6,6 @@ import tempfile
 import shutil
 import subprocess
 import math as m
-import galpy.util.bovy_plot as bovy_plot
 from Snapshot import *
 def snapshotToMovie(snap,filename,*args,**kwargs):
     """
@@ -58,6 +57,7 @@ def snapshotToMovie(snap,filename,*args,**kwargs):
        2011-02-06 - Written - Bovy (NYU)
 
     """
+    from galpy.util import bovy_plot
     if kwargs.has_key('tmpdir'):
         tmpdir= kwargs['tmpdir']
         kwargs.pop('tmpdir')
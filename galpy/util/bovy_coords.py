@@ -76,7 +76,8 @@ from galpy.util.config import __config__
 _APY_COORDS= __config__.getboolean('astropy','astropy-coords')
 _APY_LOADED= True
 try:
-    import astropy.coordinates as apycoords
+    # astropy.coordinates is slow to import, so it is only imported in the
+    # functions that use it
     from astropy import units
 except ImportError:
     _APY_LOADED= False
@@ -163,6 +164,7 @@ def radec_to_lb(ra,dec,degree=False,epoch=2000.0):
 
     """
     if _APY_COORDS:
+        import astropy.coordinates as apycoords
         epoch, frame= _parse_epoch_frame_apy(epoch)
         c= apycoords.SkyCoord(ra*units.rad,dec*units.rad,
                               equinox=epoch,frame=frame)
@@ -220,6 +222,7 @@ def lb_to_radec(l,b,degree=False,epoch=2000.0):
 
     """
     if _APY_COORDS:
+        import astropy.coordinates as apycoords
         epoch, frame= _parse_epoch_frame_apy(epoch)
         c= apycoords.SkyCoord(l*units.rad,b*units.rad,frame='galactic')
         if not epoch is None and 'J' in epoch:
@@ -2113,6 +2116,7 @@ def get_epoch_angles(epoch=2000.0):
         ra_ngp= 192.25/180.*sc.pi
     elif _APY_LOADED:
         # Use astropy to get the angles
+        import astropy.coordinates as apycoords
         epoch, frame= _parse_epoch_frame_apy(epoch)
         c= apycoords.SkyCoord(180.*units.deg,90.*units.deg,
                               frame=frame,equinox=epoch)
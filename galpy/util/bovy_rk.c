@@ -32,13 +32,13 @@ POSSIBILITY OF SUCH DAMAGE.
 #include <stdio.h>
 #include <stdlib.h>
 #include <math.h>
-#include "signal.h"
 #include <bovy_symplecticode.h>
 #include <bovy_rk.h>
 #define _MAX_STEPCHANGE_POWERTWO 3.
 #define _MIN_STEPCHANGE_POWERTWO -3.
 #define _MAX_STEPREDUCE 10000.
 #define _MAX_DT_REDUCE 10000.
+#define _EVENT_THETATOL 1e-12
 /*
 Runge-Kutta 4 integrator
 Usage:
@@ -59,9 +59,10 @@ Usage:
        int nargs: see above
        double *args: see above
        double rtol, double atol: relative and absolute tolerance levels desired
+       volatile int *interrupted: (NULL if not used) per-call flag, checked before each output step; set it to non-zero (e.g., from another thread upon CTRL-C) to stop the integration
   Output:
        double *result: result (nt blocks of size 2dim)
-       int *err: error: -10 if interrupted by CTRL-C (SIGINT)
+       int *err: error: -10 if interrupted
 */
 void bovy_rk4(void (*func)(double t, double *q, double *a,
 			   int nargs, struct potentialArg * potentialArgs),
@@ -70,7 +71,9 @@ void bovy_rk4(void (*func)(double t, double *q, double *a,
 	      int nt, double dt, double *t,
 	      int nargs, struct potentialArg * potentialArgs,
 	      double rtol, double atol,
-	      double *result, int * err){
+	      double *result, int * err,
+	      struct odeStats * stats,
+	      volatile int * interrupted){
   //Declare and initialize
   double *yn= (double *) malloc ( dim * sizeof(double) );
   double *yn1= (double *) malloc ( dim * sizeof(double) );
@@ -86,20 +89,15 @@ void bovy_rk4(void (*func)(double t, double *q, double *a,
   double init_dt= (*(t+1))-(*t);
   if ( dt == -9999.99 ) {
     dt= rk4_estimate_step(*func,dim,yo,init_dt,t,nargs,potentialArgs,
-			  rtol,atol);
+			  rtol,atol,stats);
   }
-  long ndt= (long) (init_dt/dt);
+  long ndt= (long) (init_dt/dt+0.5);
+  if ( stats ) stats->dt= dt;
   //Integrate the system
   double to= *t;
-  // Handle KeyboardInterrupt gracefully
-  struct sigaction action;
-  memset(&action, 0, sizeof(struct sigaction));
-  action.sa_handler= handle_sigint;
-  sigaction(SIGINT,&action,NULL);
   for (ii=0; ii < (nt-1); ii++){
-    if ( interrupted ) {
+    if ( interrupted && *interrupted ) {
       *err= -10;
-      interrupted= 0; // need to reset, bc library and vars stay in memory
       break;
     }
     for (jj=0; jj < (ndt-1); jj++) {
@@ -110,15 +108,20 @@ void bovy_rk4(void (*func)(double t, double *q, double *a,
     }
     bovy_rk4_onestep(func,dim,yn,yn1,to,dt,nargs,potentialArgs,ynk,a);
     to+= dt;
+    if ( stats ) {
+      stats->nfev+= 4*ndt;
+      stats->naccept+= ndt;
+    }
     //save
     save_rk(dim,yn1,result);
     result+= dim;
     //reset yn
     for (kk=0; kk < dim; kk++) *(yn+kk)= *(yn1+kk);
   }
-  // Back to default handler
-  action.sa_handler= SIG_DFL;
-  sigaction(SIGINT,&action,NULL);
+  if ( stats ) {
+    stats->ntdone= ii+1;
+    stats->dtnext= dt;
+  }
   //Free allocated memory
   free(yn);
   free(yn1);
@@ -163,7 +166,9 @@ void bovy_rk6(void (*func)(double t, double *q, double *a,
 	      int nt, double dt, double *t,
 	      int nargs, struct potentialArg * potentialArgs,
 	      double rtol, double atol,
-	      double *result, int * err){
+	      double *result, int * err,
+	      struct odeStats * stats,
+	      volatile int * interrupted){
   //Declare and initialize
   double *yn= (double *) malloc ( dim * sizeof(double) );
   double *yn1= (double *) malloc ( dim * sizeof(double) );
@@ -184,20 +189,15 @@ void bovy_rk6(void (*func)(double t, double *q, double *a,
   double init_dt= (*(t+1))-(*t);
   if ( dt == -9999.99 ) {
     dt= rk6_estimate_step(*func,dim,yo,init_dt,t,nargs,potentialArgs,
-			  rtol,atol);
+			  rtol,atol,stats);
   }
-  long ndt= (long) (init_dt/dt);
+  long ndt= (long) (init_dt/dt+0.5);
+  if ( stats ) stats->dt= dt;
   //Integrate the system
   double to= *t;
-  // Handle KeyboardInterrupt gracefully
-  struct sigaction action;
-  memset(&action, 0, sizeof(struct sigaction));
-  action.sa_handler= handle_sigint;
-  sigaction(SIGINT,&action,NULL);
   for (ii=0; ii < (nt-1); ii++){
-    if ( interrupted ) {
+    if ( interrupted && *interrupted ) {
       *err= -10;
-      interrupted= 0; // need to reset, bc library and vars stay in memory
       break;
     }
     for (jj=0; jj < (ndt-1); jj++) {
@@ -210,15 +210,20 @@ void bovy_rk6(void (*func)(double t, double *q, double *a,
     bovy_rk6_onestep(func,dim,yn,yn1,to,dt,nargs,potentialArgs,ynk,a,
 		     k1,k2,k3,k4,k5);
     to+= dt;
+    if ( stats ) {
+      stats->nfev+= 7*ndt;
+      stats->naccept+= ndt;
+    }
     //save
     save_rk(dim,yn1,result);
     result+= dim;
     //reset yn
     for (kk=0; kk < dim; kk++) *(yn+kk)= *(yn1+kk);
   }
-  // Back to default handler
-  action.sa_handler= SIG_DFL;
-  sigaction(SIGINT,&action,NULL);
+  if ( stats ) {
+    stats->ntdone= ii+1;
+    stats->dtnext= dt;
+  }
   //Free allocated memory
   free(yn);
   free(yn1);
@@ -305,7 +310,8 @@ double rk4_estimate_step(void (*func)(double t, double *y, double *a,int nargs,
 			 int dim, double *yo,
 			 double dt, double *t,
 			 int nargs,struct potentialArg * potentialArgs,
-			 double rtol,double atol){
+			 double rtol,double atol,
+			 struct odeStats * stats){
   //return dt;
   //scalars
   double err= 2.;
@@ -326,12 +332,13 @@ double rk4_estimate_step(void (*func)(double t, double *y, double *a,int nargs,
     if ( fabs(*(yo+ii)) > max_val )
       max_val= fabs(*(yo+ii));
   //set up scale
-  double c= fmax(atol, rtol * max_val);
-  double s= log(exp(atol-c)+exp(rtol*max_val-c))+c;
+  double c= fmax(atol, rtol + log(max_val));
+  double s= log(exp(atol-c)+exp(rtol + log(max_val)-c))+c;
   for (ii=0; ii < dim; ii++) *(scale+ii)= s;
   //find good dt
   //dt*= 2.;
   while ( err > 1. ){
+    if ( stats ) stats->nfev+= 12;
     //dt/= 2.;
     //copy initial codition
     for (ii=0; ii < dim; ii++) *(yn+ii)= *(yo+ii);
@@ -373,7 +380,8 @@ double rk6_estimate_step(void (*func)(double t, double *y, double *a,int nargs,
 			 int dim, double *yo,
 			 double dt, double *t,
 			 int nargs,struct potentialArg * potentialArgs,
-			 double rtol,double atol){
+			 double rtol,double atol,
+			 struct odeStats * stats){
   //return dt;
   //scalars
   double err= 2.;
@@ -399,12 +407,13 @@ double rk6_estimate_step(void (*func)(double t, double *y, double *a,int nargs,
     if ( fabs(*(yo+ii)) > max_val )
       max_val= fabs(*(yo+ii));
   //set up scale
-  double c= fmax(atol, rtol * max_val);
-  double s= log(exp(atol-c)+exp(rtol*max_val-c))+c;
+  double c= fmax(atol, rtol + log(max_val));
+  double s= log(exp(atol-c)+exp(rtol + log(max_val)-c))+c;
   for (ii=0; ii < dim; ii++) *(scale+ii)= s;
   //find good dt
   //dt*= 2.;
   while ( err > 1. ){
+    if ( stats ) stats->nfev+= 21;
     //dt/= 2.;
     //copy initial codition
     for (ii=0; ii < dim; ii++) *(yn+ii)= *(yo+ii);
@@ -470,9 +479,10 @@ Usage:
        int nargs: see above
        double *args: see above
        double rtol, double atol: relative and absolute tolerance levels desired
+       volatile int *interrupted: (NULL if not used) per-call flag, checked before each output step; set it to non-zero (e.g., from another thread upon CTRL-C) to stop the integration
   Output:
        double *result: result (nt blocks of size 2dim)
-       int * err: if non-zero, something bad happened (1: maximum step reduction happened; -10: interrupted by CTRL-C (SIGINT)
+       int * err: if non-zero, something bad happened (1: maximum step reduction happened; -10: interrupted)
 */
 void bovy_dopr54(void (*func)(double t, double *q, double *a,
 			      int nargs, struct potentialArg * potentialArgs),
@@ -481,7 +491,144 @@ void bovy_dopr54(void (*func)(double t, double *q, double *a,
 		 int nt, double dt_one, double *t,
 		 int nargs, struct potentialArg * potentialArgs,
 		 double rtol, double atol,
-		 double *result, int * err){
+		 double *result, int * err,
+		 struct odeStats * stats,
+		 volatile int * interrupted){
+  bovy_dopr54_dense(func,dim,yo,nt,dt_one,t,nargs,potentialArgs,rtol,atol,
+		    result,err,NULL,NULL,NULL,stats,interrupted);
+}
+/*
+Event detection for the Dormand-Prince integrator, using the dense output
+Event functions are zero at the event, y is the rectangular phase-space 
+point [x,y,(z,)vx,vy,(vz)]:
+     0: r.v (zero at peri- and apocenters; increases through pericenter)
+     1: z (zero at disk crossings)
+     2: vz (zero at the extrema of z)
+     3: r-value (zero when crossing the radius value)
+*/
+static inline double dopr54_event_func(int type, double value,
+				       int dim, double *y){
+  int ii;
+  double out= 0.;
+  switch ( type ) {
+  case 0:
+    for (ii=0; ii < dim/2; ii++) out+= *(y+ii) * *(y+ii+dim/2);
+    return out;
+  case 1:
+    return *(y+dim/2-1);
+  case 2:
+    return *(y+dim-1);
+  case 3:
+    for (ii=0; ii < dim/2; ii++) out+= *(y+ii) * *(y+ii);
+    return sqrt(out)-value;
+  }
+  return 0.;
+}
+static inline void dopr54_dense_eval(int dim, double *dense, double theta,
+				     double *y){
+  int ii;
+  double theta1= 1.-theta;
+  dense+= 2;
+  for (ii=0; ii < dim; ii++)
+    *(y+ii)= *(dense+ii)+theta*(*(dense+dim+ii)
+				+theta1*(*(dense+2*dim+ii)
+					 +theta*(*(dense+3*dim+ii)
+						 +theta1* *(dense+4*dim+ii))));
+}
+//Find the zero of an event function in [0,1] using the Illinois algorithm
+static double dopr54_event_root(int type, double value, int dim, 
+				double *dense, double g0, double g1,
+				double *y){
+  double tha= 0., thb= 1., thc= 1., gc;
+  int ii, side= 0;
+  for (ii=0; ii < 100; ii++){
+    thc= (tha*g1-thb*g0)/(g1-g0);
+    if ( thb-tha < _EVENT_THETATOL ) break;
+    dopr54_dense_eval(dim,dense,thc,y);
+    gc= dopr54_event_func(type,value,dim,y);
+    if ( gc == 0. ) break;
+    if ( gc * g1 > 0. ) {
+      thb= thc;
+      g1= gc;
+      if ( side == -1 ) g0/= 2.;
+      side= -1;
+    }
+    else {
+      tha= thc;
+      g0= gc;
+      if ( side == 1 ) g1/= 2.;
+      side= 1;
+    }
+  }
+  return thc;
+}
+//Find and store the events during a step, returns the theta at which a terminal event occurs (>1 if none)
+static double dopr54_find_events(int dim, double *yo, double *yn1,
+				 struct odeEvents * events){
+  int ii, next;
+  double g0, g1;
+  double * dense= events->work;
+  double * theta= events->work+2+5*dim;
+  double * y= theta+events->nevent;
+  double thstop= 2.;
+  for (ii=0; ii < events->nevent; ii++){
+    *(theta+ii)= 2.;
+    g0= dopr54_event_func(*(events->type+ii),*(events->value+ii),dim,yo);
+    g1= dopr54_event_func(*(events->type+ii),*(events->value+ii),dim,yn1);
+    if ( ( *(events->direction+ii) >= 0 && g0 < 0. && g1 >= 0. )
+	 || ( *(events->direction+ii) <= 0 && g0 > 0. && g1 <= 0. ) ) {
+      *(theta+ii)= dopr54_event_root(*(events->type+ii),*(events->value+ii),
+				     dim,dense,g0,g1,y);
+      if ( *(events->terminal+ii) && *(theta+ii) < thstop )
+	thstop= *(theta+ii);
+    }
+  }
+  //Store the events in the order in which they occur, up to a terminal event
+  while ( 1 ) {
+    next= -1;
+    for (ii=0; ii < events->nevent; ii++)
+      if ( *(theta+ii) <= 1. && *(theta+ii) <= thstop 
+	   && ( next < 0 || *(theta+ii) < *(theta+next) ) ) next= ii;
+    if ( next < 0 ) break;
+    if ( *events->nfound >= events->maxfound ) {
+      events->maxfound= 2 * events->maxfound > 16 ? 2 * events->maxfound : 16;
+      events->t= (double *) realloc(events->t,
+				    events->maxfound * sizeof(double));
+      events->indx= (int *) realloc(events->indx,
+				    events->maxfound * sizeof(int));
+      events->y= (double *) realloc(events->y,
+				    events->maxfound * dim * sizeof(double));
+    }
+    *(events->t+*events->nfound)= *dense + *(theta+next) * *(dense+1);
+    *(events->indx+*events->nfound)= next;
+    dopr54_dense_eval(dim,dense,*(theta+next),
+		      events->y+*events->nfound*dim);
+    *events->nfound+= 1;
+    *(theta+next)= 2.;
+  }
+  if ( thstop <= 1. ) events->stopped= 1;
+  return thstop;
+}
+/*
+Runge-Kutta Dormand-Prince 5/4 integrator that also stores the dense output
+Usage: same as bovy_dopr54, with additional arguments
+  Output:
+       double **dense: (NULL if not used) set to a newly allocated array with the dense output (nsteps blocks of size 2+5dim: [t_start,h,rcont1,rcont2,rcont3,rcont4,rcont5] for each accepted step), which grows as needed and has to be freed by the caller; the solution within the step is y(t_start+theta h) = rcont1+theta*(rcont2+(1-theta)*(rcont3+theta*(rcont4+(1-theta)*rcont5))) (Hairer, Norsett, & Wanner 1993, II.6)
+       int *nsteps: number of accepted steps
+       struct odeEvents * events: (NULL if not used) events to detect, the time of each event is found by root-finding on the dense output; if a terminal event occurs, the integration stops and the remaining outputs are set to NaN; the arrays with the events found grow as needed and have to be freed by the caller
+*/
+void bovy_dopr54_dense(void (*func)(double t, double *q, double *a,
+				    int nargs, struct potentialArg * potentialArgs),
+		       int dim,
+		       double * yo,
+		       int nt, double dt_one, double *t,
+		       int nargs, struct potentialArg * potentialArgs,
+		       double rtol, double atol,
+		       double *result, int * err,
+		       double **dense, int * nsteps,
+		       struct odeEvents * events,
+		       struct odeStats * stats,
+		       volatile int * interrupted){
   //Declare and initialize
   double *a= (double *) malloc ( dim * sizeof(double) );
   double *a1= (double *) malloc ( dim * sizeof(double) );
@@ -495,41 +642,62 @@ void bovy_dopr54(void (*func)(double t, double *q, double *a,
   double *yn1= (double *) malloc ( dim * sizeof(double) );
   double *yerr= (double *) malloc ( dim * sizeof(double) );
   double *ynk= (double *) malloc ( dim * sizeof(double) );
-  int ii;
+  int ii, jj;
   save_rk(dim,yo,result);
   result+= dim;
   *err= 0;
+  int maxsteps= 0;
+  if ( dense ) {
+    // Each step has at least one output time, start with room for that
+    *nsteps= 0;
+    maxsteps= nt;
+    *dense= (double *) malloc ( maxsteps * (2+5*dim) * sizeof(double) );
+  }
+  if ( events ) {
+    *events->nfound= 0;
+    events->stopped= 0;
+    events->work= (double *) malloc ( (2+6*dim+events->nevent) 
+				      * sizeof(double) );
+  }
   for (ii=0; ii < dim; ii++) *(yn+ii)= *(yo+ii);
   double dt= (*(t+1))-(*t);
   if ( dt_one == -9999.99 ) {
     dt_one= rk4_estimate_step(*func,dim,yo,dt,t,nargs,potentialArgs,
-			      rtol,atol);
+			      rtol,atol,stats);
   }
   //Integrate the system
   double to= *t;
   //set up a1
   func(to,yn,a1,nargs,potentialArgs);
-  // Handle KeyboardInterrupt gracefully
-  struct sigaction action;
-  memset(&action, 0, sizeof(struct sigaction));
-  action.sa_handler= handle_sigint;
-  sigaction(SIGINT,&action,NULL);
+  if ( stats ) {
+    stats->nfev+= 1;
+    stats->dt= dt_one;
+  }
   for (ii=0; ii < (nt-1); ii++){
-    if ( interrupted ) {
+    if ( interrupted && *interrupted ) {
       *err= -10;
-      interrupted= 0; // need to reset, bc library and vars stay in memory
       break;
     }
     bovy_dopr54_onestep(func,dim,yn,dt,&to,&dt_one,
 			nargs,potentialArgs,rtol,atol,
-			a1,a,k1,k2,k3,k4,k5,k6,yn1,yerr,ynk,err);
+			a1,a,k1,k2,k3,k4,k5,k6,yn1,yerr,ynk,err,
+			&maxsteps,dense,nsteps,events,stats);
+    if ( events && events->stopped ) {
+      for (; ii < (nt-1); ii++) {
+	for (jj=0; jj < dim; jj++) *(result+jj)= NAN;
+	result+= dim;
+      }
+      break;
+    }
     //save
     save_rk(dim,yn,result);
     result+= dim;
   }
-  // Back to default handler
-  action.sa_handler= SIG_DFL;
-  sigaction(SIGINT,&action,NULL);
+  if ( stats ) {
+    stats->ntdone= ii+1;
+    stats->dtnext= dt_one;
+  }
+  if ( events ) free(events->work);
   // Free allocated memory
   free(a);
   free(a1);
@@ -544,6 +712,10 @@ void bovy_dopr54(void (*func)(double t, double *q, double *a,
   free(yerr);
   free(ynk);
 }
+//Free an array allocated in C (e.g., the dense output), for use from Python
+void galpy_free(void * ptr){
+  free(ptr);
+}
 //one output step, consists of multiple steps potentially
 void bovy_dopr54_onestep(void (*func)(double t, double *y, double *a,int nargs, struct potentialArg *),
 			 int dim, double *yo,
@@ -554,7 +726,10 @@ void bovy_dopr54_onestep(void (*func)(double t, double *y, double *a,int nargs,
 			 double * k1, double * k2,
 			 double * k3, double * k4,
 			 double * k5, double * k6,
-			 double * yn1, double * yerr,double * ynk, int * err){
+			 double * yn1, double * yerr,double * ynk, int * err,
+			 int * maxsteps, double ** dense, int * nsteps,
+			 struct odeEvents * events,
+			 struct odeStats * stats){
   double init_dt_one= *dt_one;
   double init_to= *to;
   unsigned char accept;
@@ -575,7 +750,8 @@ void bovy_dopr54_onestep(void (*func)(double t, double *y, double *a,int nargs,
     *dt_one= bovy_dopr54_actualstep(func,dim,yo,*dt_one,to,nargs,potentialArgs,
 				    rtol,atol,
 				    a1,a,k1,k2,k3,k4,k5,k6,yn1,yerr,ynk,
-				    accept);
+				    accept,maxsteps,dense,nsteps,events,stats);
+    if ( events && events->stopped ) break;
   }
 }
 double bovy_dopr54_actualstep(void (*func)(double t, double *y, double *a,int nargs, struct potentialArg *),
@@ -588,7 +764,10 @@ double bovy_dopr54_actualstep(void (*func)(double t, double *y, double *a,int na
 			      double * k3, double * k4,
 			      double * k5, double * k6,
 			      double * yn1, double * yerr,double * ynk,
-			      unsigned char accept){
+			      unsigned char accept,
+			      int * maxsteps, double ** dense, int * nsteps,
+			      struct odeEvents * events,
+			      struct odeStats * stats){
   //constant
   static const double c2= 0.2;
   static const double c3= 0.3;
@@ -627,6 +806,7 @@ double bovy_dopr54_actualstep(void (*func)(double t, double *y, double *a,int na
   const double be6= b6-187./2100.;
   static const double be7= -1./40.;
   int ii;
+  double thstop;
   //setup yn1
   for (ii=0; ii < dim; ii++) *(yn1+ii) = *(yo+ii);
   //calculate k1
@@ -687,6 +867,7 @@ double bovy_dopr54_actualstep(void (*func)(double t, double *y, double *a,int na
   //calculate k7
   func(*to+dt,ynk,a,nargs,potentialArgs);
   for (ii=0; ii < dim; ii++) *(yerr+ii) += be7 * dt * *(a+ii);
+  if ( stats ) stats->nfev+= 6;
   //yn1 is proposed new value
   //find maximum values
   double max_val= fabs(*yo);
@@ -694,8 +875,8 @@ double bovy_dopr54_actualstep(void (*func)(double t, double *y, double *a,int na
     if ( fabs(*(yo+ii)) > max_val )
       max_val= fabs(*(yo+ii));
   //set up scale
-  double c= fmax(atol, rtol * max_val);
-  double s= log(exp(atol-c)+exp(rtol*max_val-c))+c;
+  double c= fmax(atol, rtol + log(max_val));
+  double s= log(exp(atol-c)+exp(rtol + log(max_val)-c))+c;
   //Norm
   double err= 0.;
   for (ii=0; ii < dim; ii++) 
@@ -713,6 +894,27 @@ double bovy_dopr54_actualstep(void (*func)(double t, double *y, double *a,int na
   //accept or reject
   double dt_one;
   if ( ( powertwo >= 0. ) || accept ) {//accept, if the step is the smallest possible, always accept
+    if ( stats ) stats->naccept+= 1;
+    if ( dense ) {
+      if ( *nsteps >= *maxsteps ) {
+	*maxsteps= 2 * *maxsteps > 16 ? 2 * *maxsteps : 16;
+	*dense= (double *) realloc(*dense,
+				   *maxsteps * (2+5*dim) * sizeof(double));
+      }
+      save_dopr54_dense(dim,*to,dt,yo,yn1,k1,k3,k4,k5,k6,a,
+			*dense+*nsteps*(2+5*dim));
+      *nsteps+= 1;
+    }
+    if ( events ) {
+      save_dopr54_dense(dim,*to,dt,yo,yn1,k1,k3,k4,k5,k6,a,events->work);
+      thstop= dopr54_find_events(dim,yo,yn1,events);
+      if ( events->stopped ) {
+	// Terminal event: stop at the time of the event
+	dopr54_dense_eval(dim,events->work,thstop,yo);
+	*to+= thstop * dt;
+	return dt;
+      }
+    }
     for (ii= 0; ii < dim; ii++) {
       *(a1+ii)= *(a+ii);
       *(yo+ii)= *(yn1+ii);
@@ -720,6 +922,459 @@ double bovy_dopr54_actualstep(void (*func)(double t, double *y, double *a,int na
     *to+= dt;
     //printf("%f,%f\n",*to,dt);
   }
+  else if ( stats ) stats->nreject+= 1;
   dt_one= dt*pow(2.,powertwo);
   return dt_one;
 }
+/*
+Dormand-Prince 8(5,3) integrator (DOP853; Hairer, Norsett, & Wanner 1993)
+Usage:
+   Provide the acceleration function func with calling sequence
+       func (t,q,a,nargs,args)
+   where
+       double t: time
+       double * q: current value (dimension: dim)
+       double * a: will be set to the derivative by func
+       int nargs: number of arguments the function takes
+       double *args: arguments
+  Other arguments are:
+       int dim: dimension
+       double *yo: initial value, dimension: dim
+       int nt: number of times at which the output is wanted
+       double dt_one: (optional) stepsize to use, must be an integer divisor of time difference between output steps (NOT CHECKED EXPLICITLY)
+       double *t: times at which the output is wanted (EQUALLY SPACED)
+       int nargs: see above
+       double *args: see above
+       double rtol, double atol: relative and absolute tolerance levels desired
+       volatile int *interrupted: (NULL if not used) per-call flag, checked before each output step; set it to non-zero (e.g., from another thread upon CTRL-C) to stop the integration
+  Output:
+       double *result: result (nt blocks of size 2dim)
+       int * err: if non-zero, something bad happened (1: maximum step reduction happened; -10: interrupted)
+*/
+void bovy_dop853(void (*func)(double t, double *q, double *a,
+			      int nargs, struct potentialArg * potentialArgs),
+		 int dim,
+		 double * yo,
+		 int nt, double dt_one, double *t,
+		 int nargs, struct potentialArg * potentialArgs,
+		 double rtol, double atol,
+		 double *result, int * err,
+		 struct odeStats * stats,
+		 volatile int * interrupted){
+  //Declare and initialize
+  double *a1= (double *) malloc ( dim * sizeof(double) );
+  double *k= (double *) malloc ( 12 * dim * sizeof(double) );
+  double *yn= (double *) malloc ( dim * sizeof(double) );
+  double *yn1= (double *) malloc ( dim * sizeof(double) );
+  double *ynk= (double *) malloc ( dim * sizeof(double) );
+  int ii;
+  save_rk(dim,yo,result);
+  result+= dim;
+  *err= 0;
+  for (ii=0; ii < dim; ii++) *(yn+ii)= *(yo+ii);
+  double dt= (*(t+1))-(*t);
+  if ( dt_one == -9999.99 ) {
+    dt_one= rk6_estimate_step(*func,dim,yo,dt,t,nargs,potentialArgs,
+			      rtol,atol,stats);
+  }
+  //Integrate the system
+  double to= *t;
+  //set up a1
+  func(to,yn,a1,nargs,potentialArgs);
+  if ( stats ) {
+    stats->nfev+= 1;
+    stats->dt= dt_one;
+  }
+  for (ii=0; ii < (nt-1); ii++){
+    if ( interrupted && *interrupted ) {
+      *err= -10;
+      break;
+    }
+    bovy_dop853_onestep(func,dim,yn,dt,&to,&dt_one,
+			nargs,potentialArgs,rtol,atol,
+			a1,k,yn1,ynk,err,stats);
+    //save
+    save_rk(dim,yn,result);
+    result+= dim;
+  }
+  if ( stats ) {
+    stats->ntdone= ii+1;
+    stats->dtnext= dt_one;
+  }
+  // Free allocated memory
+  free(a1);
+  free(k);
+  free(yn);
+  free(yn1);
+  free(ynk);
+}
+//one output step, consists of multiple steps potentially
+void bovy_dop853_onestep(void (*func)(double t, double *y, double *a,int nargs, struct potentialArg *),
+			 int dim, double *yo,
+			 double dt, double *to,double * dt_one,
+			 int nargs,struct potentialArg * potentialArgs,
+			 double rtol,double atol,
+			 double * a1, double * k,
+			 double * yn1, double * ynk, int * err,
+			 struct odeStats * stats){
+  double init_dt_one= *dt_one;
+  double init_to= *to;
+  unsigned char accept;
+  while ( ( dt >= 0. && *to < (init_to+dt)) 
+	  || ( dt < 0. && *to > (init_to+dt)) ) {
+    accept= 0;
+    if ( init_dt_one/ *dt_one > _MAX_STEPREDUCE 
+	 || *dt_one != *dt_one) { // check for NaN
+      *dt_one= init_dt_one/_MAX_STEPREDUCE;
+      accept= 1;
+      if ( *err % 2 ==  0) *err+= 1;
+    }
+    if ( dt >= 0. && *dt_one > (init_to+dt - *to) )
+      *dt_one= (init_to + dt - *to);
+    if ( dt < 0. && *dt_one < (init_to+dt - *to) )
+      *dt_one = (init_to + dt - *to); 
+    *dt_one= bovy_dop853_actualstep(func,dim,yo,*dt_one,to,nargs,potentialArgs,
+				    rtol,atol,a1,k,yn1,ynk,accept,stats);
+  }
+}
+double bovy_dop853_actualstep(void (*func)(double t, double *y, double *a,int nargs, struct potentialArg *),
+			      int dim, double *yo,
+			      double dt, double *to,
+			      int nargs,struct potentialArg * potentialArgs,
+			      double rtol,double atol,
+			      double * a1, double * k,
+			      double * yn1, double * ynk,
+			      unsigned char accept,
+			      struct odeStats * stats){
+  //constants; k[12] at t+dt is the first stage of the next step
+  static const double c[12]= {0.0, 0.05260015195876773, 0.0789002279381516, 0.1183503419072274, 0.2816496580927726, 0.3333333333333333, 0.25, 0.3076923076923077, 0.6512820512820513, 0.6, 0.8571428571428571, 1.0};
+  static const double aa[12][12]= {
+    {0.0,0.0,0.0,0.0,0.0,0.0,0.0,0.0,0.0,0.0,0.0,0.0},
+    {0.05260015195876773,0.0,0.0,0.0,0.0,0.0,0.0,0.0,0.0,0.0,0.0,0.0},
+    {0.0197250569845379,0.0591751709536137,0.0,0.0,0.0,0.0,0.0,0.0,0.0,0.0,0.0,0.0},
+    {0.02958758547680685,0.0,0.08876275643042054,0.0,0.0,0.0,0.0,0.0,0.0,0.0,0.0,0.0},
+    {0.2413651341592667,0.0,-0.8845494793282861,0.924834003261792,0.0,0.0,0.0,0.0,0.0,0.0,0.0,0.0},
+    {0.037037037037037035,0.0,0.0,0.17082860872947386,0.12546768756682242,0.0,0.0,0.0,0.0,0.0,0.0,0.0},
+    {0.037109375,0.0,0.0,0.17025221101954405,0.06021653898045596,-0.017578125,0.0,0.0,0.0,0.0,0.0,0.0},
+    {0.03709200011850479,0.0,0.0,0.17038392571223998,0.10726203044637328,-0.015319437748624402,0.008273789163814023,0.0,0.0,0.0,0.0,0.0},
+    {0.6241109587160757,0.0,0.0,-3.3608926294469414,-0.868219346841726,27.59209969944671,20.154067550477894,-43.48988418106996,0.0,0.0,0.0,0.0},
+    {0.47766253643826434,0.0,0.0,-2.4881146199716677,-0.590290826836843,21.230051448181193,15.279233632882423,-33.28821096898486,-0.020331201708508627,0.0,0.0,0.0},
+    {-0.9371424300859873,0.0,0.0,5.186372428844064,1.0914373489967295,-8.149787010746927,-18.52006565999696,22.739487099350505,2.4936055526796523,-3.0467644718982196,0.0,0.0},
+    {2.273310147516538,0.0,0.0,-10.53449546673725,-2.0008720582248625,-17.9589318631188,27.94888452941996,-2.8589982771350235,-8.87285693353063,12.360567175794303,0.6433927460157636,0.0}
+  };
+  static const double b[12]= {0.054293734116568765,0.0,0.0,0.0,0.0,4.450312892752409,1.8915178993145003,-5.801203960010585,0.3111643669578199,-0.1521609496625161,0.20136540080403034,0.04471061572777259};
+  static const double e3[12]= {-0.18980075407240762,0.0,0.0,0.0,0.0,4.450312892752409,1.8915178993145003,-5.801203960010585,-0.4226823213237919,-0.1521609496625161,0.20136540080403034,0.02265179219836082};
+  static const double e5[12]= {0.01312004499419488,0.0,0.0,0.0,0.0,-1.2251564463762044,-0.4957589496572502,1.6643771824549864,-0.35032884874997366,0.3341791187130175,0.08192320648511571,-0.022355307863886294};
+  int ii, jj, ll;
+  double err3, err5, tmp3, tmp5;
+  //calculate k1
+  for (ii=0; ii < dim; ii++) *(k+ii)= dt * *(a1+ii);
+  //calculate k2 through k12
+  for (jj=1; jj < 12; jj++) {
+    for (ii=0; ii < dim; ii++) {
+      *(ynk+ii)= *(yo+ii);
+      for (ll=0; ll < jj; ll++)
+	if ( aa[jj][ll] != 0. )
+	  *(ynk+ii)+= aa[jj][ll] * *(k+ll*dim+ii);
+    }
+    func(*to+c[jj]*dt,ynk,k+jj*dim,nargs,potentialArgs);
+    for (ii=0; ii < dim; ii++) *(k+jj*dim+ii)*= dt;
+  }
+  if ( stats ) stats->nfev+= 11;
+  //yn1 is proposed new value, with 5th and 3rd order error estimates
+  err3= 0.;
+  err5= 0.;
+  for (ii=0; ii < dim; ii++) {
+    *(yn1+ii)= *(yo+ii);
+    tmp3= 0.;
+    tmp5= 0.;
+    for (jj=0; jj < 12; jj++) {
+      *(yn1+ii)+= b[jj] * *(k+jj*dim+ii);
+      tmp3+= e3[jj] * *(k+jj*dim+ii);
+      tmp5+= e5[jj] * *(k+jj*dim+ii);
+    }
+    err3+= tmp3*tmp3;
+    err5+= tmp5*tmp5;
+  }
+  //find maximum values
+  double max_val= fabs(*yo);
+  for (ii=1; ii < dim; ii++)
+    if ( fabs(*(yo+ii)) > max_val )
+      max_val= fabs(*(yo+ii));
+  //set up scale
+  double c0= fmax(atol, rtol + log(max_val));
+  double s= log(exp(atol-c0)+exp(rtol + log(max_val)-c0))+c0;
+  //Norm
+  err3*= exp(-2.*s);
+  err5*= exp(-2.*s);
+  double err= err5 / sqrt( (err5 + 0.01 * err3) * dim );
+  double corr= 0.85*pow(err,-1./8.);
+  //Round to the nearest power of two
+  double powertwo= round(log(corr)/log(2.));
+  if ( powertwo > _MAX_STEPCHANGE_POWERTWO )
+    powertwo= _MAX_STEPCHANGE_POWERTWO;
+  else if ( powertwo < _MIN_STEPCHANGE_POWERTWO )
+    powertwo= _MIN_STEPCHANGE_POWERTWO;
+  //accept or reject
+  if ( ( powertwo >= 0. ) || accept ) {//accept, if the step is the smallest possible, always accept
+    for (ii= 0; ii < dim; ii++) *(yo+ii)= *(yn1+ii);
+    *to+= dt;
+    func(*to,yo,a1,nargs,potentialArgs);
+    if ( stats ) {
+      stats->nfev+= 1;
+      stats->naccept+= 1;
+    }
+  }
+  else if ( stats ) stats->nreject+= 1;
+  return dt*pow(2.,powertwo);
+}
+/*
+Bulirsch-Stoer integrator: Gragg's modified midpoint method with polynomial
+Richardson extrapolation in dt^2, using the step sequence n= 2,4,6,...; both
+the step size and the number of columns of the extrapolation tableau (the 
+order) are adapted to minimize the work per unit step, following the order
+and step-size control of Deuflhard (1983) as implemented in ODEX (Hairer, 
+Norsett, & Wanner 1993, II.9)
+Usage:
+   Same as bovy_dopr54 above
+*/
+// Number of columns of the extrapolation tableau (n= 2,...,2 _BS_KMAX)
+#define _BS_KMAX 9
+// Safety factors of the step size and of the order selection (Hairer et 
+// al. 1993)
+#define _BS_SAFE1 0.65
+#define _BS_SAFE2 0.94
+#define _BS_FAC1 0.02
+#define _BS_FAC2 4.
+#define _BS_FAC3 0.8
+#define _BS_FAC4 0.9
+void bovy_bs(void (*func)(double t, double *q, double *a,
+			  int nargs, struct potentialArg * potentialArgs),
+	     int dim,
+	     double * yo,
+	     int nt, double dt_one, double *t,
+	     int nargs, struct potentialArg * potentialArgs,
+	     double rtol, double atol,
+	     double *result, int * err,
+	     struct odeStats * stats,
+	     volatile int * interrupted){
+  //Declare and initialize
+  double *a= (double *) malloc ( dim * sizeof(double) );
+  double *a1= (double *) malloc ( dim * sizeof(double) );
+  double *tab= (double *) malloc ( _BS_KMAX * dim * sizeof(double) );
+  double *yn= (double *) malloc ( dim * sizeof(double) );
+  double *ym= (double *) malloc ( dim * sizeof(double) );
+  double *yp= (double *) malloc ( dim * sizeof(double) );
+  int ii;
+  save_rk(dim,yo,result);
+  result+= dim;
+  *err= 0;
+  for (ii=0; ii < dim; ii++) *(yn+ii)= *(yo+ii);
+  double dt= (*(t+1))-(*t);
+  if ( dt_one == -9999.99 ) {
+    dt_one= rk6_estimate_step(*func,dim,yo,dt,t,nargs,potentialArgs,
+			      rtol,atol,stats);
+  }
+  //Initial column in which to aim for convergence, from the tolerance (rtol
+  //is the log of the relative tolerance)
+  int kopt= (int) (-0.6 * rtol / log(10.) + 0.5);
+  if ( kopt < 1 ) kopt= 1;
+  else if ( kopt > _BS_KMAX-2 ) kopt= _BS_KMAX-2;
+  unsigned char reject= 0;
+  //Integrate the system
+  double to= *t;
+  //set up a1
+  func(to,yn,a1,nargs,potentialArgs);
+  if ( stats ) {
+    stats->nfev+= 1;
+    stats->dt= dt_one;
+  }
+  for (ii=0; ii < (nt-1); ii++){
+    if ( interrupted && *interrupted ) {
+      *err= -10;
+      break;
+    }
+    bovy_bs_onestep(func,dim,yn,dt,&to,&dt_one,
+		    nargs,potentialArgs,rtol,atol,
+		    a1,a,tab,ym,yp,&kopt,&reject,err,stats);
+    //save
+    save_rk(dim,yn,result);
+    result+= dim;
+  }
+  if ( stats ) {
+    stats->ntdone= ii+1;
+    stats->dtnext= dt_one;
+  }
+  // Free allocated memory
+  free(a);
+  free(a1);
+  free(tab);
+  free(yn);
+  free(ym);
+  free(yp);
+}
+//one output step, consists of multiple steps potentially
+void bovy_bs_onestep(void (*func)(double t, double *y, double *a,int nargs, struct potentialArg *),
+		     int dim, double *yo,
+		     double dt, double *to,double * dt_one,
+		     int nargs,struct potentialArg * potentialArgs,
+		     double rtol,double atol,
+		     double * a1, double * a, double * tab,
+		     double * ym, double * yp, int * kopt,
+		     unsigned char * reject, int * err,
+		     struct odeStats * stats){
+  double init_dt_one= *dt_one;
+  double init_to= *to;
+  unsigned char accept;
+  while ( ( dt >= 0. && *to < (init_to+dt)) 
+	  || ( dt < 0. && *to > (init_to+dt)) ) {
+    accept= 0;
+    if ( init_dt_one/ *dt_one > _MAX_STEPREDUCE 
+	 || *dt_one != *dt_one) { // check for NaN
+      *dt_one= init_dt_one/_MAX_STEPREDUCE;
+      accept= 1;
+      if ( *err % 2 ==  0) *err+= 1;
+    }
+    if ( dt >= 0. && *dt_one > (init_to+dt - *to) )
+      *dt_one= (init_to + dt - *to);
+    if ( dt < 0. && *dt_one < (init_to+dt - *to) )
+      *dt_one = (init_to + dt - *to); 
+    *dt_one= bovy_bs_actualstep(func,dim,yo,*dt_one,to,nargs,potentialArgs,
+				rtol,atol,a1,a,tab,ym,yp,kopt,reject,accept,
+				stats);
+  }
+}
+//modified midpoint step over dt using n substeps, result in yn1
+static void bs_midpoint(void (*func)(double t, double *y, double *a,int nargs, struct potentialArg *),
+			int dim, double *yo, double dt, double to, int n,
+			int nargs,struct potentialArg * potentialArgs,
+			double * a1, double * a,
+			double * ym, double * yp, double * yn1){
+  int ii, jj;
+  double h= dt/n, tmp;
+  for (ii=0; ii < dim; ii++) {
+    *(ym+ii)= *(yo+ii);
+    *(yp+ii)= *(yo+ii) + h * *(a1+ii);
+  }
+  for (jj=1; jj < n; jj++) {
+    func(to+jj*h,yp,a,nargs,potentialArgs);
+    for (ii=0; ii < dim; ii++) {
+      tmp= *(ym+ii) + 2. * h * *(a+ii);
+      *(ym+ii)= *(yp+ii);
+      *(yp+ii)= tmp;
+    }
+  }
+  func(to+dt,yp,a,nargs,potentialArgs);
+  for (ii=0; ii < dim; ii++)
+    *(yn1+ii)= 0.5 * ( *(ym+ii) + *(yp+ii) + h * *(a+ii) );
+}
+//number of force evaluations to compute column kk of the tableau
+static inline double bs_work(int kk){
+  return (double) ( (kk+1)*(kk+2) + 1 );
+}
+double bovy_bs_actualstep(void (*func)(double t, double *y, double *a,int nargs, struct potentialArg *),
+			  int dim, double *yo,
+			  double dt, double *to,
+			  int nargs,struct potentialArg * potentialArgs,
+			  double rtol,double atol,
+			  double * a1, double * a, double * tab,
+			  double * ym, double * yp,
+			  int * kopt, unsigned char * reject,
+			  unsigned char accept,
+			  struct odeStats * stats){
+  int ii, jj, kk, knew;
+  double fac, facmin, cur, diff= 0., err= 0., dtnew;
+  double dtopt[_BS_KMAX], work[_BS_KMAX];
+  unsigned char converged= 0;
+  //find maximum values
+  double max_val= fabs(*yo);
+  for (ii=1; ii < dim; ii++)
+    if ( fabs(*(yo+ii)) > max_val )
+      max_val= fabs(*(yo+ii));
+  //set up scale
+  double c= fmax(atol, rtol + log(max_val));
+  double s= log(exp(atol-c)+exp(rtol + log(max_val)-c))+c;
+  // tab holds the previous row of the extrapolation tableau, T_{kk-1,jj};
+  // convergence is only checked in the order window kopt-1, kopt, kopt+1
+  for (kk=0; kk <= *kopt+1; kk++) {
+    // midpoint estimate with n= 2(kk+1), T_{kk,0}, in yp
+    bs_midpoint(func,dim,yo,dt,*to,2*(kk+1),nargs,potentialArgs,
+		a1,a,ym,yp,yp);
+    if ( stats ) stats->nfev+= 2*(kk+1);
+    //Aitken-Neville extrapolation in dt^2
+    err= 0.;
+    for (ii=0; ii < dim; ii++) {
+      cur= *(yp+ii);
+      for (jj=1; jj <= kk; jj++) {
+	fac= (double) (kk+1) / (double) (kk+1-jj);
+	diff= ( cur - *(tab+(jj-1)*dim+ii) ) / ( fac * fac - 1. );
+	*(tab+(jj-1)*dim+ii)= cur;
+	cur+= diff;
+      }
+      *(tab+kk*dim+ii)= cur;
+      err+= diff * diff;
+    }
+    if ( kk == 0 ) continue;
+    err= sqrt(err / dim * exp(-2.*s));
+    //optimal step size for this column and the work per unit step, with
+    //the factor by which the step decreases limited to [facmin,4/facmin]
+    facmin= pow(_BS_FAC1,1./(2.*kk+1.));
+    fac= pow(err / _BS_SAFE1,1./(2.*kk+1.)) / _BS_SAFE2;
+    if ( fac < facmin ) fac= facmin;
+    else if ( fac > _BS_FAC2 / facmin ) fac= _BS_FAC2 / facmin;
+    dtopt[kk]= dt / fac;
+    work[kk]= bs_work(kk) * fac;
+    if ( kk < *kopt-1 ) continue;
+    if ( err <= 1. ) {
+      converged= 1;
+      break;
+    }
+    //reject early if convergence is not expected within the order window
+    if ( kk == *kopt-1 
+	 && err > pow((double) ( (*kopt+2) * (*kopt+1) ),2.) ) break;
+    if ( kk == *kopt && err > pow((double) (*kopt+2),2.) ) break;
+  }
+  if ( kk > *kopt+1 ) kk= *kopt+1;
+  if ( converged || accept ) {//accept, if the step is the smallest possible, always accept
+    for (ii= 0; ii < dim; ii++) *(yo+ii)= *(tab+kk*dim+ii);
+    *to+= dt;
+    func(*to,yo,a1,nargs,potentialArgs);
+    if ( stats ) {
+      stats->nfev+= 1;
+      stats->naccept+= 1;
+    }
+    //new order: the one with the least work per unit step
+    if ( kk == 1 ) knew= 2; // no work estimate for the first column
+    else if ( kk <= *kopt ) {
+      knew= kk;
+      if ( work[kk-1] < _BS_FAC3 * work[kk] ) knew= kk-1;
+      if ( work[kk] < _BS_FAC4 * work[kk-1] ) knew= kk+1;
+    }
+    else {
+      knew= kk-1;
+      if ( kk > 2 && work[kk-2] < _BS_FAC3 * work[kk-1] ) knew= kk-2;
+      if ( work[kk] < _BS_FAC4 * work[knew] ) knew= kk;
+    }
+    if ( knew > _BS_KMAX-2 ) knew= _BS_KMAX-2;
+    //new step size
+    if ( knew <= kk ) dtnew= dtopt[knew];
+    else if ( kk < *kopt && work[kk] < _BS_FAC4 * work[kk-1] )
+      dtnew= dtopt[kk] * bs_work(knew+1) / bs_work(kk);
+    else dtnew= dtopt[kk] * bs_work(knew) / bs_work(kk);
+    //neither the order nor the step size increase after a rejected step
+    if ( *reject ) {
+      if ( knew > kk ) knew= kk;
+      if ( fabs(dtnew) > fabs(dt) ) dtnew= dt;
+    }
+    *reject= 0;
+  }
+  else {
+    if ( stats ) stats->nreject+= 1;
+    knew= kk < *kopt ? kk : *kopt;
+    if ( knew > 1 && work[knew-1] < _BS_FAC3 * work[knew] ) knew-= 1;
+    dtnew= dtopt[knew];
+    *reject= 1;
+  }
+  *kopt= knew;
+  return dtnew;
+}
@@ -38,6 +38,23 @@ extern "C" {
   include
 */
 #include <bovy_symplecticode.h>
+/*
+  Structure to declare events to detect during the integration
+*/
+struct odeEvents{
+  int nevent; // number of events
+  int * type; // type of each event (see bovy_rk.c)
+  int * direction; // 0: any zero crossing, 1: increasing, -1: decreasing
+  int * terminal; // if non-zero, stop the integration at this event
+  double * value; // parameter of each event (e.g., radius)
+  int maxfound; // number of events that fit in t, indx, and y, which grow as needed
+  int * nfound; // number of events found
+  double * t; // times of the events found (maxfound)
+  int * indx; // index of the event found (maxfound)
+  double * y; // state at the events found (maxfound blocks of size dim)
+  unsigned char stopped; // set to 1 when a terminal event stopped the integration
+  double * work; // work space, 2+5*dim+nevent
+};
 /*
   Function declarations
 */
@@ -48,7 +65,7 @@ void bovy_rk4(void (*func)(double, double *, double *,
 	      int, double, double *,
 	      int, struct potentialArg *,
 	      double, double,
-	      double *,int *);
+	      double *,int *,struct odeStats *,volatile int *);
 void bovy_rk4_onestep(void (*func)(double, double *, double *,
 				   int, struct potentialArg *),
 		      int,
@@ -63,7 +80,7 @@ void bovy_rk6(void (*func)(double, double *, double *,
 	      int, double, double *,
 	      int, struct potentialArg *,
 	      double, double,
-	      double *,int *);
+	      double *,int *,struct odeStats *,volatile int *);
 void bovy_rk6_onestep(void (*func)(double, double *, double *,
 				   int, struct potentialArg *),
 		      int,
@@ -81,12 +98,12 @@ double rk4_estimate_step(void (*func)(double , double *, double *,int, struct po
 			 int, double *,
 			 double, double *,
 			 int,struct potentialArg *,
-			 double,double);
+			 double,double,struct odeStats *);
 double rk6_estimate_step(void (*func)(double , double *, double *,int, struct potentialArg *),
 			 int, double *,
 			 double, double *,
 			 int,struct potentialArg *,
-			 double,double);
+			 double,double,struct odeStats *);
 void bovy_dopr54(void (*func)(double, double *, double *,
 			      int, struct potentialArg *),
 		 int,
@@ -94,7 +111,19 @@ void bovy_dopr54(void (*func)(double, double *, double *,
 		 int, double, double *,
 		 int, struct potentialArg *,
 		 double, double,
-		 double *,int *);
+		 double *,int *,struct odeStats *,volatile int *);
+void bovy_dopr54_dense(void (*func)(double, double *, double *,
+				    int, struct potentialArg *),
+		       int,
+		       double *,
+		       int, double, double *,
+		       int, struct potentialArg *,
+		       double, double,
+		       double *,int *,
+		       double **,int *,
+		       struct odeEvents *,struct odeStats *,
+		       volatile int *);
+void galpy_free(void *);
 void bovy_dopr54_onestep(void (*func)(double, double *, double *,int, struct potentialArg *),
 			 int, double *,
 			 double, double *,double *,
@@ -105,7 +134,9 @@ void bovy_dopr54_onestep(void (*func)(double, double *, double *,int, struct pot
 			 double *, double *,
 			 double *, double *,
 			 double *, double *,
-			 double *,int *);
+			 double *,int *,
+			 int *,double **,int *,
+			 struct odeEvents *,struct odeStats *);
 double bovy_dopr54_actualstep(void (*func)(double, double *, double *,int, struct potentialArg *),
 			      int, double *,
 			      double, double *,
@@ -116,7 +147,85 @@ double bovy_dopr54_actualstep(void (*func)(double, double *, double *,int, struc
 			      double *, double *,
 			      double *, double *,
 			      double *, double *,
-			      double *,unsigned char);
+			      double *,unsigned char,
+			      int *,double **,int *,
+			      struct odeEvents *,struct odeStats *);
+void bovy_dop853(void (*func)(double, double *, double *,
+			      int, struct potentialArg *),
+		 int,
+		 double *,
+		 int, double, double *,
+		 int, struct potentialArg *,
+		 double, double,
+		 double *,int *,struct odeStats *,volatile int *);
+void bovy_dop853_onestep(void (*func)(double, double *, double *,int, struct potentialArg *),
+			 int, double *,
+			 double, double *,double *,
+			 int,struct potentialArg *,
+			 double,double,
+			 double *, double *,
+			 double *, double *,int *,
+			 struct odeStats *);
+double bovy_dop853_actualstep(void (*func)(double, double *, double *,int, struct potentialArg *),
+			      int, double *,
+			      double, double *,
+			      int,struct potentialArg *,
+			      double,double,
+			      double *, double *,
+			      double *, double *,
+			      unsigned char,struct odeStats *);
+void bovy_bs(void (*func)(double, double *, double *,
+			  int, struct potentialArg *),
+	     int,
+	     double *,
+	     int, double, double *,
+	     int, struct potentialArg *,
+	     double, double,
+	     double *,int *,struct odeStats *,volatile int *);
+void bovy_bs_onestep(void (*func)(double, double *, double *,int, struct potentialArg *),
+		     int, double *,
+		     double, double *,double *,
+		     int,struct potentialArg *,
+		     double,double,
+		     double *, double *, double *,
+		     double *, double *,int *,unsigned char *,int *,
+		     struct odeStats *);
+double bovy_bs_actualstep(void (*func)(double, double *, double *,int, struct potentialArg *),
+			  int, double *,
+			  double, double *,
+			  int,struct potentialArg *,
+			  double,double,
+			  double *, double *, double *,
+			  double *, double *,int *,unsigned char *,
+			  unsigned char,struct odeStats *);
+static inline void save_dopr54_dense(int dim, double to, double dt,
+				     double *yo, double *yn1,
+				     double *k1, double *k3, double *k4,
+				     double *k5, double *k6, double *a7,
+				     double *dense){
+  // Dense output coefficients for Dormand-Prince 5(4), following
+  // Hairer, Norsett, & Wanner (1993); k_i include the step dt, a7 does not
+  static const double d1= -12715105075./11282082432.;
+  static const double d3= 87487479700./32700410799.;
+  static const double d4= -10690763975./1880347072.;
+  static const double d5= 701980252875./199316789632.;
+  static const double d6= -1453857185./822651844.;
+  static const double d7= 69997945./29380423.;
+  int ii;
+  double ydiff, bspl;
+  *dense++= to;
+  *dense++= dt;
+  for (ii=0; ii < dim; ii++) {
+    ydiff= *(yn1+ii) - *(yo+ii);
+    bspl= *(k1+ii) - ydiff;
+    *(dense+ii)= *(yo+ii);
+    *(dense+dim+ii)= ydiff;
+    *(dense+2*dim+ii)= bspl;
+    *(dense+3*dim+ii)= ydiff - dt * *(a7+ii) - bspl;
+    *(dense+4*dim+ii)= d1 * *(k1+ii) + d3 * *(k3+ii) + d4 * *(k4+ii)
+      + d5 * *(k5+ii) + d6 * *(k6+ii) + d7 * dt * *(a7+ii);
+  }
+}
 #ifdef __cplusplus
 }
 #endif
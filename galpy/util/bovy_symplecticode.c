@@ -32,13 +32,41 @@ POSSIBILITY OF SUCH DAMAGE.
 #include <stdio.h>
 #include <stdlib.h>
 #include <math.h>
-#include "signal.h"
+#include <string.h>
+#include <signal.h>
 #include <bovy_symplecticode.h>
 #define _MAX_DT_REDUCE 10000.
-volatile sig_atomic_t interrupted= 0;
-void handle_sigint(int signum)
-{
-  interrupted= 1;
+/*
+  SIGINT handling: the handler sets the flag of the integration that runs
+  on the main thread; the previous handler is restored afterwards
+*/
+static volatile int * sigint_flag= NULL;
+#ifndef _WIN32
+static struct sigaction sigint_oldaction;
+#else
+static void (*sigint_oldhandler)(int);
+#endif
+static void handle_sigint(int signum){
+  if ( sigint_flag ) *sigint_flag= 1;
+}
+void galpy_set_sigint_flag(volatile int * flag){
+  sigint_flag= flag;
+#ifndef _WIN32
+  struct sigaction action;
+  memset(&action,0,sizeof(struct sigaction));
+  action.sa_handler= handle_sigint;
+  sigaction(SIGINT,&action,&sigint_oldaction);
+#else
+  sigint_oldhandler= signal(SIGINT,handle_sigint);
+#endif
+}
+void galpy_reset_sigint(void){
+#ifndef _WIN32
+  sigaction(SIGINT,&sigint_oldaction,NULL);
+#else
+  signal(SIGINT,sigint_oldhandler);
+#endif
+  sigint_flag= NULL;
 }
 inline void leapfrog_leapq(int dim, double *q,double *p,double dt,double *qn){
   int ii;
@@ -74,9 +102,10 @@ Usage:
        int nargs: see above
        double *args: see above
        double rtol, double atol: relative and absolute tolerance levels desired
+       volatile int *interrupted: (NULL if not used) per-call flag, checked before each output step; set it to non-zero (e.g., from another thread upon CTRL-C) to stop the integration
   Output:
        double *result: result (nt blocks of size 2dim)
-       int *err: error: -10 if interrupted by CTRL-C (SIGINT)
+       int *err: error: -10 if interrupted
 */
 void leapfrog(void (*func)(double t, double *q, double *a,
 			   int nargs, struct potentialArg * potentialArgs),
@@ -85,7 +114,9 @@ void leapfrog(void (*func)(double t, double *q, double *a,
 	      int nt, double dt, double *t,
 	      int nargs, struct potentialArg * potentialArgs,
 	      double rtol, double atol,
-	      double *result,int * err){
+	      double *result,int * err,
+	      struct odeStats * stats,
+	      volatile int * interrupted){
   //Initialize
   double *qo= (double *) malloc ( dim * sizeof(double) );
   double *po= (double *) malloc ( dim * sizeof(double) );
@@ -106,20 +137,15 @@ void leapfrog(void (*func)(double t, double *q, double *a,
   double init_dt= (*(t+1))-(*t);
   if ( dt == -9999.99 ) {
     dt= leapfrog_estimate_step(*func,dim,qo,po,init_dt,t,nargs,potentialArgs,
-			       rtol,atol);
+			       rtol,atol,stats);
   }
-  long ndt= (long) (init_dt/dt);
+  long ndt= (long) (init_dt/dt+0.5);
+  if ( stats ) stats->dt= dt;
   //Integrate the system
   double to= *t;
-  // Handle KeyboardInterrupt gracefully
-  struct sigaction action;
-  memset(&action, 0, sizeof(struct sigaction));
-  action.sa_handler= handle_sigint;
-  sigaction(SIGINT,&action,NULL);
   for (ii=0; ii < (nt-1); ii++){
-    if ( interrupted ) {
+    if ( interrupted && *interrupted ) {
       *err= -10;
-      interrupted= 0; // need to reset, bc library and vars stay in memory
       break;
     }
     //drift half
@@ -145,13 +171,18 @@ void leapfrog(void (*func)(double t, double *q, double *a,
     //drift
     leapfrog_leapq(dim,q12,po,dt/2.,qo);
     to= to+dt;
+    if ( stats ) {
+      stats->nfev+= ndt;
+      stats->naccept+= ndt;
+    }
     //save
     save_qp(dim,qo,po,result);
     result+= 2 * dim;
   }
-  // Back to default handler
-  action.sa_handler= SIG_DFL;
-  sigaction(SIGINT,&action,NULL);
+  if ( stats ) {
+    stats->ntdone= ii+1;
+    stats->dtnext= dt;
+  }
   //Free allocated memory
   free(qo);
   free(po);
@@ -180,9 +211,10 @@ Usage:
        int nargs: see above
        double *args: see above
        double rtol, double atol: relative and absolute tolerance levels desired
+       volatile int *interrupted: (NULL if not used) per-call flag, checked before each output step; set it to non-zero (e.g., from another thread upon CTRL-C) to stop the integration
   Output:
        double *result: result (nt blocks of size 2dim)
-       int *err: error: -10 if interrupted by CTRL-C (SIGINT)
+       int *err: error: -10 if interrupted
 */
 void symplec4(void (*func)(double t, double *q, double *a,
 			   int nargs, struct potentialArg * potentialArgs),
@@ -191,7 +223,9 @@ void symplec4(void (*func)(double t, double *q, double *a,
 	      int nt, double dt, double *t,
 	      int nargs, struct potentialArg * potentialArgs,
 	      double rtol, double atol,
-	      double *result,int * err){
+	      double *result,int * err,
+	      struct odeStats * stats,
+	      volatile int * interrupted){
   //coefficients
   double c1= 0.6756035959798289;
   double c4= c1;
@@ -220,20 +254,15 @@ void symplec4(void (*func)(double t, double *q, double *a,
   double init_dt= (*(t+1))-(*t);
   if ( dt == -9999.99 ) {
     dt= symplec4_estimate_step(*func,dim,qo,po,init_dt,t,nargs,potentialArgs,
-			       rtol,atol);
+			       rtol,atol,stats);
   }
-  long ndt= (long) (init_dt/dt);
+  long ndt= (long) (init_dt/dt+0.5);
+  if ( stats ) stats->dt= dt;
   //Integrate the system
   double to= *t;
-  // Handle KeyboardInterrupt gracefully
-  struct sigaction action;
-  memset(&action, 0, sizeof(struct sigaction));
-  action.sa_handler= handle_sigint;
-  sigaction(SIGINT,&action,NULL);
   for (ii=0; ii < (nt-1); ii++){
-    if ( interrupted ) {
+    if ( interrupted && *interrupted ) {
       *err= -10;
-      interrupted= 0; // need to reset, bc library and vars stay in memory
       break;
     }
     //drift for c1*dt
@@ -286,13 +315,18 @@ void symplec4(void (*func)(double t, double *q, double *a,
     to+= c4*dt;
     //p4=p3
     for (kk=0; kk < dim; kk++) *(po+kk)= *(p12+kk);
+    if ( stats ) {
+      stats->nfev+= 3*ndt;
+      stats->naccept+= ndt;
+    }
     //save
     save_qp(dim,qo,po,result);
     result+= 2 * dim;
   }
-  // Back to default handler
-  action.sa_handler= SIG_DFL;
-  sigaction(SIGINT,&action,NULL);
+  if ( stats ) {
+    stats->ntdone= ii+1;
+    stats->dtnext= dt;
+  }
   //Free allocated memory
   free(qo);
   free(po);
@@ -321,9 +355,10 @@ Usage:
        int nargs: see above
        double *args: see above
        double rtol, double atol: relative and absolute tolerance levels desired
+       volatile int *interrupted: (NULL if not used) per-call flag, checked before each output step; set it to non-zero (e.g., from another thread upon CTRL-C) to stop the integration
   Output:
        double *result: result (nt blocks of size 2dim)
-       int *err: error: -10 if interrupted by CTRL-C (SIGINT)
+       int *err: error: -10 if interrupted
 */
 void symplec6(void (*func)(double t, double *q, double *a,
 			   int nargs, struct potentialArg * potentialArgs),
@@ -332,7 +367,9 @@ void symplec6(void (*func)(double t, double *q, double *a,
 	      int nt, double dt, double *t,
 	      int nargs, struct potentialArg * potentialArgs,
 	      double rtol, double atol,
-	      double *result,int * err){
+	      double *result,int * err,
+	      struct odeStats * stats,
+	      volatile int * interrupted){
   //coefficients
   double c1= 0.392256805238780;
   double c8= c1;
@@ -369,20 +406,15 @@ void symplec6(void (*func)(double t, double *q, double *a,
   double init_dt= (*(t+1))-(*t);
   if ( dt == -9999.99 ) {
     dt= symplec6_estimate_step(*func,dim,qo,po,init_dt,t,nargs,potentialArgs,
-			       rtol,atol);
+			       rtol,atol,stats);
   }
-  long ndt= (long) (init_dt/dt);
+  long ndt= (long) (init_dt/dt+0.5);
+  if ( stats ) stats->dt= dt;
   //Integrate the system
   double to= *t;
-  // Handle KeyboardInterrupt gracefully
-  struct sigaction action;
-  memset(&action, 0, sizeof(struct sigaction));
-  action.sa_handler= handle_sigint;
-  sigaction(SIGINT,&action,NULL);
   for (ii=0; ii < (nt-1); ii++){
-    if ( interrupted ) {
+    if ( interrupted && *interrupted ) {
       *err= -10;
-      interrupted= 0; // need to reset, bc library and vars stay in memory
       break;
     }
     //drift for c1*dt
@@ -483,13 +515,18 @@ void symplec6(void (*func)(double t, double *q, double *a,
     to+= c8*dt;
     //p8=p7
     for (kk=0; kk < dim; kk++) *(po+kk)= *(p12+kk);
+    if ( stats ) {
+      stats->nfev+= 7*ndt;
+      stats->naccept+= ndt;
+    }
     //save
     save_qp(dim,qo,po,result);
     result+= 2 * dim;
   }
-  // Back to default handler
-  action.sa_handler= SIG_DFL;
-  sigaction(SIGINT,&action,NULL);
+  if ( stats ) {
+    stats->ntdone= ii+1;
+    stats->dtnext= dt;
+  }
   //Free allocated memory
   free(qo);
   free(po);
@@ -502,7 +539,8 @@ double leapfrog_estimate_step(void (*func)(double t, double *q, double *a,int na
 			      int dim, double *qo,double *po,
 			      double dt, double *t,
 			      int nargs,struct potentialArg * potentialArgs,
-			      double rtol,double atol){
+			      double rtol,double atol,
+			      struct odeStats * stats){
   //return dt;
   //scalars
   double err= 2.;
@@ -529,15 +567,16 @@ double leapfrog_estimate_step(void (*func)(double t, double *q, double *a,int na
     if ( fabs(*(po+ii)) > max_val_p )
       max_val_p= fabs(*(po+ii));
   //set up scale
-  double c= fmax(atol, rtol * max_val_q);
-  double s= log(exp(atol-c)+exp(rtol*max_val_q-c))+c;
+  double c= fmax(atol, rtol + log(max_val_q));
+  double s= log(exp(atol-c)+exp(rtol + log(max_val_q)-c))+c;
   for (ii=0; ii < dim; ii++) *(scale+ii)= s;
-  c= fmax(atol, rtol * max_val_p);
-  s= log(exp(atol-c)+exp(rtol*max_val_p-c))+c;
+  c= fmax(atol, rtol + log(max_val_p));
+  s= log(exp(atol-c)+exp(rtol + log(max_val_p)-c))+c;
   for (ii=0; ii < dim; ii++) *(scale+ii+dim)= s;
   //find good dt
   dt*= 2.;
   while ( err > 1.  && init_dt / dt < _MAX_DT_REDUCE){
+    if ( stats ) stats->nfev+= 3;
     dt/= 2.;
     //do one leapfrog step with step dt, and one with step dt/2.
     //dt
@@ -579,7 +618,8 @@ double symplec4_estimate_step(void (*func)(double t, double *q, double *a,int na
 			      int dim, double *qo,double *po,
 			      double dt, double *t,
 			      int nargs,struct potentialArg * potentialArgs,
-			      double rtol,double atol){
+			      double rtol,double atol,
+			      struct odeStats * stats){
   //return dt;
   //coefficients
   double c1= 0.6756035959798289;
@@ -614,15 +654,16 @@ double symplec4_estimate_step(void (*func)(double t, double *q, double *a,int na
     if ( fabs(*(po+ii)) > max_val_p )
       max_val_p= fabs(*(po+ii));
   //set up scale
-  double c= fmax(atol, rtol * max_val_q);
-  double s= log(exp(atol-c)+exp(rtol*max_val_q-c))+c;
+  double c= fmax(atol, rtol + log(max_val_q));
+  double s= log(exp(atol-c)+exp(rtol + log(max_val_q)-c))+c;
   for (ii=0; ii < dim; ii++) *(scale+ii)= s;
-  c= fmax(atol, rtol * max_val_p);
-  s= log(exp(atol-c)+exp(rtol*max_val_p-c))+c;
+  c= fmax(atol, rtol + log(max_val_p));
+  s= log(exp(atol-c)+exp(rtol + log(max_val_p)-c))+c;
   for (ii=0; ii < dim; ii++) *(scale+ii+dim)= s;
   //find good dt
   dt*= 2.;
   while ( err > 1. && init_dt / dt < _MAX_DT_REDUCE ){
+    if ( stats ) stats->nfev+= 9;
     dt/= 2.;
     //do one step with step dt, and one with step dt/2.
     /*
@@ -724,7 +765,8 @@ double symplec6_estimate_step(void (*func)(double t, double *q, double *a,int na
 			      int dim, double *qo,double *po,
 			      double dt, double *t,
 			      int nargs,struct potentialArg * potentialArgs,
-			      double rtol,double atol){
+			      double rtol,double atol,
+			      struct odeStats * stats){
   //return dt;
   //coefficients
   double c1= 0.392256805238780;
@@ -767,15 +809,16 @@ double symplec6_estimate_step(void (*func)(double t, double *q, double *a,int na
     if ( fabs(*(po+ii)) > max_val_p )
       max_val_p= fabs(*(po+ii));
   //set up scale
-  double c= fmax(atol, rtol * max_val_q);
-  double s= log(exp(atol-c)+exp(rtol*max_val_q-c))+c;
+  double c= fmax(atol, rtol + log(max_val_q));
+  double s= log(exp(atol-c)+exp(rtol + log(max_val_q)-c))+c;
   for (ii=0; ii < dim; ii++) *(scale+ii)= s;
-  c= fmax(atol, rtol * max_val_p);
-  s= log(exp(atol-c)+exp(rtol*max_val_p-c))+c;
+  c= fmax(atol, rtol + log(max_val_p));
+  s= log(exp(atol-c)+exp(rtol + log(max_val_p)-c))+c;
   for (ii=0; ii < dim; ii++) *(scale+ii+dim)= s;
   //find good dt
   dt*= 2.;
   while ( err > 1. && init_dt / dt < _MAX_DT_REDUCE ){
+    if ( stats ) stats->nfev+= 21;
     dt/= 2.;
     //do one step with step dt, and one with step dt/2.
     /*
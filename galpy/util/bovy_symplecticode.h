@@ -34,16 +34,21 @@ POSSIBILITY OF SUCH DAMAGE.
 #ifdef __cplusplus
 extern "C" {
 #endif
-#include "signal.h"
 #include <galpy_potentials.h>
 /*
-  Global variables
+  Structure to collect statistics about the integration
 */
-extern volatile sig_atomic_t interrupted;
+struct odeStats{
+  long long nfev; // number of force evaluations
+  long long naccept; // number of accepted steps
+  long long nreject; // number of rejected steps
+  double dt; // (initial) step size, from *_estimate_step if not given
+  int ntdone; // number of output times reached (< nt when interrupted)
+  double dtnext; // step size to use when continuing the integration
+};
 /*
   Function declarations
 */
-void handle_sigint(int);
 void leapfrog(void (*func)(double, double *, double *,
 			   int, struct potentialArg *),
 	      int,
@@ -51,12 +56,12 @@ void leapfrog(void (*func)(double, double *, double *,
 	      int, double, double *,
 	      int, struct potentialArg *,
 	      double, double,
-	      double *,int *);
+	      double *,int *,struct odeStats *,volatile int *);
 double leapfrog_estimate_step(void (*func)(double , double *, double *,int, struct potentialArg *),
 			      int, double *,double *,
 			      double, double *,
 			      int,struct potentialArg *,
-			      double,double);
+			      double,double,struct odeStats *);
 void symplec4(void (*func)(double, double *, double *,
 			   int, struct potentialArg *),
 	      int,
@@ -64,12 +69,12 @@ void symplec4(void (*func)(double, double *, double *,
 	      int, double, double *,
 	      int, struct potentialArg *,
 	      double, double,
-	      double *,int *);
+	      double *,int *,struct odeStats *,volatile int *);
 double symplec4_estimate_step(void (*func)(double , double *, double *,int, struct potentialArg *),
 			      int, double *,double *,
 			      double, double *,
 			      int,struct potentialArg *,
-			      double,double);
+			      double,double,struct odeStats *);
 void symplec6(void (*func)(double, double *, double *,
 			   int, struct potentialArg *),
 	      int,
@@ -77,12 +82,18 @@ void symplec6(void (*func)(double, double *, double *,
 	      int, double, double *,
 	      int, struct potentialArg *,
 	      double, double,
-	      double *,int *);
+	      double *,int *,struct odeStats *,volatile int *);
 double symplec6_estimate_step(void (*func)(double , double *, double *,int, struct potentialArg *),
 			      int, double *,double *,
 			      double, double *,
 			      int,struct potentialArg *,
-			      double,double);
+			      double,double,struct odeStats *);
+/*
+  Catching CTRL-C (SIGINT) during an integration: sets the given per-call
+  flag, which the integrators check before each output step
+*/
+void galpy_set_sigint_flag(volatile int *);
+void galpy_reset_sigint(void);
 #ifdef __cplusplus
 }
 #endif
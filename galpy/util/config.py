@@ -42,17 +42,18 @@ def write_config(filename,configuration=None):
         writeconfig.write(configfile)
     return None
 
-# Read the configuration file
+# Read the configuration file; start from the default configuration, such
+# that options missing from the file (or a missing file) take their default
+# values without writing anything to disk at import time (use write_config
+# to write a configuration file)
 __config__= configparser.ConfigParser()
+for sec_key in default_configuration.keys():
+    __config__.add_section(sec_key)
+    for key in default_configuration[sec_key]:
+        __config__.set(sec_key,key,default_configuration[sec_key][key])
 cfilename= __config__.read('.galpyrc')
 if not cfilename:
     cfilename= __config__.read(default_filename)
-    if not cfilename:
-        write_config(default_filename)
-        __config__.read(default_filename)
-if not check_config(__config__):
-    write_config(cfilename[-1],__config__)
-    __config__.read(cfilename[-1])
 
 # Set configuration variables on the fly
 def set_ro(ro):
@@ -112,9 +112,12 @@ orbit_int_c_src.extend(glob.glob('galpy/util/interp_2d/*.c'))
 orbit_libraries=['m']
 if float(gsl_version[0]) >= 1.:
     orbit_libraries.extend(['gsl','gslcblas'])
+if 'gomp' in pot_libraries: # OpenMP is used to integrate multiple orbits
+    orbit_libraries.append('gomp')
 
 orbit_include_dirs= ['galpy/util',
                      'galpy/util/interp_2d',
+                     'galpy/orbit_src/orbit_c_ext',
                      'galpy/potential_src/potential_c_ext']
 
 #actionAngleTorus C extension (files here, so we can compile a single extension if so desidered)
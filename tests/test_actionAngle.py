@@ -681,6 +681,30 @@ def test_actionAngleStaeckel_basic_actions_c():
     assert numpy.fabs(js[2]) < 2.*10.**-4., 'Close-to-circular orbit in the MWPotential does not have small Jz'
     return None
 
+# Test that actionAngleStaeckel in C works for a CallbackPotential given by compiled functions
+def test_actionAngleStaeckel_callbackpotential_c():
+    import ctypes
+    from galpy.actionAngle import actionAngleStaeckel
+    from galpy.potential import CallbackPotential, PlummerPotential
+    functype= ctypes.CFUNCTYPE(ctypes.c_double,ctypes.c_double,
+                               ctypes.c_double,ctypes.c_double,
+                               ctypes.c_double)
+    b2= 0.25
+    pot_func= functype(lambda R,z,phi,t: -1./numpy.sqrt(R**2.+z**2.+b2))
+    Rforce_func= functype(lambda R,z,phi,t: -R/(R**2.+z**2.+b2)**1.5)
+    zforce_func= functype(lambda R,z,phi,t: -z/(R**2.+z**2.+b2)**1.5)
+    cp= CallbackPotential(potential=pot_func,Rforce=Rforce_func,
+                          zforce=zforce_func,amp=2.)
+    pp= PlummerPotential(amp=2.,b=0.5)
+    aAS= actionAngleStaeckel(pot=pp,delta=0.1,c=True)
+    aASc= actionAngleStaeckel(pot=cp,delta=0.1,c=True)
+    R,vR,vT,z,vz= 1.01,0.05,1.,0.05,0.02
+    js= aAS(R,vR,vT,z,vz)
+    jsc= aASc(R,vR,vT,z,vz)
+    for ii in range(3):
+        assert numpy.fabs(js[ii]-jsc[ii]) < 10.**-10., 'Actions computed with actionAngleStaeckel for a CallbackPotential do not agree with those for the equivalent galpy potential'
+    return None
+
 #Basic sanity checking of the actionAngleStaeckel actions, unbound
 def test_actionAngleStaeckel_unboundr_actions_c():
     from galpy.actionAngle import actionAngleStaeckel
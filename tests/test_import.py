@@ -21,3 +21,24 @@ def test_util_import():
     import galpy.util.bovy_coords
     import galpy.util.bovy_conversion
         
+
+# Test that importing galpy does not import slow-to-import packages that are
+# only needed for plotting, astropy's coordinate transformations, or
+# snapshots, and that it does not write the configuration file
+def test_import_lazy():
+    import os, sys
+    import subprocess
+    import tempfile
+    import shutil
+    tmpdir= tempfile.mkdtemp()
+    try:
+        env= os.environ.copy()
+        env['HOME']= tmpdir
+        code= "import sys; import galpy.orbit, galpy.potential, galpy.actionAngle, galpy.df; print(','.join([m for m in ['matplotlib','astropy.coordinates','pynbody'] if m in sys.modules]))"
+        out= subprocess.check_output([sys.executable,'-W','ignore',
+                                      '-c',code],cwd=tmpdir,env=env)
+        assert out.decode().strip() == '', 'Importing galpy imported %s' % out.decode().strip()
+        assert not os.path.exists(os.path.join(tmpdir,'.galpyrc')), 'Importing galpy wrote the configuration file'
+    finally:
+        shutil.rmtree(tmpdir)
+    return None
@@ -949,3 +949,67 @@ def test_interpolation_potential_verticalfreq_notinterpolated():
         assert vfdiff < 10.**-10., 'RZPot interpolation w/ interpRZPotential fails when the potential was not interpolated at R = %g by %g' % (r,vfdiff)
     return None
 
+
+# Test that grids cached on disk are re-used and give the same interpolation
+def test_interpolation_potential_cachedir():
+    import os
+    import shutil
+    import tempfile
+    cachedir= tempfile.mkdtemp()
+    try:
+        kwargs= dict(rgrid=(0.01,2.,101),zgrid=(0.,0.2,101),logR=False,
+                     interpPot=True,interpRforce=True,interpzforce=True,
+                     interpvcirc=True,interpepifreq=True,
+                     use_c=True,enable_c=True,zsym=True,cachedir=cachedir)
+        rzpot= potential.interpRZPotential(RZPot=potential.MWPotential,
+                                           **kwargs)
+        assert len(os.listdir(cachedir)) == 1, 'interpRZPotential with cachedir did not create a single cache directory'
+        cached= potential.interpRZPotential(RZPot=potential.MWPotential,
+                                            **kwargs)
+        assert len(os.listdir(cachedir)) == 1, 'interpRZPotential with cachedir did not re-use the cached grids'
+        assert isinstance(cached._potGrid,numpy.memmap), 'interpRZPotential with cachedir did not load the cached grid using memory mapping'
+        rs= numpy.linspace(0.1,1.9,11)
+        zs= numpy.linspace(-0.1,0.1,11)
+        for func in ['__call__','Rforce','zforce']:
+            assert numpy.all(numpy.fabs(getattr(rzpot,func)(rs,zs)-getattr(cached,func)(rs,zs)) < 10.**-10.), 'interpRZPotential with cached grids does not agree with the original interpolation for %s' % func
+        for func in ['vcirc','epifreq']:
+            assert numpy.all(numpy.fabs(getattr(rzpot,func)(rs)-getattr(cached,func)(rs)) < 10.**-10.), 'interpRZPotential with cached grids does not agree with the original interpolation for %s' % func
+        # A different potential is cached separately
+        potential.interpRZPotential(RZPot=potential.MiyamotoNagaiPotential(normalize=1.,a=0.5,b=0.05),**kwargs)
+        assert len(os.listdir(cachedir)) == 2, 'interpRZPotential with cachedir did not cache a different potential separately'
+    finally:
+        shutil.rmtree(cachedir)
+    return None
+
+# Test that the hash used to look up cached grids depends on the closure
+# variables, default arguments, and globals of functions, and that potentials
+# with objects that cannot be hashed are not cached
+def test_interpolation_potential_cachekey_functions():
+    import warnings
+    from galpy.util import galpyWarning
+    from galpy.potential_src.interpRZPotential import _cache_key
+    rs= numpy.linspace(0.01,2.,11)
+    zs= numpy.linspace(0.,0.2,11)
+    def make_dens(h):
+        def dens(R,z): return numpy.exp(-R/h-numpy.fabs(z)/0.1)
+        return dens
+    def dens_default(R,z,h=1./3.): return numpy.exp(-R/h-numpy.fabs(z)/0.1)
+    def dens_default2(R,z,h=1./2.): return numpy.exp(-R/h-numpy.fabs(z)/0.1)
+    assert _cache_key(make_dens(1./3.),rs,zs) == _cache_key(make_dens(1./3.),rs,zs), 'Hash of the same function differs'
+    assert _cache_key(make_dens(1./3.),rs,zs) != _cache_key(make_dens(1./2.),rs,zs), 'Hash of functions with different closure variables is the same'
+    assert _cache_key(dens_default,rs,zs) != _cache_key(dens_default2,rs,zs), 'Hash of functions with different default arguments is the same'
+    global _cachekey_test_h
+    _cachekey_test_h= 1./3.
+    key= _cache_key(_cachekey_test_dens,rs,zs)
+    _cachekey_test_h= 1./2.
+    assert _cache_key(_cachekey_test_dens,rs,zs) != key, 'Hash of functions with different global variables is the same'
+    # An object that cannot be hashed: not cached, with a warning
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter("always",galpyWarning)
+        assert _cache_key([make_dens(1./3.),slice(0,1)],rs,zs) is None, 'Hash of an object that cannot be hashed is not None'
+        assert len(w) == 1 and issubclass(w[0].category,galpyWarning), 'Hashing an object that cannot be hashed does not warn'
+    return None
+
+_cachekey_test_h= 1./3.
+def _cachekey_test_dens(R,z):
+    return numpy.exp(-R/_cachekey_test_h-numpy.fabs(z)/0.1)
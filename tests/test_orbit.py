@@ -119,7 +119,8 @@ def test_energy_jacobi_conservation():
     pots.append('mockFlatSolidBodyRotationPlanarSpiralArmsPotential')
     rmpots= ['Potential','MWPotential','MWPotential2014',
              'MovingObjectPotential',
-             'interpRZPotential', 'linearPotential', 'planarAxiPotential',
+             'interpRZPotential', 'CallbackPotential',
+             'linearPotential', 'planarAxiPotential',
              'planarPotential', 'verticalPotential','PotentialError',
              'SnapshotRZPotential','InterpSnapshotRZPotential']
     if False: #_TRAVIS: #travis CI
@@ -509,7 +510,8 @@ def test_liouville_planar():
     pots.append('mockFlatSolidBodyRotationSpiralArmsPotential')
     rmpots= ['Potential','MWPotential','MWPotential2014',
              'MovingObjectPotential',
-             'interpRZPotential', 'linearPotential', 'planarAxiPotential',
+             'interpRZPotential', 'CallbackPotential',
+             'linearPotential', 'planarAxiPotential',
              'planarPotential', 'verticalPotential','PotentialError',
              'SnapshotRZPotential','InterpSnapshotRZPotential']
     #rmpots.append('BurkertPotential')
@@ -622,7 +624,8 @@ def test_eccentricity():
     pots.append('testplanarMWPotential')
     rmpots= ['Potential','MWPotential','MWPotential2014',
              'MovingObjectPotential',
-             'interpRZPotential', 'linearPotential', 'planarAxiPotential',
+             'interpRZPotential', 'CallbackPotential',
+             'linearPotential', 'planarAxiPotential',
              'planarPotential', 'verticalPotential','PotentialError',
              'SnapshotRZPotential','InterpSnapshotRZPotential']
     if False: #_TRAVIS: #travis CI
@@ -742,7 +745,8 @@ def test_pericenter():
     pots.append('testplanarMWPotential')
     rmpots= ['Potential','MWPotential','MWPotential2014',
              'MovingObjectPotential',
-             'interpRZPotential', 'linearPotential', 'planarAxiPotential',
+             'interpRZPotential', 'CallbackPotential',
+             'linearPotential', 'planarAxiPotential',
              'planarPotential', 'verticalPotential','PotentialError',
              'SnapshotRZPotential','InterpSnapshotRZPotential']
     if False: #_TRAVIS: #travis CI
@@ -861,7 +865,8 @@ def test_apocenter():
     pots.append('testplanarMWPotential')
     rmpots= ['Potential','MWPotential','MWPotential2014',
              'MovingObjectPotential',
-             'interpRZPotential', 'linearPotential', 'planarAxiPotential',
+             'interpRZPotential', 'CallbackPotential',
+             'linearPotential', 'planarAxiPotential',
              'planarPotential', 'verticalPotential','PotentialError',
              'SnapshotRZPotential','InterpSnapshotRZPotential']
     if False: #_TRAVIS: #travis CI
@@ -980,7 +985,8 @@ def test_zmax():
     pots.append('testMWPotential')
     rmpots= ['Potential','MWPotential','MWPotential2014',
              'MovingObjectPotential',
-             'interpRZPotential', 'linearPotential', 'planarAxiPotential',
+             'interpRZPotential', 'CallbackPotential',
+             'linearPotential', 'planarAxiPotential',
              'planarPotential', 'verticalPotential','PotentialError',
              'SnapshotRZPotential','InterpSnapshotRZPotential']
     if False: #_TRAVIS: #travis CI
@@ -1086,7 +1092,8 @@ def test_analytic_ecc_rperi_rap():
     pots.append('testplanarMWPotential')
     rmpots= ['Potential','MWPotential','MWPotential2014',
              'MovingObjectPotential',
-             'interpRZPotential', 'linearPotential', 'planarAxiPotential',
+             'interpRZPotential', 'CallbackPotential',
+             'linearPotential', 'planarAxiPotential',
              'planarPotential', 'verticalPotential','PotentialError',
              'SnapshotRZPotential','InterpSnapshotRZPotential']
     if False: #_TRAVIS: #travis CI
@@ -1292,7 +1299,8 @@ def test_analytic_zmax():
     pots.append('testMWPotential')
     rmpots= ['Potential','MWPotential','MWPotential2014',
              'MovingObjectPotential',
-             'interpRZPotential', 'linearPotential', 'planarAxiPotential',
+             'interpRZPotential', 'CallbackPotential',
+             'linearPotential', 'planarAxiPotential',
              'planarPotential', 'verticalPotential','PotentialError',
              'SnapshotRZPotential','InterpSnapshotRZPotential']
     if False: #_TRAVIS: #travis CI
@@ -2616,6 +2624,41 @@ def test_orbitfit_custom():
     assert numpy.all(compf < 10.**-4.), 'Orbit fit in radec space does not work'
     return None
 
+# Test that the gradient-based fit agrees with the derivative-free fit and that multiple starts work
+def test_orbitfit_gradient_multistart():
+    from galpy.orbit import Orbit
+    from galpy.orbit_src import FullOrbit
+    lp= potential.LogarithmicHaloPotential(normalize=1.,q=0.9)
+    o= Orbit([0.8,0.3,1.3,0.4,0.2,2.])
+    ts= numpy.linspace(0.,1.,1001)
+    o.integrate(ts,lp)
+    vxvv= o._orb.orbit[::100,:]
+    # Gradient of the log likelihood vs. finite differences
+    tsJ= numpy.linspace(0.,1.5,1000)
+    w0= numpy.array([0.81,0.29,1.31,0.41,0.19,2.01])
+    args= (vxvv,0.05*numpy.ones_like(vxvv),lp,False,False,False,None,None,
+           tsJ,'dopr54_c',None,None,None)
+    grad= FullOrbit._fit_orbit_mlogl_grad(w0,*args)[1]
+    for ii in range(6):
+        dw= numpy.zeros(6)
+        dw[ii]= 10.**-6.
+        fdgrad= (FullOrbit._fit_orbit_mlogl_grad(w0+dw,*args)[0]
+                 -FullOrbit._fit_orbit_mlogl_grad(w0-dw,*args)[0])/2./10.**-6.
+        assert numpy.fabs(grad[ii]-fdgrad) < 10.**-5.*numpy.amax(numpy.fabs(grad)), 'Gradient of the orbit-fit log likelihood does not agree with finite differences'
+    # Fits with and without gradient, and with multiple starts in parallel
+    of= o()
+    logl_powell= of.fit(vxvv,pot=lp,tintJ=1.5,gradient=False)
+    of= o()
+    logl_grad= of.fit(vxvv,pot=lp,tintJ=1.5)
+    assert numpy.fabs(logl_grad-logl_powell) < 10.**-2., 'Gradient-based orbit fit does not reach the same maximum likelihood as the derivative-free fit'
+    of= o()
+    logl_multi= of.fit(vxvv,pot=lp,tintJ=1.5,
+                       init=[[0.85,0.25,1.25,0.45,0.15,2.05],
+                             [0.8,0.3,1.3,0.4,0.2,2.]],
+                       numcores=2)
+    assert logl_multi >= logl_grad-10.**-8., 'Orbit fit with multiple starts does not return the best fit'
+    return None
+
 def comp_orbfit(of,vxvv,ts,pot,lb=False,radec=False,ro=None,vo=None):
     """Compare the output of the orbit fit properly, ro and vo only implemented for radec"""
     from galpy.util import bovy_coords
@@ -3212,6 +3255,798 @@ def test_orbit_c_sigint_planardxdv():
         p.stderr.close()
     return None
 
+# Test that integrating multiple orbits at once in C gives the same result as
+# integrating them one by one
+def test_integrate_c_multiple():
+    from galpy.orbit_src.integrateFullOrbit import integrateFullOrbit_c
+    from galpy.orbit_src.integratePlanarOrbit import integratePlanarOrbit_c
+    integrators= ['dopr54_c',
+                  'leapfrog_c',
+                  'rk4_c','rk6_c',
+                  'symplec4_c','symplec6_c']
+    ts= numpy.linspace(0.,10.,101)
+    numpy.random.seed(1)
+    # Full, include a potential that caches in its args
+    pot= [potential.MiyamotoNagaiPotential(normalize=0.6,a=0.5,b=0.05),
+          potential.TriaxialNFWPotential(normalize=0.4,b=0.8,c=0.6)]
+    yo= numpy.array([1.,0.,1.,0.1,0.,0.])\
+        +0.1*numpy.random.normal(size=(11,6))
+    for integrator in integrators:
+        out, err= integrateFullOrbit_c(pot,yo,ts,integrator)
+        assert out.shape == (len(yo),len(ts),6), 'integrateFullOrbit_c for multiple orbits does not return an array with the expected shape'
+        assert err.shape == (len(yo),), 'integrateFullOrbit_c for multiple orbits does not return an err array with the expected shape'
+        for ii in range(len(yo)):
+            sout, serr= integrateFullOrbit_c(pot,yo[ii],ts,integrator)
+            assert numpy.amax(numpy.fabs(out[ii]-sout)) < 10.**-10., 'integrateFullOrbit_c for multiple orbits does not agree with integrating orbits one by one for integrator %s' % integrator
+            assert err[ii] == serr, 'integrateFullOrbit_c for multiple orbits does not return the same error as integrating orbits one by one'
+    # Planar
+    pot= [potential.LogarithmicHaloPotential(normalize=1.).toPlanar(),
+          potential.DehnenBarPotential().toPlanar()]
+    yo= numpy.array([1.,0.,0.,1.])+0.1*numpy.random.normal(size=(11,4))
+    for integrator in integrators:
+        out, err= integratePlanarOrbit_c(pot,yo,ts,integrator)
+        assert out.shape == (len(yo),len(ts),4), 'integratePlanarOrbit_c for multiple orbits does not return an array with the expected shape'
+        for ii in range(len(yo)):
+            sout, serr= integratePlanarOrbit_c(pot,yo[ii],ts,integrator)
+            assert numpy.amax(numpy.fabs(out[ii]-sout)) < 10.**-10., 'integratePlanarOrbit_c for multiple orbits does not agree with integrating orbits one by one for integrator %s' % integrator
+    return None
+
+# Test that the array-backed Orbits class agrees with individual Orbits
+def test_orbits_vs_orbit():
+    from galpy.orbit import Orbit, Orbits
+    numpy.random.seed(1)
+    ts= numpy.linspace(0.,10.,1001)
+    # Full orbits, in a potential with and without C support
+    vxvv= numpy.array([1.,0.,1.,0.,0.,0.])\
+        +0.1*numpy.random.normal(size=(5,6))
+    for pot,method in zip([potential.MWPotential2014,
+                           potential.MWPotential2014],
+                          ['symplec4_c','odeint']):
+        os= Orbits(vxvv,ro=8.,vo=220.)
+        os.integrate(ts,pot,method=method)
+        ol= [Orbit(v,ro=8.,vo=220.) for v in vxvv]
+        for o in ol: o.integrate(ts,pot,method=method)
+        for attr in ['R','vR','vT','z','vz','phi','x','y','vx','vy','E',
+                     'ra','dec','ll','bb','dist','pmra','pmdec','vlos',
+                     'U','V','W']:
+            for t in [None,3.,ts[10:20],3.0051,numpy.array([3.0051,7.22])]:
+                if t is None:
+                    oso= getattr(os,attr)()
+                    olo= numpy.array([getattr(o,attr)() for o in ol])
+                else:
+                    oso= getattr(os,attr)(t)
+                    olo= numpy.array([getattr(o,attr)(t) for o in ol])
+                diff= oso-olo.reshape(oso.shape)
+                if attr == 'phi': # odeint does not wrap phi
+                    diff= (diff+numpy.pi) % (2.*numpy.pi)-numpy.pi
+                assert numpy.all(numpy.fabs(diff) < 10.**-8.*numpy.maximum(1.,numpy.fabs(olo.reshape(oso.shape)))), 'Orbits.%s does not agree with Orbit.%s' % (attr,attr)
+    assert numpy.all(numpy.fabs(os.L(3.)-numpy.array([o.L(3.)[0] for o in ol])) < 10.**-8.), 'Orbits.L does not agree with Orbit.L'
+    assert numpy.all(numpy.fabs(os.jr(pot,type='staeckel',delta=0.4)-numpy.array([o.jr(pot,type='staeckel',delta=0.4) for o in ol])) < 10.**-8.), 'Orbits.jr does not agree with Orbit.jr'
+    # Default actionAngle type is the same as for Orbit
+    assert numpy.all(numpy.fabs(os.jz(pot)-numpy.array([o.jz(pot) for o in ol])) < 10.**-8.), 'Orbits.jz with the default actionAngle type does not agree with Orbit.jz'
+    # Indexing and slicing return views
+    sos= os[1:3]
+    assert numpy.may_share_memory(sos.orbit,os.orbit), 'Slicing Orbits does not return a view'
+    assert numpy.may_share_memory(os[2].vxvv,os.vxvv), 'Indexing Orbits does not return a view'
+    assert numpy.all(numpy.fabs(sos.R(3.0051)-os.R(3.0051)[1:3]) < 10.**-10.), 'Sliced Orbits does not agree with the original Orbits'
+    assert numpy.fabs(os[-1].vz(2.)-ol[-1].vz(2.)) < 10.**-10., 'Indexed Orbits does not agree with the original Orbit'
+    # Planar orbits in a non-axisymmetric potential
+    pot= [potential.LogarithmicHaloPotential(normalize=1.),
+          potential.DehnenBarPotential()]
+    os= Orbits(vxvv[:,[0,1,2,5]])
+    os.integrate(ts,pot)
+    ol= [Orbit(v[[0,1,2,5]]) for v in vxvv]
+    for o in ol: o.integrate(ts,pot)
+    for attr in ['R','vR','vT','phi','x','vy','E','L']:
+        assert numpy.all(numpy.fabs(getattr(os,attr)(ts)-numpy.array([getattr(o,attr)(ts) for o in ol]).reshape((len(vxvv),len(ts)))) < 10.**-8.), 'Orbits.%s does not agree with Orbit.%s for planar orbits' % (attr,attr)
+    # Initialization from observed coordinates
+    obs= [[20.,30.,2.,-10.,20.,50.],[120.,-30.,0.5,3.,-2.,-150.]]
+    os= Orbits(obs,radec=True,ro=8.,vo=220.)
+    for ii in range(len(obs)):
+        o= Orbit(obs[ii],radec=True,ro=8.,vo=220.)
+        assert numpy.all(numpy.fabs(os.vxvv[ii]-o._orb.vxvv) < 10.**-10.), 'Orbits initialized with radec=True does not agree with Orbit'
+    assert numpy.all(numpy.fabs(os.pmra()-numpy.array(obs)[:,3]) < 10.**-8.), 'Orbits.pmra does not return the input proper motion'
+    return None
+
+# Test that integrating in chunks and into a given array gives the same orbit
+def test_integrate_chunks():
+    import tempfile
+    from galpy.orbit import Orbit, Orbits
+    from galpy.orbit_src.integrateFullOrbit import integrateFullOrbit_c
+    ts= numpy.linspace(0.,100.,10001)
+    pot= potential.MWPotential2014
+    for method in ['dopr54_c','rk6_c','leapfrog']:
+        o= Orbit([1.,0.1,1.1,0.1,0.,0.])
+        o.integrate(ts,pot,method=method)
+        oc= Orbit([1.,0.1,1.1,0.1,0.,0.])
+        tmpfile= tempfile.NamedTemporaryFile()
+        out= numpy.memmap(tmpfile,dtype='float64',mode='w+',
+                          shape=(len(ts),6))
+        oc.integrate(ts,pot,method=method,out=out,chunksize=777)
+        assert oc.getOrbit() is out, 'Orbit.integrate with out= does not store the orbit in out'
+        assert numpy.amax(numpy.fabs(o.getOrbit()-oc.getOrbit())) < 10.**-8., 'Orbit integrated in chunks does not agree with the orbit integrated at once for method %s' % method
+        assert numpy.fabs(o.R(50.05)-oc.R(50.05)) < 10.**-8., 'Orbit integrated in chunks does not agree with the orbit integrated at once for method %s' % method
+        chunks= list(oc.integrate_chunks(ts,pot,method=method,chunksize=1000))
+        assert len(chunks) == 11, 'Orbit.integrate_chunks does not return the expected number of chunks'
+        assert numpy.all(numpy.hstack([c[0] for c in chunks]) == ts), 'Orbit.integrate_chunks does not return all times once'
+        assert numpy.amax(numpy.fabs(numpy.vstack([c[1] for c in chunks])-o.getOrbit())) < 10.**-8., 'Orbit.integrate_chunks does not agree with the orbit integrated at once for method %s' % method
+        tmpfile.close()
+    # Orbits
+    vxvv= numpy.array([[1.,0.1,1.1,0.1,0.,0.],[1.2,0.,0.9,0.,0.1,1.]])
+    os= Orbits(vxvv)
+    os.integrate(ts,pot,method='dopr54_c')
+    osc= Orbits(vxvv)
+    out= numpy.empty((len(vxvv),len(ts),6))
+    osc.integrate(ts,pot,method='dopr54_c',out=out,chunksize=500)
+    assert osc.getOrbit() is out, 'Orbits.integrate with out= does not store the orbits in out'
+    assert numpy.amax(numpy.fabs(os.getOrbit()-osc.getOrbit())) < 10.**-8., 'Orbits integrated in chunks does not agree with the orbits integrated at once'
+    # C integrator writing into a given array
+    result= numpy.empty((len(vxvv),len(ts),6))
+    cout, err= integrateFullOrbit_c(pot,vxvv,ts,'dopr54_c',result=result)
+    assert numpy.may_share_memory(cout,result), 'integrateFullOrbit_c with result= does not write into result'
+    try:
+        integrateFullOrbit_c(pot,vxvv,ts,'dopr54_c',
+                             result=numpy.empty((len(ts),6)))
+    except ValueError: pass
+    else: raise AssertionError('integrateFullOrbit_c with result= of the wrong shape does not raise ValueError')
+    return None
+
+# Test that the dense output of dopr54_c gives the orbit at arbitrary times
+def test_dopr54_dense_output():
+    from galpy.orbit import Orbit
+    pot= potential.MWPotential2014
+    tcheck= numpy.linspace(0.,9.99,1001)
+    for vxvv in [[1.,0.1,1.1,0.1,0.,0.],[1.,0.1,1.1,0.]]:
+        for sign in [1.,-1.]:
+            # Coarse grid, rely on the dense output in between
+            o= Orbit(vxvv)
+            o.integrate(sign*numpy.linspace(0.,10.,11),pot,method='dopr54_c',
+                        dense=True)
+            # Fine grid for reference
+            of= Orbit(vxvv)
+            of.integrate(sign*tcheck,pot,method='dopr54_c')
+            assert numpy.amax(numpy.fabs(o.R(sign*tcheck)-of.R(sign*tcheck))) < 10.**-6., 'Dense output of dopr54_c does not agree with the orbit integrated on a fine grid'
+            assert numpy.amax(numpy.fabs(o.vR(sign*tcheck)-of.vR(sign*tcheck))) < 10.**-6., 'Dense output of dopr54_c does not agree with the orbit integrated on a fine grid'
+            assert numpy.amax(numpy.fabs(o.vT(sign*tcheck)-of.vT(sign*tcheck))) < 10.**-6., 'Dense output of dopr54_c does not agree with the orbit integrated on a fine grid'
+            dphi= (o.phi(sign*tcheck)-of.phi(sign*tcheck)) % (2.*numpy.pi)
+            assert numpy.amax(numpy.minimum(dphi,2.*numpy.pi-dphi)) < 10.**-6., 'Dense output of dopr54_c does not agree with the orbit integrated on a fine grid'
+            if len(vxvv) == 6:
+                assert numpy.amax(numpy.fabs(o.z(sign*tcheck)-of.z(sign*tcheck))) < 10.**-6., 'Dense output of dopr54_c does not agree with the orbit integrated on a fine grid'
+                assert numpy.amax(numpy.fabs(o.vz(sign*tcheck)-of.vz(sign*tcheck))) < 10.**-6., 'Dense output of dopr54_c does not agree with the orbit integrated on a fine grid'
+            # Outside of the integration range
+            try:
+                o.R(sign*11.)
+            except ValueError: pass
+            else: raise AssertionError('Dense output outside of the integration range does not raise ValueError')
+            # Dense output is only kept when asked for
+            of.integrate(sign*tcheck,pot,method='dopr54_c')
+            assert of._orb._dense is None, 'Dense output is kept without dense=True'
+    return None
+
+# Test that evaluating an orbit looks up output times and only interpolates
+# the components that are needed
+def test_orbit_call_timeindex_lazyinterp():
+    from galpy.orbit import Orbit
+    pot= potential.MWPotential2014
+    for sign in [1.,-1.]:
+        ts= sign*numpy.linspace(0.,10.,1001)
+        o= Orbit([1.,0.1,1.1,0.1,0.,0.])
+        o.integrate(ts,pot,method='symplec4_c')
+        oo= o.getOrbit()
+        # Output times
+        assert numpy.all(o.R(ts) == oo[:,0]), 'Orbit.R at the output times does not return the integrated orbit'
+        assert numpy.all(o.vz(ts[::7]) == oo[::7,4]), 'Orbit.vz at the output times does not return the integrated orbit'
+        assert o.vR(ts[123]) == oo[123,1], 'Orbit.vR at an output time does not return the integrated orbit'
+        assert not hasattr(o._orb,'_orbInterp'), 'Evaluating an orbit at the output times sets up interpolation'
+        # Times in between the output times, only set up what is necessary
+        tin= ts[:-1]+sign*0.005
+        R= o.R(tin)
+        assert sorted(o._orb._orbInterp.keys()) == ['x','y'], 'Orbit.R sets up interpolation for components other than x and y'
+        vz= o.vz(tin)
+        assert 4 in o._orb._orbInterp and len(o._orb._orbInterp) == 3, 'Orbit.vz sets up interpolation for components other than vz'
+        assert numpy.amax(numpy.fabs(R-0.5*(oo[:-1,0]+oo[1:,0]))) < 10.**-4., 'Orbit.R in between output times does not agree with the integrated orbit'
+        assert numpy.amax(numpy.fabs(vz-0.5*(oo[:-1,4]+oo[1:,4]))) < 10.**-4., 'Orbit.vz in between output times does not agree with the integrated orbit'
+        # __call__ gives the same
+        assert numpy.all(numpy.fabs(o._orb(tin)[0]-R) < 10.**-14.), 'Orbit.__call__ and Orbit.R do not agree'
+        assert numpy.all(numpy.fabs(o._orb(tin)[4]-vz) < 10.**-14.), 'Orbit.__call__ and Orbit.vz do not agree'
+        assert numpy.fabs(o.R(tin[10])-R[10]) < 10.**-14., 'Orbit.R for a single time does not agree with Orbit.R for an array of times'
+    # phi at the output times is wrapped to [0,2pi), for a single time as
+    # well as for an array of times (odeint does not wrap phi itself)
+    o= Orbit([1.,0.1,1.1,0.1,0.,0.])
+    o.integrate(ts,pot,method='odeint')
+    phis= o._orb.orbit[:,5]
+    assert numpy.amax(numpy.fabs(phis)) > 2.*numpy.pi, 'Test orbit does not go around the Galactic center'
+    assert numpy.all(o.phi(ts) == phis % (2.*numpy.pi)), 'Orbit.phi at the output times is not wrapped to [0,2pi)'
+    assert o.phi(ts[-1]) == phis[-1] % (2.*numpy.pi), 'Orbit.phi at a single output time is not wrapped to [0,2pi)'
+    assert o._orb(ts[-1])[5] == phis[-1] % (2.*numpy.pi), 'Orbit.__call__ at a single output time does not wrap phi to [0,2pi)'
+    return None
+
+# Test that events found during the integration are accurate
+def test_orbit_events():
+    from galpy.orbit import Orbit
+    pot= potential.MWPotential2014
+    # Coarse integration with events vs. fine integration
+    ts= numpy.linspace(0.,100.,11)
+    tsf= numpy.linspace(0.,100.,100001)
+    for vxvv in [[1.,0.1,1.1,0.1,0.,0.],[1.,0.1,1.1,0.]]:
+        events= ['pericenter','apocenter']
+        if len(vxvv) == 6: events.extend(['zcrossing','zmax'])
+        o= Orbit(vxvv)
+        o.integrate(ts,pot,method='dopr54_c',events=events)
+        of= Orbit(vxvv)
+        of.integrate(tsf,pot,method='dopr54_c')
+        assert numpy.fabs(o.rperi()-of.rperi()) < 10.**-6., 'Pericenter from events does not agree with that from a finely-sampled orbit'
+        assert numpy.fabs(o.rap()-of.rap()) < 10.**-6., 'Apocenter from events does not agree with that from a finely-sampled orbit'
+        assert numpy.fabs(o.e()-of.e()) < 10.**-6., 'Eccentricity from events does not agree with that from a finely-sampled orbit'
+        assert o.rperi() <= of.rperi() and o.rap() >= of.rap(), 'Peri- and apocenter from events are not more extreme than those from a finely-sampled orbit'
+        assert sorted(o.getEvents().keys()) == sorted(events), 'Orbit.getEvents does not return all events'
+        # At the events, the orbit is where the event says it is
+        for name in events:
+            et, ey= o.getEvents(name)
+            assert len(et) > 5, 'Not enough events found'
+            for ii in range(len(et)):
+                assert numpy.fabs(of.R(et[ii])-ey[ii,0]) < 10.**-6., 'Event position does not agree with the orbit at the event time'
+                assert numpy.fabs(of.vR(et[ii])-ey[ii,1]) < 10.**-6., 'Event position does not agree with the orbit at the event time'
+                if name == 'zcrossing':
+                    assert numpy.fabs(ey[ii,3]) < 10.**-10., 'z is not zero at zcrossing events'
+                elif name == 'zmax':
+                    assert numpy.fabs(ey[ii,4]) < 10.**-10., 'vz is not zero at zmax events'
+                elif len(vxvv) == 4:
+                    assert numpy.fabs(ey[ii,1]) < 10.**-10., 'vR is not zero at peri- or apocenter events'
+        if len(vxvv) == 6:
+            assert numpy.fabs(o.zmax()-of.zmax()) < 10.**-6., 'zmax from events does not agree with that from a finely-sampled orbit'
+        # Events only for dopr54_c
+        try:
+            o.integrate(ts,pot,method='symplec4_c',events=events)
+        except NotImplementedError: pass
+        else: raise AssertionError('Integrating with events with a method other than dopr54_c does not raise NotImplementedError')
+    # Escape: stop the integration when the orbit reaches r=2
+    o= Orbit([1.,0.,1.3,0.,0.5,0.])
+    o.integrate(ts,pot,method='dopr54_c',events=[('escape',2.)])
+    et, ey= o.getEvents('escape')
+    assert len(et) == 1, 'Escape event not found'
+    assert numpy.fabs(numpy.sqrt(ey[0,0]**2.+ey[0,3]**2.)-2.) < 10.**-10., 'Escape event does not happen at the requested radius'
+    assert numpy.all(numpy.isnan(o.R(ts[ts > et[0]]))), 'Orbit after an escape event is not NaN'
+    assert numpy.fabs(o.rap()-2.) < 10.**-10., 'Apocenter of escaping orbit is not the escape radius'
+    of= Orbit([1.,0.,1.3,0.,0.5,0.])
+    of.integrate(numpy.linspace(0.,et[0],1001),pot,method='dopr54_c')
+    assert numpy.fabs(of.r(et[0])-2.) < 10.**-6., 'Escape event time does not agree with the time at which the orbit reaches the escape radius'
+    try:
+        o.getEvents('pericenter')
+    except ValueError: pass
+    else: raise AssertionError('Orbit.getEvents for an event that was not searched for does not raise ValueError')
+    return None
+
+def test_orbit_dop853_bulirschstoer():
+    from galpy.orbit import Orbit
+    pot= potential.MWPotential2014
+    ts= numpy.linspace(0.,100.,101)
+    for vxvv in [[1.,0.1,1.1,0.1,0.,0.],[1.,0.1,1.1,0.1,0.],
+                 [1.,0.1,1.1,0.]]:
+        o= Orbit(vxvv)
+        o.integrate(ts,pot,method='dopr54_c')
+        for method in ['dop853_c','bulirschstoer_c']:
+            om= Orbit(vxvv)
+            om.integrate(ts,pot,method=method)
+            assert numpy.amax(numpy.fabs(om.getOrbit()-o.getOrbit())) < 10.**-5., 'Orbit integrated with %s does not agree with that integrated with dopr54_c' % method
+            assert numpy.amax(numpy.fabs(om.E(ts)/om.E(0.)-1.)) < 10.**-8., 'Energy is not conserved when integrating with %s' % method
+    # Also for the phase-space volume
+    dxdv= numpy.array([10.**-4.,0.,0.,0.])
+    o= Orbit([1.,0.1,1.1,0.])
+    o.integrate_dxdv(dxdv,ts,pot,method='dopr54_c')
+    for method in ['dop853_c','bulirschstoer_c']:
+        om= Orbit([1.,0.1,1.1,0.])
+        om.integrate_dxdv(dxdv,ts,pot,method=method)
+        assert numpy.amax(numpy.fabs(om.getOrbit_dxdv()-o.getOrbit_dxdv())) < 10.**-8., 'Phase-space volume integrated with %s does not agree with that integrated with dopr54_c' % method
+    return None
+
+def test_orbit_integration_stats():
+    from galpy.orbit import Orbit
+    from galpy.orbit_src.Orbits import Orbits
+    pot= potential.MWPotential2014
+    ts= numpy.linspace(0.,10.,101)
+    # Fixed-step integrator: 4 force evaluations per step, all accepted
+    o= Orbit([1.,0.1,1.1,0.1,0.,0.])
+    stats= o.integrate(ts,pot,method='rk4_c',dt=0.01,stats=True)
+    assert stats.naccept == 1000, 'Number of steps of rk4_c is not len(t)*nsubsteps'
+    assert stats.nfev == 4*stats.naccept, 'Number of force evaluations of rk4_c is not 4 x number of steps'
+    assert stats.nreject == 0, 'Fixed-step integrator rk4_c rejects steps'
+    assert numpy.fabs(stats.dt-0.01) < 10.**-10. and stats.nsubsteps == 10, 'Step size of rk4_c is not the one that was given'
+    assert stats.time > 0. and stats.drift < 10.**-8., 'Wall time or energy drift of rk4_c are not as expected'
+    assert o.integrate(ts,pot,method='rk4_c') is None, 'Orbit.integrate does not return None when stats=False'
+    # Adaptive integrators
+    for vxvv in [[1.,0.1,1.1,0.1,0.,0.],[1.,0.1,1.1,0.1,0.],
+                 [1.,0.1,1.1,0.],[1.,0.1,1.1]]:
+        for method in ['dopr54_c','dop853_c','bulirschstoer_c']:
+            o= Orbit(vxvv)
+            stats= o.integrate(ts,pot,method=method,stats=True)
+            assert stats.nfev > stats.naccept > 0, 'Number of force evaluations and steps of %s are not as expected' % method
+            assert stats.nreject >= 0, 'Number of rejected steps of %s is negative' % method
+            assert stats.drift < 10.**-8., 'Energy drift reported for %s is too large' % method
+    # Python integrators only report the method, time, and drift
+    o= Orbit([1.,0.1,1.1,0.1,0.,0.])
+    stats= o.integrate(ts,pot,method='odeint',stats=True)
+    assert stats.nfev is None and stats.naccept is None, 'Python integrator reports force evaluations'
+    assert stats.drift < 10.**-6., 'Energy drift reported for odeint is too large'
+    # Potentials with a pattern speed report the drift in the Jacobi integral
+    bpot= [potential.LogarithmicHaloPotential(normalize=1.),
+           potential.DehnenBarPotential(tform=-100.,tsteady=0.)]
+    o= Orbit([1.,0.1,1.1,0.])
+    stats= o.integrate(ts,bpot,method='dopr54_c',stats=True)
+    assert stats.drift < 10.**-8., 'Jacobi drift reported for a barred potential is too large'
+    assert numpy.fabs(stats.drift-numpy.amax(numpy.fabs(o.Jacobi(ts)/o.Jacobi(0.)-1.))) < 10.**-10., 'Jacobi drift reported for a barred potential is not the drift in the Jacobi integral'
+    # Integrating in chunks sums the statistics
+    o= Orbit([1.,0.1,1.1,0.1,0.,0.])
+    stats= o.integrate(ts,pot,method='rk4_c',dt=0.01,stats=True,
+                       out=numpy.empty((len(ts),6)),chunksize=21)
+    assert stats.naccept == 1000 and stats.nfev == 4000, 'Statistics of an integration in chunks are not summed correctly'
+    # Batched integration returns per-orbit statistics
+    os= Orbits([[1.,0.1,1.1,0.1,0.,0.],[1.2,0.1,1.,0.1,0.1,0.]])
+    stats= os.integrate(ts,pot,method='dopr54_c',stats=True,chunksize=40)
+    assert stats.nfev.shape == (2,) and stats.drift.shape == (2,), 'Orbits.integrate does not return per-orbit statistics'
+    for ii in range(2):
+        o= Orbit(list(os.vxvv[ii]))
+        ostats= o.integrate(ts,pot,method='dopr54_c',stats=True)
+        # Integrating in chunks re-estimates the step size for each chunk
+        assert numpy.fabs(stats.nfev[ii]/ostats.nfev-1.) < 0.1, 'Statistics of Orbits.integrate are inconsistent with those of Orbit.integrate'
+        assert numpy.fabs(ostats.drift-stats.drift[ii]) < 10.**-10., 'Energy drift of Orbits.integrate is inconsistent with that of Orbit.integrate'
+    return None
+
+# Test that orbits can be integrated in C concurrently from multiple threads
+def test_orbit_c_threads():
+    from multiprocessing.pool import ThreadPool
+    from galpy.orbit import Orbit
+    pot= potential.MWPotential2014
+    ts= numpy.linspace(0.,100.,1001)
+    vxvvs= [[1.+0.05*ii,0.1,1.1,0.1,0.,0.] for ii in range(8)]\
+        +[[1.+0.05*ii,0.1,1.1,0.] for ii in range(8)]
+    for method in ['leapfrog_c','symplec4_c','rk6_c','dopr54_c','dop853_c',
+                   'bulirschstoer_c']:
+        def _integrate(vxvv):
+            o= Orbit(vxvv)
+            o.integrate(ts,pot,method=method)
+            return o.getOrbit()
+        serial= [_integrate(vxvv) for vxvv in vxvvs]
+        pool= ThreadPool(4)
+        threaded= pool.map(_integrate,vxvvs)
+        pool.close()
+        pool.join()
+        for ii in range(len(vxvvs)):
+            assert numpy.all(serial[ii] == threaded[ii]), 'Orbit integrated with %s in a thread pool is different from that integrated serially' % method
+    return None
+
+def test_orbit_checkpoint_resume():
+    # Integrations that exceed their wall-clock budget should stop early and
+    # resuming them should give the same orbit as an uninterrupted integration
+    from galpy.orbit import Orbit
+    pot= potential.MWPotential2014
+    ts= numpy.linspace(0.,1000.,100001)
+    for vxvv in [[1.,0.1,1.1,0.1,0.,0.],[1.,0.1,1.1,0.1,0.],
+                 [1.,0.1,1.1,0.],[1.,0.1,1.1]]:
+        for method, dt in [('rk4_c',0.005),('dopr54_c',None)]:
+            o= Orbit(vxvv)
+            o.integrate(ts,pot,method=method,dt=dt)
+            assert o.getCheckpoint() is None, 'Orbit integration that completed has a checkpoint'
+            oc= Orbit(vxvv)
+            with pytest.warns(galpyWarning) as record:
+                oc.integrate(ts,pot,method=method,dt=dt,walltime=0.)
+            raisedWarning= False
+            for rec in record:
+                raisedWarning+= ('wall-clock budget was exceeded' in str(rec.message.args[0]))
+            assert raisedWarning, 'Orbit integration that exceeded its wall-clock budget did not raise a warning'
+            cp= oc.getCheckpoint()
+            assert not cp is None, 'Orbit integration that exceeded its wall-clock budget has no checkpoint'
+            assert len(oc.getOrbit()) < len(ts), 'Orbit integration that exceeded its wall-clock budget was not stopped early'
+            assert numpy.fabs(cp['t']-oc.time()[-1]) < 10.**-10., 'Checkpoint time is not the last time of the partial orbit'
+            oc.integrate_resume()
+            assert oc.getCheckpoint() is None, 'Resumed orbit integration has a checkpoint'
+            assert len(oc.getOrbit()) == len(ts), 'Resumed orbit integration does not cover all times'
+            assert numpy.amax(numpy.fabs(oc.getOrbit()-o.getOrbit())) < 10.**-8., 'Resumed orbit integration differs from an uninterrupted one for method %s' % method
+            with pytest.raises(RuntimeError) as excinfo:
+                oc.integrate_resume()
+    return None
+
+def test_orbit_dxdv_full():
+    # The deviation vector of a 3D orbit should match the difference between
+    # two nearby orbits
+    from galpy.orbit import Orbit
+    pot= potential.MWPotential2014
+    ts= numpy.linspace(0.,10.,101)
+    vxvv= [1.,0.1,1.1,0.1,0.05,0.]
+    eps= 10.**-7.
+    dxdv= numpy.array([eps,0.,0.,eps,0.,0.])
+    o0= Orbit(vxvv)
+    o0.integrate(ts,pot,method='dop853_c')
+    o1= Orbit(list(numpy.array(vxvv)+dxdv))
+    o1.integrate(ts,pot,method='dop853_c')
+    for method in ['dopr54_c','rk6_c','odeint']:
+        o= Orbit(vxvv)
+        o.integrate_dxdv(dxdv,ts,pot,method=method)
+        assert numpy.amax(numpy.fabs(o.getOrbit_dxdv()-(o1.getOrbit()-o0.getOrbit())))/eps < 10.**-3., 'Integrated 3D phase-space difference does not agree with the difference between nearby orbits for method %s' % method
+        assert numpy.amax(numpy.fabs(o.getOrbit()-o0.getOrbit())) < 10.**-6., 'Orbit integrated with integrate_dxdv does not agree with that integrated with integrate for method %s' % method
+    return None
+
+def test_orbit_lyapunov_megno():
+    # Regular orbits should have MEGNO ~ 2 and small Lyapunov exponents,
+    # chaotic orbits in a bar potential large ones
+    from galpy.orbit import Orbit, Orbits
+    lp= potential.LogarithmicHaloPotential(normalize=1.,q=0.9)
+    ts= numpy.linspace(0.,1000.,1001)
+    for method in ['dopr54_c','dop853_c']:
+        o= Orbit([1.,0.1,1.1,0.1,0.05,0.])
+        o.integrate_lyapunov(ts,lp,method=method)
+        assert numpy.fabs(o.megno()-2.) < 0.1, 'MEGNO of a regular orbit is not close to 2 for method %s' % method
+        assert o.lyapunov() < 0.01, 'Lyapunov exponent of a regular orbit is not small for method %s' % method
+    bp= [potential.LogarithmicHaloPotential(normalize=1.),
+         potential.DehnenBarPotential(alpha=0.05,tform=-100.,tsteady=1.)]
+    ts= numpy.linspace(0.,500.,501)
+    vxvvs= numpy.array([[1.,0.1,1.,0.05,0.,0.],[0.9,0.4,0.8,0.1,0.05,1.]])
+    os= Orbits(vxvvs)
+    os.integrate_lyapunov(ts,bp,method='dopr54_c')
+    assert os.megno()[0] < 3., 'MEGNO of a regular orbit in a bar potential is not small'
+    assert os.megno()[1] > 10., 'MEGNO of a chaotic orbit in a bar potential is not large'
+    assert os.lyapunov()[1] > 10.*os.lyapunov()[0], 'Lyapunov exponent of a chaotic orbit in a bar potential is not much larger than that of a regular orbit'
+    for ii in range(len(vxvvs)):
+        o= Orbit(vxvvs[ii])
+        o.integrate_lyapunov(ts,bp,method='dopr54_c')
+        assert numpy.fabs(o.lyapunov()-os.lyapunov()[ii]) < 10.**-10., 'Lyapunov exponent from Orbits.integrate_lyapunov differs from that from Orbit.integrate_lyapunov'
+        assert numpy.fabs(o.megno()-os.megno()[ii]) < 10.**-8., 'MEGNO from Orbits.integrate_lyapunov differs from that from Orbit.integrate_lyapunov'
+        assert numpy.amax(numpy.fabs(o.getOrbit()-os.getOrbit()[ii])) < 10.**-8., 'Orbit from Orbits.integrate_lyapunov differs from that from Orbit.integrate_lyapunov'
+    # Python fallback should agree with C for the regular orbit
+    o= Orbit([1.,0.1,1.1,0.1,0.05,0.])
+    o.integrate_lyapunov(ts,lp,method='odeint')
+    oc= Orbit([1.,0.1,1.1,0.1,0.05,0.])
+    oc.integrate_lyapunov(ts,lp,method='dopr54_c')
+    assert numpy.fabs(o.megno()-oc.megno()) < 0.1, 'MEGNO from odeint does not agree with that from dopr54_c'
+    with pytest.raises(NotImplementedError) as excinfo:
+        Orbit([1.,0.1,1.1,0.]).integrate_lyapunov(ts,lp)
+    return None
+
+# Test that the parsed form of potentials for the C code is cached and invalidated when the potential changes
+def test_orbitint_c_pot_cache():
+    from galpy.orbit import Orbit
+    from galpy.orbit_src.integrateFullOrbit import _parse_pot, \
+        _parse_pot_nocache
+    from galpy.orbit_src import integratePlanarOrbit
+    lp= potential.LogarithmicHaloPotential(normalize=1.,q=0.9)
+    mp= potential.MiyamotoNagaiPotential(normalize=0.2,a=0.5,b=0.05)
+    dp= potential.DehnenSmoothWrapperPotential(pot=mp,tform=-1.,tsteady=2.)
+    pot= [lp,mp,dp]
+    npot, pot_type, pot_args= _parse_pot(pot)
+    npot_nc, pot_type_nc, pot_args_nc= _parse_pot_nocache(pot)
+    assert npot == npot_nc, 'Cached parse of the potential for C does not agree with the direct parse'
+    assert numpy.all(pot_type == pot_type_nc), 'Cached parse of the potential for C does not agree with the direct parse'
+    assert numpy.all(pot_args == pot_args_nc), 'Cached parse of the potential for C does not agree with the direct parse'
+    assert _parse_pot(lp)[2] is _parse_pot(lp)[2], 'Parse of the potential for C is not cached'
+    assert _parse_pot([lp,mp])[2] is _parse_pot([lp,mp])[2], 'Parse of a list of potentials for C is not cached'
+    # Evaluating the potential should not invalidate the cache
+    pot_args= _parse_pot(lp)[2]
+    potential.evaluateRforces(lp,1.,0.1)
+    assert _parse_pot(lp)[2] is pot_args, 'Parse of the potential for C is invalidated by evaluating the potential'
+    # Changing the potential should invalidate the cache
+    o= Orbit([1.,0.1,1.1,0.1,0.,0.])
+    ts= numpy.linspace(0.,10.,101)
+    o.integrate(ts,pot,method='dop853_c')
+    R_before= o.R(ts[-1])
+    lp._amp*= 1.5
+    mp._amp*= 0.5
+    assert numpy.fabs(_parse_pot(lp)[2][0]-1.5*pot_args[0]) < 10.**-10., 'Parse of the potential for C is not invalidated when the potential changes'
+    o.integrate(ts,pot,method='dop853_c')
+    assert numpy.fabs(o.R(ts[-1])-R_before) > 10.**-3., 'Orbit integration does not change after changing the potential'
+    assert numpy.all(_parse_pot(pot)[2] == _parse_pot_nocache(pot)[2]), 'Cached parse of the potential for C does not agree with the direct parse after changing the potential'
+    op= Orbit([1.,0.1,1.1,0.])
+    op.integrate(ts,lp,method='dop853_c')
+    R_before= op.R(ts[-1])
+    lp._amp/= 1.5
+    assert numpy.all(integratePlanarOrbit._parse_pot(potential.toPlanarPotential(lp))[2] == integratePlanarOrbit._parse_pot_nocache(potential.toPlanarPotential(lp))[2]), 'Cached parse of the planar potential for C does not agree with the direct parse after changing the potential'
+    op.integrate(ts,lp,method='dop853_c')
+    assert numpy.fabs(op.R(ts[-1])-R_before) > 10.**-3., 'Planar orbit integration does not change after changing the potential'
+    return None
+
+# Test that Orbits integrates orbits in potentials that are not implemented in C in lockstep in Python
+def test_orbits_integrate_python_ensemble():
+    from galpy.orbit import Orbits
+    from galpy.orbit_src.FullOrbit import _integrateFullOrbit
+    from galpy.orbit_src.planarOrbit import _integrateOrbit
+    tp= potential.TwoPowerSphericalPotential(normalize=1.,alpha=1.5,beta=3.5)
+    numpy.random.seed(1)
+    vxvv= numpy.array([numpy.random.uniform(0.8,1.2,6),
+                       numpy.random.normal(0.,0.1,6),
+                       numpy.random.normal(1.,0.1,6),
+                       numpy.random.normal(0.,0.05,6),
+                       numpy.random.normal(0.,0.05,6),
+                       numpy.random.uniform(0.,6.,6)]).T
+    ts= numpy.linspace(0.,10.,101)
+    ref= numpy.array([_integrateFullOrbit(v,tp,ts,'odeint',None) for v in vxvv])
+    for method, tol in zip(['dopr54_c','leapfrog','symplec4_c','rk4_c'],
+                           [10.**-5.,10.**-3.,10.**-4.,10.**-3.]):
+        os= Orbits(vxvv)
+        stats= os.integrate(ts,tp,method=method,stats=True)
+        assert not stats.nfev is None, 'Orbits.integrate does not use the vectorized Python integrators for a potential that is not implemented in C'
+        assert numpy.all(numpy.fabs(os.orbit[...,:5]-ref[...,:5]) < tol), 'Orbits.integrate with the vectorized Python integrators does not agree with integrating the orbits one by one for method %s' % method
+        assert numpy.all(numpy.fabs(numpy.cos(os.orbit[...,5])-numpy.cos(ref[...,5])) < tol), 'Orbits.integrate with the vectorized Python integrators does not agree with integrating the orbits one by one for method %s' % method
+    # Planar
+    ptp= potential.toPlanarPotential(tp)
+    ref= numpy.array([_integrateOrbit(v,ptp,ts,'odeint',None)[0]
+                      for v in vxvv[:,[0,1,2,5]]])
+    os= Orbits(vxvv[:,[0,1,2,5]])
+    stats= os.integrate(ts,tp,method='dopr54_c',stats=True)
+    assert not stats.nfev is None, 'Orbits.integrate does not use the vectorized Python integrators for a potential that is not implemented in C'
+    assert numpy.all(numpy.fabs(os.orbit[...,:3]-ref[...,:3]) < 10.**-5.), 'Orbits.integrate with the vectorized Python integrators does not agree with integrating the orbits one by one for planar orbits'
+    # Potentials that cannot be evaluated for all orbits at once are
+    # integrated one by one
+    fp= potential.FerrersPotential(normalize=1.,a=1.,b=0.5,c=0.3)
+    fp.hasC= False # use the Python implementation
+    ts= numpy.linspace(0.,0.5,3)
+    os= Orbits(vxvv[:2])
+    stats= os.integrate(ts,fp,method='dopr54_c',stats=True)
+    assert stats.nfev is None, 'Orbits.integrate does not fall back to integrating the orbits one by one for a potential that cannot be evaluated for all orbits at once'
+    ref= numpy.array([_integrateFullOrbit(v,fp,ts,'odeint',None)
+                      for v in vxvv[:2]])
+    assert numpy.all(numpy.fabs(os.orbit[...,:5]-ref[...,:5]) < 10.**-8.), 'Orbits.integrate for a potential that cannot be evaluated for all orbits at once does not agree with integrating the orbits one by one'
+    return None
+
+# Test that the vectorized Python dopr54 integrator stops for orbits whose
+# force becomes non-finite instead of looping forever
+def test_orbits_integrate_python_ensemble_nonfinite():
+    from galpy.orbit_src.integrateEnsemble import integrateFullOrbits_py, \
+        integratePlanarOrbits_py
+    class nanLogPot(potential.LogarithmicHaloPotential):
+        def _Rforce(self,R,z,phi=0.,t=0.):
+            out= potential.LogarithmicHaloPotential._Rforce(self,R,z,
+                                                             phi=phi,t=t)
+            if t > 0.5: return out*numpy.nan # all orbits fail at t > 0.5
+            return numpy.where(R > 1.5,numpy.nan,out)
+    nlp= nanLogPot(normalize=1.)
+    ts= numpy.linspace(0.,1.,11)
+    # One orbit that stays inside R=1.5, one that leaves it before t=0.5
+    yo= numpy.array([[1.,0.,0.,0.,1.,0.],[1.45,0.,0.,1.,1.,0.]])
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter("always",galpyWarning)
+        out, stats= integrateFullOrbits_py(nlp,yo,ts,'dopr54')
+    assert len(w) >= 2, 'dopr54 failure did not raise a galpyWarning'
+    assert numpy.all(numpy.isfinite(out[0,ts <= 0.5])), 'Orbit with a finite force is not integrated when another orbit fails'
+    assert numpy.all(numpy.isnan(out[0,ts > 0.5])), 'Orbit with a non-finite force is not set to NaN'
+    assert numpy.all(numpy.isnan(out[1,ts >= 0.2])), 'Orbit with a non-finite force is not set to NaN'
+    assert numpy.all(numpy.isfinite(out[1,0])), 'Initial condition of a failed orbit is changed'
+    # Planar
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter("always",galpyWarning)
+        out, stats= integratePlanarOrbits_py(nlp.toPlanar(),yo[:,[0,1,3,4]],
+                                             ts,'dopr54')
+    assert numpy.all(numpy.isfinite(out[0,ts <= 0.5])), 'Orbit with a finite force is not integrated when another orbit fails'
+    assert numpy.all(numpy.isnan(out[:,ts > 0.5])), 'Orbit with a non-finite force is not set to NaN'
+    return None
+
+# Test that the C implementation of FerrersPotential agrees with the Python one
+def test_orbitint_ferrers_c():
+    from galpy.orbit import Orbit
+    fp= potential.FerrersPotential(normalize=1.,a=1.,b=0.5,c=0.3,
+                                   omegab=0.8,pa=0.3)
+    ts= numpy.linspace(0.,2.,11)
+    for vxvv in [[0.8,0.1,0.9,0.1,0.05,0.3],[1.5,0.2,1.,0.2,0.1,1.]]:
+        o= Orbit(vxvv)
+        oc= Orbit(vxvv)
+        o.integrate(ts,fp,method='odeint')
+        oc.integrate(ts,fp,method='dopr54_c')
+        assert numpy.all(numpy.fabs(o.x(ts)-oc.x(ts)) < 10.**-5.), 'C integration of an orbit in FerrersPotential does not agree with the Python integration'
+        assert numpy.all(numpy.fabs(o.y(ts)-oc.y(ts)) < 10.**-5.), 'C integration of an orbit in FerrersPotential does not agree with the Python integration'
+        assert numpy.all(numpy.fabs(o.z(ts)-oc.z(ts)) < 10.**-5.), 'C integration of an orbit in FerrersPotential does not agree with the Python integration'
+        assert numpy.all(numpy.fabs(o.vR(ts)-oc.vR(ts)) < 10.**-5.), 'C integration of an orbit in FerrersPotential does not agree with the Python integration'
+        # Planar, which also tests the second derivatives
+        o= Orbit([vxvv[0],vxvv[1],vxvv[2],vxvv[5]])
+        oc= Orbit([vxvv[0],vxvv[1],vxvv[2],vxvv[5]])
+        o.integrate_dxdv([1.,0.,0.,0.],ts,fp,method='odeint',
+                         rectIn=True,rectOut=True)
+        oc.integrate_dxdv([1.,0.,0.,0.],ts,fp,method='dopr54_c',
+                          rectIn=True,rectOut=True)
+        assert numpy.all(numpy.fabs(o.x(ts)-oc.x(ts)) < 10.**-5.), 'C integration of a planar orbit in FerrersPotential does not agree with the Python integration'
+        assert numpy.all(numpy.fabs(o.getOrbit_dxdv()-oc.getOrbit_dxdv()) < 10.**-5.), 'C integration of the phase-space volume in FerrersPotential does not agree with the Python integration'
+    return None
+
+# Test that the C implementation of MovingObjectPotential agrees with the Python one, for several moving objects whose orbits are evaluated using splines or the dense output of the integrator
+def test_orbitint_movingobject_c():
+    from galpy.orbit import Orbit
+    lp= potential.LogarithmicHaloPotential(normalize=1.,q=0.9)
+    ts= numpy.linspace(0.,3.,301)
+    o1= Orbit([1.,0.1,1.1,0.1,0.,0.])
+    o1.integrate(ts,lp,method='leapfrog') # no dense output: splines
+    o2= Orbit([1.2,-0.1,0.9,0.,0.1,2.])
+    o2.integrate(ts,lp,method='dopr54_c',dense=True) # dense output
+    mp1= potential.MovingObjectPotential(o1,GM=0.05,softening_length=0.1)
+    mp2= potential.MovingObjectPotential(o2,GM=0.03,
+                                         softening=potential.PlummerSoftening(softening_length=0.2))
+    assert mp1.hasC and mp2.hasC, 'MovingObjectPotential with Plummer softening does not have a C implementation'
+    pot= [lp,mp1,mp2]
+    ts= numpy.linspace(0.,2.5,51)
+    o= Orbit([1.05,0.1,1.,0.05,0.1,0.1])
+    oc= Orbit([1.05,0.1,1.,0.05,0.1,0.1])
+    o.integrate(ts,pot,method='odeint')
+    oc.integrate(ts,pot,method='dopr54_c')
+    assert numpy.all(numpy.fabs(o.getOrbit()[:,:5]-oc.getOrbit()[:,:5]) < 10.**-5.), 'C integration of an orbit in MovingObjectPotential does not agree with the Python integration'
+    # Planar
+    o= Orbit([1.05,0.1,1.,0.1])
+    oc= Orbit([1.05,0.1,1.,0.1])
+    o.integrate(ts,pot,method='odeint')
+    oc.integrate(ts,pot,method='dopr54_c')
+    assert numpy.all(numpy.fabs(o.getOrbit()[:,:3]-oc.getOrbit()[:,:3]) < 10.**-5.), 'C integration of a planar orbit in MovingObjectPotential does not agree with the Python integration'
+    # Outside of the integrated range of the objects' orbits, like in Python
+    for vxvv in [[1.05,0.1,1.,0.05,0.1,0.1],[1.05,0.1,1.,0.1]]:
+        for thispot in [pot,[lp,mp2],
+                        potential.DehnenSmoothWrapperPotential(pot=[lp,mp1])]:
+            oc= Orbit(vxvv)
+            try:
+                oc.integrate(numpy.linspace(0.,4.,51),thispot,
+                             method='dopr54_c')
+            except ValueError: pass
+            else: raise AssertionError('C integration of an orbit in MovingObjectPotential outside of the integrated range of the object does not raise ValueError')
+    return None
+
+# Test that re-integrating the orbit of a MovingObjectPotential's object
+# changes the potential used by the C integrators, like it does in Python
+def test_orbitint_movingobject_c_reintegrate():
+    from galpy.orbit import Orbit
+    lp= potential.LogarithmicHaloPotential(normalize=1.,q=0.9)
+    ts= numpy.linspace(0.,3.,301)
+    op= Orbit([1.,0.1,1.1,0.1,0.,0.])
+    op.integrate(ts,lp,method='dopr54_c')
+    mp= potential.MovingObjectPotential(op,GM=0.05,softening_length=0.1)
+    ts= numpy.linspace(0.,2.5,51)
+    for vxvv in [[1.05,0.1,1.,0.05,0.1,0.1],[1.05,0.1,1.,0.1]]:
+        o1= Orbit(vxvv)
+        o1.integrate(ts,[lp,mp],method='dopr54_c')
+        # Re-integrate the object's orbit in a different potential
+        mp._orb.integrate(numpy.linspace(0.,3.,301),
+                          potential.LogarithmicHaloPotential(normalize=0.8),
+                          method='dopr54_c')
+        o2= Orbit(vxvv)
+        o2.integrate(ts,[lp,mp],method='dopr54_c')
+        o3= Orbit(vxvv)
+        o3.integrate(ts,[lp,potential.MovingObjectPotential(mp._orb,GM=0.05,
+                                                          softening_length=0.1)],
+                     method='dopr54_c')
+        assert numpy.amax(numpy.fabs(o1.getOrbit()-o2.getOrbit())) > 10.**-4., 'C integration in a MovingObjectPotential does not change when the orbit of the object is re-integrated'
+        assert numpy.all(numpy.fabs(o2.getOrbit()-o3.getOrbit()) < 10.**-10.), 'C integration in a MovingObjectPotential after re-integrating the orbit of the object does not agree with a new MovingObjectPotential'
+        # Restore the original orbit of the object
+        mp._orb.integrate(numpy.linspace(0.,3.,301),lp,method='dopr54_c')
+    return None
+
+# Test that the C integration of linear orbits agrees with the Python integration, for KGPotential and vertical potentials of 3D potentials, and for many orbits at once
+def test_orbitint_linear_c():
+    from galpy.orbit import Orbit
+    from galpy.orbit_src.integrateLinearOrbit import integrateLinearOrbit_c
+    kp= potential.KGPotential(K=1.,F=0.05,D=0.2)
+    vp= potential.RZToverticalPotential(potential.MWPotential2014,1.1)
+    dp= potential.DehnenSmoothWrapperPotential(\
+        pot=potential.MiyamotoNagaiPotential(amp=0.1,a=0.5,b=0.1),
+        tform=1.,tsteady=3.)
+    assert kp.hasC, 'KGPotential does not have a C implementation'
+    assert numpy.all([p.hasC for p in vp]), 'verticalPotential of a potential with a C implementation does not have a C implementation'
+    ts= numpy.linspace(0.,10.,101)
+    for pot in [kp,vp,[kp,potential.RZToverticalPotential(dp,1.)]]:
+        o= Orbit([0.1,0.2])
+        o.integrate(ts,pot,method='odeint')
+        for method in ['symplec4_c','rk6_c','dopr54_c','dop853_c']:
+            oc= Orbit([0.1,0.2])
+            oc.integrate(ts,pot,method=method)
+            assert numpy.all(numpy.fabs(o.getOrbit()-oc.getOrbit()) < 10.**-5.), 'C integration of a linear orbit with method %s does not agree with the Python integration' % method
+    # Many orbits at once
+    vxvv= numpy.array([[0.1,0.2],[-0.05,0.1],[0.2,-0.3]])
+    out, err= integrateLinearOrbit_c(vp,vxvv,ts,'dopr54_c')
+    for ii in range(len(vxvv)):
+        o= Orbit(vxvv[ii])
+        o.integrate(ts,vp,method='dopr54_c')
+        assert numpy.all(numpy.fabs(out[ii]-o.getOrbit()) < 10.**-10.), 'Integrating many linear orbits at once does not agree with integrating them one by one'
+    return None
+
+# Test that orbits integrated in C in an interp3DPotential agree with those in the original, non-axisymmetric potential
+def test_orbitint_interp3dpotential():
+    from galpy.orbit import Orbit
+    pot= [potential.MiyamotoNagaiPotential(normalize=1.,a=0.5,b=0.3),
+          potential.SoftenedNeedleBarPotential(amp=0.3,a=0.7,b=0.1,c=0.3,
+                                               omegab=0.,pa=0.05)]
+    # Cylindrical grid with a two-fold azimuthal symmetry and a Cartesian grid
+    # mirrored in all three directions (for a triaxial potential)
+    tpot= [potential.MiyamotoNagaiPotential(normalize=0.5,a=0.5,b=0.3),
+           potential.TriaxialNFWPotential(normalize=0.5,a=2.,b=0.8,c=0.9)]
+    pots= [pot,tpot]
+    ips= [potential.interp3DPotential(pot,Rgrid=(0.2,2.,61),nphi=64,symm=2,
+                                      zgrid=(0.,0.5,41)),
+          potential.interp3DPotential(tpot,xgrid=(0.,2.,41),
+                                      ygrid=(0.,2.,41),zgrid=(0.,0.5,21),
+                                      xsym=True,ysym=True)]
+    Rs= numpy.array([0.5,1.,1.5])
+    zs= numpy.array([0.1,-0.2,0.3])
+    phis= numpy.array([0.3,2.,-1.])
+    for pot,ip in zip(pots,ips):
+        assert ip.hasC and ip.isNonAxi, 'interp3DPotential does not have a C implementation or is not non-axisymmetric'
+        for func, evalfunc in zip(['__call__','Rforce','zforce','phiforce'],
+                                  [potential.evaluatePotentials,
+                                   potential.evaluateRforces,
+                                   potential.evaluatezforces,
+                                   potential.evaluatephiforces]):
+            ftrue= numpy.array([evalfunc(pot,R,z,phi=phi)
+                                for R,z,phi in zip(Rs,zs,phis)])
+            assert numpy.all(numpy.fabs(getattr(ip,func)(Rs,zs,phi=phis)-ftrue) < 10.**-3.), 'interp3DPotential does not interpolate the %s well' % func
+            # Interpolation in Python and in C agree
+            ip._enable_c= False
+            fpy= getattr(ip,func)(Rs,zs,phi=phis)
+            ip._enable_c= True
+            assert numpy.all(numpy.fabs(getattr(ip,func)(Rs,zs,phi=phis)-fpy) < 10.**-12.), 'interp3DPotential interpolation in Python and in C do not agree'
+        # Outside of the grid, the original potential is used
+        assert numpy.fabs(ip(3.,0.1,phi=0.5)-potential.evaluatePotentials(pot,3.,0.1,phi=0.5)) < 10.**-10., 'interp3DPotential does not use the original potential outside of the grid'
+        ts= numpy.linspace(0.,10.,101)
+        for vxvv in [[1.,0.1,1.1,0.1,0.05,0.],[1.,0.1,1.1,0.]]:
+            o= Orbit(vxvv)
+            oi= Orbit(vxvv)
+            o.integrate(ts,pot,method='dopr54_c')
+            oi.integrate(ts,ip,method='dopr54_c')
+            assert numpy.all(numpy.fabs(o.getOrbit()-oi.getOrbit()) < 10.**-3.), 'Orbit integrated in C in an interp3DPotential does not agree with the same orbit in the original potential'
+    # The grid calculated in C agrees with that calculated in Python
+    ippy= potential.interp3DPotential(tpot,xgrid=(0.,2.,11),ygrid=(0.,2.,11),
+                                      zgrid=(0.,0.5,6),xsym=True,ysym=True,
+                                      use_c=False)
+    ipc= potential.interp3DPotential(tpot,xgrid=(0.,2.,11),ygrid=(0.,2.,11),
+                                     zgrid=(0.,0.5,6),xsym=True,ysym=True)
+    assert numpy.all(numpy.fabs(ipc._grid-ippy._grid) < 10.**-10.), 'interp3DPotential grid calculated in C does not agree with that calculated in Python'
+    # Bad grids raise errors
+    try:
+        potential.interp3DPotential(pot,order=2)
+    except ValueError: pass
+    else: raise AssertionError('interp3DPotential with order=2 did not raise ValueError')
+    try:
+        potential.interp3DPotential(pot,zgrid=(-1.,1.,21))
+    except ValueError: pass
+    else: raise AssertionError('interp3DPotential with a mirrored z grid that does not start at zero did not raise ValueError')
+    return None
+
+# Test that a CallbackPotential given by compiled functions is integrated in C and agrees with the equivalent galpy potential
+def test_orbitint_callbackpotential():
+    import ctypes
+    from galpy.orbit import Orbit
+    # Plummer potential with b=0.5 as ctypes callbacks
+    functype= ctypes.CFUNCTYPE(ctypes.c_double,ctypes.c_double,
+                               ctypes.c_double,ctypes.c_double,
+                               ctypes.c_double)
+    b2= 0.25
+    pot_func= functype(lambda R,z,phi,t: -1./numpy.sqrt(R**2.+z**2.+b2))
+    Rforce_func= functype(lambda R,z,phi,t: -R/(R**2.+z**2.+b2)**1.5)
+    zforce_func= functype(lambda R,z,phi,t: -z/(R**2.+z**2.+b2)**1.5)
+    R2deriv_func= functype(lambda R,z,phi,t: \
+                               (z**2.+b2-2.*R**2.)/(R**2.+z**2.+b2)**2.5)
+    cp= potential.CallbackPotential(potential=pot_func,Rforce=Rforce_func,
+                                    zforce=zforce_func,R2deriv=R2deriv_func,
+                                    amp=2.)
+    pp= potential.PlummerPotential(amp=2.,b=0.5)
+    assert cp.hasC and cp.hasC_dxdv, 'CallbackPotential does not have a C implementation'
+    assert numpy.fabs(cp(1.,0.1)-pp(1.,0.1)) < 10.**-10., 'CallbackPotential does not evaluate the potential correctly'
+    assert numpy.all(numpy.fabs(cp.Rforce(numpy.array([0.5,1.]),0.1)-pp.Rforce(numpy.array([0.5,1.]),0.1)) < 10.**-10.), 'CallbackPotential does not evaluate the radial force correctly'
+    assert numpy.fabs(cp.phiforce(1.,0.1,phi=1.)) < 10.**-10., 'CallbackPotential without phiforce has non-zero phiforce'
+    ts= numpy.linspace(0.,10.,101)
+    for vxvv in [[1.,0.1,1.1,0.1,0.2,0.],[1.,0.1,1.1,0.]]:
+        o= Orbit(vxvv)
+        oc= Orbit(vxvv)
+        o.integrate(ts,pp,method='dopr54_c')
+        oc.integrate(ts,cp,method='dopr54_c')
+        assert numpy.all(numpy.fabs(o.getOrbit()-oc.getOrbit()) < 10.**-8.), 'Orbit integrated in C in a CallbackPotential does not agree with the same orbit in the equivalent galpy potential'
+    # Phase-space volume
+    o= Orbit([1.,0.1,1.1,0.])
+    oc= Orbit([1.,0.1,1.1,0.])
+    o.integrate_dxdv([1.,0.,0.,0.],ts,pp,method='dopr54_c')
+    oc.integrate_dxdv([1.,0.,0.,0.],ts,cp,method='dopr54_c')
+    assert numpy.all(numpy.fabs(o.getOrbit_dxdv()-oc.getOrbit_dxdv()) < 10.**-8.), 'Phase-space volume integrated in C in a CallbackPotential does not agree with that in the equivalent galpy potential'
+    # Inputs that are not compiled functions raise errors
+    try:
+        potential.CallbackPotential(potential=lambda R,z,phi,t: 0.,
+                                    Rforce=Rforce_func,zforce=zforce_func)
+    except TypeError: pass
+    else: raise AssertionError('CallbackPotential with a Python function did not raise TypeError')
+    try:
+        potential.CallbackPotential(potential=pot_func,Rforce=Rforce_func)
+    except ValueError: pass
+    else: raise AssertionError('CallbackPotential without zforce did not raise ValueError')
+    return None
+
 def test_orbitint_pythonfallback():
     # Check if a warning is raised when the potential has no C integrator
     from galpy.orbit import Orbit
@@ -28,7 +28,8 @@ def test_normalize_potential():
     pots.append('specialMN3ExponentialDiskPotentialSECH')
     rmpots= ['Potential','MWPotential','MWPotential2014',
              'MovingObjectPotential',
-             'interpRZPotential', 'linearPotential', 'planarAxiPotential',
+             'interpRZPotential', 'interp3DPotential', 'CallbackPotential',
+             'linearPotential', 'planarAxiPotential',
              'planarPotential', 'verticalPotential','PotentialError',
              'SnapshotRZPotential','InterpSnapshotRZPotential']
     if False: #_TRAVIS: #travis CI
@@ -135,7 +136,8 @@ def test_forceAsDeriv_potential():
     pots.append('SolidBodyRotationSpiralArmsPotential')
     rmpots= ['Potential','MWPotential','MWPotential2014',
              'MovingObjectPotential',
-             'interpRZPotential', 'linearPotential', 'planarAxiPotential',
+             'interpRZPotential', 'interp3DPotential', 'CallbackPotential',
+             'linearPotential', 'planarAxiPotential',
              'planarPotential', 'verticalPotential','PotentialError',
              'SnapshotRZPotential','InterpSnapshotRZPotential']
     if False: #_TRAVIS: #travis CI
@@ -294,7 +296,8 @@ def test_2ndDeriv_potential():
     pots.append('SolidBodyRotationSpiralArmsPotential')
     rmpots= ['Potential','MWPotential','MWPotential2014',
              'MovingObjectPotential',
-             'interpRZPotential', 'linearPotential', 'planarAxiPotential',
+             'interpRZPotential', 'interp3DPotential', 'CallbackPotential',
+             'linearPotential', 'planarAxiPotential',
              'planarPotential', 'verticalPotential','PotentialError',
              'SnapshotRZPotential','InterpSnapshotRZPotential']
     if False: #_TRAVIS: #travis CI
@@ -510,7 +513,8 @@ def test_poisson_potential():
     pots.append('SolidBodyRotationSpiralArmsPotential')
     rmpots= ['Potential','MWPotential','MWPotential2014',
              'MovingObjectPotential',
-             'interpRZPotential', 'linearPotential', 'planarAxiPotential',
+             'interpRZPotential', 'interp3DPotential', 'CallbackPotential',
+             'linearPotential', 'planarAxiPotential',
              'planarPotential', 'verticalPotential','PotentialError',
              'SnapshotRZPotential','InterpSnapshotRZPotential']
     if False: #_TRAVIS: #travis CI
@@ -623,7 +627,8 @@ def test_evaluateAndDerivs_potential():
     pots.append('mockDehnenSmoothBarPotentialTm5')
     rmpots= ['Potential','MWPotential','MWPotential2014',
              'MovingObjectPotential',
-             'interpRZPotential', 'linearPotential', 'planarAxiPotential',
+             'interpRZPotential', 'interp3DPotential', 'CallbackPotential',
+             'linearPotential', 'planarAxiPotential',
              'planarPotential', 'verticalPotential','PotentialError',
              'SnapshotRZPotential','InterpSnapshotRZPotential']
     if False: #_TRAVIS: #travis CI
@@ -868,7 +873,8 @@ def test_toVertical_toPlanar():
                and not 'evaluate' in p and not 'Wrapper' in p)]
     rmpots= ['Potential','MWPotential','MWPotential2014',
              'MovingObjectPotential',
-             'interpRZPotential', 'linearPotential', 'planarAxiPotential',
+             'interpRZPotential', 'interp3DPotential', 'CallbackPotential',
+             'linearPotential', 'planarAxiPotential',
              'planarPotential', 'verticalPotential','PotentialError',
              'SnapshotRZPotential','InterpSnapshotRZPotential']
     if False: #_TRAVIS: #travis CI
@@ -1920,7 +1926,6 @@ def test_vtermnegl_issue314():
     assert numpy.fabs(rp.vterm(0.5)+rp.vterm(-0.5)) < 10.**-8., 'vterm for negative l does not behave as expected'
     return None
 
-@pytest.mark.xfail
 def test_Ferrers_Rzderiv_issue319():
     # Test that the Rz derivative works for the FerrersPotential (issue 319)
      fp= potential.FerrersPotential(normalize=1.)
@@ -1931,6 +1936,131 @@ def test_Ferrers_Rzderiv_issue319():
      assert numpy.fabs(rzderiv-rzderiv_finitediff) < 10.**-8., 'Rzderiv for FerrersPotential does not agree with finite-difference calculation'
      return None
 
+def test_Ferrers_2ndderiv_rotated():
+    # Test that the second derivatives of a FerrersPotential with a non-zero
+    # position angle and pattern speed agree with the derivatives of the forces
+    fp= potential.FerrersPotential(normalize=1.,a=1.,b=0.5,c=0.3,
+                                   omegab=0.8,pa=0.3)
+    dx= 10.**-4.
+    for R,z,phi,t in [(0.8,0.1,0.3,0.),(0.5,-0.2,1.2,0.7),(1.5,0.2,2.5,1.3)]:
+        tR2deriv= -(fp.Rforce(R+dx,z,phi=phi,t=t)
+                    -fp.Rforce(R-dx,z,phi=phi,t=t))/2./dx
+        tRzderiv= -(fp.Rforce(R,z+dx,phi=phi,t=t)
+                    -fp.Rforce(R,z-dx,phi=phi,t=t))/2./dx
+        tphi2deriv= -(fp.phiforce(R,z,phi=phi+dx,t=t)
+                      -fp.phiforce(R,z,phi=phi-dx,t=t))/2./dx
+        tRphideriv= -(fp.Rforce(R,z,phi=phi+dx,t=t)
+                      -fp.Rforce(R,z,phi=phi-dx,t=t))/2./dx
+        assert numpy.fabs(fp.R2deriv(R,z,phi=phi,t=t)-tR2deriv) < 10.**-5., 'R2deriv of a rotated FerrersPotential does not agree with the derivative of Rforce'
+        assert numpy.fabs(fp.Rzderiv(R,z,phi=phi,t=t)-tRzderiv) < 10.**-5., 'Rzderiv of a rotated FerrersPotential does not agree with the derivative of Rforce'
+        assert numpy.fabs(fp.phi2deriv(R,z,phi=phi,t=t)-tphi2deriv) < 10.**-5., 'phi2deriv of a rotated FerrersPotential does not agree with the derivative of phiforce'
+        assert numpy.fabs(fp.Rphideriv(R,z,phi=phi,t=t)-tRphideriv) < 10.**-5., 'Rphideriv of a rotated FerrersPotential does not agree with the derivative of Rforce'
+    return None
+
+# Test that the bulk evaluation in C agrees with the Python evaluation
+def test_evaluate_c():
+    pots= [potential.MWPotential2014,
+           [potential.MiyamotoNagaiPotential(normalize=0.5,a=0.5,b=0.05),
+            potential.SoftenedNeedleBarPotential(amp=0.3,a=0.7,b=0.1,c=0.3,
+                                                 omegab=1.,pa=0.05),
+            potential.DehnenBarPotential()], # no potential in C
+           potential.TriaxialNFWPotential(normalize=1.,b=0.8,c=0.9),
+           potential.SpiralArmsPotential()] # potential only in Python
+    numpy.random.seed(1)
+    n= 21
+    Rs= numpy.random.uniform(0.1,2.,size=n)
+    zs= numpy.random.uniform(-1.,1.,size=n)
+    phis= numpy.random.uniform(0.,2.*numpy.pi,size=n)
+    ts= numpy.linspace(0.,3.,n)
+    for pot in pots:
+        for func, func_c in zip([potential.evaluatePotentials,
+                                 potential.evaluateRforces,
+                                 potential.evaluatezforces,
+                                 potential.evaluatephiforces],
+                                [potential.evaluatePotentials_c,
+                                 potential.evaluateRforces_c,
+                                 potential.evaluatezforces_c,
+                                 potential.evaluatephiforces_c]):
+            out= numpy.empty(n)
+            res= func_c(pot,Rs,zs,phi=phis,t=ts,out=out)
+            assert res is out, 'Bulk evaluation did not write into the given output array'
+            for ii in range(n):
+                assert numpy.fabs(out[ii]-func(pot,Rs[ii],zs[ii],phi=phis[ii],t=ts[ii])) < 10.**-10., 'Bulk evaluation of %s does not agree with the Python evaluation' % func.__name__
+    # Densities and second derivatives are evaluated in Python
+    for pot in [potential.MWPotential2014,
+                [potential.MiyamotoNagaiPotential(normalize=0.5,a=0.5,b=0.05),
+                 potential.SpiralArmsPotential()]]:
+        for func, func_c in zip([potential.evaluateDensities,
+                                 potential.evaluateR2derivs,
+                                 potential.evaluatez2derivs,
+                                 potential.evaluateRzderivs],
+                                [potential.evaluateDensities_c,
+                                 potential.evaluateR2derivs_c,
+                                 potential.evaluatez2derivs_c,
+                                 potential.evaluateRzderivs_c]):
+            out= numpy.empty(n)
+            res= func_c(pot,Rs,zs,phi=phis,t=ts,out=out)
+            assert res is out, 'Bulk evaluation did not write into the given output array'
+            for ii in range(n):
+                assert numpy.fabs(out[ii]-func(pot,Rs[ii],zs[ii],phi=phis[ii],t=ts[ii])) < 10.**-10., 'Bulk evaluation of %s does not agree with the Python evaluation' % func.__name__
+    # Scalar inputs are broadcast
+    assert potential.evaluateRforces_c(potential.MWPotential2014,
+                                       numpy.ones((3,4)),0.1).shape == (3,4), 'Bulk evaluation does not broadcast its inputs'
+    # Errors
+    try:
+        potential.evaluateRforces_c(potential.MWPotential2014,Rs,zs,
+                                    out=numpy.empty(n-1))
+    except ValueError: pass
+    else: raise AssertionError('Bulk evaluation with a wrong output array did not raise ValueError')
+    try:
+        potential.evaluateRforces_c(potential.SpiralArmsPotential(),Rs,zs)
+    except potential.PotentialError: pass
+    else: raise AssertionError('Bulk evaluation of a non-axisymmetric potential without phi did not raise PotentialError')
+    return None
+
+# Test that the raw functions without unit handling agree with the general
+# routines
+def test_evaluate_raw():
+    mp= potential.MiyamotoNagaiPotential(normalize=0.6,a=0.5,b=0.05,
+                                         ro=8.,vo=220.)
+    np= potential.NFWPotential(normalize=0.35,a=4.5,ro=8.,vo=220.)
+    bp= potential.DehnenBarPotential(ro=8.,vo=220.)
+    Rs= numpy.array([0.5,0.9,1.3])
+    zs= numpy.array([0.,0.1,-0.2])
+    for pot in [mp,[mp,np]]:
+        for func, func_raw in zip([potential.evaluatePotentials,
+                                   potential.evaluateRforces,
+                                   potential.evaluatezforces,
+                                   potential.evaluatephiforces,
+                                   potential.evaluateR2derivs,
+                                   potential.evaluatez2derivs,
+                                   potential.evaluateRzderivs],
+                                  [potential.evaluatePotentials_raw,
+                                   potential.evaluateRforces_raw,
+                                   potential.evaluatezforces_raw,
+                                   potential.evaluatephiforces_raw,
+                                   potential.evaluateR2derivs_raw,
+                                   potential.evaluatez2derivs_raw,
+                                   potential.evaluateRzderivs_raw]):
+            assert numpy.all(numpy.fabs(func(pot,Rs,zs,phi=0.3,t=1.,use_physical=False)-func_raw(pot,Rs,zs,phi=0.3,t=1.)) < 10.**-10.), 'Raw evaluation of %s does not agree with the general routine' % func.__name__
+        for func, func_raw in zip([potential.vcirc,potential.omegac,
+                                   potential.epifreq,potential.verticalfreq],
+                                  [potential.vcirc_raw,potential.omegac_raw,
+                                   potential.epifreq_raw,
+                                   potential.verticalfreq_raw]):
+            assert numpy.all(numpy.fabs(func(pot,Rs,use_physical=False)-func_raw(pot,Rs)) < 10.**-10.), 'Raw evaluation of %s does not agree with the general routine' % func.__name__
+    # Planar potentials and lists including them fall back onto the general
+    # routines
+    for pot in [mp.toPlanar(),[mp.toPlanar(),bp]]:
+        assert numpy.fabs(potential.vcirc(pot,0.9,phi=0.,use_physical=False)-potential.vcirc_raw(pot,0.9,phi=0.)) < 10.**-10., 'Raw evaluation of vcirc does not agree with the general routine for planar potentials'
+        assert numpy.fabs(potential.omegac(mp.toPlanar(),0.9,use_physical=False)-potential.omegac_raw(mp.toPlanar(),0.9)) < 10.**-10., 'Raw evaluation of omegac does not agree with the general routine for planar potentials'
+    # Non-axisymmetric lists require phi
+    try:
+        potential.evaluateRforces_raw([mp,bp],0.9,0.1)
+    except potential.PotentialError: pass
+    else: raise AssertionError('Raw evaluation of a non-axisymmetric potential without phi did not raise PotentialError')
+    return None
+
 def test_plotting():
     import tempfile
     #Some tests of the plotting routines, to make sure they don't fail
@@ -366,8 +366,89 @@ def test_phiforceMatches_nfw():
     assertmsg = "Comparing the azimuth force of NFW Potential with SCF fails at R={0}, Z={1}, phi={2}"
     compareFunctions(nfw.phiforce,scf.phiforce, assertmsg)
  
+## Tests whether the coefficients computed from N-body particles drawn from a Hernquist profile reduce to the Hernquist coefficients within their variance
+def test_scf_compute_nbody_hernquist():
+    numpy.random.seed(1)
+    pos= sample_hernquist(10000,a=2.)
+    Acos, Asin, Acos_var, Asin_var= \
+        potential.scf_compute_coeffs_nbody(pos,5,4,mass=1./pos.shape[1],
+                                           a=2.,variance=True)
+    # Total mass of 1 is twice the mass of the amp=1 Hernquist potential
+    Acos[0,0,0]-= 2.
+    assert numpy.all(numpy.fabs(Acos) <= 5.*numpy.sqrt(Acos_var)+EPS), \
+        "Coefficients computed from Hernquist particles do not agree with the Hernquist coefficients within their variance"
+    assert numpy.all(numpy.fabs(Asin) <= 5.*numpy.sqrt(Asin_var)+EPS), \
+        "Coefficients computed from Hernquist particles do not agree with the Hernquist coefficients within their variance"
+    # Can be given directly to SCFPotential
+    Acos[0,0,0]+= 2.
+    scf= SCFPotential(Acos=Acos,Asin=Asin,a=2.)
+    hp= potential.HernquistPotential(amp=2.,a=2.)
+    for R,z,phi in zip([0.5,1.,2.],[0.,0.5,-1.],[0.,1.,4.]):
+        assert numpy.fabs((scf(R,z,phi)-hp(R,z))/hp(R,z)) < 0.02, "SCFPotential from N-body coefficients does not agree with the Hernquist potential"
+    # Coefficients with m > l vanish
+    assert numpy.all(Acos_var[:,numpy.triu_indices(4,1)[0],numpy.triu_indices(4,1)[1]] == 0.), "Coefficients with m > l are not zero"
+    return None
+
+## Tests whether the N-body coefficients do not depend on how the particles are split into chunks and over cores
+def test_scf_compute_nbody_chunks():
+    numpy.random.seed(2)
+    pos= sample_hernquist(3000)*numpy.array([1.,.8,.6])[:,None]
+    mass= numpy.random.uniform(size=pos.shape[1])/pos.shape[1]
+    Acos, Asin= potential.scf_compute_coeffs_nbody(pos,4,3,mass=mass)
+    for chunksize,numcores in zip([500,1000],[1,2]):
+        Acos2, Asin2= potential.scf_compute_coeffs_nbody(pos,4,3,mass=mass,
+                                                         chunksize=chunksize,
+                                                         numcores=numcores)
+        assert numpy.all(numpy.fabs(Acos-Acos2) < 10.**-12.), "N-body coefficients depend on the chunk size or number of cores"
+        assert numpy.all(numpy.fabs(Asin-Asin2) < 10.**-12.), "N-body coefficients depend on the chunk size or number of cores"
+    return None
+
+## Tests whether the vectorized associated Legendre polynomials agree with scipy's lpmn
+def test_legendre_matches_lpmn():
+    from scipy.special import lpmn
+    from galpy.potential_src.SCFPotential import _legendre
+    x= numpy.array([-1.,-0.7,-0.2,0.,0.3,0.9,1.])
+    for L,M in [(1,1),(5,1),(6,3),(8,8)]:
+        PP, dPP= _legendre(x,L,M)
+        for ii in range(len(x)):
+            P, dP= lpmn(M-1,L-1,x[ii])
+            assert numpy.all(numpy.fabs(PP[:,:,ii]-P.T) < 10.**-10.), "Vectorized Legendre polynomials do not agree with lpmn"
+            if numpy.fabs(x[ii]) == 1.: continue # lpmn's dP/dx is infinite at the poles
+            dP= -dP.T*numpy.sqrt(1.-x[ii]**2.)
+            assert numpy.all(numpy.fabs(dPP[:,:,ii]-dP) <= 10.**-10.*numpy.amax(numpy.fabs(dP))), "Vectorized derivative of the Legendre polynomials does not agree with lpmn"
+    return None
+
+## Tests whether evaluating at arrays of points and caching the basis functions give the same result as evaluating at each point
+def test_cache_basis():
+    numpy.random.seed(4)
+    Acos= numpy.tril(numpy.random.normal(size=(6,4,4)))
+    Asin= numpy.tril(numpy.random.normal(size=(6,4,4)))
+    scf= SCFPotential(Acos=Acos,Asin=Asin,a=1.5)
+    scfc= SCFPotential(Acos=Acos,Asin=Asin,a=1.5,cache_basis=True)
+    R= numpy.random.uniform(0.1,2.,size=(4,5))
+    z= numpy.random.uniform(-1.,1.,size=(4,5))
+    phi= numpy.random.uniform(0.,2.*numpy.pi,size=(4,5))
+    for func in ['__call__','dens','Rforce','zforce','phiforce']:
+        single= numpy.array([[getattr(scf,func)(R[ii,jj],z[ii,jj],phi[ii,jj])
+                              for jj in range(5)] for ii in range(4)])
+        for pot in [scf,scfc,scfc]: # twice to use the cache
+            assert numpy.all(numpy.fabs(getattr(pot,func)(R,z,phi)-single) < 10.**-10.), "Evaluating {0} at an array of points does not agree with evaluating it at each point".format(func)
+    # Different points clear the cache
+    assert numpy.fabs(scfc(R[0,0],z[0,0],phi[0,0])-scf(R[0,0],z[0,0],phi[0,0])) < 10.**-10., "Cached basis functions are used at different points"
+    return None
+
 ##############GENERIC FUNCTIONS BELOW###############
 
+## Draws n particles from a Hernquist profile with scale a
+def sample_hernquist(n,a=1.):
+    u= numpy.sqrt(numpy.random.uniform(size=n))
+    r= a*u/(1.-u)
+    costheta= numpy.random.uniform(-1.,1.,size=n)
+    phi= numpy.random.uniform(0.,2.*numpy.pi,size=n)
+    sintheta= numpy.sqrt(1.-costheta**2.)
+    return numpy.array([r*sintheta*numpy.cos(phi),r*sintheta*numpy.sin(phi),
+                        r*costheta])
+
 ##This is used to test whether input as arrays works
 def ArrayTest(scf, params):
     def compareFunctions(func, result, i):